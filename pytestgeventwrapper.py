@@ -9,5 +9,7 @@ import sys
 
 import pytest
 
-exit_code = pytest.main()
-sys.exit(exit_code)
+# guarded since worker processes started with spawn import this module as their main
+if __name__ == '__main__':
+    exit_code = pytest.main()
+    sys.exit(exit_code)
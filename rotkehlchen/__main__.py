@@ -1,6 +1,7 @@
 from gevent import monkey  # isort:skip
 monkey.patch_all()  # isort:skip
 import logging
+import multiprocessing
 import sys
 import traceback
 
@@ -38,4 +39,5 @@ def main() -> None:
 
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()  # for the decoding worker processes of packaged builds
     main()
@@ -209,6 +209,7 @@ from rotkehlchen.icons import (
 )
 from rotkehlchen.inquirer import CurrentPriceOracle, Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.oracles.telemetry import OracleTelemetry
 from rotkehlchen.premium.premium import PremiumCredentials
 from rotkehlchen.rotkehlchen import Rotkehlchen
 from rotkehlchen.serialization.serialize import process_result, process_result_list
@@ -250,6 +251,7 @@ from rotkehlchen.types import (
     UserNote,
 )
 from rotkehlchen.utils.misc import combine_dicts, ts_now
+from rotkehlchen.utils.rate_limiter import RateLimiter
 from rotkehlchen.utils.snapshots import parse_import_snapshot_data
 from rotkehlchen.utils.version_check import get_current_version
 
@@ -263,6 +265,7 @@ if TYPE_CHECKING:
     from rotkehlchen.db.drivers.gevent import DBCursor
     from rotkehlchen.exchanges.kraken import KrakenAccountType
     from rotkehlchen.history.events.structures.base import HistoryBaseEntry
+    from rotkehlchen.history.events.structures.evm_event import EvmEvent
 
 
 logger = logging.getLogger(__name__)
@@ -565,11 +568,13 @@ class RestAPI:
             save_data: bool,
             ignore_errors: bool,
             ignore_cache: bool,
+            incremental: bool,
     ) -> dict[str, Any]:
         result = self.rotkehlchen.query_balances(
             requested_save_data=save_data,
             save_despite_errors=ignore_errors,
             ignore_cache=ignore_cache,
+            incremental=incremental,
         )
         return {'result': result, 'message': ''}
 
@@ -598,6 +603,10 @@ class RestAPI:
         self.rotkehlchen.data.db.delete_external_service_credentials(services)
         return self._return_external_services_response()
 
+    @staticmethod
+    def get_external_services_rate_limits() -> Response:
+        return api_response(_wrap_in_ok_result(RateLimiter().get_stats()))
+
     def get_exchanges(self) -> Response:
         return api_response(
             _wrap_in_ok_result(self.rotkehlchen.exchange_manager.get_connected_exchanges_info()),
@@ -769,6 +778,10 @@ class RestAPI:
             status_code = HTTPStatus.BAD_GATEWAY
         else:
             result = balances.serialize()
+            msg = ', '.join(
+                f'Querying {chain!s} balances failed due to {error_msg}'
+                for chain, error_msg in balances.failed_chains.items()
+            )
 
         return {'result': result, 'message': msg, 'status_code': status_code}
 
@@ -2766,6 +2779,33 @@ class RestAPI:
 
         return {'result': result, 'message': message, 'status_code': status_code}
 
+    def _decode_evm_transactions_of_chain(
+            self,
+            ignore_cache: bool,
+            entry: EvmTransactionDecodingApiData,
+    ) -> tuple[list['EvmEvent'], HTTPStatus, str]:
+        """Decodes the transactions of a single chain entry of decode_evm_transactions.
+        Errors are returned instead of raised since this runs in its own greenlet."""
+        decoder = self.rotkehlchen.chains_aggregator.get_evm_manager(entry['evm_chain']).transactions_decoder  # noqa: E501
+        try:
+            if entry['addresses'] is not None:
+                decoded_events = decoder.redecode_affected_transactions(
+                    addresses=entry['addresses'],
+                    send_ws_notifications=True,
+                )
+            else:
+                decoded_events = decoder.decode_transaction_hashes(
+                    ignore_cache=ignore_cache,
+                    tx_hashes=entry['tx_hashes'],
+                    send_ws_notifications=True,
+                )
+        except (RemoteError, DeserializationError) as e:
+            return [], HTTPStatus.BAD_GATEWAY, f'Failed to request evm transaction decoding due to {e!s}'  # noqa: E501
+        except InputError as e:
+            return [], HTTPStatus.CONFLICT, f'Failed to request evm transaction decoding due to {e!s}'  # noqa: E501
+
+        return decoded_events, HTTPStatus.OK, ''
+
     @async_api_call()
     def decode_evm_transactions(
             self,
@@ -2775,46 +2815,58 @@ class RestAPI:
         """
         Decode a set of transactions selected by their transaction hash. If the tx_hashes
         value is None all the transactions for that chain  in the database will be
-        attempted to be decoded. If the tx_hashes argument is provided then the USD
-        price for their events will be queried.
+        attempted to be decoded. If addresses are given instead then only the already
+        decoded transactions that involve them are redecoded. If the tx_hashes or the
+        addresses argument is provided then the USD price for their events will be queried.
+
+        Each chain is decoded in its own greenlet so that the remote queries for missing
+        receipts of the different chains run concurrently. With the multiprocess_decoding
+        setting big batches of each chain are decoded in worker processes, on multiple cores.
         """
         task_manager = self.rotkehlchen.task_manager
-        result = None
-        message = ''
-        status_code = HTTPStatus.OK
+        greenlets = [
+            gevent.spawn(self._decode_evm_transactions_of_chain, ignore_cache, entry)
+            for entry in data
+        ]
+        gevent.joinall(greenlets)
+        for entry, greenlet in zip(data, greenlets, strict=True):
+            decoded_events, status_code, message = greenlet.get()
+            if status_code != HTTPStatus.OK:
+                return {'result': None, 'message': message, 'status_code': status_code}
 
-        for entry in data:
-            chain_manager = self.rotkehlchen.chains_aggregator.get_evm_manager(entry['evm_chain'])
-            try:
-                decoded_events = chain_manager.transactions_decoder.decode_transaction_hashes(
-                    ignore_cache=ignore_cache,
-                    tx_hashes=entry['tx_hashes'],
-                    send_ws_notifications=True,
+            if (entry['tx_hashes'] is not None or entry['addresses'] is not None) and task_manager is not None:  # noqa: E501
+                # Trigger the task to query the missing prices for the decoded events
+                events_filter = EvmEventFilterQuery.make(
+                    tx_hashes=[event.tx_hash for event in decoded_events],
+                )
+                history_events_db = DBHistoryEvents(task_manager.database)
+                entries = history_events_db.get_base_entries_missing_prices(events_filter)
+                query_missing_prices_of_base_entries(
+                    database=task_manager.database,
+                    entries_missing_prices=entries,
+                    base_entries_ignore_set=task_manager.base_entries_ignore_set,
                 )
-                if entry['tx_hashes'] is not None and task_manager is not None:
-                    # Trigger the task to query the missing prices for the decoded events
-                    events_filter = EvmEventFilterQuery.make(
-                        tx_hashes=[event.tx_hash for event in decoded_events],
-                    )
-                    history_events_db = DBHistoryEvents(task_manager.database)
-                    entries = history_events_db.get_base_entries_missing_prices(events_filter)
-                    query_missing_prices_of_base_entries(
-                        database=task_manager.database,
-                        entries_missing_prices=entries,
-                        base_entries_ignore_set=task_manager.base_entries_ignore_set,
-                    )
-            except (RemoteError, DeserializationError) as e:
-                status_code = HTTPStatus.BAD_GATEWAY
-                message = f'Failed to request evm transaction decoding due to {e!s}'
-                break
-            except InputError as e:
-                status_code = HTTPStatus.CONFLICT
-                message = f'Failed to request evm transaction decoding due to {e!s}'
-                break
-        else:  # no break in the for loop, success
-            result = True
 
-        return {'result': result, 'message': message, 'status_code': status_code}
+        return {'result': True, 'message': '', 'status_code': HTTPStatus.OK}
+
+    def _decode_pending_evm_transactions_of_chain(
+            self,
+            evm_chain: EVM_CHAIN_IDS_WITH_TRANSACTIONS_TYPE,
+    ) -> int:
+        """Queries the missing receipts and decodes the undecoded transactions of a chain.
+        Returns the number of transactions that were pending decoding"""
+        chain_manager = self.rotkehlchen.chains_aggregator.get_evm_manager(evm_chain)
+        # make sure that all the receipts are already queried
+        chain_manager.transactions.get_receipts_for_transactions_missing_them()
+        amount_of_tx_to_decode = DBEvmTx(self.rotkehlchen.data.db).count_hashes_not_decoded(
+            chain_id=evm_chain,
+        )
+        if amount_of_tx_to_decode > 0:
+            chain_manager.transactions_decoder.get_and_decode_undecoded_transactions(
+                send_ws_notifications=True,
+            )
+
+        return amount_of_tx_to_decode
 
     @async_api_call()
     def decode_pending_evm_transactions(
@@ -2827,22 +2879,21 @@ class RestAPI:
         - Decode ethereum transactions
 
         It can be a slow process and this is why it is important to set the list of addresses
-        queried per module that need to be decoded.
+        queried per module that need to be decoded. Each chain is processed in its own
+        greenlet so that the remote queries of the different chains run concurrently and,
+        with the multiprocess_decoding setting, big batches are decoded in worker processes.
 
         This logic is executed by the frontend in pages where the set of transactions needs to be
         up to date, for example, the liquity module.
         """
-        dbevmtx = DBEvmTx(self.rotkehlchen.data.db)
+        greenlets = [
+            gevent.spawn(self._decode_pending_evm_transactions_of_chain, evm_chain)
+            for evm_chain in evm_chains
+        ]
+        gevent.joinall(greenlets, raise_error=True)
         result = {}
-        for evm_chain in evm_chains:
-            chain_manager = self.rotkehlchen.chains_aggregator.get_evm_manager(evm_chain)
-            # make sure that all the receipts are already queried
-            chain_manager.transactions.get_receipts_for_transactions_missing_them()
-            amount_of_tx_to_decode = dbevmtx.count_hashes_not_decoded(chain_id=evm_chain)
-            if amount_of_tx_to_decode > 0:
-                chain_manager.transactions_decoder.get_and_decode_undecoded_transactions(
-                    send_ws_notifications=True,
-                )
+        for evm_chain, greenlet in zip(evm_chains, greenlets, strict=True):
+            if (amount_of_tx_to_decode := greenlet.get()) > 0:
                 result[evm_chain.to_name()] = amount_of_tx_to_decode
 
         return {
@@ -2861,6 +2912,27 @@ class RestAPI:
 
         return _wrap_in_ok_result(pending_transactions_to_decode)
 
+    def set_evm_decoding_profiling(
+            self,
+            enable: bool,
+            evm_chains: list[EVM_CHAIN_IDS_WITH_TRANSACTIONS_TYPE],
+    ) -> Response:
+        for evm_chain in evm_chains:
+            chain_manager = self.rotkehlchen.chains_aggregator.get_evm_manager(evm_chain)
+            chain_manager.transactions_decoder.set_profiling(enable)
+
+        return api_response(OK_RESULT)
+
+    def get_evm_decoding_profile(self) -> Response:
+        """Returns the decoding rules stats of the evm chains that have profiling enabled"""
+        result = {}
+        for evm_chain in EVM_CHAIN_IDS_WITH_TRANSACTIONS:
+            chain_manager = self.rotkehlchen.chains_aggregator.get_evm_manager(evm_chain)
+            if (profiler := chain_manager.transactions_decoder.profiler) is not None:
+                result[evm_chain.to_name()] = profiler.serialize()
+
+        return api_response(_wrap_in_ok_result(result))
+
     def get_asset_icon(
             self,
             asset: AssetWithNameAndType,
@@ -3074,6 +3146,15 @@ class RestAPI:
         result_dict = _wrap_in_ok_result(data)
         return api_response(result_dict, status_code=HTTPStatus.OK)
 
+    @staticmethod
+    def get_oracle_telemetry() -> Response:
+        return api_response(_wrap_in_ok_result(OracleTelemetry().serialize()))
+
+    @staticmethod
+    def clear_oracle_telemetry() -> Response:
+        OracleTelemetry().clear()
+        return api_response(OK_RESULT)
+
     @async_api_call()
     def get_token_info(self, address: ChecksumEvmAddress, chain_id: SUPPORTED_CHAIN_IDS) -> dict[str, Any]:  # noqa: E501
         evm_manager = self.rotkehlchen.chains_aggregator.get_evm_manager(chain_id)
@@ -3899,6 +3980,7 @@ class RestAPI:
             only_cache: bool,
             addresses: Sequence[ChecksumEvmAddress] | None,
             blockchain: SUPPORTED_EVM_CHAINS,
+            incremental: bool,
     ) -> dict[str, Any]:
         manager: EvmManager = self.rotkehlchen.chains_aggregator.get_chain_manager(blockchain)
         if addresses is None:
@@ -3908,6 +3990,7 @@ class RestAPI:
             account_tokens_info = manager.tokens.detect_tokens(
                 only_cache=only_cache,
                 addresses=addresses,
+                incremental=incremental,
             )
         except (RemoteError, BadFunctionCallOutput) as e:
             return wrap_in_fail_result(message=str(e), status_code=HTTPStatus.CONFLICT)
@@ -74,6 +74,7 @@ from rotkehlchen.api.v1.resources import (
     EventsOnlineQueryResource,
     EvmAccountsResource,
     EvmCounterpartiesResource,
+    EvmDecodingProfilingResource,
     EvmModuleBalancesResource,
     EvmModuleBalancesWithVersionResource,
     EvmPendingTransactionsDecodingResource,
@@ -85,6 +86,7 @@ from rotkehlchen.api.v1.resources import (
     ExchangesDataResource,
     ExchangesResource,
     ExportHistoryEventResource,
+    ExternalServicesRateLimitsResource,
     ExternalServicesResource,
     FalsePositiveSpamTokenResource,
     HistoricalAssetsPriceResource,
@@ -118,6 +120,7 @@ from rotkehlchen.api.v1.resources import (
     NFTSPricesResource,
     NFTSResource,
     OraclesResource,
+    OracleTelemetryResource,
     OwnedAssetsResource,
     PeriodicDataResource,
     PickleDillResource,
@@ -172,7 +175,9 @@ URLS_V1: URLS = [
     ('/tasks/<int:task_id>', AsyncTasksResource, 'specific_async_tasks_resource'),
     ('/exchange_rates', ExchangeRatesResource),
     ('/external_services', ExternalServicesResource),
+    ('/external_services/rate_limits', ExternalServicesRateLimitsResource),
     ('/oracles', OraclesResource),
+    ('/oracles/telemetry', OracleTelemetryResource),
     ('/oracles/<string:oracle>/cache', NamedOracleCacheResource),
     ('/exchanges', ExchangesResource),
     ('/exchanges/balances', ExchangeBalancesResource),
@@ -238,6 +243,7 @@ URLS_V1: URLS = [
     ('blockchains/evm/all', AllEvmChainsResource),
     ('/blockchains/evm/transactions', EvmTransactionsResource),
     ('/blockchains/evm/transactions/decode', EvmPendingTransactionsDecodingResource),
+    ('/blockchains/evm/transactions/decode/profiling', EvmDecodingProfilingResource),
     ('/blockchains/eth2/validators', Eth2ValidatorsResource),
     ('/blockchains/eth2/stake/details', Eth2StakeDetailsResource),
     ('/blockchains/eth2/stake/dailystats', Eth2DailyStatsResource),
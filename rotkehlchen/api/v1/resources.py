@@ -79,6 +79,7 @@ from rotkehlchen.api.v1.schemas import (
     EventDetailsQuerySchema,
     EventsOnlineQuerySchema,
     EvmAccountsPutSchema,
+    EvmDecodingProfilingSchema,
     EvmPendingTransactionDecodingSchema,
     EvmTransactionDecodingSchema,
     EvmTransactionHashAdditionSchema,
@@ -644,6 +645,24 @@ class EvmPendingTransactionsDecodingResource(BaseMethodView):
         return self.rest_api.get_count_transactions_not_decoded(async_query=async_query)
 
 
+class EvmDecodingProfilingResource(BaseMethodView):
+
+    put_schema = EvmDecodingProfilingSchema()
+
+    @require_loggedin_user()
+    def get(self) -> Response:
+        return self.rest_api.get_evm_decoding_profile()
+
+    @require_loggedin_user()
+    @use_kwargs(put_schema, location='json')
+    def put(
+            self,
+            enable: bool,
+            evm_chains: list[EVM_CHAIN_IDS_WITH_TRANSACTIONS_TYPE],
+    ) -> Response:
+        return self.rest_api.set_evm_decoding_profiling(enable=enable, evm_chains=evm_chains)
+
+
 class EthereumAirdropsResource(BaseMethodView):
 
     get_schema = AsyncQueryArgumentSchema()
@@ -751,6 +770,13 @@ class ExternalServicesResource(BaseMethodView):
         return self.rest_api.delete_external_services(services=services)
 
 
+class ExternalServicesRateLimitsResource(BaseMethodView):
+
+    @require_loggedin_user()
+    def get(self) -> Response:
+        return self.rest_api.get_external_services_rate_limits()
+
+
 class AllBalancesResource(BaseMethodView):
 
     get_schema = AllBalancesQuerySchema()
@@ -763,12 +789,14 @@ class AllBalancesResource(BaseMethodView):
             ignore_errors: bool,
             async_query: bool,
             ignore_cache: bool,
+            incremental: bool,
     ) -> Response:
         return self.rest_api.query_all_balances(
             save_data=save_data,
             ignore_errors=ignore_errors,
             async_query=async_query,
             ignore_cache=ignore_cache,
+            incremental=incremental,
         )
 
 
@@ -2476,6 +2504,17 @@ class OraclesResource(BaseMethodView):
         return self.rest_api.get_supported_oracles()
 
 
+class OracleTelemetryResource(BaseMethodView):
+
+    @require_loggedin_user()
+    def get(self) -> Response:
+        return self.rest_api.get_oracle_telemetry()
+
+    @require_loggedin_user()
+    def delete(self) -> Response:
+        return self.rest_api.clear_oracle_telemetry()
+
+
 class ERC20TokenInfo(BaseMethodView):
 
     get_schema = ERC20InfoSchema()
@@ -2796,12 +2835,14 @@ class DetectTokensResource(BaseMethodView):
             async_query: bool,
             only_cache: bool,
             addresses: Sequence[ChecksumEvmAddress] | None,
+            incremental: bool,
     ) -> Response:
         return self.rest_api.detect_evm_tokens(
             async_query=async_query,
             only_cache=only_cache,
             addresses=addresses,
             blockchain=blockchain,
+            incremental=incremental,
         )
 
 
@@ -332,6 +332,7 @@ class EvmTransactionQuerySchema(
 class SingleEVMTransactionDecodingSchema(Schema):
     evm_chain = EvmChainNameField(required=True)
     tx_hashes = fields.List(EVMTransactionHashField(), load_default=None)
+    addresses = fields.List(EvmAddressField(), load_default=None)
 
     @validates_schema
     def validate_schema(
@@ -346,6 +347,19 @@ class SingleEVMTransactionDecodingSchema(Schema):
                 field_name='tx_hashes',
             )
 
+        addresses = data.get('addresses')
+        if addresses is not None:
+            if len(addresses) == 0:
+                raise ValidationError(
+                    message='Empty list of addresses is a noop. Did you mean to omit the list?',
+                    field_name='addresses',
+                )
+            if tx_hashes is not None:
+                raise ValidationError(
+                    message='Can not give both transaction hashes and addresses to decode',
+                    field_name='addresses',
+                )
+
 
 class EventsOnlineQuerySchema(AsyncQueryArgumentSchema):
     query_type = SerializableEnumField(enum_class=HistoryEventQueryType, required=True)
@@ -375,6 +389,14 @@ class EvmPendingTransactionDecodingSchema(AsyncQueryArgumentSchema):
             )
 
 
+class EvmDecodingProfilingSchema(Schema):
+    enable = fields.Boolean(required=True)
+    evm_chains = fields.List(
+        EvmChainNameField(limit_to=list(EVM_CHAIN_IDS_WITH_TRANSACTIONS)),
+        load_default=EVM_CHAIN_IDS_WITH_TRANSACTIONS,
+    )
+
+
 class TradesQuerySchema(
         AsyncQueryArgumentSchema,
         TimestampRangeSchema,
@@ -1275,6 +1297,37 @@ class ModifiableSettingsSchema(Schema):
             error='The penalty should be >= 1 seconds',
         ),
     )
+    current_price_cache_size = fields.Integer(
+        load_default=None,
+        validate=webargs.validate.Range(
+            min=1,
+            error='The current price cache size should be >= 1',
+        ),
+    )
+    serve_stale_current_prices = fields.Bool(load_default=None)
+    historical_price_interpolation_max_gap = fields.Integer(
+        load_default=None,
+        validate=webargs.validate.Range(
+            min=0,
+            error='The historical price interpolation gap should be >= 0 seconds',
+        ),
+    )
+    adaptive_oracle_order = fields.Bool(load_default=None)
+    multiprocess_decoding = fields.Bool(load_default=None)
+    balances_query_concurrency = fields.Integer(
+        load_default=None,
+        validate=webargs.validate.Range(
+            min=1,
+            error='The balances query concurrency should be >= 1',
+        ),
+    )
+    chain_balances_query_timeout = fields.Integer(
+        load_default=None,
+        validate=webargs.validate.Range(
+            min=1,
+            error='The chain balances query timeout should be > 0 seconds',
+        ),
+    )
 
     @validates_schema
     def validate_settings_schema(
@@ -1332,6 +1385,13 @@ class ModifiableSettingsSchema(Schema):
             read_timeout=data['read_timeout'],
             oracle_penalty_threshold_count=data['oracle_penalty_threshold_count'],
             oracle_penalty_duration=data['oracle_penalty_duration'],
+            current_price_cache_size=data['current_price_cache_size'],
+            serve_stale_current_prices=data['serve_stale_current_prices'],
+            historical_price_interpolation_max_gap=data['historical_price_interpolation_max_gap'],
+            adaptive_oracle_order=data['adaptive_oracle_order'],
+            multiprocess_decoding=data['multiprocess_decoding'],
+            balances_query_concurrency=data['balances_query_concurrency'],
+            chain_balances_query_timeout=data['chain_balances_query_timeout'],
         )
 
 
@@ -1399,6 +1459,7 @@ class AllBalancesQuerySchema(AsyncQueryArgumentSchema):
     save_data = fields.Boolean(load_default=False)
     ignore_errors = fields.Boolean(load_default=False)
     ignore_cache = fields.Boolean(load_default=False)
+    incremental = fields.Boolean(load_default=False)
 
 
 class ExternalServiceSchema(Schema):
@@ -2867,6 +2928,7 @@ class DetectTokensSchema(
     OptionalAddressesListSchema,
 ):
     blockchain = BlockchainField(required=True, exclude_types=list(NON_EVM_CHAINS))
+    incremental = fields.Boolean(load_default=False)
 
 
 class UserNotesPutSchema(Schema):
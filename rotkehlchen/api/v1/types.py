@@ -3,13 +3,14 @@ from enum import auto
 from typing import Literal, TypedDict
 
 from rotkehlchen.history.events.structures.base import HistoryBaseEntryType
-from rotkehlchen.types import SUPPORTED_CHAIN_IDS, EVMTxHash
+from rotkehlchen.types import SUPPORTED_CHAIN_IDS, ChecksumEvmAddress, EVMTxHash
 from rotkehlchen.utils.mixins.enums import SerializableEnumNameMixin
 
 
 class EvmTransactionDecodingApiData(TypedDict):
     evm_chain: SUPPORTED_CHAIN_IDS
     tx_hashes: list[EVMTxHash] | None
+    addresses: list[ChecksumEvmAddress] | None
 
 
 class EvmPendingTransactionDecodingApiData(TypedDict):
@@ -43,14 +43,19 @@ class AssetResolver:
 
     @staticmethod
     def clean_memory_cache(identifier: str | None = None) -> None:
-        """Clean the memory cache of either a single or all assets"""
+        """Clean the memory cache of either a single or all assets.
+
+        Also cleans the evm tokens cache of the globaldb for the same assets"""
+        from rotkehlchen.globaldb.handler import GlobalDBHandler  # pylint: disable=import-outside-toplevel  # isort:skip
         assert AssetResolver.__instance is not None, 'when cleaning the cache instance should be set'  # noqa: E501
         if identifier is not None:
             AssetResolver.__instance.assets_cache.remove(identifier)
             AssetResolver.__instance.types_cache.remove(identifier)
+            GlobalDBHandler.clean_evm_tokens_cache([identifier])
         else:
             AssetResolver.__instance.assets_cache.clear()
             AssetResolver.__instance.types_cache.clear()
+            GlobalDBHandler.clean_evm_tokens_cache()
 
     @staticmethod
     def resolve_asset(identifier: str) -> 'AssetWithNameAndType':
@@ -48,16 +48,16 @@ def get_manually_tracked_balances(
     with db.conn.read_ctx() as cursor:
         balances = db.get_manually_tracked_balances(cursor, balance_type=balance_type)
     balances_with_value = []
-    for entry in balances:
-        try:
-            price = Inquirer().find_usd_price(entry.asset)
-        except RemoteError as e:
-            db.msg_aggregator.add_warning(
-                f'Could not find price for {entry.asset.identifier} during '
-                f'manually tracked balance querying due to {e!s}',
-            )
-            price = ZERO_PRICE
+    try:
+        prices = Inquirer.find_usd_prices(assets=[entry.asset for entry in balances])
+    except RemoteError as e:
+        db.msg_aggregator.add_warning(
+            f'Could not find prices during manually tracked balance querying due to {e!s}',
+        )
+        prices = {}
 
+    for entry in balances:
+        price = prices.get(entry.asset, ZERO_PRICE)
         value = Balance(amount=entry.amount, usd_value=price * entry.amount)
         balances_with_value.append(ManuallyTrackedBalanceWithValue(
             identifier=entry.identifier,
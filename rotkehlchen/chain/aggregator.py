@@ -7,13 +7,15 @@ from itertools import starmap
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Literal, Optional, TypeVar, cast, get_args, overload
 
+import gevent
 import requests
 from gevent.lock import Semaphore
+from gevent.pool import Pool
 from web3.exceptions import BadFunctionCallOutput, Web3Exception
 
 from rotkehlchen.accounting.structures.balance import Balance, BalanceSheet
 from rotkehlchen.api.websockets.typedefs import WSMessageType
-from rotkehlchen.assets.asset import CryptoAsset, EvmToken
+from rotkehlchen.assets.asset import Asset, CryptoAsset, EvmToken
 from rotkehlchen.chain.accounts import BlockchainAccountData, BlockchainAccounts
 from rotkehlchen.chain.avalanche.manager import AvalancheManager
 from rotkehlchen.chain.bitcoin import get_bitcoin_addresses_balances
@@ -44,10 +46,13 @@ from rotkehlchen.chain.substrate.utils import SUBSTRATE_NODE_CONNECTION_TIMEOUT
 from rotkehlchen.constants import ONE, ZERO
 from rotkehlchen.constants.assets import A_AVAX, A_BCH, A_BTC, A_DAI, A_DOT, A_ETH, A_ETH2, A_KSM
 from rotkehlchen.constants.resolver import ethaddress_to_identifier
+from rotkehlchen.constants.timing import DAY_IN_SECONDS
 from rotkehlchen.db.cache import DBCacheStatic
 from rotkehlchen.db.eth2 import DBEth2
+from rotkehlchen.db.evmtx import DBEvmTx
 from rotkehlchen.db.filtering import Eth2DailyStatsFilterQuery
 from rotkehlchen.db.queried_addresses import QueriedAddresses
+from rotkehlchen.db.settings import CachedSettings
 from rotkehlchen.errors.asset import UnknownAsset, WrongAssetType
 from rotkehlchen.errors.misc import (
     EthSyncError,
@@ -134,6 +139,8 @@ def _module_name_to_class(module_name: ModuleName) -> type[EthereumModule]:
 
 
 DEFI_BALANCES_REQUERY_SECONDS = 600
+# How often an incremental evm balances refresh still queries all addresses
+INCREMENTAL_BALANCES_FULL_SWEEP_SECONDS = DAY_IN_SECONDS
 
 
 # Mapping to token symbols to ignore. True means all
@@ -180,6 +187,23 @@ CHAIN_TO_BALANCE_PROTOCOLS = {
 T = TypeVar('T')
 
 
+def _update_balance_sheet_usd_value(
+        balance_sheet: BalanceSheet,
+        prices: dict[Asset, Price],
+) -> BalanceSheet:
+    """Returns a copy of the balance sheet with the usd values at the given prices"""
+    return BalanceSheet(
+        assets=defaultdict(Balance, {
+            asset: Balance(amount=balance.amount, usd_value=balance.amount * prices[asset])
+            for asset, balance in balance_sheet.assets.items()
+        }),
+        liabilities=defaultdict(Balance, {
+            asset: Balance(amount=balance.amount, usd_value=balance.amount * prices[asset])
+            for asset, balance in balance_sheet.liabilities.items()
+        }),
+    )
+
+
 class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
 
     def __init__(
@@ -236,6 +260,12 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
         self.arbitrum_one_lock = Semaphore()
         self.base_lock = Semaphore()
         self.gnosis_lock = Semaphore()
+        # State of the incremental evm balances refresh. The DB activity marker of each
+        # chain's last balances query, when all its addresses were last queried and each
+        # address' native and token balances before the protocol balances are added.
+        self.evm_balances_query_marker: dict[SupportedBlockchain, tuple[int, int]] = {}
+        self.evm_full_balances_query_ts: dict[SupportedBlockchain, Timestamp] = {}
+        self.evm_base_balances: dict[SupportedBlockchain, dict[ChecksumEvmAddress, BalanceSheet]] = {}  # noqa: E501
 
         # Per account balances
         self.balances = BlockchainBalances(db=database)
@@ -423,12 +453,17 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
 
         return instance
 
-    def get_balances_update(self, chain: SupportedBlockchain | None) -> BlockchainBalancesUpdate:
+    def get_balances_update(
+            self,
+            chain: SupportedBlockchain | None,
+            failed_chains: dict[SupportedBlockchain, str] | None = None,
+    ) -> BlockchainBalancesUpdate:
         """Returns a balances update to be consumed by the API."""
         return BlockchainBalancesUpdate(
             given_chain=chain,
             per_account=self.balances.copy(),
             totals=self.totals.copy(),
+            failed_chains=failed_chains if failed_chains is not None else {},
         )
 
     def check_accounts_existence(
@@ -477,33 +512,113 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
             self,
             blockchain: SupportedBlockchain | None = None,
             ignore_cache: bool = False,
+            incremental: bool = False,
     ) -> BlockchainBalancesUpdate:
         """Queries either all, or specific blockchain balances
 
         If querying beaconchain and ignore_cache is true then each eth1 address is also
         checked for the validators it has deposited and the deposits are fetched.
 
+        If incremental is True then evm chains only requery the addresses with activity
+        since their last balances query. See query_evm_chain_balances.
+
+        When querying all chains, up to balances_query_concurrency chains are queried at
+        the same time and each one for at most chain_balances_query_timeout seconds. A chain
+        whose query fails or times out keeps its previous balances and its error is returned
+        in the update's failed_chains instead of failing the query of all the other chains.
+
         May raise:
         - RemoteError if an external service such as Etherscan or blockchain.info
-        is queried and there is a problem with its query.
+        is queried and there is a problem with its query. Only for a given chain.
         - EthSyncError if querying the token balances through a provided ethereum
-        client and the chain is not synced
+        client and the chain is not synced. Only for a given chain.
         """
         xpub_manager = XpubManager(chains_aggregator=self)
+        failed_chains: dict[SupportedBlockchain, str] = {}
         if blockchain is not None:
-            query_method = f'query_{blockchain.get_key()}_balances'
-            getattr(self, query_method)(ignore_cache=ignore_cache)
-            if ignore_cache is True and blockchain.is_bitcoin():
-                xpub_manager.check_for_new_xpub_addresses(blockchain=blockchain)  # type: ignore # is checked in the if
-        else:  # all chains
-            for chain in SupportedBlockchain:
-                query_method = f'query_{chain.get_key()}_balances'
-                getattr(self, query_method)(ignore_cache=ignore_cache)
-                if ignore_cache is True and chain.is_bitcoin():
-                    xpub_manager.check_for_new_xpub_addresses(blockchain=chain)  # type: ignore # is checked in the if
+            self._query_chain_balances(
+                blockchain=blockchain,
+                ignore_cache=ignore_cache,
+                incremental=incremental,
+                xpub_manager=xpub_manager,
+            )
+        else:  # all chains. Each chain populates its own balances so query them concurrently
+            pool = Pool(size=CachedSettings().balances_query_concurrency)
+            greenlets = {chain: pool.spawn(
+                self._query_chain_balances_with_timeout,
+                blockchain=chain,
+                ignore_cache=ignore_cache,
+                incremental=incremental,
+                xpub_manager=xpub_manager,
+            ) for chain in SupportedBlockchain}
+            gevent.joinall(greenlets.values())
+            for chain, greenlet in greenlets.items():
+                if greenlet.exception is None:
+                    continue
+                if not isinstance(greenlet.exception, RemoteError | EthSyncError):
+                    raise greenlet.exception
+
+                log.error(f'Querying {chain!s} balances failed due to {greenlet.exception!s}')
+                failed_chains[chain] = str(greenlet.exception)
 
         self.totals = self.balances.recalculate_totals()
-        return self.get_balances_update(blockchain)
+        return self.get_balances_update(chain=blockchain, failed_chains=failed_chains)
+
+    def _query_chain_balances(
+            self,
+            blockchain: SupportedBlockchain,
+            ignore_cache: bool,
+            incremental: bool,
+            xpub_manager: XpubManager,
+    ) -> None:
+        """Queries the balances of a single chain and populates its part of the state
+
+        May raise:
+        - RemoteError if an external service is queried and there is a problem with its query.
+        - EthSyncError if querying the token balances through a provided ethereum
+        client and the chain is not synced
+        """
+        query_method = f'query_{blockchain.get_key()}_balances'
+        if blockchain.is_evm():
+            getattr(self, query_method)(ignore_cache=ignore_cache, incremental=incremental)
+        else:
+            getattr(self, query_method)(ignore_cache=ignore_cache)
+        if ignore_cache is True and blockchain.is_bitcoin():
+            xpub_manager.check_for_new_xpub_addresses(blockchain=blockchain)  # type: ignore # is checked in the if
+
+    def _query_chain_balances_with_timeout(
+            self,
+            blockchain: SupportedBlockchain,
+            ignore_cache: bool,
+            incremental: bool,
+            xpub_manager: XpubManager,
+    ) -> None:
+        """Same as _query_chain_balances but gives up after chain_balances_query_timeout seconds
+
+        May raise:
+        - RemoteError if the query times out or any of the errors of _query_chain_balances
+        - EthSyncError
+        """
+        timeout_seconds = CachedSettings().chain_balances_query_timeout
+        timeout = gevent.Timeout(timeout_seconds)
+        timeout.start()
+        try:
+            self._query_chain_balances(
+                blockchain=blockchain,
+                ignore_cache=ignore_cache,
+                incremental=incremental,
+                xpub_manager=xpub_manager,
+            )
+        except gevent.Timeout as e:
+            if e is not timeout:
+                raise  # not our timeout
+
+            raise RemoteError(
+                f'Querying {blockchain!s} balances timed out after '
+                f'{timeout_seconds} seconds',
+            ) from e
+        finally:
+            timeout.close()
 
     @protect_with_lock()
     @cache_response_timewise()
@@ -847,11 +962,12 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
             self,
             manager: 'EvmManager',
             balances: defaultdict[ChecksumEvmAddress, BalanceSheet],
+            addresses: Sequence[ChecksumEvmAddress] | None = None,
     ) -> None:
         """Queries evm token balance via either etherscan or evm node
 
         Should come here during addition of a new account or querying of all token
-        balances.
+        balances. If addresses is None all the accounts of the chain are queried.
 
         May raise:
         - RemoteError if an external service such as Etherscan or cryptocompare
@@ -861,7 +977,7 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
         """
         try:
             balance_result, token_usd_price = manager.tokens.query_tokens_for_addresses(
-                addresses=self.accounts.get(manager.node_inquirer.blockchain),
+                addresses=self.accounts.get(manager.node_inquirer.blockchain) if addresses is None else addresses,  # noqa: E501
             )
         except BadFunctionCallOutput as e:
             log.error(
@@ -897,9 +1013,21 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
             self.defi_balances_last_query_ts = ts_now()
             return self.defi_balances
 
-    def query_evm_chain_balances(self, chain: SUPPORTED_EVM_CHAINS) -> None:
+    def query_evm_chain_balances(
+            self,
+            chain: SUPPORTED_EVM_CHAINS,
+            incremental: bool = False,
+    ) -> None:
         """Queries all the balances for an evm chain and populates the state
 
+        If incremental is True and all addresses of the chain were queried less than
+        INCREMENTAL_BALANCES_FULL_SWEEP_SECONDS ago, then only the addresses with
+        transactions or history events added to the DB since the last query of the chain
+        are queried again. The rest keep their previously queried native and token balances
+        with their usd value updated. This relies on the transactions of the addresses
+        having been queried before the balances. The periodic full query is the safety net
+        for any balance changes that this misses.
+
         May raise:
         - RemoteError if an external service such as Etherscan or cryptocompare
         is queried and there is a problem with its query.
@@ -910,22 +1038,70 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
         if len(accounts) == 0:
             return
 
-        # Query native token balances
+        now, dbevmtx = ts_now(), DBEvmTx(self.database)
+        base_balances = self.evm_base_balances.get(chain, {})
+        addresses_to_query = list(accounts)
+        with self.database.conn.read_ctx() as cursor:
+            # taken before querying so that activity added meanwhile is queried next time
+            activity_marker = dbevmtx.get_activity_marker(cursor)
+            if (
+                    incremental is True and
+                    (last_marker := self.evm_balances_query_marker.get(chain)) is not None and
+                    now - self.evm_full_balances_query_ts.get(chain, 0) < INCREMENTAL_BALANCES_FULL_SWEEP_SECONDS  # noqa: E501
+            ):
+                active_addresses = dbevmtx.get_addresses_with_activity_after(
+                    cursor=cursor,
+                    chain_id=cast(SUPPORTED_CHAIN_IDS, chain.to_chain_id()),
+                    addresses=accounts,
+                    marker=last_marker,
+                )
+                addresses_to_query = [x for x in accounts if x in active_addresses or x not in base_balances]  # noqa: E501
+                log.debug(
+                    f'Incremental {chain!s} balances refresh will query '
+                    f'{len(addresses_to_query)} out of {len(accounts)} addresses',
+                )
+
         manager = cast('EvmManager', self.get_chain_manager(chain))
-        native_token_usd_price = Inquirer().find_usd_price(manager.node_inquirer.native_token)
         chain_balances = self.balances.get(chain)
-        for account, balance in manager.node_inquirer.get_multi_balance(accounts).items():
-            chain_balances[account] = BalanceSheet(
-                assets=defaultdict(Balance, {
-                    manager.node_inquirer.native_token: Balance(balance, balance * native_token_usd_price),  # noqa: E501
-                } if balance != ZERO else {}),  # accounts (e.g. multisigs) can have zero balances
+        if len(reused_accounts := [x for x in accounts if x not in addresses_to_query]) != 0:
+            prices = Inquirer.find_usd_prices(assets={
+                asset for account in reused_accounts
+                for asset in base_balances[account].assets.keys() | base_balances[account].liabilities.keys()  # noqa: E501
+            })
+            for account in reused_accounts:
+                chain_balances[account] = _update_balance_sheet_usd_value(
+                    balance_sheet=base_balances[account],
+                    prices=prices,
+                )
+
+        if len(addresses_to_query) != 0:
+            # Query native token balances
+            native_token = manager.node_inquirer.native_token
+            native_token_usd_price = Inquirer().find_usd_price(native_token)
+            native_balances = manager.node_inquirer.get_multi_balance(addresses_to_query)
+            for account, balance in native_balances.items():
+                chain_balances[account] = BalanceSheet(  # accounts (e.g. multisigs) can have zero balances  # noqa: E501
+                    assets=defaultdict(Balance, {
+                        native_token: Balance(balance, balance * native_token_usd_price),
+                    } if balance != ZERO else {}),
+                )
+            self.query_evm_tokens(
+                manager=manager,
+                balances=chain_balances,
+                addresses=addresses_to_query,
             )
-        self.query_evm_tokens(manager=manager, balances=chain_balances)
+
+        # keep a copy since protocol balances are later added to the same balance sheets
+        self.evm_base_balances[chain] = {x: chain_balances[x].copy() for x in accounts}
+        self.evm_balances_query_marker[chain] = activity_marker
+        if len(addresses_to_query) == len(accounts):
+            self.evm_full_balances_query_ts[chain] = now
 
     @protect_with_lock()
     @cache_response_timewise()
     def query_optimism_balances(
             self,  # pylint: disable=unused-argument
+            incremental: bool = False,
             # Kwargs here is so linters don't complain when the "magic" ignore_cache kwarg is given
             **kwargs: Any,
     ) -> None:
@@ -933,13 +1109,14 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
         Queries all the optimism balances and populates the state.
         Same potential exceptions as ethereum
         """
-        self.query_evm_chain_balances(chain=SupportedBlockchain.OPTIMISM)
+        self.query_evm_chain_balances(chain=SupportedBlockchain.OPTIMISM, incremental=incremental)
         self._query_protocols_with_balance(chain_id=ChainID.OPTIMISM)
 
     @protect_with_lock()
     @cache_response_timewise()
     def query_polygon_pos_balances(
             self,  # pylint: disable=unused-argument
+            incremental: bool = False,
             # Kwargs here is so linters don't complain when the "magic" ignore_cache kwarg is given
             **kwargs: Any,
     ) -> None:
@@ -947,12 +1124,16 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
         Queries all the polygon pos balances and populates the state.
         Same potential exceptions as ethereum
         """
-        self.query_evm_chain_balances(chain=SupportedBlockchain.POLYGON_POS)
+        self.query_evm_chain_balances(
+            chain=SupportedBlockchain.POLYGON_POS,
+            incremental=incremental,
+        )
 
     @protect_with_lock()
     @cache_response_timewise()
     def query_arbitrum_one_balances(
             self,  # pylint: disable=unused-argument
+            incremental: bool = False,
             # Kwargs here is so linters don't complain when the "magic" ignore_cache kwarg is given
             **kwargs: Any,
     ) -> None:
@@ -960,12 +1141,16 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
         Queries all the arbitrum one balances and populates the state.
         Same potential exceptions as ethereum
         """
-        self.query_evm_chain_balances(chain=SupportedBlockchain.ARBITRUM_ONE)
+        self.query_evm_chain_balances(
+            chain=SupportedBlockchain.ARBITRUM_ONE,
+            incremental=incremental,
+        )
 
     @protect_with_lock()
     @cache_response_timewise()
     def query_base_balances(
             self,  # pylint: disable=unused-argument
+            incremental: bool = False,
             # Kwargs here is so linters don't complain when the "magic" ignore_cache kwarg is given
             **kwargs: Any,
     ) -> None:
@@ -973,12 +1158,13 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
         Queries all the base balances and populates the state.
         Same potential exceptions as ethereum
         """
-        self.query_evm_chain_balances(chain=SupportedBlockchain.BASE)
+        self.query_evm_chain_balances(chain=SupportedBlockchain.BASE, incremental=incremental)
 
     @protect_with_lock()
     @cache_response_timewise()
     def query_gnosis_balances(
             self,  # pylint: disable=unused-argument
+            incremental: bool = False,
             # Kwargs here is so linters don't complain when the "magic" ignore_cache kwarg is given
             **kwargs: Any,
     ) -> None:
@@ -986,12 +1172,13 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
         Queries all the gnosis balances and populates the state.
         Same potential exceptions as ethereum
         """
-        self.query_evm_chain_balances(chain=SupportedBlockchain.GNOSIS)
+        self.query_evm_chain_balances(chain=SupportedBlockchain.GNOSIS, incremental=incremental)
 
     @protect_with_lock()
     @cache_response_timewise()
     def query_eth_balances(
             self,  # pylint: disable=unused-argument
+            incremental: bool = False,
             # Kwargs here is so linters don't complain when the "magic" ignore_cache kwarg is given
             **kwargs: Any,
     ) -> None:
@@ -1003,7 +1190,7 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
         - EthSyncError if querying the token balances through a provided ethereum
         client and the chain is not synced
         """
-        self.query_evm_chain_balances(chain=SupportedBlockchain.ETHEREUM)
+        self.query_evm_chain_balances(chain=SupportedBlockchain.ETHEREUM, incremental=incremental)
         self.query_defi_balances()
         self._add_eth_protocol_balances(eth_balances=self.balances.eth)
         self._query_protocols_with_balance(chain_id=ChainID.ETHEREUM)
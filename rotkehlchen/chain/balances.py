@@ -208,6 +208,8 @@ class BlockchainBalancesUpdate:
     given_chain: SupportedBlockchain | None
     per_account: BlockchainBalances
     totals: BalanceSheet
+    # errors of the chains whose query failed when querying all chains
+    failed_chains: dict[SupportedBlockchain, str] = field(default_factory=dict)
 
     def serialize(self) -> dict[str, dict]:
         """
@@ -1,6 +1,7 @@
 import json
 import logging
-from typing import TYPE_CHECKING, Any
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, NamedTuple
 
 from eth_utils import event_abi_to_log_topic
 from web3 import Web3
@@ -17,14 +18,108 @@ from web3.types import ABIEvent
 
 from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.utils.misc import bytes_to_checksum_address
 
 if TYPE_CHECKING:
+    from collections.abc import Sequence
+
     from rotkehlchen.chain.evm.structures import EvmTxReceiptLog
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
 WEB3 = Web3()
+ZERO_WORD_PADDING = b'\x00' * 32
+
+
+class PreparedEventAbi(NamedTuple):
+    """The parts of an event abi needed to decode its logs, computed once per abi"""
+    anonymous: bool
+    topic: bytes
+    topic_types: tuple[str, ...]
+    data_types: tuple[str, ...]
+
+
+@lru_cache(maxsize=512)
+def _prepare_event_abi(abi_json: str) -> PreparedEventAbi:
+    """Processes the given event abi json. Cached since the same few event abis are
+    used to decode most logs.
+
+    May raise:
+    - DeserializationError if the topic and data argument names intersect
+    """
+    event_abi = json.loads(abi_json)
+    log_topics_abi = get_indexed_event_inputs(event_abi)
+    log_topic_types = get_event_abi_types_for_decoding(normalize_event_input_types(log_topics_abi))
+    log_topic_names = get_abi_input_names(ABIEvent({'inputs': log_topics_abi}))
+    log_data_abi = exclude_indexed_event_inputs(event_abi)
+    log_data_types = get_event_abi_types_for_decoding(normalize_event_input_types(log_data_abi))
+    log_data_names = get_abi_input_names(ABIEvent({'inputs': log_data_abi}))
+
+    # sanity check that there are not name intersections between the topic
+    # names and the data argument names.
+    duplicate_names = set(log_topic_names).intersection(log_data_names)
+    if duplicate_names:
+        raise DeserializationError(
+            f'The following argument names are duplicated '
+            f"between event inputs: '{', '.join(duplicate_names)}'",
+        )
+
+    return PreparedEventAbi(
+        anonymous=event_abi['anonymous'],
+        topic=event_abi_to_log_topic(event_abi),
+        topic_types=tuple(log_topic_types),
+        data_types=tuple(log_data_types),
+    )
+
+
+def _decode_static_word(abi_type: str, word: bytes) -> tuple[bool, Any]:
+    """Decodes a 32 bytes word of a static abi type by its fixed layout, without
+    going through the generic abi codec.
+
+    Returns a tuple of whether the word could be decoded and the normalized value. Words
+    that are of another type or not properly padded are not decoded so that the codec
+    handles them, along with any errors."""
+    if abi_type == 'address':
+        if word[:12] != ZERO_WORD_PADDING[:12]:
+            return False, None
+        return True, bytes_to_checksum_address(word[12:])
+    if abi_type == 'bool':
+        if word[:31] != ZERO_WORD_PADDING[:31] or word[31] > 1:
+            return False, None
+        return True, word[31] == 1
+    if abi_type.startswith('uint') and abi_type[4:].isdigit():
+        value = int.from_bytes(word, byteorder='big')
+        return (True, value) if value >> int(abi_type[4:]) == 0 else (False, None)
+    if abi_type.startswith('int') and abi_type[3:].isdigit():
+        value = int.from_bytes(word, byteorder='big', signed=True)
+        bound = 1 << (int(abi_type[3:]) - 1)
+        return (True, value) if -bound <= value < bound else (False, None)
+    if abi_type.startswith('bytes') and abi_type[5:].isdigit():
+        size = int(abi_type[5:])
+        if word[size:] != ZERO_WORD_PADDING[size:]:
+            return False, None
+        return True, word[:size]
+
+    return False, None
+
+
+def _decode_static_words(abi_types: tuple[str, ...], words: 'Sequence[bytes]') -> list[Any] | None:
+    """Decodes 32 bytes words of the given static abi types at their fixed offsets.
+    Returns None if the words can't be decoded this way."""
+    if len(words) != len(abi_types):
+        return None
+
+    values = []
+    for abi_type, word in zip(abi_types, words, strict=True):
+        if len(word) != 32:
+            return None
+        decoded, value = _decode_static_word(abi_type, word)
+        if decoded is False:
+            return None
+        values.append(value)
+
+    return values
 
 
 def decode_event_data_abi_str(
@@ -53,60 +148,46 @@ def decode_event_data_abi(
     """This is an adjustment of web3's event data decoding to work with our code
     source: https://github.com/ethereum/web3.py/blob/8f853f5841fd62187bce0c9f17be75627104ca43/web3/_utils/events.py#L214
 
+    The processing of the abi is cached and static types are decoded at fixed offsets,
+    falling back to web3's codec for anything else.
+
     Returns a tuple containing the decoded topic data and decoded log data.
 
     May raise:
     - DeserializationError if the abi string is invalid or abi or log topics/data do not match
     """
-    if event_abi['anonymous']:
+    prepared_abi = _prepare_event_abi(json.dumps(event_abi, sort_keys=True))
+    if prepared_abi.anonymous:
         topics = tx_log.topics
     elif len(tx_log.topics) == 0:
         raise DeserializationError('Expected non-anonymous event to have 1 or more topics')
-    elif event_abi_to_log_topic(event_abi) != tx_log.topics[0]:
+    elif prepared_abi.topic != tx_log.topics[0]:
         raise DeserializationError('The event signature did not match the provided ABI')
     else:
         topics = tx_log.topics[1:]
 
-    # type ignored b/c event_abi is a Dict which is an ABIEvent
-    log_topics_abi = get_indexed_event_inputs(event_abi)  # type: ignore
-    log_topic_normalized_inputs = normalize_event_input_types(log_topics_abi)
-    log_topic_types = get_event_abi_types_for_decoding(log_topic_normalized_inputs)
-    log_topic_names = get_abi_input_names(ABIEvent({'inputs': log_topics_abi}))
-
-    if len(topics) != len(log_topic_types):
+    if len(topics) != len(prepared_abi.topic_types):
         raise DeserializationError('Expected {} log topics.  Got {}'.format(
-            len(log_topic_types),
+            len(prepared_abi.topic_types),
             len(topics),
         ))
 
-    # type ignored b/c event_abi is a Dict which is an ABIEvent
-    log_data_abi = exclude_indexed_event_inputs(event_abi)  # type: ignore
-    log_data_normalized_inputs = normalize_event_input_types(log_data_abi)
-    log_data_types = get_event_abi_types_for_decoding(log_data_normalized_inputs)
-    log_data_names = get_abi_input_names(ABIEvent({'inputs': log_data_abi}))
+    data_words = [tx_log.data[idx:idx + 32] for idx in range(0, len(tx_log.data), 32)]
+    if (normalized_log_data := _decode_static_words(prepared_abi.data_types, data_words)) is None:
+        normalized_log_data = map_abi_data(
+            BASE_RETURN_NORMALIZERS,
+            prepared_abi.data_types,
+            WEB3.codec.decode(prepared_abi.data_types, tx_log.data),
+        )
 
-    # sanity check that there are not name intersections between the topic
-    # names and the data argument names.
-    duplicate_names = set(log_topic_names).intersection(log_data_names)
-    if duplicate_names:
-        raise DeserializationError(
-            f'The following argument names are duplicated '
-            f"between event inputs: '{', '.join(duplicate_names)}'",
+    if (normalized_topic_data := _decode_static_words(prepared_abi.topic_types, topics)) is None:
+        normalized_topic_data = map_abi_data(
+            BASE_RETURN_NORMALIZERS,
+            prepared_abi.topic_types,
+            [
+                WEB3.codec.decode([topic_type], topic_data)[0]
+                for topic_type, topic_data in zip(prepared_abi.topic_types, topics, strict=False)
+            ],
         )
 
-    decoded_log_data = WEB3.codec.decode(log_data_types, tx_log.data)
-    normalized_log_data = map_abi_data(
-        BASE_RETURN_NORMALIZERS,
-        log_data_types,
-        decoded_log_data,
-    )
-    decoded_topic_data = [
-        WEB3.codec.decode([topic_type], topic_data)[0]
-        for topic_type, topic_data in zip(log_topic_types, topics, strict=False)
-    ]
-    normalized_topic_data = map_abi_data(
-        BASE_RETURN_NORMALIZERS,
-        log_topic_types,
-        decoded_topic_data,
-    )
     return normalized_topic_data, normalized_log_data
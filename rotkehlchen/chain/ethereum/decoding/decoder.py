@@ -1,4 +1,5 @@
 import logging
+import time
 from typing import TYPE_CHECKING
 
 from rotkehlchen.accounting.structures.balance import Balance
@@ -168,6 +169,7 @@ class EthereumTransactionDecoder(EVMTransactionDecoderWithDSProxy):
 
     def _enrich_protocol_tranfers(self, context: EnricherContext) -> TransferEnrichmentOutput:
         for enrich_call in self.rules.token_enricher_rules:
+            start = time.perf_counter() if self.profiler is not None else 0.0
             try:
                 transfer_enrich: TransferEnrichmentOutput = enrich_call(context)
             except (UnknownAsset, WrongAssetType) as e:
@@ -177,6 +179,15 @@ class EthereumTransactionDecoder(EVMTransactionDecoderWithDSProxy):
                 )
                 # Don't try other rules since all of them will fail to resolve the asset
                 return FAILED_ENRICHMENT_OUTPUT
+            finally:
+                if self.profiler is not None:
+                    self.profiler.record(
+                        rule=enrich_call,
+                        rule_type='enricher',
+                        counterparty=context.event.counterparty,
+                        seconds=time.perf_counter() - start,
+                        events=0,
+                    )
 
             if transfer_enrich != FAILED_ENRICHMENT_OUTPUT:
                 return transfer_enrich
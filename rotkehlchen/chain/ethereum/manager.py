@@ -58,7 +58,8 @@ class EthereumManager(EvmManager):
         2. Queries information about curve pools' addresses, lp tokens and used coins
         3. Saves queried information in the cache in globaldb
 
-        Also updates the curve decoder
+        Also updates the curve decoder and redecodes the already decoded transactions
+        that involve new pools in the background
         """
         if self.node_inquirer.ensure_cache_data_is_updated(
                 cache_type=CacheType.CURVE_LP_TOKENS,
@@ -75,5 +76,15 @@ class EthereumManager(EvmManager):
                 'Please open an issue on github.com/rotki/rotki/issues if you saw this.',
             ) from e
         new_mappings = curve_decoder.reload_data()  # type: ignore  # we know type here
-        if new_mappings:
-            self.transactions_decoder.rules.address_mappings.update(new_mappings)
+        if not new_mappings:
+            return
+
+        changed_addresses = self.transactions_decoder.update_address_mappings(new_mappings)
+        if len(changed_addresses) != 0:  # their transactions were decoded without the new pools
+            self.node_inquirer.greenlet_manager.spawn_and_track(
+                after_seconds=None,
+                task_name='Redecode ethereum transactions affected by new curve pools',
+                exception_is_error=True,
+                method=self.transactions_decoder.redecode_affected_transactions,
+                addresses=changed_addresses,
+            )
@@ -314,7 +314,11 @@ class EthereumInquirer(DSProxyInquirerWithCacheData):
         - Performs the etherscan api call by default first
         - If RemoteError raised or etherscan flag set to false
             -> queries blocks subgraph
+        Both are skipped if the block can be found via the local block index.
         """
+        if (block_number := self.get_blocknumber_by_time_from_index(ts=ts, closest=closest)) is not None:  # noqa: E501
+            return block_number
+
         if etherscan:
             with suppress(RemoteError):
                 return self.etherscan.get_blocknumber_by_time(ts, closest)
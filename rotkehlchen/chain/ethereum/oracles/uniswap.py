@@ -1,5 +1,6 @@
 import abc
 import logging
+from collections.abc import Sequence
 from functools import reduce
 from operator import mul
 from typing import TYPE_CHECKING, NamedTuple
@@ -8,7 +9,7 @@ from eth_utils import to_checksum_address
 from web3.types import BlockIdentifier
 
 from rotkehlchen.assets.asset import AssetWithOracles, EvmToken
-from rotkehlchen.chain.ethereum.utils import token_normalized_value
+from rotkehlchen.chain.ethereum.utils import MULTICALL_CHUNKS, token_normalized_value
 from rotkehlchen.chain.evm.constants import ZERO_ADDRESS
 from rotkehlchen.chain.evm.contracts import EvmContract
 from rotkehlchen.chain.evm.types import string_to_evm_address
@@ -16,14 +17,19 @@ from rotkehlchen.constants import ONE, ZERO
 from rotkehlchen.constants.assets import A_DAI, A_ETH, A_USD, A_USDC, A_USDT, A_WETH
 from rotkehlchen.constants.prices import ZERO_PRICE
 from rotkehlchen.constants.resolver import ChainID, ethaddress_to_identifier
+from rotkehlchen.constants.timing import DAY_IN_SECONDS, HOUR_IN_SECONDS
 from rotkehlchen.errors.asset import UnknownAsset, WrongAssetType
 from rotkehlchen.errors.defi import DefiPoolError
 from rotkehlchen.errors.price import PriceQueryUnsupportedAsset
 from rotkehlchen.fval import FVal
 from rotkehlchen.inquirer import Inquirer
-from rotkehlchen.interfaces import CurrentPriceOracleInterface
+from rotkehlchen.interfaces import (
+    CurrentPriceOracleInterface,
+    MultipleCurrentPricesOracleInterface,
+)
 from rotkehlchen.logging import RotkehlchenLogsAdapter
-from rotkehlchen.types import ChecksumEvmAddress, EvmTokenKind, Price
+from rotkehlchen.types import ChecksumEvmAddress, EvmTokenKind, Price, Timestamp
+from rotkehlchen.utils.misc import get_chunks, ts_now
 from rotkehlchen.utils.mixins.cacheable import CacheableMixIn, cache_response_timewise
 
 if TYPE_CHECKING:
@@ -31,6 +37,10 @@ if TYPE_CHECKING:
 
 UNISWAP_FACTORY_DEPLOYED_BLOCK = 12369621
 SINGLE_SIDE_USD_POOL_LIMIT = 5000
+# Seconds for which the route found for a pair of tokens is reused
+ROUTE_CACHE_TTL = DAY_IN_SECONDS
+# Seconds for which a pair of tokens for which no route was found is not searched again
+NO_ROUTE_CACHE_TTL = HOUR_IN_SECONDS * 6
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -49,10 +59,17 @@ class PoolPrice(NamedTuple):
         )
 
 
-class UniswapOracle(CurrentPriceOracleInterface, CacheableMixIn):
+class UniswapOracle(
+        CurrentPriceOracleInterface,
+        MultipleCurrentPricesOracleInterface,
+        CacheableMixIn,
+):
     """
     Provides shared logic between Uniswap V2 and Uniswap V3 to use them as price oracles.
     """
+    # The pool method that returns the data needed to calculate the pool price
+    pool_price_method: str
+
     def __init__(self, ethereum_inquirer: 'EthereumInquirer', version: int):
         CacheableMixIn.__init__(self)
         CurrentPriceOracleInterface.__init__(self, oracle_name=f'Uniswap V{version} oracle')
@@ -63,6 +80,10 @@ class UniswapOracle(CurrentPriceOracleInterface, CacheableMixIn):
             A_DAI.resolve_to_evm_token(),
             A_USDT.resolve_to_evm_token(),
         ]
+        # routes found per pair of tokens along with the timestamp they were found at
+        self.routes_cache: dict[tuple[EvmToken, EvmToken], tuple[list[str], Timestamp]] = {}
+        # token0 and token1 of the pools read so far. They never change for a pool
+        self.pool_tokens: dict[ChecksumEvmAddress, tuple[ChecksumEvmAddress, ChecksumEvmAddress]] = {}  # noqa: E501
 
     def rate_limited_in_last(
             self,
@@ -79,6 +100,112 @@ class UniswapOracle(CurrentPriceOracleInterface, CacheableMixIn):
         """Given two tokens returns a list of pools where they can be swapped"""
 
     @abc.abstractmethod
+    def pool_contract(self, pool_addr: ChecksumEvmAddress) -> EvmContract:
+        """Returns the contract of the pool at the given address"""
+
+    @abc.abstractmethod
+    def pool_price_from_output(
+            self,
+            pool_contract: EvmContract,
+            output: bytes,
+            token_0: EvmToken,
+            token_1: EvmToken,
+    ) -> PoolPrice:
+        """Calculates the pool price from the output of the pool_price_method call.
+        May raise:
+        - DefiPoolError
+        """
+
+    def _pool_tokens_from_output(
+            self,
+            pool_addr: ChecksumEvmAddress,
+            pool_contract: EvmContract,
+            token_0_output: bytes,
+            token_1_output: bytes,
+    ) -> tuple[ChecksumEvmAddress, ChecksumEvmAddress]:
+        """Decodes and remembers the token0 and token1 of the given pool"""
+        token_0_address = pool_contract.decode(token_0_output, 'token0')[0]  # pylint:disable=unsubscriptable-object
+        token_1_address = pool_contract.decode(token_1_output, 'token1')[0]  # pylint:disable=unsubscriptable-object
+        self.pool_tokens[pool_addr] = (
+            to_checksum_address(token_0_address),
+            to_checksum_address(token_1_address),
+        )
+        return self.pool_tokens[pool_addr]
+
+    def get_pool_prices(
+            self,
+            pool_addrs: Sequence[ChecksumEvmAddress],
+            block_identifier: BlockIdentifier = 'latest',
+    ) -> dict[ChecksumEvmAddress, PoolPrice | DefiPoolError]:
+        """Reads the price of all the given pools with as few multicalls as possible.
+
+        The token0 and token1 of a pool are only queried the first time the pool is
+        seen. Pools for which the price could not be read map to the error that
+        prevented it.
+
+        May raise:
+        - RemoteError
+        """
+        calls: list[tuple[ChecksumEvmAddress, str]] = []
+        pool_calls: dict[ChecksumEvmAddress, tuple[EvmContract, int, bool]] = {}
+        for pool_addr in pool_addrs:
+            if pool_addr in pool_calls:
+                continue
+
+            pool_contract = self.pool_contract(pool_addr)
+            query_tokens = pool_addr not in self.pool_tokens
+            pool_calls[pool_addr] = (pool_contract, len(calls), query_tokens)
+            calls.append((pool_addr, pool_contract.encode(method_name=self.pool_price_method)))
+            if query_tokens:
+                calls.extend((
+                    (pool_addr, pool_contract.encode(method_name='token0')),
+                    (pool_addr, pool_contract.encode(method_name='token1')),
+                ))
+
+        outputs: list[tuple[bool, bytes]] = []
+        for calls_chunk in get_chunks(calls, n=MULTICALL_CHUNKS):
+            outputs.extend(self.ethereum.multicall_2(
+                calls=calls_chunk,
+                require_success=False,
+                block_identifier=block_identifier,
+            ))
+
+        result: dict[ChecksumEvmAddress, PoolPrice | DefiPoolError] = {}
+        for pool_addr, (pool_contract, idx, query_tokens) in pool_calls.items():
+            pool_outputs = outputs[idx:(idx + 3 if query_tokens else idx + 1)]
+            if not all(success for success, _ in pool_outputs):
+                result[pool_addr] = DefiPoolError(f'Failed to query uniswap pool {pool_addr}')
+                continue
+
+            if query_tokens:
+                token_0_address, token_1_address = self._pool_tokens_from_output(
+                    pool_addr=pool_addr,
+                    pool_contract=pool_contract,
+                    token_0_output=pool_outputs[1][1],
+                    token_1_output=pool_outputs[2][1],
+                )
+            else:
+                token_0_address, token_1_address = self.pool_tokens[pool_addr]
+
+            try:
+                token_0 = EvmToken(ethaddress_to_identifier(token_0_address))
+                token_1 = EvmToken(ethaddress_to_identifier(token_1_address))
+            except (UnknownAsset, WrongAssetType):
+                result[pool_addr] = DefiPoolError(f'Failed to read token from address {token_0_address} or {token_1_address} as ERC-20 token')  # noqa: E501
+                continue
+
+            try:
+                result[pool_addr] = self.pool_price_from_output(
+                    pool_contract=pool_contract,
+                    output=pool_outputs[0][1],
+                    token_0=token_0,
+                    token_1=token_1,
+                )
+            except DefiPoolError as e:
+                result[pool_addr] = e
+
+        return result
+
     def get_pool_price(
             self,
             pool_addr: ChecksumEvmAddress,
@@ -88,7 +215,16 @@ class UniswapOracle(CurrentPriceOracleInterface, CacheableMixIn):
         token1 of the pool.
         May raise:
         - DefiPoolError
+        - RemoteError
         """
+        pool_price = self.get_pool_prices(
+            pool_addrs=[pool_addr],
+            block_identifier=block_identifier,
+        )[pool_addr]
+        if isinstance(pool_price, DefiPoolError):
+            raise pool_price
+
+        return pool_price
 
     def _find_pool_for(
             self,
@@ -178,24 +314,32 @@ class UniswapOracle(CurrentPriceOracleInterface, CacheableMixIn):
 
         return []
 
-    def get_price(
+    def get_route(self, from_asset: EvmToken, to_asset: EvmToken) -> list[str]:
+        """Same as find_route but remembers the route found for each pair of tokens.
+
+        Found routes are reused for ROUTE_CACHE_TTL seconds. Pairs for which no route
+        exists are not searched again for NO_ROUTE_CACHE_TTL seconds, so that tokens
+        without any pool don't cost a pool lookup in each price query.
+        """
+        now = ts_now()
+        if (cached_route := self.routes_cache.get((from_asset, to_asset))) is not None:
+            route, found_ts = cached_route
+            if now - found_ts < (ROUTE_CACHE_TTL if len(route) != 0 else NO_ROUTE_CACHE_TTL):
+                return route
+
+        route = self.find_route(from_asset, to_asset)
+        self.routes_cache[(from_asset, to_asset)] = (route, now)
+        return route
+
+    def _resolve_tokens(
             self,
             from_asset: AssetWithOracles,
             to_asset: AssetWithOracles,
-            block_identifier: BlockIdentifier,
-    ) -> Price:
-        """
-        Return the price of from_asset to to_asset at the block block_identifier.
-
-        Can raise:
-        - DefiPoolError
-        - RemoteError
+    ) -> tuple[EvmToken, EvmToken]:
+        """Resolves the assets to the ethereum mainnet ERC20 tokens used in the pools.
+        May raise:
+        - PriceQueryUnsupportedAsset
         """
-        log.debug(
-            f'Searching price for {from_asset} to {to_asset} at '
-            f'{block_identifier!r} with {self.name}',
-        )
-
         # Uniswap V2 and V3 use in their contracts WETH instead of ETH
         if from_asset == A_ETH:
             from_asset = self.weth
@@ -208,10 +352,7 @@ class UniswapOracle(CurrentPriceOracleInterface, CacheableMixIn):
         except WrongAssetType as e:
             raise PriceQueryUnsupportedAsset(e.identifier) from e
 
-        if from_token == to_token:
-            return Price(ONE)
-
-        if (
+        if from_token != to_token and (
                 from_token.token_kind != EvmTokenKind.ERC20 or
                 to_token.token_kind != EvmTokenKind.ERC20 or
                 from_token.chain_id != ChainID.ETHEREUM or
@@ -219,23 +360,15 @@ class UniswapOracle(CurrentPriceOracleInterface, CacheableMixIn):
         ):
             raise PriceQueryUnsupportedAsset(f'Either {from_token} or {to_token} is not an ERC20 token in Ethereum mainnet')  # noqa: E501
 
-        route = self.find_route(from_token, to_token)
-
-        if len(route) == 0:
-            log.debug(f'Failed to find uniswap price for {from_token} to {to_token}')
-            return ZERO_PRICE
-        log.debug(f'Found price route {route} for {from_token} to {to_token} using {self.name}')
-
-        prices_and_tokens = []
-        for step in route:
-            log.debug(f'Getting pool price for {step}')
-            prices_and_tokens.append(
-                self.get_pool_price(
-                    pool_addr=to_checksum_address(step),
-                    block_identifier=block_identifier,
-                ),
-            )
+        return from_token, to_token
 
+    @staticmethod
+    def _price_from_pool_prices(
+            from_token: EvmToken,
+            to_token: EvmToken,
+            prices_and_tokens: list[PoolPrice],
+    ) -> Price:
+        """Multiplies the prices of the pools of a route in the right direction"""
         # Looking at which one is token0 and token1 we need to see if we need price or 1/price
         if prices_and_tokens[0].token_0 != from_token:
             prices_and_tokens[0] = prices_and_tokens[0].swap_tokens()
@@ -252,6 +385,51 @@ class UniswapOracle(CurrentPriceOracleInterface, CacheableMixIn):
         price = FVal(reduce(mul, [item.price for item in prices_and_tokens], 1))
         return Price(price)
 
+    def get_price(
+            self,
+            from_asset: AssetWithOracles,
+            to_asset: AssetWithOracles,
+            block_identifier: BlockIdentifier,
+    ) -> Price:
+        """
+        Return the price of from_asset to to_asset at the block block_identifier.
+
+        Can raise:
+        - DefiPoolError
+        - RemoteError
+        """
+        log.debug(
+            f'Searching price for {from_asset} to {to_asset} at '
+            f'{block_identifier!r} with {self.name}',
+        )
+
+        from_token, to_token = self._resolve_tokens(from_asset=from_asset, to_asset=to_asset)
+        if from_token == to_token:
+            return Price(ONE)
+
+        route = self.get_route(from_token, to_token)
+        if len(route) == 0:
+            log.debug(f'Failed to find uniswap price for {from_token} to {to_token}')
+            return ZERO_PRICE
+        log.debug(f'Found price route {route} for {from_token} to {to_token} using {self.name}')
+
+        pool_addrs = [to_checksum_address(step) for step in route]
+        pool_prices = self.get_pool_prices(
+            pool_addrs=pool_addrs,
+            block_identifier=block_identifier,
+        )
+        prices_and_tokens = []
+        for pool_addr in pool_addrs:
+            if isinstance(pool_price := pool_prices[pool_addr], DefiPoolError):
+                raise pool_price
+            prices_and_tokens.append(pool_price)
+
+        return self._price_from_pool_prices(
+            from_token=from_token,
+            to_token=to_token,
+            prices_and_tokens=prices_and_tokens,
+        )
+
     def query_current_price(
             self,
             from_asset: AssetWithOracles,
@@ -280,8 +458,64 @@ class UniswapOracle(CurrentPriceOracleInterface, CacheableMixIn):
         )
         return price, False
 
+    def query_multiple_current_prices(
+            self,
+            from_assets: Sequence[AssetWithOracles],
+            to_asset: AssetWithOracles,
+    ) -> dict[AssetWithOracles, Price]:
+        """Finds the route of each asset and reads the prices of all the pools of all
+        the routes together so that pricing many tokens needs only a few node calls.
+        Routes come from the routes cache when possible.
+
+        May raise:
+        - RemoteError
+        """
+        if to_asset == A_USD:
+            to_asset = A_USDC.resolve_to_asset_with_oracles()
+
+        prices: dict[AssetWithOracles, Price] = {}
+        routes: dict[AssetWithOracles, tuple[EvmToken, EvmToken, list[ChecksumEvmAddress]]] = {}
+        for from_asset in from_assets:
+            try:
+                from_token, to_token = self._resolve_tokens(from_asset=from_asset, to_asset=to_asset)  # noqa: E501
+            except PriceQueryUnsupportedAsset:
+                continue
+
+            if from_token == to_token:
+                prices[from_asset] = Price(ONE)
+            elif len(route := self.get_route(from_token, to_token)) != 0:
+                routes[from_asset] = (
+                    from_token,
+                    to_token,
+                    [to_checksum_address(step) for step in route],
+                )
+
+        if len(routes) == 0:
+            return prices
+
+        pool_prices = self.get_pool_prices(
+            pool_addrs=[x for _, _, pool_addrs in routes.values() for x in pool_addrs],
+        )
+        for from_asset, (from_token, to_token, pool_addrs) in routes.items():
+            prices_and_tokens = []
+            for pool_addr in pool_addrs:
+                if isinstance(pool_price := pool_prices[pool_addr], DefiPoolError):
+                    log.debug(f'Skipping {self.name} price of {from_token} due to {pool_price!s}')
+                    break
+                prices_and_tokens.append(pool_price)
+            else:
+                prices[from_asset] = self._price_from_pool_prices(
+                    from_token=from_token,
+                    to_token=to_token,
+                    prices_and_tokens=prices_and_tokens,
+                )
+
+        log.debug(f'Read {len(set(pool_prices))} pools to price {len(routes)} tokens with {self.name}')  # noqa: E501
+        return prices
+
 
 class UniswapV3Oracle(UniswapOracle):
+    pool_price_method = 'slot0'
 
     def __init__(self, ethereum_inquirer: 'EthereumInquirer'):
         super().__init__(ethereum_inquirer=ethereum_inquirer, version=3)
@@ -305,24 +539,22 @@ class UniswapV3Oracle(UniswapOracle):
         )
 
         # get liquidity for each pool and choose the pool with the highest liquidity
-        best_pool, max_liquidity = to_checksum_address(result[0][0]), 0
-        for query in result:
-            if query[0] == ZERO_ADDRESS:
-                continue
-            pool_address = to_checksum_address(query[0])
-            pool_contract = EvmContract(
-                address=pool_address,
-                abi=self.uniswap_v3_pool_abi,
-                deployed_block=UNISWAP_FACTORY_DEPLOYED_BLOCK,
-            )
-            pool_liquidity = pool_contract.call(
-                node_inquirer=self.ethereum,
-                method_name='liquidity',
-                arguments=[],
-                call_order=None,
-            )
+        pool_contracts = [
+            self.pool_contract(to_checksum_address(query[0]))
+            for query in result if query[0] != ZERO_ADDRESS
+        ]
+        if len(pool_contracts) == 0:
+            return []
+
+        liquidity_output = self.ethereum.multicall(calls=[(
+            pool_contract.address,
+            pool_contract.encode(method_name='liquidity'),
+        ) for pool_contract in pool_contracts])
+        best_pool, max_liquidity = pool_contracts[0].address, 0
+        for pool_contract, output in zip(pool_contracts, liquidity_output, strict=True):
+            pool_liquidity = pool_contract.decode(output, 'liquidity')[0]
             if pool_liquidity > max_liquidity:
-                best_pool = pool_address
+                best_pool = pool_contract.address
                 max_liquidity = pool_liquidity
 
         if max_liquidity == 0:
@@ -330,10 +562,19 @@ class UniswapV3Oracle(UniswapOracle):
             return []
         return [best_pool]
 
-    def get_pool_price(
+    def pool_contract(self, pool_addr: ChecksumEvmAddress) -> EvmContract:
+        return EvmContract(
+            address=pool_addr,
+            abi=self.uniswap_v3_pool_abi,
+            deployed_block=UNISWAP_FACTORY_DEPLOYED_BLOCK,
+        )
+
+    def pool_price_from_output(
             self,
-            pool_addr: ChecksumEvmAddress,
-            block_identifier: BlockIdentifier = 'latest',
+            pool_contract: EvmContract,
+            output: bytes,
+            token_0: EvmToken,
+            token_1: EvmToken,
     ) -> PoolPrice:
         """
         Returns the units of token1 that one token0 can buy
@@ -341,41 +582,7 @@ class UniswapV3Oracle(UniswapOracle):
         May raise:
         - DefiPoolError
         """
-        pool_contract = EvmContract(
-            address=pool_addr,
-            abi=self.uniswap_v3_pool_abi,
-            deployed_block=UNISWAP_FACTORY_DEPLOYED_BLOCK,
-        )
-        calls = [
-            (
-                pool_contract.address,
-                pool_contract.encode(method_name='slot0'),
-            ), (
-                pool_contract.address,
-                pool_contract.encode(method_name='token0'),
-            ), (
-                pool_contract.address,
-                pool_contract.encode(method_name='token1'),
-            ),
-        ]
-        output = self.ethereum.multicall(
-            calls=calls,
-            require_success=True,
-            block_identifier=block_identifier,
-        )
-        token_0_address = pool_contract.decode(output[1], 'token0')[0]  # pylint:disable=unsubscriptable-object
-        token_1_address = pool_contract.decode(output[2], 'token1')[0]  # pylint:disable=unsubscriptable-object
-        try:
-            token_0 = EvmToken(
-                ethaddress_to_identifier(to_checksum_address(token_0_address)),
-            )
-            token_1 = EvmToken(
-                ethaddress_to_identifier(to_checksum_address(token_1_address)),
-            )
-        except (UnknownAsset, WrongAssetType) as e:
-            raise DefiPoolError(f'Failed to read token from address {token_0_address} or {token_1_address} as ERC-20 token') from e  # noqa: E501
-
-        sqrt_price_x96, _, _, _, _, _, _ = pool_contract.decode(output[0], 'slot0')
+        sqrt_price_x96, _, _, _, _, _, _ = pool_contract.decode(output, 'slot0')
         if token_0.decimals is None:
             raise DefiPoolError(f'Token {token_0} has None as decimals')
         if token_1.decimals is None:
@@ -391,6 +598,7 @@ class UniswapV3Oracle(UniswapOracle):
 
 
 class UniswapV2Oracle(UniswapOracle):
+    pool_price_method = 'getReserves'
 
     def __init__(self, ethereum_inquirer: 'EthereumInquirer'):
         super().__init__(ethereum_inquirer=ethereum_inquirer, version=3)
@@ -413,10 +621,19 @@ class UniswapV2Oracle(UniswapOracle):
         )
         return [result]
 
-    def get_pool_price(
+    def pool_contract(self, pool_addr: ChecksumEvmAddress) -> EvmContract:
+        return EvmContract(
+            address=pool_addr,
+            abi=self.uniswap_v2_lp_abi,
+            deployed_block=10000835,  # Factory deployment block
+        )
+
+    def pool_price_from_output(
             self,
-            pool_addr: ChecksumEvmAddress,
-            block_identifier: BlockIdentifier = 'latest',
+            pool_contract: EvmContract,
+            output: bytes,
+            token_0: EvmToken,
+            token_1: EvmToken,
     ) -> PoolPrice:
         """
         Returns the units of token1 that one token0 can buy
@@ -424,51 +641,11 @@ class UniswapV2Oracle(UniswapOracle):
         May raise:
         - DefiPoolError
         """
-        pool_contract = EvmContract(
-            address=pool_addr,
-            abi=self.uniswap_v2_lp_abi,
-            deployed_block=10000835,  # Factory deployment block
-        )
-        calls = [
-            (
-                pool_contract.address,
-                pool_contract.encode(method_name='getReserves'),
-            ), (
-                pool_contract.address,
-                pool_contract.encode(method_name='token0'),
-            ), (
-                pool_contract.address,
-                pool_contract.encode(method_name='token1'),
-            ),
-        ]
-        output = self.ethereum.multicall(
-            calls=calls,
-            require_success=True,
-            block_identifier=block_identifier,
-        )
-
-        token_0_address = pool_contract.decode(output[1], 'token0')[0]  # pylint:disable=unsubscriptable-object
-        token_1_address = pool_contract.decode(output[2], 'token1')[0]  # pylint:disable=unsubscriptable-object
-
-        try:
-            token_0 = EvmToken(
-                ethaddress_to_identifier(to_checksum_address(token_0_address)),
-            )
-        except (UnknownAsset, WrongAssetType) as e:
-            raise DefiPoolError(f'Failed to read token from address {token_0_address} as ERC-20 token') from e  # noqa: E501
-
-        try:
-            token_1 = EvmToken(
-                ethaddress_to_identifier(to_checksum_address(token_1_address)),
-            )
-        except (UnknownAsset, WrongAssetType) as e:
-            raise DefiPoolError(f'Failed to read token from address {token_1_address} as ERC-20 token') from e  # noqa: E501
-
         if token_0.decimals is None:
             raise DefiPoolError(f'Token {token_0} has None as decimals')
         if token_1.decimals is None:
             raise DefiPoolError(f'Token {token_1} has None as decimals')
-        reserve_0, reserve_1, _ = pool_contract.decode(output[0], 'getReserves')
+        reserve_0, reserve_1, _ = pool_contract.decode(output, 'getReserves')
         decimals_constant = 10**(token_0.decimals - token_1.decimals)
 
         if ZERO in (reserve_0, reserve_1):
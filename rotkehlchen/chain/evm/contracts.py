@@ -6,6 +6,7 @@ from typing import TYPE_CHECKING, Any, Generic, Literal, NamedTuple, TypeVar, ov
 from eth_typing.abi import Decodable
 from web3 import Web3
 from web3._utils.abi import get_abi_output_types
+from web3._utils.contracts import find_matching_event_abi
 from web3.types import BlockIdentifier
 
 from rotkehlchen.chain.ethereum.abi import decode_event_data_abi
@@ -110,11 +111,11 @@ class EvmContract(NamedTuple):
     ) -> tuple[list, list]:
         """Decodes an event by finding the event ABI in the given contract's abi
 
-        Perhaps we can have a faster version of this method where instead of name
-        and argument names we just give the index of event abi in the list if we know it
+        The event ABI is looked up directly in the abi instead of creating a web3 contract
+        for each call and its processing is cached by decode_event_data_abi.
         """
-        contract = WEB3.eth.contract(address=self.address, abi=self.abi)
-        event_abi = contract._find_matching_event_abi(
+        event_abi = find_matching_event_abi(
+            abi=self.abi,  # type: ignore[arg-type]  # abi is a list of dicts
             event_name=event_name,
             argument_names=argument_names,
         )
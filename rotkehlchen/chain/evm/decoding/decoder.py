@@ -1,13 +1,15 @@
 import importlib
 import logging
 import pkgutil
+import time
 from abc import ABCMeta, abstractmethod
-from collections.abc import Callable
+from collections.abc import Callable, Collection, Mapping
 from contextlib import suppress
 from dataclasses import dataclass
 from types import ModuleType
 from typing import TYPE_CHECKING, Any, Optional, Protocol
 
+import gevent
 from gevent.lock import Semaphore
 
 from rotkehlchen.accounting.structures.balance import Balance
@@ -24,9 +26,10 @@ from rotkehlchen.chain.evm.decoding.types import CounterpartyDetails
 from rotkehlchen.chain.evm.structures import EvmTxReceipt, EvmTxReceiptLog
 from rotkehlchen.constants import ZERO
 from rotkehlchen.db.constants import HISTORY_MAPPING_STATE_DECODED
-from rotkehlchen.db.evmtx import DBEvmTx
+from rotkehlchen.db.evmtx import TX_QUERY_CHUNK_SIZE, DBEvmTx
 from rotkehlchen.db.filtering import EvmEventFilterQuery
 from rotkehlchen.db.history_events import DBHistoryEvents
+from rotkehlchen.db.settings import CachedSettings
 from rotkehlchen.errors.asset import UnknownAsset, WrongAssetType
 from rotkehlchen.errors.misc import (
     InputError,
@@ -41,12 +44,18 @@ from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.history.events.structures.evm_event import EvmProduct
 from rotkehlchen.history.events.structures.types import HistoryEventSubType, HistoryEventType
 from rotkehlchen.logging import RotkehlchenLogsAdapter
-from rotkehlchen.types import ChecksumEvmAddress, EvmTokenKind, EvmTransaction, EVMTxHash
-from rotkehlchen.utils.misc import from_wei, hex_or_bytes_to_address, hex_or_bytes_to_int
+from rotkehlchen.types import ChecksumEvmAddress, EvmTokenKind, EvmTransaction, EVMTxHash, Location
+from rotkehlchen.utils.misc import (
+    from_wei,
+    get_chunks,
+    hex_or_bytes_to_address,
+    hex_or_bytes_to_int,
+)
 from rotkehlchen.utils.mixins.customizable_date import CustomizableDateMixin
 
 from .base import BaseDecoderTools, BaseDecoderToolsWithDSProxy
 from .constants import CPT_GAS, ERC20_APPROVE, ERC20_OR_ERC721_TRANSFER, OUTGOING_EVENT_TYPES
+from .profiling import DecodingProfiler, DecodingRuleType
 from .structures import (
     DEFAULT_DECODING_OUTPUT,
     ActionItem,
@@ -56,6 +65,13 @@ from .structures import (
     TransferEnrichmentOutput,
 )
 from .utils import maybe_reshuffle_events
+from .workers import (
+    DECODING_WORKER_CHUNK_SIZE,
+    DECODING_WORKER_MIN_TRANSACTIONS,
+    DecodedTransaction,
+    DecodingWorker,
+    DecodingWorkerJob,
+)
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.evm.node_inquirer import EvmNodeInquirer, EvmNodeInquirerWithDSProxy
@@ -167,6 +183,7 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
         self.rules.event_rules.extend(event_rules)
         self.value_asset = value_asset
         self.decoders: dict[str, DecoderInterface] = {}
+        self.profiler: DecodingProfiler | None = None  # set only when profiling is enabled
 
         # Add the built-in decoders
         self._add_builtin_decoders(self.rules)
@@ -286,17 +303,67 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
 
         return possible_products
 
-    def reload_data(self, cursor: 'DBCursor') -> None:
+    def reload_data(self, cursor: 'DBCursor') -> set[ChecksumEvmAddress]:
         """Reload all related settings from DB and data that any decoder may require from the chain
-        so that decoding happens with latest data"""
+        so that decoding happens with latest data.
+
+        Returns the addresses whose address mappings changed"""
         self.base.refresh_tracked_accounts(cursor)
+        changed_addresses = set()
         for decoder in self.decoders.values():
             if isinstance(decoder, CustomizableDateMixin):
                 decoder.reload_settings(cursor)
             if isinstance(decoder, ReloadableDecoderMixin):
                 new_mappings = decoder.reload_data()
                 if new_mappings is not None:
-                    self.rules.address_mappings.update(new_mappings)
+                    changed_addresses |= self.update_address_mappings(new_mappings)
+
+        return changed_addresses
+
+    def update_address_mappings(
+            self,
+            new_mappings: Mapping[ChecksumEvmAddress, tuple[Any, ...]],
+    ) -> set[ChecksumEvmAddress]:
+        """Adds the given address mappings to the decoding rules.
+
+        Returns the addresses that were not mapped before or whose mapping changed"""
+        changed_addresses = {
+            address for address, mapping in new_mappings.items()
+            if self.rules.address_mappings.get(address) != mapping
+        }
+        self.rules.address_mappings.update(new_mappings)
+        return changed_addresses
+
+    def set_profiling(self, enabled: bool) -> None:
+        """Enables or disables the profiling of the decoding rules. Enabling it
+        always starts from clean stats."""
+        self.profiler = DecodingProfiler() if enabled is True else None
+
+    def _profile_rule(
+            self,
+            rule: Callable,
+            rule_type: DecodingRuleType,
+            start: float,
+            output: DecodingOutput | None,
+            counterparty: str | None = None,
+    ) -> None:
+        """Records a call of a decoding rule that started at `start` if profiling is enabled.
+        If no counterparty is given it is taken from the rule's output."""
+        if self.profiler is None:
+            return
+
+        if counterparty is None and output is not None:
+            counterparty = output.matched_counterparty
+            if counterparty is None and output.event is not None:
+                counterparty = output.event.counterparty
+
+        self.profiler.record(
+            rule=rule,
+            rule_type=rule_type,
+            counterparty=counterparty,
+            seconds=time.perf_counter() - start,
+            events=int(output is not None and output.event is not None),
+        )
 
     def try_all_rules(
             self,
@@ -315,12 +382,16 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
             if len(tx_log.topics) == 0:
                 continue  # ignore anonymous events
 
+            start = time.perf_counter() if self.profiler is not None else 0.0
             try:
                 decoding_output = rule(token=token, tx_log=tx_log, transaction=transaction, decoded_events=decoded_events, action_items=action_items, all_logs=all_logs)  # noqa: E501
             except (DeserializationError, IndexError) as e:
+                self._profile_rule(rule=rule, rule_type='event_rule', start=start, output=None)
                 self.msg_aggregator.add_error(f'Decoding tx log with index {tx_log.log_index} of {transaction.tx_hash.hex()} through {rule} failed due to {e!s}. Skipping rule.')  # noqa: E501
                 continue
 
+            self._profile_rule(rule=rule, rule_type='event_rule', start=start, output=decoding_output)  # noqa: E501
+
             if decoding_output.event is not None or len(decoding_output.action_items) > 0:
                 return decoding_output
 
@@ -340,6 +411,7 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
             return DEFAULT_DECODING_OUTPUT
         method = mapping_result[0]
 
+        start = time.perf_counter() if self.profiler is not None else 0.0
         try:
             if len(mapping_result) == 1:
                 result = method(context)
@@ -349,8 +421,15 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
             self.msg_aggregator.add_error(
                 f'Decoding tx log with index {context.tx_log.log_index} of transaction '
                 f'{context.transaction.tx_hash.hex()} through {method.__name__} failed due to {e!s}')  # noqa: E501
-            return DEFAULT_DECODING_OUTPUT
-
+            result = DEFAULT_DECODING_OUTPUT
+
+        self._profile_rule(
+            rule=method,
+            rule_type='address_mapping',
+            start=start,
+            output=result,
+            counterparty=self.rules.addresses_to_counterparties.get(context.tx_log.address),
+        )
         return result
 
     def run_all_post_decoding_rules(
@@ -374,20 +453,34 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
                 counterparties.add(address_counterparty)
 
         rules = self._chain_specific_post_decoding_rules(transaction)
+        rule_counterparties: dict[Callable, str] = {}
         # get the rules that need to be applied by counterparty
         for counterparty in counterparties:
             new_rules = self.rules.post_decoding_rules.get(counterparty)
             if new_rules is not None:
                 rules.extend(new_rules)
+                if self.profiler is not None:
+                    rule_counterparties.update((rule, counterparty) for _, rule in new_rules)
 
         # Sort post decoding rules by priority (which is the first element of the tuple)
         rules.sort(key=lambda x: x[0])
         for _, rule in rules:
+            events_num = len(decoded_events)
+            start = time.perf_counter() if self.profiler is not None else 0.0
             try:
                 decoded_events = rule(transaction=transaction, decoded_events=decoded_events, all_logs=all_logs)  # noqa: E501
             except (DeserializationError, IndexError) as e:
                 log.error(f'Applying post-decoding rule {rule} for {transaction.tx_hash.hex()} failed due to {e!s}. Skipping rule.')  # noqa: E501
 
+            if self.profiler is not None:
+                self.profiler.record(
+                    rule=rule,
+                    rule_type='post_decoding_rule',
+                    counterparty=rule_counterparties.get(rule),
+                    seconds=time.perf_counter() - start,
+                    events=len(decoded_events) - events_num,
+                )
+
         return decoded_events
 
     def _decode_transaction(
@@ -399,6 +492,28 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
         Decodes an evm transaction and its receipt and saves result in the DB.
         Returns the list of decoded events and a flag which is True if balances refresh is needed.
         """
+        events, refresh_balances = self._decode_transaction_events(
+            transaction=transaction,
+            tx_receipt=tx_receipt,
+        )
+        with self.database.user_write() as write_cursor:
+            self._save_transaction_events(
+                write_cursor=write_cursor,
+                transaction=transaction,
+                events=events,
+            )
+
+        events = sorted(events, key=lambda x: x.sequence_index, reverse=False)
+        return events, refresh_balances  # Propagate for post processing in the caller
+
+    def _decode_transaction_events(
+            self,
+            transaction: EvmTransaction,
+            tx_receipt: EvmTxReceipt,
+    ) -> tuple[list['EvmEvent'], bool]:
+        """Decodes an evm transaction and its receipt without saving anything in the DB.
+        Returns the list of decoded events and a flag which is True if balances refresh is needed.
+        """
         self.base.reset_sequence_counter()
         # check if any eth transfer happened in the transaction, including in internal transactions
         events = self._maybe_decode_simple_transactions(transaction, tx_receipt)
@@ -420,12 +535,15 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
                 action_items=action_items,
             )
             if input_data_rules and len(tx_log.topics) != 0 and (input_rule := input_data_rules.get(tx_log.topics[0])) is not None:  # noqa: E501
+                start = time.perf_counter() if self.profiler is not None else 0.0
                 try:  # run specific decoder if the 4bytes signature + topic match
                     result = input_rule(context)
                 except (DeserializationError, ConversionError, UnknownAsset) as e:
                     log.error(f'Decoding log {tx_log} of {transaction} via input data rules failed due to {e!s}')  # noqa: E501
                     result = DEFAULT_DECODING_OUTPUT
 
+                self._profile_rule(rule=input_rule, rule_type='input_data_rule', start=start, output=result)  # noqa: E501
+
                 if result.event:
                     events.append(result.event)
                     continue  # since the input data rule found an event for this log
@@ -471,29 +589,34 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
         if len(events) == 0 and (eth_event := self._get_eth_transfer_event(transaction)) is not None:  # noqa: E501
             events = [eth_event]
 
-        with self.database.user_write() as write_cursor:
-            if len(events) > 0:
-                self.dbevents.add_history_events(
+        return events, refresh_balances
+
+    def _save_transaction_events(
+            self,
+            write_cursor: 'DBCursor',
+            transaction: EvmTransaction,
+            events: list['EvmEvent'],
+    ) -> None:
+        """Saves the decoded events of a transaction and marks it as decoded"""
+        if len(events) > 0:
+            self.dbevents.add_history_events(
+                write_cursor=write_cursor,
+                history=events,
+            )
+        else:
+            # This is probably a phishing zero value token transfer tx.
+            # Details here: https://github.com/rotki/rotki/issues/5749
+            with suppress(InputError):  # We don't care if it's already in the DB
+                self.database.add_to_ignored_action_ids(
                     write_cursor=write_cursor,
-                    history=events,
+                    action_type=ActionType.HISTORY_EVENT,
+                    identifiers=[transaction.identifier],
                 )
-            else:
-                # This is probably a phishing zero value token transfer tx.
-                # Details here: https://github.com/rotki/rotki/issues/5749
-                with suppress(InputError):  # We don't care if it's already in the DB
-                    self.database.add_to_ignored_action_ids(
-                        write_cursor=write_cursor,
-                        action_type=ActionType.HISTORY_EVENT,
-                        identifiers=[transaction.identifier],
-                    )
-            tx_id = transaction.get_or_query_db_id(write_cursor)
-            write_cursor.execute(
-                'INSERT OR IGNORE INTO evm_tx_mappings(tx_id, value) VALUES(?, ?)',
-                (tx_id, HISTORY_MAPPING_STATE_DECODED),
-            )
-
-        events = sorted(events, key=lambda x: x.sequence_index, reverse=False)
-        return events, refresh_balances  # Propagate for post processing in the caller
+        tx_id = transaction.get_or_query_db_id(write_cursor)
+        write_cursor.execute(
+            'INSERT OR IGNORE INTO evm_tx_mappings(tx_id, value) VALUES(?, ?)',
+            (tx_id, HISTORY_MAPPING_STATE_DECODED),
+        )
 
     def get_and_decode_undecoded_transactions(
             self,
@@ -528,17 +651,18 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
     ) -> list['EvmEvent']:
         """Make sure that receipts are pulled + events decoded for the given transaction hashes.
 
-        The transaction hashes must exist in the DB at the time of the call
+        The transaction hashes must exist in the DB at the time of the call. If reloading
+        the decoders data brings new address mappings, the already decoded transactions of
+        those addresses are redecoded first.
 
         May raise:
         - DeserializationError if there is a problem with contacting a remote to get receipts
         - RemoteError if there is a problem with contacting a remote to get receipts
         - InputError if the transaction hash is not found in the DB
         """
-        events: list[EvmEvent] = []
-        refresh_balances = False
+        redecode_all = ignore_cache is True and tx_hashes is None
         with self.database.conn.read_ctx() as cursor:
-            self.reload_data(cursor)
+            changed_addresses = self.reload_data(cursor)
             # If no transaction hashes are passed, decode all transactions.
             if tx_hashes is None:
                 cursor.execute(
@@ -547,29 +671,96 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
                 )
                 tx_hashes = [EVMTxHash(x[0]) for x in cursor]
 
+        if len(changed_addresses) != 0 and redecode_all is False:
+            # already decoded transactions of the changed addresses used the old mappings
+            self.redecode_affected_transactions(
+                addresses=changed_addresses,
+                send_ws_notifications=send_ws_notifications,
+            )
+
+        # load the events of the already decoded transactions in bulk instead of one by one
+        decoded_events = {} if ignore_cache is True else self._get_decoded_transactions_events(tx_hashes)  # noqa: E501
+        if (
+            CachedSettings().multiprocess_decoding is True and
+            len(tx_hashes) - len(decoded_events) >= DECODING_WORKER_MIN_TRANSACTIONS
+        ):
+            events, refresh_balances = self._decode_transaction_hashes_in_worker(
+                tx_hashes=tx_hashes,
+                decoded_events=decoded_events,
+                ignore_cache=ignore_cache,
+                send_ws_notifications=send_ws_notifications,
+            )
+        else:
+            events, refresh_balances = self._decode_transaction_hashes_in_process(
+                tx_hashes=tx_hashes,
+                decoded_events=decoded_events,
+                ignore_cache=ignore_cache,
+                send_ws_notifications=send_ws_notifications,
+            )
+
+        if send_ws_notifications:
+            self._send_decoding_progress(total=len(tx_hashes), processed=len(tx_hashes))
+
+        self._post_process(refresh_balances=refresh_balances)
+        return events
+
+    def _send_decoding_progress(self, total: int, processed: int) -> None:
+        self.msg_aggregator.add_message(
+            message_type=WSMessageType.EVM_UNDECODED_TRANSACTIONS,
+            data={
+                'evm_chain': self.evm_inquirer.chain_name,
+                'total': total,
+                'processed': processed,
+            },
+        )
+
+    def _get_transaction_and_receipt(
+            self,
+            tx_hash: EVMTxHash,
+    ) -> tuple[EvmTransaction, EvmTxReceipt]:
+        """Gets the transaction and its receipt from the DB or queries them if missing
+
+        May raise:
+        - InputError if the transaction hash does not correspond to a transaction
+        - DeserializationError if there is a problem with contacting a remote to get receipts
+        """
+        with self.database.conn.read_ctx() as cursor:
+            try:
+                return self.transactions.get_or_create_transaction(
+                    cursor=cursor,
+                    tx_hash=tx_hash,
+                    relevant_address=None,
+                )
+            except RemoteError as e:
+                raise InputError(f'{self.evm_inquirer.chain_name} hash {tx_hash.hex()} does not correspond to a transaction. {e}') from e  # noqa: E501
+
+    def _decode_transaction_hashes_in_process(
+            self,
+            tx_hashes: list[EVMTxHash],
+            decoded_events: dict[EVMTxHash, list['EvmEvent']],
+            ignore_cache: bool,
+            send_ws_notifications: bool,
+    ) -> tuple[list['EvmEvent'], bool]:
+        """Decodes the given transactions one by one, taking the events of the already
+        decoded ones from decoded_events. Returns the events of all the transactions and
+        whether balances need to be refreshed.
+
+        May raise the same errors as decode_transaction_hashes
+        """
+        events: list[EvmEvent] = []
+        refresh_balances = False
         total_transactions = len(tx_hashes)
         for tx_index, tx_hash in enumerate(tx_hashes):
+            gevent.sleep(0)  # decoding is cpu bound. Let other greenlets run between transactions
             if send_ws_notifications and tx_index % 10 == 0:
-                self.msg_aggregator.add_message(
-                    message_type=WSMessageType.EVM_UNDECODED_TRANSACTIONS,
-                    data={
-                        'evm_chain': self.evm_inquirer.chain_name,
-                        'total': total_transactions,
-                        'processed': tx_index,
-                    },
-                )
+                self._send_decoding_progress(total=total_transactions, processed=tx_index)
 
-            # TODO: Change this if transaction filter query can accept multiple hashes
-            with self.database.conn.read_ctx() as cursor:
-                try:
-                    tx, receipt = self.transactions.get_or_create_transaction(
-                        cursor=cursor,
-                        tx_hash=tx_hash,
-                        relevant_address=None,
-                    )
-                except RemoteError as e:
-                    raise InputError(f'{self.evm_inquirer.chain_name} hash {tx_hash.hex()} does not correspond to a transaction. {e}') from e  # noqa: E501
+            if (tx_events := decoded_events.get(tx_hash)) is not None:
+                events.extend(tx_events)
+                continue
 
+            # TODO: Change this if transaction filter query can accept multiple hashes
+            tx, receipt = self._get_transaction_and_receipt(tx_hash)
             new_events, new_refresh_balances = self._get_or_decode_transaction_events(
                 transaction=tx,
                 tx_receipt=receipt,
@@ -579,17 +770,180 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
             if new_refresh_balances is True:
                 refresh_balances = True
 
-        if send_ws_notifications:
-            self.msg_aggregator.add_message(
-                message_type=WSMessageType.EVM_UNDECODED_TRANSACTIONS,
-                data={
-                    'evm_chain': self.evm_inquirer.chain_name,
-                    'total': total_transactions,
-                    'processed': total_transactions,
-                },
+        return events, refresh_balances
+
+    def _decode_transaction_hashes_in_worker(
+            self,
+            tx_hashes: list[EVMTxHash],
+            decoded_events: dict[EVMTxHash, list['EvmEvent']],
+            ignore_cache: bool,
+            send_ws_notifications: bool,
+    ) -> tuple[list['EvmEvent'], bool]:
+        """Decodes the given transactions that are not in decoded_events in a worker
+        process so that multiple chains can be decoded on multiple cores. The transactions
+        and their receipts are queried here, while the worker decodes the previous chunk,
+        and the events sent back by the worker are saved here, one write transaction per
+        chunk. Transactions the worker could not decode without writing to the DBs are
+        decoded here at the end. Returns the events of all the transactions and whether
+        balances need to be refreshed.
+
+        May raise the same errors as decode_transaction_hashes
+        """
+        chunks = get_chunks([x for x in tx_hashes if x not in decoded_events], n=DECODING_WORKER_CHUNK_SIZE)  # noqa: E501
+        deferred_hashes: list[EVMTxHash] = []
+        refresh_balances = False
+        job = DecodingWorkerJob(
+            chain_id=self.evm_inquirer.chain_id,
+            data_dir=GlobalDBHandler()._data_directory,  # type: ignore[arg-type]  # initialized at this point
+            user_data_dir=self.database.user_data_dir,
+            password=self.database.password,
+            sql_vm_instructions_cb=self.database.sql_vm_instructions_cb,
+        )
+        with DecodingWorker(job) as worker:
+            next_chunk = [self._get_transaction_and_receipt(x) for x in next(chunks, [])]
+            while (output := worker.receive()).finished is False:
+                worker.send(next_chunk if len(next_chunk) != 0 else None)
+                for msg in output.warnings:
+                    self.msg_aggregator.add_warning(msg)
+                for msg in output.errors:
+                    self.msg_aggregator.add_error(msg)
+                deferred_hashes.extend(output.deferred)
+                if len(output.decoded) != 0:
+                    self._save_worker_decoded_transactions(
+                        decoded=output.decoded,
+                        ignore_cache=ignore_cache,
+                    )
+                    for transaction, tx_events, tx_refresh_balances in output.decoded:
+                        decoded_events[transaction.tx_hash] = tx_events
+                        refresh_balances |= tx_refresh_balances
+                    if send_ws_notifications:
+                        self._send_decoding_progress(
+                            total=len(tx_hashes),
+                            processed=len(decoded_events),
+                        )
+
+                # query the next chunk while the worker decodes the one just sent
+                next_chunk = [self._get_transaction_and_receipt(x) for x in next(chunks, [])]
+
+        for tx_hash in deferred_hashes:
+            tx, receipt = self._get_transaction_and_receipt(tx_hash)
+            decoded_events[tx_hash], tx_refresh_balances = self._get_or_decode_transaction_events(
+                transaction=tx,
+                tx_receipt=receipt,
+                ignore_cache=ignore_cache,
             )
+            refresh_balances |= tx_refresh_balances
+
+        return [event for tx_hash in tx_hashes for event in decoded_events[tx_hash]], refresh_balances  # noqa: E501
+
+    def _save_worker_decoded_transactions(
+            self,
+            decoded: list[DecodedTransaction],
+            ignore_cache: bool,
+    ) -> None:
+        """Saves the transactions decoded by a worker process in a single write transaction.
+        If ignore_cache is True their previously decoded events are deleted first."""
+        with self.database.user_write() as write_cursor:
+            if ignore_cache is True:
+                self.dbevents.delete_events_by_tx_hash(
+                    write_cursor=write_cursor,
+                    tx_hashes=[transaction.tx_hash for transaction, _, _ in decoded],
+                    chain_id=self.evm_inquirer.chain_id,
+                )
+                write_cursor.executemany(
+                    'DELETE from evm_tx_mappings WHERE tx_id=? AND value=?',
+                    [
+                        (transaction.get_or_query_db_id(write_cursor), HISTORY_MAPPING_STATE_DECODED)  # noqa: E501
+                        for transaction, _, _ in decoded
+                    ],
+                )
+            for transaction, events, _ in decoded:
+                self._save_transaction_events(
+                    write_cursor=write_cursor,
+                    transaction=transaction,
+                    events=events,
+                )
+
+    def decode_transaction_without_saving(
+            self,
+            transaction: EvmTransaction,
+            tx_receipt: EvmTxReceipt,
+    ) -> DecodedTransaction:
+        """Decodes the given transaction without saving anything of it. Used by the decoding
+        worker processes, whose results are saved by the main process. Returns the
+        transaction with its sorted events and whether balances need to be refreshed."""
+        events, refresh_balances = self._decode_transaction_events(
+            transaction=transaction,
+            tx_receipt=tx_receipt,
+        )
+        events = sorted(events, key=lambda x: x.sequence_index, reverse=False)
+        return transaction, events, refresh_balances
+
+    def redecode_affected_transactions(
+            self,
+            addresses: Collection[ChecksumEvmAddress],
+            topics: Collection[bytes] = (),
+            send_ws_notifications: bool = False,
+    ) -> list['EvmEvent']:
+        """Redecodes only the already decoded transactions that involve any of the given
+        addresses or have a receipt log with any of the given topics. To be used instead of
+        redecoding all transactions of the chain when only the decoding of some contracts
+        or events changed, for example after new address mappings are loaded.
+
+        May raise:
+        - DeserializationError if there is a problem with contacting a remote to get receipts
+        - RemoteError if there is a problem with contacting a remote to get receipts
+        - InputError if any of the transactions is not found in the DB
+        """
+        with self.database.conn.read_ctx() as cursor:
+            tx_hashes = self.dbevmtx.get_decoded_transaction_hashes_touching(
+                cursor=cursor,
+                chain_id=self.evm_inquirer.chain_id,
+                addresses=addresses,
+                topics=topics,
+            )
+
+        if len(tx_hashes) == 0:
+            return []
+
+        log.debug(
+            f'Redecoding {len(tx_hashes)} {self.evm_inquirer.chain_name} transactions affected '
+            f'by {len(addresses)} addresses and {len(topics)} topics',
+        )
+        return self.decode_transaction_hashes(
+            ignore_cache=True,
+            tx_hashes=tx_hashes,
+            send_ws_notifications=send_ws_notifications,
+        )
+
+    def _get_decoded_transactions_events(
+            self,
+            tx_hashes: list[EVMTxHash],
+    ) -> dict[EVMTxHash, list['EvmEvent']]:
+        """Finds which of the given transactions are already decoded and returns their
+        events grouped by transaction hash. Undecoded transactions are not in the result.
+
+        Uses one query per chunk of hashes for the decoded state and for the events
+        instead of a few queries for each transaction.
+        """
+        with self.database.conn.read_ctx() as cursor:
+            decoded_hashes = self.dbevmtx.get_decoded_transaction_hashes(
+                cursor=cursor,
+                chain_id=self.evm_inquirer.chain_id,
+                tx_hashes=tx_hashes,
+            )
+            events: dict[EVMTxHash, list[EvmEvent]] = {x: [] for x in decoded_hashes}
+            for chunk in get_chunks(list(decoded_hashes), n=TX_QUERY_CHUNK_SIZE):
+                for event in self.dbevents.get_history_events(
+                    cursor=cursor,
+                    filter_query=EvmEventFilterQuery.make(
+                        tx_hashes=chunk,
+                        location=Location.from_chain_id(self.evm_inquirer.chain_id),
+                    ),
+                    has_premium=True,  # for this function we don't limit anything
+                ):
+                    events[event.tx_hash].append(event)
 
-        self._post_process(refresh_balances=refresh_balances)
         return events
 
     def _get_or_decode_transaction_events(
@@ -0,0 +1,67 @@
+from collections import defaultdict
+from collections.abc import Callable
+from dataclasses import dataclass
+from typing import Any, Literal
+
+DecodingRuleType = Literal[
+    'address_mapping',
+    'event_rule',
+    'input_data_rule',
+    'enricher',
+    'post_decoding_rule',
+]
+
+
+@dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
+class DecodingRuleStats:
+    calls: int = 0
+    seconds: float = 0.0
+    events: int = 0
+
+
+def rule_owner(rule: Callable) -> str:
+    """Returns the name of the decoder class a decoding rule belongs to or the
+    qualified name of the rule if it's not a bound method"""
+    if (owner := getattr(rule, '__self__', None)) is not None:
+        return type(owner).__name__
+
+    return getattr(rule, '__qualname__', str(rule))
+
+
+class DecodingProfiler:
+    """Optional instrumentation of the decoding rules of an EVMTransactionDecoder.
+
+    Records the calls, the time spent and the events produced per decoder class,
+    type of rule and counterparty so that slow protocol decoders can be identified.
+    """
+
+    def __init__(self) -> None:
+        self.stats: defaultdict[tuple[str, DecodingRuleType, str | None], DecodingRuleStats] = defaultdict(DecodingRuleStats)  # noqa: E501
+
+    def record(
+            self,
+            rule: Callable,
+            rule_type: DecodingRuleType,
+            counterparty: str | None,
+            seconds: float,
+            events: int,
+    ) -> None:
+        entry = self.stats[(rule_owner(rule), rule_type, counterparty)]
+        entry.calls += 1
+        entry.seconds += seconds
+        entry.events += max(events, 0)
+
+    def serialize(self) -> list[dict[str, Any]]:
+        """Returns the recorded stats ordered by the time spent in descending order"""
+        return [{
+            'decoder': decoder,
+            'rule_type': rule_type,
+            'counterparty': counterparty,
+            'calls': stats.calls,
+            'seconds': round(stats.seconds, 6),
+            'events': stats.events,
+        } for (decoder, rule_type, counterparty), stats in sorted(
+            self.stats.items(),
+            key=lambda x: x[1].seconds,
+            reverse=True,
+        )]
@@ -0,0 +1,311 @@
+"""Decoding of evm transactions in worker processes
+
+Decoding is cpu bound so a single process decodes the transactions of all the evm chains
+on one core. With the multiprocess_decoding setting enabled, big batches of transactions
+of a chain are decoded in a worker process instead. Each worker opens read only connections
+to the user DB and the global DB and creates the decoder of its chain. The main process
+queries the transactions and their receipts and sends them to the worker in chunks. The
+worker decodes each chunk and sends the decoded events back, and the main process saves
+them in a single write transaction per chunk.
+
+Nothing is written to the DBs by a worker. Transactions whose decoding needs to write, for
+example to add a new token, are sent back undecoded to be decoded by the main process.
+"""
+import logging
+import multiprocessing
+import os
+import sqlite3
+from dataclasses import dataclass, field
+from multiprocessing.connection import Connection
+from pathlib import Path
+from types import TracebackType
+from typing import TYPE_CHECKING
+
+import gevent
+from gevent.lock import BoundedSemaphore
+from gevent.socket import wait_read
+from pysqlcipher3 import dbapi2 as sqlcipher
+
+from rotkehlchen.chain.evm.contracts import EvmContracts
+from rotkehlchen.db.dbhandler import DBHandler
+from rotkehlchen.errors.misc import InputError, RemoteError
+from rotkehlchen.errors.serialization import DeserializationError
+from rotkehlchen.globaldb.handler import GlobalDBHandler
+from rotkehlchen.greenlets.manager import GreenletManager
+from rotkehlchen.logging import (
+    RotkehlchenLogsAdapter,
+    configure_worker_process_logging,
+    get_logfile,
+)
+from rotkehlchen.types import ChainID
+from rotkehlchen.user_messages import MessagesAggregator
+
+if TYPE_CHECKING:
+    from multiprocessing.context import SpawnProcess
+
+    from rotkehlchen.chain.evm.manager import EvmManager
+    from rotkehlchen.chain.evm.structures import EvmTxReceipt
+    from rotkehlchen.history.events.structures.evm_event import EvmEvent
+    from rotkehlchen.types import EVM_CHAIN_IDS_WITH_TRANSACTIONS_TYPE, EvmTransaction, EVMTxHash
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+# Minimum number of transactions to decode for a worker process to be used. Starting a
+# worker and loading the decoders in it takes a few seconds so smaller batches are
+# decoded in the main process.
+DECODING_WORKER_MIN_TRANSACTIONS = 200
+# Number of transactions sent to a worker and decoded transactions sent back in each message
+DECODING_WORKER_CHUNK_SIZE = 50
+# Seconds to wait for a worker to exit after it sent its last message
+DECODING_WORKER_EXIT_TIMEOUT = 10
+# Seconds to sleep between checks of whether a worker exited
+DECODING_WORKER_EXIT_POLL_INTERVAL = 0.1
+# Max number of worker processes decoding at the same time. One core is left to the main process
+MAX_DECODING_WORKERS = max(1, (os.cpu_count() or 1) - 1)
+_decoding_workers_semaphore = BoundedSemaphore(MAX_DECODING_WORKERS)
+
+# A transaction with its receipt, as sent to a worker to be decoded
+TransactionWithReceipt = tuple['EvmTransaction', 'EvmTxReceipt']
+# A decoded transaction with its events and whether balances need to be refreshed
+DecodedTransaction = tuple['EvmTransaction', list['EvmEvent'], bool]
+
+
+@dataclass(init=True, repr=True, eq=False, order=False, unsafe_hash=False, frozen=True)
+class DecodingWorkerJob:
+    """What a worker process needs to create the decoder of a chain on its own"""
+    chain_id: 'EVM_CHAIN_IDS_WITH_TRANSACTIONS_TYPE'
+    data_dir: Path
+    user_data_dir: Path
+    password: str
+    sql_vm_instructions_cb: int
+
+
+@dataclass(init=True, repr=True, eq=False, order=False, unsafe_hash=False, frozen=True)
+class DecodingWorkerOutput:
+    """A message sent by a worker process to the main process. Unless finished or failed,
+    the worker waits for the next chunk of transactions after sending it."""
+    decoded: list[DecodedTransaction] = field(default_factory=list)
+    # transactions that need to write to the DBs to be decoded, left to the main process
+    deferred: list['EVMTxHash'] = field(default_factory=list)
+    # user messages added in the worker, to be shown by the main process
+    warnings: list[str] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+    failure: Exception | None = None  # set if the worker failed and stopped
+    finished: bool = False  # set in the last message of a worker that decoded everything
+
+
+def _create_evm_manager(
+        chain_id: 'EVM_CHAIN_IDS_WITH_TRANSACTIONS_TYPE',
+        database: 'DBHandler',
+        greenlet_manager: 'GreenletManager',
+) -> 'EvmManager':
+    """Creates the manager of the given chain, along with its node inquirer and decoder"""
+    # imported here since the chain managers import the decoders which import this module
+    # pylint: disable=import-outside-toplevel
+    from rotkehlchen.chain.arbitrum_one.manager import ArbitrumOneManager
+    from rotkehlchen.chain.arbitrum_one.node_inquirer import ArbitrumOneInquirer
+    from rotkehlchen.chain.base.manager import BaseManager
+    from rotkehlchen.chain.base.node_inquirer import BaseInquirer
+    from rotkehlchen.chain.ethereum.manager import EthereumManager
+    from rotkehlchen.chain.ethereum.node_inquirer import EthereumInquirer
+    from rotkehlchen.chain.gnosis.manager import GnosisManager
+    from rotkehlchen.chain.gnosis.node_inquirer import GnosisInquirer
+    from rotkehlchen.chain.optimism.manager import OptimismManager
+    from rotkehlchen.chain.optimism.node_inquirer import OptimismInquirer
+    from rotkehlchen.chain.polygon_pos.manager import PolygonPOSManager
+    from rotkehlchen.chain.polygon_pos.node_inquirer import PolygonPOSInquirer
+
+    chain_classes: dict[ChainID, tuple[type, type]] = {
+        ChainID.ETHEREUM: (EthereumInquirer, EthereumManager),
+        ChainID.OPTIMISM: (OptimismInquirer, OptimismManager),
+        ChainID.POLYGON_POS: (PolygonPOSInquirer, PolygonPOSManager),
+        ChainID.ARBITRUM_ONE: (ArbitrumOneInquirer, ArbitrumOneManager),
+        ChainID.BASE: (BaseInquirer, BaseManager),
+        ChainID.GNOSIS: (GnosisInquirer, GnosisManager),
+    }
+    inquirer_class, manager_class = chain_classes[chain_id]
+    return manager_class(inquirer_class(greenlet_manager=greenlet_manager, database=database))
+
+
+def _decoding_worker_main(
+        job: DecodingWorkerJob,
+        connection: Connection,
+        loglevel: int,
+        logfile: Path | None,
+) -> None:
+    """Entry point of the worker processes. Opens the databases read only, creates the
+    decoder of the job's chain and decodes the chunks of transactions the main process
+    sends until it sends None. Any error is sent to the main process instead of being
+    raised."""
+    configure_worker_process_logging(loglevel=loglevel, logfile=logfile)
+
+    msg_aggregator = MessagesAggregator()
+    globaldb, database = None, None
+    try:
+        globaldb = GlobalDBHandler(
+            data_dir=job.data_dir,
+            sql_vm_instructions_cb=job.sql_vm_instructions_cb,
+            read_only=True,
+        )
+        database = DBHandler(
+            user_data_dir=job.user_data_dir,
+            password=job.password,
+            msg_aggregator=msg_aggregator,
+            initial_settings=None,
+            sql_vm_instructions_cb=job.sql_vm_instructions_cb,
+            resume_from_backup=False,
+            read_only=True,
+        )
+        with database.conn.read_ctx() as cursor:
+            database.get_settings(cursor)  # also populates the cached settings
+        EvmContracts.initialize_common_abis()
+        # the decoder loads its data at creation from the DB state the main process refreshed
+        decoder = _create_evm_manager(
+            chain_id=job.chain_id,
+            database=database,
+            greenlet_manager=GreenletManager(msg_aggregator=msg_aggregator),
+        ).transactions_decoder
+
+        connection.send(DecodingWorkerOutput())  # ready for the first chunk
+        while (chunk := connection.recv()) is not None:
+            decoded, deferred = [], []
+            for transaction, receipt in chunk:
+                try:
+                    decoded.append(decoder.decode_transaction_without_saving(
+                        transaction=transaction,
+                        tx_receipt=receipt,
+                    ))
+                # most probably a write to the read only DBs
+                except (sqlite3.OperationalError, sqlcipher.OperationalError) as e:  # pylint: disable=no-member
+                    log.debug(
+                        f'Leaving {transaction} to the main process since its decoding '
+                        f'failed in the {job.chain_id.to_name()} decoding worker due to {e!s}',
+                    )
+                    deferred.append(transaction.tx_hash)
+
+            connection.send(DecodingWorkerOutput(
+                decoded=decoded,
+                deferred=deferred,
+                warnings=msg_aggregator.consume_warnings(),
+                errors=msg_aggregator.consume_errors(),
+            ))
+    except EOFError:
+        log.debug(f'{job.chain_id.to_name()} decoding worker was stopped by the main process')
+    except (RemoteError, DeserializationError, InputError) as e:
+        connection.send(DecodingWorkerOutput(failure=e))
+    except Exception as e:  # pylint: disable=broad-except  # would otherwise be lost with the process
+        connection.send(DecodingWorkerOutput(failure=RemoteError(
+            f'{job.chain_id.to_name()} decoding worker failed due to {e!s}',
+        )))
+    else:
+        connection.send(DecodingWorkerOutput(
+            warnings=msg_aggregator.consume_warnings(),
+            errors=msg_aggregator.consume_errors(),
+            finished=True,
+        ))
+    finally:
+        if database is not None:
+            database.disconnect(conn_attribute='conn')
+            database.disconnect(conn_attribute='conn_transient')
+        if globaldb is not None:
+            globaldb.cleanup()
+        connection.close()
+
+
+class DecodingWorker:
+    """A worker process decoding transactions of a chain. To be used as a context manager
+    that starts the worker when entered and makes sure it exits when left. At most
+    MAX_DECODING_WORKERS workers run at the same time and the rest wait for a free slot.
+
+    The worker first sends an empty output when ready and then an output for each chunk
+    of transactions sent to it. Sending None makes it send its last output and exit.
+    """
+
+    def __init__(self, job: DecodingWorkerJob) -> None:
+        self.job = job
+        self.process: 'SpawnProcess | None' = None
+        self.connection: Connection | None = None
+
+    def __enter__(self) -> 'DecodingWorker':
+        # forking would copy the hub and the DB connections
+        context = multiprocessing.get_context('spawn')
+        _decoding_workers_semaphore.acquire()
+        try:
+            self.connection, worker_connection = context.Pipe(duplex=True)
+            self.process = context.Process(
+                target=_decoding_worker_main,
+                args=(self.job, worker_connection, logging.getLogger().getEffectiveLevel(), get_logfile()),  # noqa: E501
+                name=f'{self.job.chain_id.to_name()} decoding worker',
+                daemon=True,
+            )
+            self.process.start()
+        except BaseException:
+            _decoding_workers_semaphore.release()
+            raise
+
+        worker_connection.close()  # only used by the worker
+        log.debug(f'Started {self.process.name}')
+        return self
+
+    def __exit__(
+            self,
+            exc_type: type[BaseException] | None,
+            exc_value: BaseException | None,
+            traceback: TracebackType | None,
+    ) -> None:
+        assert self.process is not None and self.connection is not None
+        try:
+            self.connection.close()  # stops a worker that is still waiting for transactions
+            if self._wait_for_exit(timeout=DECODING_WORKER_EXIT_TIMEOUT) is False:
+                log.error(f'{self.process.name} did not exit in time. Killing it')
+                self.process.kill()
+                self._wait_for_exit(timeout=DECODING_WORKER_EXIT_TIMEOUT)
+        finally:
+            _decoding_workers_semaphore.release()
+
+    def _wait_for_exit(self, timeout: float) -> bool:
+        """Waits up to timeout seconds for the worker to exit, yielding to the other
+        greenlets instead of blocking in join. Returns whether it exited."""
+        assert self.process is not None, 'should only be called after the worker started'
+        for _ in range(int(timeout / DECODING_WORKER_EXIT_POLL_INTERVAL)):
+            if self.process.is_alive() is False:  # also reaps the exited process
+                return True
+            gevent.sleep(DECODING_WORKER_EXIT_POLL_INTERVAL)
+
+        return self.process.is_alive() is False
+
+    def receive(self) -> DecodingWorkerOutput:
+        """Waits for the next output of the worker, yielding to the other greenlets.
+
+        May raise:
+        - RemoteError, DeserializationError or InputError if the worker failed due to them
+        - RemoteError if the worker failed due to anything else or exited unexpectedly
+        """
+        assert self.process is not None and self.connection is not None, 'should only be called after the worker started'  # noqa: E501
+        wait_read(self.connection.fileno())
+        try:
+            output: DecodingWorkerOutput = self.connection.recv()
+        except EOFError as e:
+            raise RemoteError(
+                f'{self.process.name} exited unexpectedly with code {self.process.exitcode}',
+            ) from e
+
+        if output.failure is not None:
+            raise output.failure
+        return output
+
+    def send(self, chunk: list[TransactionWithReceipt] | None) -> None:
+        """Sends a chunk of transactions to be decoded or None to stop the worker. Should
+        only be called after receiving an output, when the worker waits for the chunk.
+
+        May raise:
+        - RemoteError if the worker exited unexpectedly
+        """
+        assert self.process is not None and self.connection is not None, 'should only be called after the worker started'  # noqa: E501
+        try:
+            self.connection.send(chunk)
+        except OSError as e:
+            raise RemoteError(
+                f'{self.process.name} exited unexpectedly with code {self.process.exitcode}',
+            ) from e
@@ -37,6 +37,7 @@ from rotkehlchen.chain.evm.contracts import EvmContract, EvmContracts
 from rotkehlchen.chain.evm.proxies_inquirer import EvmProxiesInquirer
 from rotkehlchen.chain.evm.types import NodeName, Web3Node, WeightedNode
 from rotkehlchen.constants import ONE
+from rotkehlchen.db.evmblocks import DBEvmBlocks
 from rotkehlchen.errors.misc import (
     BlockchainQueryError,
     EventNotInABI,
@@ -69,6 +70,7 @@ from rotkehlchen.types import (
 from rotkehlchen.utils.data_structures import LRUCacheWithRemove
 from rotkehlchen.utils.misc import from_wei, get_chunks, hex_or_bytes_to_str
 from rotkehlchen.utils.mixins.lockable import LockableQueryMixIn, protect_with_lock
+from rotkehlchen.utils.network import create_session
 
 if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
@@ -103,6 +105,13 @@ def _is_synchronized(current_block: int, latest_block: int) -> tuple[bool, str]:
 
 
 WEB3_LOGQUERY_BLOCK_RANGE = 250000
+ETHERSCAN_LOGQUERY_BLOCK_RANGE = 300000
+# How many times the default block range of a log query is allowed to grow when results are sparse
+LOGQUERY_BLOCK_RANGE_MAX_GROWTH = 4
+# If a single log query returns less than this many results the range is considered sparse
+LOGQUERY_SPARSE_RESULTS = 100
+# Max number of blocks fetched while searching a block by timestamp in the local block index
+BLOCK_INDEX_MAX_FETCHES = 3
 
 
 def _query_web3_get_logs(
@@ -114,11 +123,19 @@ def _query_web3_get_logs(
         event_name: str,
         argument_filters: dict[str, Any],
         initial_block_range: int,
-) -> list[dict[str, Any]]:
+        max_block_range: int,
+) -> tuple[list[dict[str, Any]], int]:
+    """Queries the logs via web3 in chunks of blocks, adapting the block range on the way.
+
+    The range is halved if the node complains about too many results or a timeout and
+    it is doubled (up to max_block_range) after each query that returned sparse results.
+
+    Returns the events and the last block range that worked so that it can be reused.
+    """
     until_block = web3.eth.block_number if to_block == 'latest' else to_block
     events: list[dict[str, Any]] = []
     start_block = from_block
-    block_range = initial_block_range
+    block_range = working_block_range = initial_block_range
 
     while start_block <= until_block:
         filter_args['fromBlock'] = start_block
@@ -165,12 +182,16 @@ def _query_web3_get_logs(
             new_events_web3[e_idx]['topics'] = new_topics
             new_events_web3[e_idx]['transactionHash'] = event['transactionHash'].hex()
 
+        if end_block - start_block == block_range or block_range < working_block_range:
+            working_block_range = block_range  # only trust ranges that were fully queried
+
         start_block = end_block + 1
         events.extend(new_events_web3)
-        # end of the loop, end of 1 query. Reset the block range to max
-        block_range = initial_block_range
+        # end of the loop, end of 1 query. Grow the block range if results are sparse
+        if len(new_events_web3) < LOGQUERY_SPARSE_RESULTS:
+            block_range = min(block_range * 2, max_block_range)
 
-    return events
+    return events, working_block_range
 
 
 class EvmNodeInquirer(metaclass=ABCMeta):
@@ -225,6 +246,11 @@ class EvmNodeInquirer(metaclass=ABCMeta):
         # A cache for erc20 and erc721 contract info to not requery the info
         self.contract_info_erc20_cache: LRUCacheWithRemove[ChecksumEvmAddress, dict[str, Any]] = LRUCacheWithRemove(maxsize=1024)  # noqa: E501
         self.contract_info_erc721_cache: LRUCacheWithRemove[ChecksumEvmAddress, dict[str, Any]] = LRUCacheWithRemove(maxsize=512)  # noqa: E501
+        # Block ranges that worked for log queries per (node endpoint, contract address)
+        self.logquery_ranges: dict[tuple[str, ChecksumEvmAddress], int] = {}
+        # A cache of already fetched logs and the block until which they have been queried
+        self.logs_cache: LRUCacheWithRemove[tuple[ChecksumEvmAddress, str, str, int], tuple[int, list[dict[str, Any]]]] = LRUCacheWithRemove(maxsize=128)  # noqa: E501
+        self.block_index = DBEvmBlocks(database)
         self.maybe_connect_to_nodes(when_tracked_accounts=True)
 
     def maybe_connect_to_nodes(self, when_tracked_accounts: bool) -> None:
@@ -370,6 +396,7 @@ class EvmNodeInquirer(metaclass=ABCMeta):
         provider = HTTPProvider(
             endpoint_uri=node.endpoint,
             request_kwargs={'timeout': self.rpc_timeout},
+            session=create_session(),
         )
         ens = ENS(provider) if self.chain_id == ChainID.ETHEREUM else None
         web3 = Web3(provider, ens=ens)
@@ -569,11 +596,16 @@ class EvmNodeInquirer(metaclass=ABCMeta):
             num: int,
             call_order: Sequence[WeightedNode] | None = None,
     ) -> dict[str, Any]:
-        return self._query(
+        block = self._query(
             method=self._get_block_by_number,
             call_order=call_order if call_order is not None else self.default_call_order(),
             num=num,
         )
+        self.block_index.add_block_timestamps(
+            chain_id=self.chain_id,
+            blocks=[(block['number'], Timestamp(block['timestamp']))],
+        )
+        return block
 
     def _get_block_by_number(self, web3: Web3 | None, num: int) -> dict[str, Any]:
         """Returns the block object corresponding to the given block number
@@ -877,6 +909,15 @@ class EvmNodeInquirer(metaclass=ABCMeta):
             to_block: int | Literal['latest'] = 'latest',
             call_order: Sequence[WeightedNode] | None = None,
     ) -> list[dict[str, Any]]:
+        """Queries logs of an evm contract in the given block range
+
+        Logs that have already been fetched for the same contract, event, filters and
+        starting block are kept in memory so that subsequent queries only need to ask
+        the nodes for the blocks after the last queried one.
+
+        May raise:
+        - RemoteError if no node in the call order could be queried
+        """
         if call_order is None:  # Default call order for logs
             call_order = [self.etherscan_node]
             if (node_info := self.get_own_node_info()) is not None:
@@ -887,16 +928,38 @@ class EvmNodeInquirer(metaclass=ABCMeta):
                         weight=ONE,
                     ),
                 )
-        return self._query(
+
+        if to_block == 'latest':  # resolve it to be able to remember the queried range
+            to_block = self.get_latest_block_number()
+
+        cache_key = (
+            contract_address,
+            event_name,
+            json.dumps(argument_filters, sort_keys=True, default=str),
+            from_block,
+        )
+        cached_events: list[dict[str, Any]] = []
+        query_from_block = from_block
+        if (cached_entry := self.logs_cache.get(cache_key)) is not None:
+            cached_until_block, cached_events = cached_entry
+            if to_block <= cached_until_block:
+                return [x for x in cached_events if x['blockNumber'] <= to_block]
+
+            query_from_block = cached_until_block + 1
+
+        new_events = self._query(
             method=self._get_logs,
             call_order=call_order,
             contract_address=contract_address,
             abi=abi,
             event_name=event_name,
             argument_filters=argument_filters,
-            from_block=from_block,
+            from_block=query_from_block,
             to_block=to_block,
         )
+        events = cached_events + new_events
+        self.logs_cache.add(cache_key, (to_block, events))
+        return list(events)
 
     def _get_logs(
             self,
@@ -935,7 +998,9 @@ class EvmNodeInquirer(metaclass=ABCMeta):
         events: list[dict[str, Any]] = []
         start_block = from_block
         if web3 is not None:
-            events = _query_web3_get_logs(
+            range_key = (web3.manager.provider.endpoint_uri, contract_address)  # type: ignore
+            default_block_range = self.logquery_block_range(web3=web3, contract_address=contract_address)  # noqa: E501
+            events, self.logquery_ranges[range_key] = _query_web3_get_logs(
                 web3=web3,
                 filter_args=filter_args,
                 from_block=from_block,
@@ -943,13 +1008,15 @@ class EvmNodeInquirer(metaclass=ABCMeta):
                 contract_address=contract_address,
                 event_name=event_name,
                 argument_filters=argument_filters,
-                initial_block_range=self.logquery_block_range(web3=web3, contract_address=contract_address),  # noqa: E501
+                initial_block_range=self.logquery_ranges.get(range_key, default_block_range),
+                max_block_range=default_block_range * LOGQUERY_BLOCK_RANGE_MAX_GROWTH,
             )
         else:  # etherscan
             until_block = (
                 self.etherscan.get_latest_block_number() if to_block == 'latest' else to_block
             )
-            blocks_step = 300000
+            range_key = (self.etherscan_node_name, contract_address)
+            blocks_step = self.logquery_ranges.get(range_key, ETHERSCAN_LOGQUERY_BLOCK_RANGE)
             while start_block <= until_block:
                 while True:  # loop to continuously reduce block range if need b
                     end_block = min(start_block + blocks_step, until_block)
@@ -962,8 +1029,8 @@ class EvmNodeInquirer(metaclass=ABCMeta):
                         )
                     except RemoteError as e:
                         if 'Please select a smaller result dataset' in str(e):
-
                             blocks_step = blocks_step // 2
+                            self.logquery_ranges[range_key] = blocks_step
                             if blocks_step < 100:
                                 raise  # stop trying
                             # else try with the smaller step
@@ -1031,8 +1098,19 @@ class EvmNodeInquirer(metaclass=ABCMeta):
                     start_block = new_events[-1]['blockNumber']
                 else:
                     start_block = end_block + 1
+                    if len(new_events) < LOGQUERY_SPARSE_RESULTS:  # grow the range for sparse results  # noqa: E501
+                        blocks_step = min(
+                            blocks_step * 2,
+                            ETHERSCAN_LOGQUERY_BLOCK_RANGE * LOGQUERY_BLOCK_RANGE_MAX_GROWTH,
+                        )
+                        self.logquery_ranges[range_key] = blocks_step
                 events.extend(new_events)
 
+        if len(events) != 0 and 'timeStamp' in events[0]:  # etherscan events contain the timestamp
+            self.block_index.add_block_timestamps(
+                chain_id=self.chain_id,
+                blocks={(event['blockNumber'], Timestamp(event['timeStamp'])) for event in events},
+            )
         return events
 
     def get_event_timestamp(self, event: dict[str, Any]) -> Timestamp:
@@ -1053,6 +1131,12 @@ class EvmNodeInquirer(metaclass=ABCMeta):
 
         # event from web3
         block_number = event['blockNumber']
+        if (timestamp := self.block_index.get_block_timestamp(
+            chain_id=self.chain_id,
+            block_number=block_number,
+        )) is not None:
+            return timestamp
+
         block_data = self.get_block_by_number(block_number)
         return Timestamp(block_data['timestamp'])
 
@@ -1345,8 +1429,56 @@ class EvmNodeInquirer(metaclass=ABCMeta):
 
         May raise RemoteError
         """
+        if (block_number := self.get_blocknumber_by_time_from_index(ts=ts, closest=closest)) is not None:  # noqa: E501
+            return block_number
+
         return self.etherscan.get_blocknumber_by_time(ts=ts, closest=closest)
 
+    def get_blocknumber_by_time_from_index(
+            self,
+            ts: Timestamp,
+            closest: Literal['before', 'after'] = 'before',
+    ) -> int | None:
+        """Searches for the blocknumber of a specific timestamp in the local block index
+
+        An interpolation search is performed between the closest indexed blocks around the
+        timestamp, fetching at most BLOCK_INDEX_MAX_FETCHES blocks of the remaining gap.
+        All fetched blocks end up in the index.
+
+        Returns None if the timestamp is not surrounded by indexed blocks or if the search
+        did not finish within the allowed fetches or failed to fetch a block.
+        """
+        lower, upper = self.block_index.get_bracketing_blocks(
+            chain_id=self.chain_id,
+            ts=ts,
+            closest=closest,
+        )
+        for fetches in range(BLOCK_INDEX_MAX_FETCHES + 1):
+            if lower is None or upper is None:
+                return None
+
+            if upper[0] - lower[0] == 1:
+                return lower[0] if closest == 'before' else upper[0]
+
+            if fetches == BLOCK_INDEX_MAX_FETCHES:
+                break
+
+            # estimate the block assuming a constant block time between the bracketing blocks
+            estimate = lower[0] + (ts - lower[1]) * (upper[0] - lower[0]) // max(upper[1] - lower[1], 1)  # noqa: E501
+            block_number = min(max(estimate, lower[0] + 1), upper[0] - 1)
+            try:
+                block_ts = Timestamp(self.get_block_by_number(block_number)['timestamp'])
+            except RemoteError as e:
+                log.debug(f'Failed to fetch {self.chain_name} block {block_number} due to {e!s}')
+                return None
+
+            if block_ts < ts or (closest == 'before' and block_ts == ts):
+                lower = (block_number, block_ts)
+            else:
+                upper = (block_number, block_ts)
+
+        return None
+
     # -- methods to be optionally implemented by child classes --
 
     def logquery_block_range(
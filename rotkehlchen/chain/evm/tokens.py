@@ -1,18 +1,24 @@
 import logging
+import time
 from abc import ABCMeta, abstractmethod
-from collections import defaultdict
+from collections import defaultdict, deque
 from collections.abc import Sequence
 from typing import TYPE_CHECKING
 
+import gevent
+
 from rotkehlchen.assets.asset import EvmToken
 from rotkehlchen.chain.ethereum.utils import token_normalized_value
-from rotkehlchen.chain.evm.types import WeightedNode, asset_id_is_evm_token
+from rotkehlchen.chain.evm.types import NodeName, WeightedNode, asset_id_is_evm_token
+from rotkehlchen.constants.timing import WEEK_IN_SECONDS
+from rotkehlchen.db.evmtx import DBEvmTx
+from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.fval import FVal
 from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import ChecksumEvmAddress, Price, Timestamp
-from rotkehlchen.utils.misc import combine_dicts, get_chunks
+from rotkehlchen.utils.misc import combine_dicts, get_chunks, ts_now
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.evm.node_inquirer import EvmNodeInquirerWithDSProxy
@@ -69,6 +75,46 @@ ETHERSCAN_MAX_ARGUMENTS_TO_CONTRACT = 110
 # to multicall. In total, it occupies (7 + number of tokens passed) arguments.
 PURE_TOKENS_BALANCE_ARGUMENTS = 7
 
+# The chunk length of a node is never adapted below this
+MIN_TOKEN_CHUNK_LENGTH = PURE_TOKENS_BALANCE_ARGUMENTS * 3
+# Multicall token balance queries that take longer than this shrink the node's chunk length
+TOKEN_CHUNK_SLOW_RESPONSE_SECS = 10
+# Multicall token balance queries that take less than this grow the node's chunk length
+TOKEN_CHUNK_FAST_RESPONSE_SECS = 3
+
+# Incremental token detection falls back to checking all known tokens after this period
+FULL_TOKEN_DETECTION_PERIOD = WEEK_IN_SECONDS
+
+
+def pop_multicall_chunk(
+        chunk_length: int,
+        pending: deque[tuple[ChecksumEvmAddress, list[EvmToken]]],
+) -> list[tuple[ChecksumEvmAddress, list[EvmToken]]]:
+    """Pop from the start of pending as many address->tokens as fit in a single multicall chunk
+
+    If the tokens of an address do not fit entirely, the remaining tokens stay in pending.
+    """
+    chunk = []
+    free_space = chunk_length
+    while len(pending) != 0:
+        address, tokens = pending[0]
+        free_space -= PURE_TOKENS_BALANCE_ARGUMENTS
+        if free_space > len(tokens):
+            chunk.append((address, tokens))
+            free_space -= len(tokens)
+            pending.popleft()
+            continue
+
+        if free_space > 0:
+            chunk.append((address, tokens[:free_space]))
+            if len(remaining_tokens := tokens[free_space:]) == 0:
+                pending.popleft()
+            else:
+                pending[0] = (address, remaining_tokens)
+        break
+
+    return chunk
+
 
 def generate_multicall_chunks(
         chunk_length: int,
@@ -76,25 +122,9 @@ def generate_multicall_chunks(
 ) -> list[list[tuple[ChecksumEvmAddress, list[EvmToken]]]]:
     """Generate appropriate num of chunks for multicall address->tokens, address->tokens query"""
     multicall_chunks = []
-    free_space = chunk_length
-    new_chunk = []
-    for address, address_tokens in addresses_to_tokens.items():
-        tokens = address_tokens
-        while len(tokens) > 0:
-            free_space -= PURE_TOKENS_BALANCE_ARGUMENTS
-            if free_space > len(tokens):
-                new_chunk.append((address, tokens))
-                free_space -= len(tokens)
-                tokens = []
-            else:
-                if free_space > 0:
-                    new_chunk.append((address, tokens[:free_space]))
-                    tokens = tokens[free_space:]
-                multicall_chunks.append(new_chunk)
-                new_chunk = []  # start new chunk
-                free_space = chunk_length
-    if new_chunk != []:
-        multicall_chunks.append(new_chunk)
+    pending = deque((address, tokens) for address, tokens in addresses_to_tokens.items() if len(tokens) != 0)  # noqa: E501
+    while len(pending) != 0:
+        multicall_chunks.append(pop_multicall_chunk(chunk_length=chunk_length, pending=pending))
     return multicall_chunks
 
 
@@ -115,6 +145,36 @@ def get_chunk_size_call_order(evm_inquirer: 'EvmNodeInquirer') -> tuple[int, lis
     return chunk_size, call_order
 
 
+class TokenChunkLengths:
+    """Keeps the multicall token chunk length of each node and adapts it at runtime
+
+    Chunks that fail (gas limit, payload too big, timeouts) halve the node's chunk length,
+    slow responses shrink it and fast responses grow it back up to the maximum allowed.
+    """
+
+    def __init__(self) -> None:
+        self.lengths: dict[NodeName, int] = {}
+
+    def get(self, node: NodeName, max_length: int) -> int:
+        return self.lengths.get(node, max_length)
+
+    def update(self, node: NodeName, max_length: int, elapsed: float | None) -> int:
+        """Adapt the chunk length of the node after a query. elapsed is None for failures.
+
+        Returns the new chunk length of the node.
+        """
+        length = self.get(node=node, max_length=max_length)
+        if elapsed is None:
+            length //= 2
+        elif elapsed > TOKEN_CHUNK_SLOW_RESPONSE_SECS:
+            length = length * 3 // 4
+        elif elapsed < TOKEN_CHUNK_FAST_RESPONSE_SECS:
+            length = length * 5 // 4
+
+        self.lengths[node] = min(max(length, MIN_TOKEN_CHUNK_LENGTH), max_length)
+        return self.lengths[node]
+
+
 class EvmTokens(metaclass=ABCMeta):
     def __init__(
             self,
@@ -123,6 +183,7 @@ class EvmTokens(metaclass=ABCMeta):
     ):
         self.db = database
         self.evm_inquirer = evm_inquirer
+        self.chunk_lengths = TokenChunkLengths()
 
     def get_token_balances(
             self,
@@ -216,6 +277,44 @@ class EvmTokens(metaclass=ABCMeta):
                 balances[address][token] += normalized_balance
         return balances
 
+    def _query_multicall_chunks_with_node(
+            self,
+            node: WeightedNode,
+            max_chunk_length: int,
+            pending: deque[tuple[ChecksumEvmAddress, list[EvmToken]]],
+            addresses_to_balances: dict[ChecksumEvmAddress, dict[EvmToken, FVal]],
+    ) -> None:
+        """Keep querying chunks of the pending address->tokens with the given node until
+        there is nothing left or the node fails even with the minimum chunk length.
+
+        Failed chunks are put back in pending so that other nodes can pick them up.
+        """
+        while len(pending) != 0:
+            chunk_length = self.chunk_lengths.get(node=node.node_info, max_length=max_chunk_length)
+            chunk = pop_multicall_chunk(chunk_length=chunk_length, pending=pending)
+            start = time.monotonic()
+            try:
+                new_balances = self._get_multicall_token_balances(chunk=chunk, call_order=[node])
+            except RemoteError as e:
+                pending.extendleft(reversed(chunk))
+                log.debug(
+                    f'Multicall token balances query of {self.evm_inquirer.chain_name} '
+                    f'node {node.node_info.name} failed with {chunk_length=} due to {e!s}',
+                )
+                if chunk_length == MIN_TOKEN_CHUNK_LENGTH:
+                    return  # leave the remaining chunks to the other nodes
+
+                self.chunk_lengths.update(node=node.node_info, max_length=max_chunk_length, elapsed=None)  # noqa: E501
+                continue
+
+            self.chunk_lengths.update(
+                node=node.node_info,
+                max_length=max_chunk_length,
+                elapsed=time.monotonic() - start,
+            )
+            for address, balances in new_balances.items():
+                addresses_to_balances[address].update(balances)
+
     def _query_chunks(
             self,
             address: ChecksumEvmAddress,
@@ -252,7 +351,23 @@ class EvmTokens(metaclass=ABCMeta):
 
         return addresses_info
 
-    def _query_new_tokens(self, addresses: Sequence[ChecksumEvmAddress]) -> None:
+    def _query_new_tokens(
+            self,
+            addresses: Sequence[ChecksumEvmAddress],
+            incremental: bool = False,
+    ) -> None:
+        with self.db.conn.read_ctx() as cursor:  # read before querying to not miss new entries
+            last_event_id, last_log_id = DBEvmTx(self.db).get_token_detection_ids(cursor)
+
+        if incremental is True:
+            addresses = self._detect_tokens_incrementally(
+                addresses=addresses,
+                last_event_id=last_event_id,
+                last_log_id=last_log_id,
+            )
+            if len(addresses) == 0:
+                return
+
         all_tokens = GlobalDBHandler().get_evm_tokens(
             chain_id=self.evm_inquirer.chain_id,
             exceptions=self._get_token_exceptions(),
@@ -261,17 +376,116 @@ class EvmTokens(metaclass=ABCMeta):
             addresses=addresses,
             tokens_to_check=all_tokens,
         )
+        now = ts_now()
+        with self.db.user_write() as write_cursor:
+            for address in addresses:
+                self.db.save_token_detection_checkpoint(
+                    write_cursor=write_cursor,
+                    address=address,
+                    blockchain=self.evm_inquirer.blockchain,
+                    last_full_detection_ts=now,
+                    last_event_id=last_event_id,
+                    last_log_id=last_log_id,
+                )
+
+    def _detect_tokens_incrementally(
+            self,
+            addresses: Sequence[ChecksumEvmAddress],
+            last_event_id: int,
+            last_log_id: int,
+    ) -> list[ChecksumEvmAddress]:
+        """Detect tokens for the given addresses by only checking the already detected
+        tokens and the tokens that each address moved since its last detection, as seen
+        in the decoded events and the receipt logs of its transactions.
+
+        Returns the addresses that need a full detection against all known tokens. Those are
+        the ones never detected before and the ones whose last full detection is older than
+        FULL_TOKEN_DETECTION_PERIOD, since movements that leave no transfer log such as
+        airdrops via rebasing can only be found by the full detection.
+
+        May raise:
+        - RemoteError if an external service such as Etherscan is queried and
+          there is a problem with its query.
+        - BadFunctionCallOutput if a local node is used and the contract for the
+          token has no code. That means the chain is not synced
+        """
+        full_detection_addresses = []
+        addresses_to_tokens: dict[ChecksumEvmAddress, tuple[Timestamp, list[EvmToken]]] = {}
+        now = ts_now()
+        dbevmtx = DBEvmTx(self.db)
+        exceptions = self._get_token_exceptions()
+        with self.db.conn.read_ctx() as cursor:
+            for address in addresses:
+                checkpoint = self.db.get_token_detection_checkpoint(
+                    cursor=cursor,
+                    address=address,
+                    blockchain=self.evm_inquirer.blockchain,
+                )
+                saved_tokens, _ = self.db.get_tokens_for_address(
+                    cursor=cursor,
+                    address=address,
+                    blockchain=self.evm_inquirer.blockchain,
+                )
+                if checkpoint is None or saved_tokens is None or now - checkpoint[0] > FULL_TOKEN_DETECTION_PERIOD:  # noqa: E501
+                    full_detection_addresses.append(address)
+                    continue
+
+                token_addresses = dbevmtx.get_token_transfer_addresses(
+                    cursor=cursor,
+                    address=address,
+                    chain_id=self.evm_inquirer.chain_id,
+                    after_event_id=checkpoint[1],
+                    after_log_id=checkpoint[2],
+                )
+                candidate_tokens = set(saved_tokens)
+                for token_address in token_addresses - exceptions:
+                    if (token := GlobalDBHandler.get_evm_token(
+                        address=token_address,
+                        chain_id=self.evm_inquirer.chain_id,
+                    )) is not None:
+                        candidate_tokens.add(token)
+
+                addresses_to_tokens[address] = (checkpoint[0], list(candidate_tokens))
+
+        chunk_size, call_order = get_chunk_size_call_order(self.evm_inquirer)
+        for address, (last_full_detection_ts, tokens_to_check) in addresses_to_tokens.items():
+            token_balances = self._query_chunks(
+                address=address,
+                tokens=tokens_to_check,
+                chunk_size=chunk_size,
+                call_order=call_order,
+            )
+            with self.db.user_write() as write_cursor:
+                self.db.save_tokens_for_address(
+                    write_cursor=write_cursor,
+                    address=address,
+                    blockchain=self.evm_inquirer.blockchain,
+                    tokens=list(token_balances.keys()),
+                )
+                self.db.save_token_detection_checkpoint(
+                    write_cursor=write_cursor,
+                    address=address,
+                    blockchain=self.evm_inquirer.blockchain,
+                    last_full_detection_ts=last_full_detection_ts,
+                    last_event_id=last_event_id,
+                    last_log_id=last_log_id,
+                )
+
+        return full_detection_addresses
 
     def detect_tokens(
             self,
             only_cache: bool,
             addresses: Sequence[ChecksumEvmAddress],
+            incremental: bool = False,
     ) -> DetectedTokensType:
         """
         Detect tokens for the given addresses.
 
         If only_cache is True, only tokens saved in the database are returned.
-        Otherwise, tokens are re-detected.
+        Otherwise, tokens are re-detected. If incremental is True then only the already
+        detected tokens and the tokens moved since the last detection are checked, falling
+        back to checking all known tokens when needed.
 
         May raise:
         - RemoteError if an external service such as Etherscan is queried and
@@ -280,7 +494,7 @@ class EvmTokens(metaclass=ABCMeta):
           token has no code. That means the chain is not synced
         """
         if only_cache is False:
-            self._query_new_tokens(addresses)
+            self._query_new_tokens(addresses=addresses, incremental=incremental)
 
         return self._compute_detected_tokens_info(addresses)
 
@@ -345,23 +559,32 @@ class EvmTokens(metaclass=ABCMeta):
                 all_tokens.update(saved_list)
                 addresses_to_tokens[address] = saved_list
 
-        multicall_chunks = generate_multicall_chunks(
-            addresses_to_tokens=addresses_to_tokens,
-            chunk_length=chunk_size,
-        )
-        for chunk in multicall_chunks:
+        # Dispatch the chunks in parallel to all usable nodes. Each node pulls chunks sized
+        # according to its own adaptive chunk length until there is nothing left to query
+        pending = deque((address, tokens) for address, tokens in addresses_to_tokens.items() if len(tokens) != 0)  # noqa: E501
+        greenlets = [
+            gevent.spawn(
+                self._query_multicall_chunks_with_node,
+                node=node,
+                max_chunk_length=chunk_size,
+                pending=pending,
+                addresses_to_balances=addresses_to_balances,
+            ) for node in call_order if (
+                node.node_info in self.evm_inquirer.web3_mapping or
+                node.node_info.name == self.evm_inquirer.etherscan_node_name
+            )
+        ]
+        gevent.joinall(greenlets, raise_error=True)
+        while len(pending) != 0:  # whatever all nodes failed at is tried with the full call order
             new_balances = self._get_multicall_token_balances(
-                chunk=chunk,
+                chunk=pop_multicall_chunk(chunk_length=chunk_size, pending=pending),
                 call_order=call_order,
             )
             for address, balances in new_balances.items():
                 addresses_to_balances[address].update(balances)
 
-        token_usd_price: dict[EvmToken, Price] = {}
-        for token in all_tokens:
-            token_usd_price[token] = Inquirer.find_usd_price(asset=token)
-
-        return dict(addresses_to_balances), token_usd_price
+        prices = Inquirer.find_usd_prices(assets=all_tokens)
+        return dict(addresses_to_balances), {token: prices[token] for token in all_tokens}
 
     def _get_token_exceptions(self) -> set[ChecksumEvmAddress]:
         """Returns a list of token addresses for which balances will not be queried"""
@@ -396,8 +619,12 @@ class EvmTokensWithDSProxy(EvmTokens, metaclass=ABCMeta):
         super().__init__(database=database, evm_inquirer=evm_inquirer)
         self.evm_inquirer: EvmNodeInquirerWithDSProxy  # set explicit type
 
-    def _query_new_tokens(self, addresses: Sequence[ChecksumEvmAddress]) -> None:
-        super()._query_new_tokens(addresses)
+    def _query_new_tokens(
+            self,
+            addresses: Sequence[ChecksumEvmAddress],
+            incremental: bool = False,
+    ) -> None:
+        super()._query_new_tokens(addresses=addresses, incremental=incremental)
         self.maybe_detect_proxies_tokens(addresses)
 
     def maybe_detect_proxies_tokens(self, addresses: Sequence[ChecksumEvmAddress]) -> None:  # pylint: disable=unused-argument
@@ -15,6 +15,10 @@ HISTORY_MAPPING_STATE_CUSTOMIZED = 1
 
 EVM_ACCOUNTS_DETAILS_LAST_QUERIED_TS = 'last_queried_timestamp'
 EVM_ACCOUNTS_DETAILS_TOKENS = 'tokens'
+# checkpoint of the incremental token detection of an account
+EVM_ACCOUNTS_DETAILS_LAST_FULL_DETECTION_TS = 'last_full_detection_timestamp'
+EVM_ACCOUNTS_DETAILS_LAST_DETECTION_EVENT_ID = 'last_detection_event_id'
+EVM_ACCOUNTS_DETAILS_LAST_DETECTION_LOG_ID = 'last_detection_log_id'
 
 NO_ACCOUNTING_COUNTERPARTY = 'NONE'
 LINKABLE_ACCOUNTING_SETTINGS_NAME = Literal[
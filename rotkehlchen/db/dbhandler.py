@@ -53,6 +53,9 @@ from rotkehlchen.db.cache import (
 )
 from rotkehlchen.db.constants import (
     BINANCE_MARKETS_KEY,
+    EVM_ACCOUNTS_DETAILS_LAST_DETECTION_EVENT_ID,
+    EVM_ACCOUNTS_DETAILS_LAST_DETECTION_LOG_ID,
+    EVM_ACCOUNTS_DETAILS_LAST_FULL_DETECTION_TS,
     EVM_ACCOUNTS_DETAILS_LAST_QUERIED_TS,
     EVM_ACCOUNTS_DETAILS_TOKENS,
     KRAKEN_ACCOUNT_TYPE_KEY,
@@ -181,9 +184,14 @@ class DBHandler:
             initial_settings: ModifiableDBSettings | None,
             sql_vm_instructions_cb: int,
             resume_from_backup: bool,
+            read_only: bool = False,
     ):
         """Database constructor
 
+        If read_only is True only the connections are opened, without any upgrades, checks
+        or syncing, and any write through them fails. For worker processes that read the DB
+        of the user that is logged in the main process.
+
         May raise:
         - DBUpgradeError if the rotki DB version is newer than the software or
         there is a DB upgrade and there is an error or if the version is older
@@ -211,6 +219,12 @@ class DBHandler:
         self.get_or_create_evm_token_lock = Semaphore()
         self.password = password
         self._connect()
+        if read_only is True:
+            self._connect(conn_attribute='conn_transient')
+            for connection in (self.conn, self.conn_transient):
+                connection.execute('PRAGMA query_only=ON;')
+            return
+
         self._check_unfinished_upgrades(resume_from_backup=resume_from_backup)
         self._run_actions_after_first_connection()
         with self.user_write() as cursor:
@@ -1263,6 +1277,69 @@ class DBHandler:
             insert_rows,
         )
 
+    def get_token_detection_checkpoint(
+            self,
+            cursor: 'DBCursor',
+            address: ChecksumEvmAddress,
+            blockchain: SupportedBlockchain,
+    ) -> tuple[Timestamp, int, int] | None:
+        """Gets the checkpoint of the last token detection of an address. That is the
+        timestamp of the last full token detection and the last history event and receipt
+        log identifiers that were taken into account by the last detection.
+
+        Returns None if there is no (complete) checkpoint saved for the address.
+        """
+        cursor.execute(
+            'SELECT key, value FROM evm_accounts_details WHERE account=? AND chain_id=? AND '
+            'key IN (?, ?, ?)',
+            (
+                address,
+                blockchain.to_chain_id().serialize_for_db(),
+                EVM_ACCOUNTS_DETAILS_LAST_FULL_DETECTION_TS,
+                EVM_ACCOUNTS_DETAILS_LAST_DETECTION_EVENT_ID,
+                EVM_ACCOUNTS_DETAILS_LAST_DETECTION_LOG_ID,
+            ),
+        )
+        values = dict(cursor)
+        try:
+            return (
+                deserialize_timestamp(values[EVM_ACCOUNTS_DETAILS_LAST_FULL_DETECTION_TS]),
+                int(values[EVM_ACCOUNTS_DETAILS_LAST_DETECTION_EVENT_ID]),
+                int(values[EVM_ACCOUNTS_DETAILS_LAST_DETECTION_LOG_ID]),
+            )
+        except (KeyError, ValueError, DeserializationError):
+            return None
+
+    def save_token_detection_checkpoint(
+            self,
+            write_cursor: 'DBCursor',
+            address: ChecksumEvmAddress,
+            blockchain: SupportedBlockchain,
+            last_full_detection_ts: Timestamp,
+            last_event_id: int,
+            last_log_id: int,
+    ) -> None:
+        """Saves the checkpoint of the last token detection of an address"""
+        chain_id = blockchain.to_chain_id().serialize_for_db()
+        write_cursor.execute(
+            'DELETE FROM evm_accounts_details WHERE account=? AND chain_id=? AND KEY IN(?, ?, ?)',
+            (
+                address,
+                chain_id,
+                EVM_ACCOUNTS_DETAILS_LAST_FULL_DETECTION_TS,
+                EVM_ACCOUNTS_DETAILS_LAST_DETECTION_EVENT_ID,
+                EVM_ACCOUNTS_DETAILS_LAST_DETECTION_LOG_ID,
+            ),
+        )
+        write_cursor.executemany(
+            'INSERT INTO evm_accounts_details (account, chain_id, key, value) VALUES (?, ?, ?, ?)',
+            [
+                (address, chain_id, EVM_ACCOUNTS_DETAILS_LAST_FULL_DETECTION_TS, last_full_detection_ts),  # noqa: E501
+                (address, chain_id, EVM_ACCOUNTS_DETAILS_LAST_DETECTION_EVENT_ID, last_event_id),
+                (address, chain_id, EVM_ACCOUNTS_DETAILS_LAST_DETECTION_LOG_ID, last_log_id),
+            ],
+        )
+
     def get_blockchain_accounts(self, cursor: 'DBCursor') -> BlockchainAccounts:
         """Returns a Blockchain accounts instance containing all blockchain account addresses"""
         cursor.execute(
@@ -0,0 +1,91 @@
+import logging
+from collections.abc import Iterable
+from typing import TYPE_CHECKING, Literal
+
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.types import ChainID, Timestamp
+
+if TYPE_CHECKING:
+    from rotkehlchen.db.dbhandler import DBHandler
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+IndexedBlock = tuple[int, Timestamp]
+
+
+class DBEvmBlocks:
+    """Sparse index of evm block numbers to timestamps kept in the transient DB.
+
+    It is filled as a side effect of queries that return blocks along with their timestamp
+    so that conversions between block numbers and timestamps can be done locally.
+    """
+
+    def __init__(self, database: 'DBHandler') -> None:
+        self.db = database
+
+    def add_block_timestamps(self, chain_id: ChainID, blocks: Iterable[IndexedBlock]) -> None:
+        """Adds the given (block number, timestamp) pairs to the index"""
+        with self.db.transient_write() as write_cursor:
+            write_cursor.executemany(
+                'INSERT OR IGNORE INTO evm_block_timestamps(chain_id, block_number, timestamp) '
+                'VALUES(?, ?, ?)',
+                [(chain_id.serialize_for_db(), number, ts) for number, ts in blocks],
+            )
+
+    def get_block_timestamp(self, chain_id: ChainID, block_number: int) -> Timestamp | None:
+        """Returns the timestamp of the given block if it is indexed"""
+        with self.db.conn_transient.read_ctx() as cursor:
+            result = cursor.execute(
+                'SELECT timestamp FROM evm_block_timestamps WHERE chain_id=? AND block_number=?',
+                (chain_id.serialize_for_db(), block_number),
+            ).fetchone()
+
+        return None if result is None else Timestamp(result[0])
+
+    def get_bracketing_blocks(
+            self,
+            chain_id: ChainID,
+            ts: Timestamp,
+            closest: Literal['before', 'after'],
+    ) -> tuple[IndexedBlock | None, IndexedBlock | None]:
+        """Returns the indexed blocks closest to either side of the block searched for the
+        given timestamp. The searched block is the last one with a timestamp at or before ts
+        if closest is 'before' and the first one with a timestamp at or after ts otherwise.
+
+        So the first returned block is the last indexed one that is before the searched block
+        (or the searched block itself for 'before') and the second returned block is the
+        first indexed one after it (or the searched block itself for 'after'). Any side
+        can be None if there is no such indexed block.
+        """
+        lower_op, upper_op = ('<=', '>') if closest == 'before' else ('<', '>=')
+        with self.db.conn_transient.read_ctx() as cursor:
+            lower = cursor.execute(
+                f'SELECT block_number, timestamp FROM evm_block_timestamps WHERE chain_id=? '
+                f'AND timestamp {lower_op} ? ORDER BY block_number DESC LIMIT 1',
+                (chain_id.serialize_for_db(), ts),
+            ).fetchone()
+            upper = cursor.execute(
+                f'SELECT block_number, timestamp FROM evm_block_timestamps WHERE chain_id=? '
+                f'AND timestamp {upper_op} ? ORDER BY block_number ASC LIMIT 1',
+                (chain_id.serialize_for_db(), ts),
+            ).fetchone()
+
+        return (
+            None if lower is None else (lower[0], Timestamp(lower[1])),
+            None if upper is None else (upper[0], Timestamp(upper[1])),
+        )
+
+    def get_blocknumber_by_time(
+            self,
+            chain_id: ChainID,
+            ts: Timestamp,
+            closest: Literal['before', 'after'],
+    ) -> int | None:
+        """Returns the block number for the given timestamp if the index alone can
+        answer it. That is when the bracketing blocks are consecutive."""
+        lower, upper = self.get_bracketing_blocks(chain_id=chain_id, ts=ts, closest=closest)
+        if lower is None or upper is None or upper[0] - lower[0] != 1:
+            return None
+
+        return lower[0] if closest == 'before' else upper[0]
@@ -1,4 +1,5 @@
 import logging
+from collections.abc import Collection
 from typing import TYPE_CHECKING, Any, get_args
 
 from pysqlcipher3 import dbapi2 as sqlcipher
@@ -7,12 +8,14 @@ from rotkehlchen.chain.arbitrum_one.constants import ARBITRUM_ONE_GENESIS
 from rotkehlchen.chain.base.constants import BASE_GENESIS
 from rotkehlchen.chain.ethereum.constants import ETHEREUM_GENESIS
 from rotkehlchen.chain.evm.constants import GENESIS_HASH, ZERO_ADDRESS
+from rotkehlchen.chain.evm.decoding.constants import ERC20_OR_ERC721_TRANSFER
 from rotkehlchen.chain.evm.structures import EvmTxReceipt, EvmTxReceiptLog
-from rotkehlchen.chain.evm.types import EvmAccount
+from rotkehlchen.chain.evm.types import EvmAccount, asset_id_is_evm_token
 from rotkehlchen.chain.gnosis.constants import GNOSIS_GENESIS
 from rotkehlchen.chain.optimism.constants import OPTIMISM_GENESIS
 from rotkehlchen.chain.polygon_pos.constants import POLYGON_POS_GENESIS
 from rotkehlchen.db.constants import HISTORY_MAPPING_STATE_DECODED
+from rotkehlchen.db.evmblocks import DBEvmBlocks
 from rotkehlchen.db.filtering import EvmTransactionsFilterQuery, TransactionsNotDecodedFilterQuery
 from rotkehlchen.db.history_events import DBHistoryEvents
 from rotkehlchen.errors.serialization import DeserializationError
@@ -30,15 +33,19 @@ from rotkehlchen.types import (
     EvmInternalTransaction,
     EvmTransaction,
     EVMTxHash,
+    Location,
     SupportedBlockchain,
     Timestamp,
     deserialize_evm_tx_hash,
 )
 from rotkehlchen.utils.hexbytes import hexstring_to_bytes
+from rotkehlchen.utils.misc import get_chunks
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+TX_QUERY_CHUNK_SIZE = 500  # keep the sql variables of each query well below the limit
+
 if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
     from rotkehlchen.db.drivers.gevent import DBCursor
@@ -100,6 +107,11 @@ class DBEvmTx:
             tuples=tx_tuples,
             relevant_address=relevant_address,
         )
+        for chain_id in {tx.chain_id for tx in evm_transactions}:  # also index the blocks
+            DBEvmBlocks(self.db).add_block_timestamps(
+                chain_id=chain_id,
+                blocks={(tx.block_number, tx.timestamp) for tx in evm_transactions if tx.chain_id == chain_id},  # noqa: E501
+            )
 
     def add_evm_internal_transactions(
             self,
@@ -303,6 +315,169 @@ class DBEvmTx:
             cursor.execute(querystr, bindings)
             return cursor.fetchone()[0]
 
+    def get_token_detection_ids(self, cursor: 'DBCursor') -> tuple[int, int]:
+        """Returns the latest history event and receipt log identifiers. Used as the
+        checkpoint after which new token movements are looked for by token detection."""
+        last_event_id = cursor.execute('SELECT MAX(identifier) FROM history_events').fetchone()[0]
+        last_log_id = cursor.execute('SELECT MAX(identifier) FROM evmtx_receipt_logs').fetchone()[0]  # noqa: E501
+        return last_event_id or 0, last_log_id or 0
+
+    def get_token_transfer_addresses(
+            self,
+            cursor: 'DBCursor',
+            address: ChecksumEvmAddress,
+            chain_id: SUPPORTED_CHAIN_IDS,
+            after_event_id: int,
+            after_log_id: int,
+    ) -> set[ChecksumEvmAddress]:
+        """Returns the addresses of the tokens moved by the given address after the given
+        history event and receipt log identifiers.
+
+        The decoded history events of the address are used and also the transfer logs
+        of its transactions' receipts so that not yet decoded transactions are covered.
+        """
+        token_addresses = set()
+        cursor.execute(
+            'SELECT DISTINCT asset FROM history_events WHERE identifier > ? AND location=? '
+            'AND location_label=? AND asset LIKE ?',
+            (
+                after_event_id,
+                Location.from_chain_id(chain_id).serialize_for_db(),
+                address,
+                f'eip155:{chain_id.serialize_for_db()}/%',
+            ),
+        )
+        for (asset_id,) in cursor:
+            if (evm_details := asset_id_is_evm_token(asset_id)) is not None:
+                token_addresses.add(evm_details[1])
+
+        cursor.execute(
+            'SELECT DISTINCT L.address FROM evmtx_receipt_logs AS L '
+            'INNER JOIN evmtx_receipt_log_topics AS T ON T.log=L.identifier AND T.topic_index=0 '
+            'INNER JOIN evmtx_address_mappings AS M ON M.tx_id=L.tx_id '
+            'INNER JOIN evm_transactions AS E ON E.identifier=L.tx_id '
+            'WHERE L.identifier > ? AND T.topic=? AND M.address=? AND E.chain_id=?',
+            (after_log_id, ERC20_OR_ERC721_TRANSFER, address, chain_id.serialize_for_db()),
+        )
+        for (token_address,) in cursor:
+            try:
+                token_addresses.add(deserialize_evm_address(token_address))
+            except DeserializationError:
+                log.error(f'Found invalid token address {token_address} in the receipt logs')
+
+        return token_addresses
+
+    def get_decoded_transaction_hashes_touching(
+            self,
+            cursor: 'DBCursor',
+            chain_id: ChainID,
+            addresses: Collection[ChecksumEvmAddress],
+            topics: Collection[bytes],
+    ) -> list[EVMTxHash]:
+        """Returns the hashes of the already decoded transactions of the chain that may be
+        affected by a change in the decoding of the given addresses or log topics.
+
+        A transaction is affected if any of the addresses is its sender, its receiver,
+        a tracked address mapped to it or the emitter of any of its receipt logs, or if
+        any of its receipt logs has one of the given topics.
+        """
+        tx_ids_to_hashes: dict[int, EVMTxHash] = {}
+        base_query = (
+            'SELECT E.identifier, E.tx_hash FROM evm_transactions AS E '
+            'INNER JOIN evm_tx_mappings AS M ON M.tx_id=E.identifier AND M.value=? '
+            'WHERE E.chain_id=? AND E.identifier IN '
+        )
+        base_bindings = (HISTORY_MAPPING_STATE_DECODED, chain_id.serialize_for_db())
+        for chunk in get_chunks(list(addresses), n=TX_QUERY_CHUNK_SIZE):
+            questionmarks = ','.join(['?'] * len(chunk))
+            cursor.execute(
+                base_query +
+                f'(SELECT identifier FROM evm_transactions WHERE from_address IN ({questionmarks}) '  # noqa: E501
+                f'OR to_address IN ({questionmarks}) '
+                f'UNION SELECT tx_id FROM evmtx_address_mappings WHERE address IN ({questionmarks}) '  # noqa: E501
+                f'UNION SELECT tx_id FROM evmtx_receipt_logs WHERE address IN ({questionmarks}))',
+                base_bindings + tuple(chunk) * 4,
+            )
+            tx_ids_to_hashes.update((tx_id, deserialize_evm_tx_hash(tx_hash)) for tx_id, tx_hash in cursor)  # noqa: E501
+
+        for topics_chunk in get_chunks(list(topics), n=TX_QUERY_CHUNK_SIZE):
+            questionmarks = ','.join(['?'] * len(topics_chunk))
+            cursor.execute(
+                base_query +
+                '(SELECT L.tx_id FROM evmtx_receipt_logs AS L INNER JOIN evmtx_receipt_log_topics '
+                f'AS T ON T.log=L.identifier WHERE T.topic IN ({questionmarks}))',
+                base_bindings + tuple(topics_chunk),
+            )
+            tx_ids_to_hashes.update((tx_id, deserialize_evm_tx_hash(tx_hash)) for tx_id, tx_hash in cursor)  # noqa: E501
+
+        return [tx_ids_to_hashes[tx_id] for tx_id in sorted(tx_ids_to_hashes)]
+
+    @staticmethod
+    def get_activity_marker(cursor: 'DBCursor') -> tuple[int, int]:
+        """Returns the rowids of the last inserted transaction address mapping and history
+        event. Rows inserted later get greater rowids, whatever their timestamp, so this
+        marks which activity get_addresses_with_activity_after should consider new."""
+        mappings_rowid, events_rowid = cursor.execute(
+            'SELECT (SELECT MAX(rowid) FROM evmtx_address_mappings), '
+            '(SELECT MAX(identifier) FROM history_events)',
+        ).fetchone()
+        return mappings_rowid or 0, events_rowid or 0
+
+    def get_addresses_with_activity_after(
+            self,
+            cursor: 'DBCursor',
+            chain_id: SUPPORTED_CHAIN_IDS,
+            addresses: Collection[ChecksumEvmAddress],
+            marker: tuple[int, int],
+    ) -> set[ChecksumEvmAddress]:
+        """Returns which of the given addresses got a transaction or a history event in
+        the chain inserted in the DB after the given get_activity_marker result. Only these
+        addresses can have had their balances changed by the activity added since then.
+
+        Insertion order is used instead of timestamps since transactions can be queried
+        long after they happened.
+        """
+        active_addresses: set[ChecksumEvmAddress] = set()
+        mappings_rowid, events_rowid = marker
+        for chunk in get_chunks(list(addresses), n=TX_QUERY_CHUNK_SIZE):
+            questionmarks = ','.join(['?'] * len(chunk))
+            cursor.execute(
+                'SELECT M.address FROM evmtx_address_mappings AS M INNER JOIN evm_transactions '
+                'AS E ON M.tx_id=E.identifier WHERE E.chain_id=? AND M.rowid>? AND '
+                f'M.address IN ({questionmarks}) UNION SELECT location_label FROM history_events '
+                f'WHERE location=? AND identifier>? AND location_label IN ({questionmarks})',
+                (
+                    chain_id.serialize_for_db(),
+                    mappings_rowid,
+                    *chunk,
+                    Location.from_chain_id(chain_id).serialize_for_db(),
+                    events_rowid,
+                    *chunk,
+                ),
+            )
+            active_addresses.update(x[0] for x in cursor)
+
+        return active_addresses
+
+    def get_decoded_transaction_hashes(
+            self,
+            cursor: 'DBCursor',
+            chain_id: ChainID,
+            tx_hashes: Collection[EVMTxHash],
+    ) -> set[EVMTxHash]:
+        """Returns which of the given transaction hashes of the chain are already decoded"""
+        decoded_hashes: set[EVMTxHash] = set()
+        for chunk in get_chunks(list(tx_hashes), n=TX_QUERY_CHUNK_SIZE):
+            cursor.execute(
+                'SELECT E.tx_hash FROM evm_transactions AS E INNER JOIN evm_tx_mappings AS M '
+                'ON M.tx_id=E.identifier AND M.value=? WHERE E.chain_id=? AND E.tx_hash IN '
+                f'({",".join(["?"] * len(chunk))})',
+                (HISTORY_MAPPING_STATE_DECODED, chain_id.serialize_for_db(), *chunk),
+            )
+            decoded_hashes.update(deserialize_evm_tx_hash(x[0]) for x in cursor)
+
+        return decoded_hashes
+
     def add_or_ignore_receipt_data(
             self,
             write_cursor: 'DBCursor',
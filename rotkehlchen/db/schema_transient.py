@@ -54,6 +54,16 @@ CREATE TABLE IF NOT EXISTS settings (
 );
 """
 
+# Sparse index of evm block numbers to their timestamps
+DB_CREATE_EVM_BLOCK_TIMESTAMPS = """
+CREATE TABLE IF NOT EXISTS evm_block_timestamps (
+    chain_id INTEGER NOT NULL,
+    block_number INTEGER NOT NULL,
+    timestamp INTEGER NOT NULL,
+    PRIMARY KEY(chain_id, block_number)
+);
+"""
+
 DB_SCRIPT_CREATE_TRANSIENT_TABLES = f"""
 PRAGMA foreign_keys=off;
 BEGIN TRANSACTION;
@@ -62,6 +72,7 @@ BEGIN TRANSACTION;
 {DB_CREATE_REPORT_TOTALS}
 {DB_CREATE_PNL_EVENTS}
 {DB_CREATE_SETTINGS}
+{DB_CREATE_EVM_BLOCK_TIMESTAMPS}
 COMMIT;
 PRAGMA foreign_keys=on;
 """
@@ -57,6 +57,13 @@ DEFAULT_CONNECT_TIMEOUT = 30
 DEFAULT_READ_TIMEOUT = 30
 DEFAULT_ORACLE_PENALTY_THRESHOLD_COUNT = 5
 DEFAULT_ORACLE_PENALTY_DURATION = 1800
+DEFAULT_CURRENT_PRICE_CACHE_SIZE = 1024
+DEFAULT_SERVE_STALE_CURRENT_PRICES = False
+DEFAULT_HISTORICAL_PRICE_INTERPOLATION_MAX_GAP = 0
+DEFAULT_ADAPTIVE_ORACLE_ORDER = False
+DEFAULT_MULTIPROCESS_DECODING = False
+DEFAULT_BALANCES_QUERY_CONCURRENCY = 6
+DEFAULT_CHAIN_BALANCES_QUERY_TIMEOUT = 600
 
 JSON_KEYS = (
     'current_price_oracles',
@@ -79,6 +86,9 @@ BOOLEAN_KEYS = (
     'eth_staking_taxable_after_withdrawal_enabled',
     'include_fees_in_cost_basis',
     'infer_zero_timed_balances',
+    'serve_stale_current_prices',
+    'adaptive_oracle_order',
+    'multiprocess_decoding',
 )
 INTEGER_KEYS = (
     'version',
@@ -92,6 +102,10 @@ INTEGER_KEYS = (
     'read_timeout',
     'oracle_penalty_threshold_count',
     'oracle_penalty_duration',
+    'current_price_cache_size',
+    'historical_price_interpolation_max_gap',
+    'balances_query_concurrency',
+    'chain_balances_query_timeout',
 )
 STRING_KEYS = (
     'ksm_rpc_endpoint',
@@ -141,6 +155,13 @@ CachedDBSettingsFieldNames = Literal[
     'read_timeout',
     'oracle_penalty_threshold_count',
     'oracle_penalty_duration',
+    'current_price_cache_size',
+    'serve_stale_current_prices',
+    'historical_price_interpolation_max_gap',
+    'adaptive_oracle_order',
+    'multiprocess_decoding',
+    'balances_query_concurrency',
+    'chain_balances_query_timeout',
 ]
 
 DBSettingsFieldTypes = (
@@ -198,6 +219,13 @@ class DBSettings:
     read_timeout: int = DEFAULT_READ_TIMEOUT
     oracle_penalty_threshold_count: int = DEFAULT_ORACLE_PENALTY_THRESHOLD_COUNT
     oracle_penalty_duration: int = DEFAULT_ORACLE_PENALTY_DURATION
+    current_price_cache_size: int = DEFAULT_CURRENT_PRICE_CACHE_SIZE
+    serve_stale_current_prices: bool = DEFAULT_SERVE_STALE_CURRENT_PRICES
+    historical_price_interpolation_max_gap: int = DEFAULT_HISTORICAL_PRICE_INTERPOLATION_MAX_GAP
+    adaptive_oracle_order: bool = DEFAULT_ADAPTIVE_ORACLE_ORDER
+    multiprocess_decoding: bool = DEFAULT_MULTIPROCESS_DECODING
+    balances_query_concurrency: int = DEFAULT_BALANCES_QUERY_CONCURRENCY
+    chain_balances_query_timeout: int = DEFAULT_CHAIN_BALANCES_QUERY_TIMEOUT
 
     def serialize(self) -> dict[str, Any]:
         settings_dict = {}
@@ -253,6 +281,13 @@ class ModifiableDBSettings(NamedTuple):
     read_timeout: int | None = None
     oracle_penalty_threshold_count: int | None = None
     oracle_penalty_duration: int | None = None
+    current_price_cache_size: int | None = None
+    serve_stale_current_prices: bool | None = None
+    historical_price_interpolation_max_gap: int | None = None
+    adaptive_oracle_order: bool | None = None
+    multiprocess_decoding: bool | None = None
+    balances_query_concurrency: int | None = None
+    chain_balances_query_timeout: int | None = None
 
     def serialize(self) -> dict[str, Any]:
         settings_dict = {}
@@ -443,3 +478,27 @@ class CachedSettings:
     @property
     def oracle_penalty_threshold_count(self) -> int:
         return self._settings.oracle_penalty_threshold_count
+
+    @property
+    def serve_stale_current_prices(self) -> bool:
+        return self._settings.serve_stale_current_prices
+
+    @property
+    def historical_price_interpolation_max_gap(self) -> int:
+        return self._settings.historical_price_interpolation_max_gap
+
+    @property
+    def adaptive_oracle_order(self) -> bool:
+        return self._settings.adaptive_oracle_order
+
+    @property
+    def multiprocess_decoding(self) -> bool:
+        return self._settings.multiprocess_decoding
+
+    @property
+    def balances_query_concurrency(self) -> int:
+        return self._settings.balances_query_concurrency
+
+    @property
+    def chain_balances_query_timeout(self) -> int:
+        return self._settings.chain_balances_query_timeout
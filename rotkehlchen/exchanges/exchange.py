@@ -3,8 +3,6 @@ from abc import abstractmethod
 from collections.abc import Callable
 from typing import TYPE_CHECKING, Any
 
-import requests
-
 from rotkehlchen.accounting.structures.balance import Balance
 from rotkehlchen.assets.asset import AssetWithOracles
 from rotkehlchen.db.filtering import (
@@ -27,9 +25,9 @@ from rotkehlchen.types import (
     T_ApiSecret,
     Timestamp,
 )
-from rotkehlchen.utils.misc import set_user_agent
 from rotkehlchen.utils.mixins.cacheable import CacheableMixIn
 from rotkehlchen.utils.mixins.lockable import LockableQueryMixIn, protect_with_lock
+from rotkehlchen.utils.network import create_session
 
 if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
@@ -89,8 +87,7 @@ class ExchangeInterface(CacheableMixIn, LockableQueryMixIn):
         self.api_key = api_key
         self.secret = secret
         self.first_connection_made = False
-        self.session = requests.session()
-        set_user_agent(self.session)
+        self.session = create_session()
         log.info(f'Initialized {location!s} exchange {name}')
 
     def reset_to_db_credentials(self) -> None:
@@ -1,9 +1,13 @@
 import logging
+import time
 from collections import defaultdict
-from collections.abc import Iterator
+from collections.abc import Callable, Iterator
 from importlib import import_module
 from types import ModuleType
-from typing import TYPE_CHECKING, Any, Optional
+from typing import TYPE_CHECKING, Any, Optional, TypeVar
+
+import gevent
+from gevent.pool import Pool
 
 from rotkehlchen.db.constants import BINANCE_MARKETS_KEY, KRAKEN_ACCOUNT_TYPE_KEY
 from rotkehlchen.errors.misc import InputError
@@ -28,12 +32,16 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+EXCHANGES_QUERY_CONCURRENCY = 4  # how many exchanges to query at the same time
+T = TypeVar('T')
+
 
 class ExchangeManager:
 
     def __init__(self, msg_aggregator: MessagesAggregator) -> None:
         self.connected_exchanges: dict[Location, list[ExchangeInterface]] = defaultdict(list)
         self.msg_aggregator = msg_aggregator
+        self.query_concurrency = EXCHANGES_QUERY_CONCURRENCY
 
     @staticmethod
     def _get_exchange_module_name(location: Location) -> str:
@@ -307,11 +315,43 @@ class ExchangeManager:
             return self.database.get_binance_pairs(name, location)
         return []
 
+    def query_exchanges(
+            self,
+            query: Callable[[ExchangeInterface], T],
+    ) -> list[tuple[ExchangeInterface, T]]:
+        """Runs the given query for all connected and syncing exchanges, up to
+        query_concurrency of them at the same time, so that a slow exchange does
+        not hold back the others.
+
+        Returns each exchange with its query result in the iteration order of the exchanges.
+        The failure of an exchange does not stop the queries of the others. After all
+        have finished the exception of the first failed exchange, if any, is raised.
+        """
+        exchanges = list(self.iterate_exchanges())
+        pool = Pool(size=self.query_concurrency)
+        greenlets = [pool.spawn(self._timed_query, exchange, query) for exchange in exchanges]
+        gevent.joinall(greenlets)
+        for greenlet in greenlets:
+            if greenlet.exception is not None:
+                raise greenlet.exception
+
+        return [(exchange, greenlet.value) for exchange, greenlet in zip(exchanges, greenlets, strict=True)]  # noqa: E501
+
+    @staticmethod
+    def _timed_query(exchange: ExchangeInterface, query: Callable[[ExchangeInterface], T]) -> T:
+        start = time.monotonic()
+        try:
+            return query(exchange)
+        except Exception as e:
+            log.error(f'Query of {exchange.location!s} exchange {exchange.name} failed due to {e!s}')  # noqa: E501
+            raise
+        finally:
+            log.debug(f'Query of {exchange.location!s} exchange {exchange.name} took {time.monotonic() - start:.2f} seconds')  # noqa: E501
+
     def query_history_events(self) -> None:
         """Queries all history events for exchanges that need it
 
         May raise:
         - RemoteError if any exchange's remote query fails
         """
-        for exchange in self.iterate_exchanges():
-            exchange.query_history_events()
+        self.query_exchanges(lambda exchange: exchange.query_history_events())
@@ -20,7 +20,8 @@ from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.serialization.deserialize import deserialize_evm_address, deserialize_fval
 from rotkehlchen.types import ChecksumEvmAddress, Eth2PubKey, ExternalService
 from rotkehlchen.user_messages import MessagesAggregator
-from rotkehlchen.utils.misc import from_wei, get_chunks, set_user_agent, ts_now, ts_sec_to_ms
+from rotkehlchen.utils.misc import from_wei, get_chunks, ts_now, ts_sec_to_ms
+from rotkehlchen.utils.network import create_session
 from rotkehlchen.utils.serialization import jsonloads_dict
 
 if TYPE_CHECKING:
@@ -56,9 +57,8 @@ class BeaconChain(ExternalServiceWithApiKey):
         super().__init__(database=database, service_name=ExternalService.BEACONCHAIN)
         self.db: DBHandler  # specifying DB is not optional
         self.msg_aggregator = msg_aggregator
-        self.session = requests.session()
+        self.session = create_session()
         self.warning_given = False
-        set_user_agent(self.session)
         self.url = f'{BEACONCHAIN_ROOT_URL}/api/v1/'
         self.produced_blocks_lock = Semaphore()
 
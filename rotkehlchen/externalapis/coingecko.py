@@ -1,5 +1,7 @@
 import json
 import logging
+from collections import defaultdict
+from collections.abc import Sequence
 from http import HTTPStatus
 from typing import Any, Literal, NamedTuple, overload
 from urllib.parse import urlencode
@@ -9,7 +11,7 @@ import requests
 from rotkehlchen.assets.asset import Asset, AssetWithOracles
 from rotkehlchen.constants.prices import ZERO_PRICE
 from rotkehlchen.constants.resolver import evm_address_to_identifier, strethaddress_to_identifier
-from rotkehlchen.constants.timing import DAY_IN_SECONDS
+from rotkehlchen.constants.timing import DAY_IN_SECONDS, HOUR_IN_SECONDS
 from rotkehlchen.db.settings import CachedSettings
 from rotkehlchen.errors.asset import UnknownAsset, UnsupportedAsset
 from rotkehlchen.errors.misc import RemoteError
@@ -17,14 +19,21 @@ from rotkehlchen.errors.price import NoPriceForGivenTimestamp, PriceQueryUnsuppo
 from rotkehlchen.fval import FVal
 from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
-from rotkehlchen.interfaces import HistoricalPriceOracleInterface
+from rotkehlchen.interfaces import (
+    HistoricalPriceOracleInterface,
+    HistoricalPriceRangeOracleInterface,
+    MultipleCurrentPricesOracleInterface,
+)
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import ChainID, EvmTokenKind, Price, Timestamp
-from rotkehlchen.utils.misc import create_timestamp, set_user_agent, timestamp_to_date, ts_now
+from rotkehlchen.utils.misc import create_timestamp, get_chunks, timestamp_to_date, ts_now
 from rotkehlchen.utils.mixins.penalizable_oracle import PenalizablePriceOracleMixin
+from rotkehlchen.utils.network import create_session
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
+# Number of coingecko ids queried per simple/price request to keep the url length sane
+SIMPLE_PRICE_IDS_CHUNK_SIZE = 150
 
 
 class CoingeckoAssetData(NamedTuple):
@@ -498,13 +507,22 @@ COINGECKO_SIMPLE_VS_CURRENCIES = [
 ]
 
 
-class Coingecko(HistoricalPriceOracleInterface, PenalizablePriceOracleMixin):
+MARKET_CHART_HOURLY_MAX_DAYS = 90
+
+
+class Coingecko(
+        HistoricalPriceOracleInterface,
+        HistoricalPriceRangeOracleInterface,
+        MultipleCurrentPricesOracleInterface,
+        PenalizablePriceOracleMixin,
+):
+    # market_chart/range returns hourly prices only for ranges of up to 90 days
+    max_price_range_seconds = MARKET_CHART_HOURLY_MAX_DAYS * DAY_IN_SECONDS
 
     def __init__(self) -> None:
         HistoricalPriceOracleInterface.__init__(self, oracle_name='coingecko')
         PenalizablePriceOracleMixin.__init__(self)
-        self.session = requests.session()
-        set_user_agent(self.session)
+        self.session = create_session()
         self.all_coins_cache: dict[str, dict[str, Any]] | None = None
         self.last_rate_limit = 0
 
@@ -705,6 +723,54 @@ class Coingecko(HistoricalPriceOracleInterface, PenalizablePriceOracleMixin):
             )
             return ZERO_PRICE, False
 
+    def query_multiple_current_prices(
+            self,
+            from_assets: Sequence[AssetWithOracles],
+            to_asset: AssetWithOracles,
+    ) -> dict[AssetWithOracles, Price]:
+        """Returns the simple prices of from_assets to to_asset in coingecko.
+
+        Queries the simple/price endpoint with many comma separated ids at once. Assets
+        not supported by coingecko or with no price returned are omitted.
+
+        May raise:
+        - RemoteError if there is a problem querying coingecko
+        """
+        vs_currency = to_asset.identifier.lower()
+        if vs_currency not in COINGECKO_SIMPLE_VS_CURRENCIES:
+            log.warning(
+                f'Tried to query coingecko simple prices to {to_asset.identifier}. '
+                f'But to_asset is not supported',
+            )
+            return {}
+
+        id_to_assets: defaultdict[str, list[AssetWithOracles]] = defaultdict(list)
+        for from_asset in from_assets:
+            try:
+                id_to_assets[from_asset.to_coingecko()].append(from_asset)
+            except UnsupportedAsset:
+                continue
+
+        prices: dict[AssetWithOracles, Price] = {}
+        for chunk in get_chunks(list(id_to_assets), n=SIMPLE_PRICE_IDS_CHUNK_SIZE):
+            result = self._query(
+                module='simple/price',
+                options={
+                    'ids': ','.join(chunk),
+                    'vs_currencies': vs_currency,
+                })
+            for coingecko_id in chunk:
+                try:
+                    price = Price(FVal(result[coingecko_id][vs_currency]))
+                except (KeyError, ValueError):
+                    log.debug(f'Coingecko returned no {vs_currency} simple price for {coingecko_id}')  # noqa: E501
+                    continue
+
+                for asset in id_to_assets[coingecko_id]:
+                    prices[asset] = price
+
+        return prices
+
     def can_query_history(
             self,
             from_asset: Asset,  # pylint: disable=unused-argument
@@ -723,6 +789,75 @@ class Coingecko(HistoricalPriceOracleInterface, PenalizablePriceOracleMixin):
 
         return ts_now() - self.last_rate_limit <= seconds
 
+    def query_historical_price_range(
+            self,
+            from_asset: AssetWithOracles,
+            to_asset: AssetWithOracles,
+            from_timestamp: Timestamp,
+            to_timestamp: Timestamp,
+    ) -> list[tuple[Timestamp, Price]]:
+        """Queries the prices between the given timestamps with a single market_chart/range
+        query. For ranges of up to 90 days coingecko returns hourly prices. A single
+        timestamp is widened by an hour on each side since coingecko returns no prices
+        for an empty range.
+
+        May raise:
+        - PriceQueryUnsupportedAsset if either from_asset or to_asset are not supported
+        - RemoteError if there is a problem querying coingecko
+        """
+        vs_currency = Coingecko.check_vs_currencies(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            location='historical price range',
+        )
+        if not vs_currency:
+            raise PriceQueryUnsupportedAsset(to_asset.identifier)
+
+        try:
+            from_coingecko_id = from_asset.to_coingecko()
+        except UnsupportedAsset as e:
+            raise PriceQueryUnsupportedAsset(from_asset.identifier) from e
+
+        if from_timestamp == to_timestamp:
+            from_timestamp = Timestamp(from_timestamp - HOUR_IN_SECONDS)
+            to_timestamp = Timestamp(to_timestamp + HOUR_IN_SECONDS)
+
+        result = self._query(
+            module='coins',
+            subpath=f'{from_coingecko_id}/market_chart/range',
+            options={
+                'vs_currency': vs_currency,
+                'from': str(from_timestamp),
+                'to': str(to_timestamp),
+            },
+        )
+        prices = []
+        try:
+            for timestamp_ms, price in result['prices']:
+                if (price := Price(FVal(price))) != ZERO_PRICE:
+                    prices.append((Timestamp(int(timestamp_ms) // 1000), price))
+        except (KeyError, TypeError, ValueError) as e:
+            raise RemoteError(
+                f'Unexpected coingecko market_chart/range response {result}: {e!s}',
+            ) from e
+
+        return prices
+
+    def query_cached_historical_price(
+            self,
+            from_asset: Asset,
+            to_asset: Asset,
+            timestamp: Timestamp,
+    ) -> HistoricalPrice | None:
+        return GlobalDBHandler().get_historical_price(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            timestamp=timestamp,
+            max_seconds_distance=DAY_IN_SECONDS,
+            source=HistoricalPriceOracle.COINGECKO,
+            interpolation_max_gap=CachedSettings().historical_price_interpolation_max_gap,
+        )
+
     def query_historical_price(
             self,
             from_asset: Asset,
@@ -764,14 +899,12 @@ class Coingecko(HistoricalPriceOracleInterface, PenalizablePriceOracleMixin):
             ) from e
 
         # check DB cache
-        price_cache_entry = GlobalDBHandler().get_historical_price(
+        price_cache_entry = self.query_cached_historical_price(
             from_asset=from_asset,
             to_asset=to_asset,
             timestamp=timestamp,
-            max_seconds_distance=DAY_IN_SECONDS,
-            source=HistoricalPriceOracle.COINGECKO,
         )
-        if price_cache_entry:
+        if price_cache_entry is not None:
             return price_cache_entry.price
 
         # no cache, query coingecko for daily price
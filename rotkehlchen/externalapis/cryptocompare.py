@@ -1,13 +1,16 @@
 import logging
 import os
-from collections import deque
+from collections import defaultdict, deque
+from collections.abc import Callable, Iterator, Sequence
 from json.decoder import JSONDecodeError
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Literal, Optional
 
 import gevent
 import requests
+from gevent.pool import Pool
 
+from rotkehlchen.api.websockets.typedefs import WSMessageType
 from rotkehlchen.assets.asset import Asset, AssetWithOracles
 from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import (
@@ -46,18 +49,28 @@ from rotkehlchen.errors.price import NoPriceForGivenTimestamp, PriceQueryUnsuppo
 from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.externalapis.interface import ExternalServiceWithApiKey
 from rotkehlchen.fval import FVal
+from rotkehlchen.globaldb.cache import (
+    globaldb_get_unique_cache_value,
+    globaldb_set_unique_cache_value,
+)
 from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.history.deserialization import deserialize_price
 from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
-from rotkehlchen.interfaces import HistoricalPriceOracleInterface
+from rotkehlchen.interfaces import (
+    HistoricalPriceOracleInterface,
+    HistoricalPriceRangeOracleInterface,
+    MultipleCurrentPricesOracleInterface,
+)
 from rotkehlchen.logging import RotkehlchenLogsAdapter
-from rotkehlchen.types import ExternalService, Price, Timestamp
-from rotkehlchen.utils.misc import pairwise, set_user_agent, ts_now
+from rotkehlchen.types import CacheType, ExternalService, Price, Timestamp, UniqueCacheType
+from rotkehlchen.utils.misc import pairwise, ts_now
 from rotkehlchen.utils.mixins.penalizable_oracle import PenalizablePriceOracleMixin
+from rotkehlchen.utils.network import create_session
 from rotkehlchen.utils.serialization import jsonloads_dict, rlk_jsondumps
 
 if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
+    from rotkehlchen.user_messages import MessagesAggregator
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -66,6 +79,7 @@ log = RotkehlchenLogsAdapter(logger)
 RATE_LIMIT_MSG = 'You are over your rate limit please upgrade your account!'
 CRYPTOCOMPARE_QUERY_RETRY_TIMES = 3
 CRYPTOCOMPARE_RATE_LIMIT_WAIT_TIME = 60
+CRYPTOCOMPARE_CACHE_WARMUP_CONCURRENCY = 4
 CRYPTOCOMPARE_SPECIAL_CASES_MAPPING = {
     'ADADOWN': A_USDT,
     'ADAUP': A_USDT,
@@ -160,6 +174,8 @@ CRYPTOCOMPARE_SPECIAL_CASES_MAPPING = {
 }
 CRYPTOCOMPARE_SPECIAL_CASES = CRYPTOCOMPARE_SPECIAL_CASES_MAPPING.keys()
 CRYPTOCOMPARE_HOURQUERYLIMIT = 2000
+# Maximum length of the comma separated fsyms argument of the pricemulti endpoint
+CRYPTOCOMPARE_PRICEMULTI_FSYMS_MAX_LENGTH = 300
 
 
 def _multiply_str_nums(a: str, b: str) -> str:
@@ -190,7 +206,39 @@ def _check_hourly_data_sanity(
         index += 2
 
 
-class Cryptocompare(ExternalServiceWithApiKey, HistoricalPriceOracleInterface, PenalizablePriceOracleMixin):  # noqa: E501
+def _deserialize_histohour_prices(data: list[dict[str, Any]]) -> list[tuple[Timestamp, Price]]:
+    """Turns histohour entries into (timestamp, price) tuples skipping zero prices.
+    The price of each hour is the average of its high and low."""
+    prices = []
+    for entry in data:
+        try:
+            price = Price((deserialize_price(entry['high']) + deserialize_price(entry['low'])) / 2)
+            if price == ZERO_PRICE:
+                continue  # don't write zero prices
+            prices.append((Timestamp(entry['time']), price))
+        except (DeserializationError, KeyError) as e:
+            msg = str(e)
+            if isinstance(e, KeyError):
+                msg = f'Missing key entry for {msg}.'
+            log.error(
+                f'{msg}. Error getting price entry from cryptocompare histohour '
+                f'price results. Skipping entry.',
+            )
+            continue
+
+    return prices
+
+
+class Cryptocompare(
+        ExternalServiceWithApiKey,
+        HistoricalPriceOracleInterface,
+        HistoricalPriceRangeOracleInterface,
+        MultipleCurrentPricesOracleInterface,
+        PenalizablePriceOracleMixin,
+):
+    # a single histohour query returns at most CRYPTOCOMPARE_HOURQUERYLIMIT + 1 hours
+    max_price_range_seconds = CRYPTOCOMPARE_HOURQUERYLIMIT * 3600
+
     def __init__(self, data_directory: Path, database: Optional['DBHandler']) -> None:
         HistoricalPriceOracleInterface.__init__(self, oracle_name='cryptocompare')
         ExternalServiceWithApiKey.__init__(
@@ -200,10 +248,10 @@ class Cryptocompare(ExternalServiceWithApiKey, HistoricalPriceOracleInterface, P
         )
         PenalizablePriceOracleMixin.__init__(self)
         self.data_directory = data_directory
-        self.session = requests.session()
-        set_user_agent(self.session)
+        self.session = create_session()
         self.last_histohour_query_ts = 0
         self.last_rate_limit = 0
+        self.cache_warmup_concurrency = CRYPTOCOMPARE_CACHE_WARMUP_CONCURRENCY
 
     def can_query_history(
             self,
@@ -485,6 +533,75 @@ class Cryptocompare(ExternalServiceWithApiKey, HistoricalPriceOracleInterface, P
 
         return Price(FVal(result[cc_to_asset_symbol])), False
 
+    def query_multiple_current_prices(
+            self,
+            from_assets: Sequence[AssetWithOracles],
+            to_asset: AssetWithOracles,
+    ) -> dict[AssetWithOracles, Price]:
+        """Returns the current prices of from_assets to to_asset in cryptocompare.
+
+        Queries the pricemulti endpoint with as many symbols as fit in one request.
+        Special case assets that need an intermediate asset are queried one by one.
+        Assets not supported by cryptocompare or with no price returned are omitted.
+
+        - May raise RemoteError if there is a problem reaching the cryptocompare server
+        or with reading the response returned by the server
+        """
+        prices: dict[AssetWithOracles, Price] = {}
+        try:
+            cc_to_asset_symbol = to_asset.to_cryptocompare()
+        except UnsupportedAsset:
+            return prices
+
+        special_assets = []
+        symbol_to_assets: defaultdict[str, list[AssetWithOracles]] = defaultdict(list)
+        for from_asset in from_assets:
+            if from_asset.identifier in CRYPTOCOMPARE_SPECIAL_CASES or to_asset.identifier in CRYPTOCOMPARE_SPECIAL_CASES:  # noqa: E501
+                special_assets.append(from_asset)
+                continue
+
+            try:
+                symbol_to_assets[from_asset.to_cryptocompare()].append(from_asset)
+            except UnsupportedAsset:
+                continue
+
+        chunks: list[list[str]] = []
+        chunk_length = CRYPTOCOMPARE_PRICEMULTI_FSYMS_MAX_LENGTH
+        for symbol in symbol_to_assets:
+            if chunk_length + len(symbol) + 1 > CRYPTOCOMPARE_PRICEMULTI_FSYMS_MAX_LENGTH:
+                chunks.append([])
+                chunk_length = 0
+            chunks[-1].append(symbol)
+            chunk_length += len(symbol) + 1
+
+        for chunk in chunks:
+            result = self._api_query(
+                path=f'pricemulti?fsyms={",".join(chunk)}&tsyms={cc_to_asset_symbol}',
+            )
+            for symbol in chunk:
+                try:
+                    price = Price(FVal(result[symbol][cc_to_asset_symbol]))
+                except (KeyError, TypeError, ValueError):
+                    continue
+
+                for asset in symbol_to_assets[symbol]:
+                    prices[asset] = price
+
+        for from_asset in special_assets:
+            try:
+                prices[from_asset], _ = self.query_current_price(
+                    from_asset=from_asset,
+                    to_asset=to_asset,
+                    match_main_currency=False,
+                )
+            except (PriceQueryUnsupportedAsset, RemoteError) as e:
+                log.warning(
+                    f'Could not query cryptocompare current price from '
+                    f'{from_asset.identifier} to {to_asset.identifier} due to {e!s}',
+                )
+
+        return prices
+
     def query_endpoint_pricehistorical(
             self,
             from_asset: AssetWithOracles,
@@ -539,27 +656,28 @@ class Cryptocompare(ExternalServiceWithApiKey, HistoricalPriceOracleInterface, P
 
         return Price(FVal(result[cc_from_asset_symbol][cc_to_asset_symbol]))
 
-    def _get_histohour_data_for_range(
+    def _iterate_histohour_pages(
             self,
             from_asset: AssetWithOracles,
             to_asset: AssetWithOracles,
             from_timestamp: Timestamp,
             to_timestamp: Timestamp,
-    ) -> deque[dict[str, Any]]:
+    ) -> Iterator[list[dict[str, Any]]]:
         """Query histohour data from cryptocompare for a time range going backwards in time
 
         Will stop when to_timestamp is reached OR when no more prices are returned
 
-        Returns a list of histohour entries with increasing timestamp. Starting from
-        to_timestamp (or higher) if no data and ending in from_timestamp or lower, if no data
+        Yields each queried page as soon as it's received. Each page is a list of histohour
+        entries with increasing timestamp and each page is older than the previous one.
+        Entries are after to_timestamp and no entry is included in more than one page.
 
         May raise:
         - RemoteError if there is problems with the query
         """
-        msg = '_get_histohour_data_for_range from_timestamp should be bigger than to_timestamp'
+        msg = '_iterate_histohour_pages from_timestamp should be bigger than to_timestamp'
         assert from_timestamp >= to_timestamp, msg
 
-        calculated_history: deque[dict[str, Any]] = deque()
+        oldest_time: int | None = None
         end_date = from_timestamp
         while True:
             log.debug(
@@ -580,6 +698,7 @@ class Cryptocompare(ExternalServiceWithApiKey, HistoricalPriceOracleInterface, P
                 break
 
             end_date = Timestamp(end_date - (CRYPTOCOMPARE_HOURQUERYLIMIT * 3600))
+            data = resp['Data']
             if end_date != resp['TimeFrom']:
                 # If we get more than we needed, since we are close to the now_ts
                 # then skip all the already included entries
@@ -587,38 +706,84 @@ class Cryptocompare(ExternalServiceWithApiKey, HistoricalPriceOracleInterface, P
                 # If the start date has less than 3600 secs difference from previous
                 # end date then do nothing. If it has more skip all already included entries
                 if diff >= 3600:
-                    if resp['Data'][diff // 3600]['time'] != end_date:
+                    if data[diff // 3600]['time'] != end_date:
                         raise RemoteError(
                             'Unexpected data format in cryptocompare query_endpoint_histohour. '
                             'Expected to find the previous date timestamp during '
                             'cryptocompare historical data fetching',
                         )
                     # just add only the part from the previous timestamp and on
-                    resp['Data'] = resp['Data'][diff // 3600:]
+                    data = data[diff // 3600:]
 
             # If last time slot and first new are the same, skip the first new slot
-            last_entry_equal_to_first = (
-                len(calculated_history) != 0 and
-                calculated_history[0]['time'] == resp['Data'][-1]['time']
-            )
-            if last_entry_equal_to_first:
-                resp['Data'] = resp['Data'][:-1]
-            if len(calculated_history) != 0:
-                calculated_history.extendleft(reversed(resp['Data']))
-            else:
-                calculated_history = deque(resp['Data'])
-
-            if end_date - to_timestamp <= 3600:
-                # Ending the loop query. Also pop any extra timestamps
-                while (
-                        len(calculated_history) != 0 and
-                        calculated_history[0]['time'] <= to_timestamp
-                ):
-                    calculated_history.popleft()
+            if oldest_time is not None and len(data) != 0 and data[-1]['time'] == oldest_time:
+                data = data[:-1]
+
+            last_page = end_date - to_timestamp <= 3600
+            if last_page:  # pop any extra timestamps
+                data = [x for x in data if x['time'] > to_timestamp]
+
+            if len(data) != 0:
+                oldest_time = data[0]['time']
+                yield data
+
+            if last_page:
                 break
 
+    def _get_histohour_data_for_range(
+            self,
+            from_asset: AssetWithOracles,
+            to_asset: AssetWithOracles,
+            from_timestamp: Timestamp,
+            to_timestamp: Timestamp,
+    ) -> deque[dict[str, Any]]:
+        """Query histohour data from cryptocompare for a time range going backwards in time
+
+        Returns a list of histohour entries with increasing timestamp. Starting from
+        to_timestamp (or higher) if no data and ending in from_timestamp or lower, if no data
+
+        May raise:
+        - RemoteError if there is problems with the query
+        """
+        calculated_history: deque[dict[str, Any]] = deque()
+        for page in self._iterate_histohour_pages(
+                from_asset=from_asset,
+                to_asset=to_asset,
+                from_timestamp=from_timestamp,
+                to_timestamp=to_timestamp,
+        ):
+            calculated_history.extendleft(reversed(page))
+
         return calculated_history
 
+    def _store_histohour_data(
+            self,
+            from_asset: AssetWithOracles,
+            to_asset: AssetWithOracles,
+            data: list[dict[str, Any]],
+    ) -> Timestamp | None:
+        """Checks the given histohour entries and stores their prices in the global DB.
+        Returns the timestamp of the oldest price stored, if any.
+
+        May raise:
+        - RemoteError if the entries are not one hour apart
+        """
+        if len(data) == 0:
+            return None
+
+        # Let's always check for data sanity for the hourly prices.
+        _check_hourly_data_sanity(data, from_asset, to_asset)
+        # Turn them into the format we will enter in the DB
+        prices = [HistoricalPrice(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            source=HistoricalPriceOracle.CRYPTOCOMPARE,
+            timestamp=timestamp,
+            price=price,
+        ) for timestamp, price in _deserialize_histohour_prices(data)]
+        GlobalDBHandler().add_historical_prices(prices)
+        return prices[0].timestamp if len(prices) != 0 else None
+
     def create_cache(
             self,
             from_asset: AssetWithOracles,
@@ -634,33 +799,13 @@ class Cryptocompare(ExternalServiceWithApiKey, HistoricalPriceOracleInterface, P
             - RemoteError if there is a problem reaching cryptocompare
             - UnsupportedAsset if any of the two assets is not supported by cryptocompare
         """
-        now = ts_now()
-
-        # If we got cached data for up to 1 hour ago there is no point doing anything
-        data_range = GlobalDBHandler().get_historical_price_range(
-            from_asset=from_asset,
-            to_asset=to_asset,
-            source=HistoricalPriceOracle.CRYPTOCOMPARE,
-        )
-        if data_range and now - data_range[1] < 3600 and not purge_old:
-            log.debug(
-                'Did not create new cache since we got cache until 1 hour ago',
-                from_asset=from_asset,
-                to_asset=to_asset,
-            )
-            return
-
         if purge_old:
             GlobalDBHandler().delete_historical_prices(
                 from_asset=from_asset,
                 to_asset=to_asset,
                 source=HistoricalPriceOracle.CRYPTOCOMPARE,
             )
-        self.query_and_store_historical_data(
-            from_asset=from_asset,
-            to_asset=to_asset,
-            timestamp=now,
-        )
+        self.warm_up_pair_cache(from_asset=from_asset, to_asset=to_asset)
 
     def query_and_store_historical_data(
             self,
@@ -718,39 +863,203 @@ class Cryptocompare(ExternalServiceWithApiKey, HistoricalPriceOracleInterface, P
                 to_timestamp=Timestamp(0),
             )
 
-        calculated_history = list(new_data)
+        self._store_histohour_data(from_asset=from_asset, to_asset=to_asset, data=list(new_data))
+        self.last_histohour_query_ts = ts_now()  # also save when last query finished
+
+    def warm_up_pair_cache(
+            self,
+            from_asset: AssetWithOracles,
+            to_asset: AssetWithOracles,
+            progress_callback: Callable[[Timestamp], None] | None = None,
+    ) -> None:
+        """Caches all the hourly prices of the given pair from the start of its history
+        until now.
+
+        The prices missing since the last cached price are queried and stored first. Then
+        the older history is queried backwards from the oldest cached price and each page
+        is stored as soon as it's received, so an interrupted warm-up resumes from where it
+        stopped. When the start of the history is reached it's recorded in the global DB
+        cache so that it's not queried again. progress_callback is called with the oldest
+        stored timestamp after each page.
+
+        May raise:
+        - RemoteError if there is a problem reaching the cryptocompare server
+        - PriceQueryUnsupportedAsset if from/to assets are not known to cryptocompare
+        """
+        now_ts = ts_now()
+        self.last_histohour_query_ts = now_ts
+        history_start_key: tuple[UniqueCacheType, str, str] = (
+            CacheType.CRYPTOCOMPARE_HISTORY_START,
+            from_asset.identifier,
+            to_asset.identifier,
+        )
+        range_result = GlobalDBHandler().get_historical_price_range(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            source=HistoricalPriceOracle.CRYPTOCOMPARE,
+        )
+        if range_result is not None and now_ts - range_result[1] >= 3600:
+            # newer prices are stored together so that there is never a gap in the cache
+            self._store_histohour_data(
+                from_asset=from_asset,
+                to_asset=to_asset,
+                data=list(self._get_histohour_data_for_range(
+                    from_asset=from_asset,
+                    to_asset=to_asset,
+                    from_timestamp=now_ts,
+                    to_timestamp=range_result[1],
+                )),
+            )
 
-        if len(calculated_history) == 0:
+        with GlobalDBHandler().conn.read_ctx() as cursor:
+            history_start = globaldb_get_unique_cache_value(cursor, history_start_key)
+        if history_start == ('' if range_result is None else str(range_result[0])):
+            log.debug(f'Cryptocompare history of {from_asset} -> {to_asset} is already cached')
             return
 
-        # Let's always check for data sanity for the hourly prices.
-        _check_hourly_data_sanity(calculated_history, from_asset, to_asset)
-        # Turn them into the format we will enter in the DB
-        prices = []
-        for entry in calculated_history:
+        for page in self._iterate_histohour_pages(
+                from_asset=from_asset,
+                to_asset=to_asset,
+                from_timestamp=now_ts if range_result is None else range_result[0],
+                to_timestamp=Timestamp(0),
+        ):
+            oldest_stored_ts = self._store_histohour_data(
+                from_asset=from_asset,
+                to_asset=to_asset,
+                data=page,
+            )
+            if progress_callback is not None and oldest_stored_ts is not None:
+                progress_callback(oldest_stored_ts)
+
+        range_result = GlobalDBHandler().get_historical_price_range(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            source=HistoricalPriceOracle.CRYPTOCOMPARE,
+        )
+        with GlobalDBHandler().conn.write_ctx() as write_cursor:
+            globaldb_set_unique_cache_value(
+                write_cursor=write_cursor,
+                key_parts=history_start_key,
+                value='' if range_result is None else str(range_result[0]),
+            )
+        self.last_histohour_query_ts = ts_now()
+
+    def warm_up_cache(
+            self,
+            pairs: Sequence[tuple[AssetWithOracles, AssetWithOracles]],
+            msg_aggregator: 'MessagesAggregator',
+    ) -> None:
+        """Caches the hourly price history of all the given pairs.
+
+        Up to cache_warmup_concurrency pairs are queried at the same time and their
+        requests share the cryptocompare rate limit. The progress of each pair is sent
+        to the frontend via websockets. Pairs that fail are logged and skipped.
+        """
+        processed_pairs = 0
+
+        def notify(
+                from_asset: AssetWithOracles,
+                to_asset: AssetWithOracles,
+                status: Literal['in_progress', 'completed', 'failed'],
+                oldest_timestamp: Timestamp | None,
+        ) -> None:
+            msg_aggregator.add_message(
+                message_type=WSMessageType.HISTORICAL_PRICE_CACHE_STATUS,
+                data={
+                    'oracle': str(HistoricalPriceOracle.CRYPTOCOMPARE),
+                    'total_pairs': len(pairs),
+                    'processed_pairs': processed_pairs,
+                    'from_asset': from_asset.identifier,
+                    'to_asset': to_asset.identifier,
+                    'status': status,
+                    'oldest_timestamp': oldest_timestamp,
+                },
+            )
+
+        def warm_up_pair(from_asset: AssetWithOracles, to_asset: AssetWithOracles) -> None:
+            nonlocal processed_pairs
+            status: Literal['completed', 'failed'] = 'completed'
             try:
-                price = Price((deserialize_price(entry['high']) + deserialize_price(entry['low'])) / 2)  # noqa: E501
-                if price == ZERO_PRICE:
-                    continue  # don't write zero prices
-                prices.append(HistoricalPrice(
+                self.warm_up_pair_cache(
                     from_asset=from_asset,
                     to_asset=to_asset,
-                    source=HistoricalPriceOracle.CRYPTOCOMPARE,
-                    timestamp=Timestamp(entry['time']),
-                    price=price,
-                ))
-            except (DeserializationError, KeyError) as e:
-                msg = str(e)
-                if isinstance(e, KeyError):
-                    msg = f'Missing key entry for {msg}.'
-                log.error(
-                    f'{msg}. Error getting price entry from cryptocompare histohour '
-                    f'price results. Skipping entry.',
+                    progress_callback=lambda timestamp: notify(
+                        from_asset=from_asset,
+                        to_asset=to_asset,
+                        status='in_progress',
+                        oldest_timestamp=timestamp,
+                    ),
                 )
-                continue
+            except (RemoteError, PriceQueryUnsupportedAsset) as e:
+                log.warning(
+                    f'Failed to warm up the cryptocompare cache of '
+                    f'{from_asset} -> {to_asset} due to {e!s}',
+                )
+                status = 'failed'
 
-        GlobalDBHandler().add_historical_prices(prices)
-        self.last_histohour_query_ts = ts_now()  # also save when last query finished
+            processed_pairs += 1
+            data_range = GlobalDBHandler().get_historical_price_range(
+                from_asset=from_asset,
+                to_asset=to_asset,
+                source=HistoricalPriceOracle.CRYPTOCOMPARE,
+            )
+            notify(
+                from_asset=from_asset,
+                to_asset=to_asset,
+                status=status,
+                oldest_timestamp=None if data_range is None else data_range[0],
+            )
+
+        log.debug(f'Warming up the cryptocompare cache of {len(pairs)} pairs')
+        pool = Pool(size=self.cache_warmup_concurrency)
+        for from_asset, to_asset in pairs:
+            pool.spawn(warm_up_pair, from_asset, to_asset)
+        pool.join()
+
+    def query_historical_price_range(
+            self,
+            from_asset: AssetWithOracles,
+            to_asset: AssetWithOracles,
+            from_timestamp: Timestamp,
+            to_timestamp: Timestamp,
+    ) -> list[tuple[Timestamp, Price]]:
+        """Queries the hourly prices between the given timestamps with a single
+        histohour query
+
+        May raise:
+        - PriceQueryUnsupportedAsset if from/to assets are not known to cryptocompare
+        - RemoteError if there is a problem reaching the cryptocompare server
+        """
+        resp = self.query_endpoint_histohour(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            limit=min((to_timestamp - from_timestamp) // 3600 + 1, CRYPTOCOMPARE_HOURQUERYLIMIT),
+            to_timestamp=to_timestamp,
+        )
+        try:
+            data = resp['Data']
+        except KeyError as e:
+            raise RemoteError(f'Missing key {e!s} in cryptocompare histohour response') from e
+
+        return _deserialize_histohour_prices(data)
+
+    def query_cached_historical_price(
+            self,
+            from_asset: Asset,
+            to_asset: Asset,
+            timestamp: Timestamp,
+    ) -> HistoricalPrice | None:
+        price_cache_entry = GlobalDBHandler().get_historical_price(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            timestamp=timestamp,
+            max_seconds_distance=3600,
+            source=HistoricalPriceOracle.CRYPTOCOMPARE,
+            interpolation_max_gap=CachedSettings().historical_price_interpolation_max_gap,
+        )
+        if price_cache_entry is None or price_cache_entry.price == ZERO_PRICE:
+            return None
+        return price_cache_entry
 
     def query_historical_price(
             self,
@@ -780,14 +1089,12 @@ class Cryptocompare(ExternalServiceWithApiKey, HistoricalPriceOracleInterface, P
         except (UnknownAsset, WrongAssetType) as e:
             raise PriceQueryUnsupportedAsset(e.identifier) from e
         # check DB cache
-        price_cache_entry = GlobalDBHandler().get_historical_price(
+        price_cache_entry = self.query_cached_historical_price(
             from_asset=from_asset,
             to_asset=to_asset,
             timestamp=timestamp,
-            max_seconds_distance=3600,
-            source=HistoricalPriceOracle.CRYPTOCOMPARE,
         )
-        if price_cache_entry and price_cache_entry.price != ZERO_PRICE:
+        if price_cache_entry is not None:
             log.debug('Got historical price from cryptocompare', from_asset=from_asset, to_asset=to_asset, timestamp=timestamp, price=price_cache_entry.price)  # noqa: E501
             return price_cache_entry.price
 
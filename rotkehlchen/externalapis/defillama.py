@@ -1,5 +1,7 @@
 import json
 import logging
+from collections import defaultdict
+from collections.abc import Sequence
 from http import HTTPStatus
 from typing import Any
 from urllib.parse import urlencode
@@ -22,23 +24,33 @@ from rotkehlchen.history.deserialization import deserialize_price
 from rotkehlchen.history.price import PriceHistorian
 from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
 from rotkehlchen.inquirer import Inquirer
-from rotkehlchen.interfaces import HistoricalPriceOracleInterface
+from rotkehlchen.interfaces import (
+    HistoricalPriceOracleInterface,
+    MultipleCurrentPricesOracleInterface,
+)
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import ChainID, Price, Timestamp
-from rotkehlchen.utils.misc import create_timestamp, timestamp_to_date, ts_now
+from rotkehlchen.utils.misc import create_timestamp, get_chunks, timestamp_to_date, ts_now
 from rotkehlchen.utils.mixins.penalizable_oracle import PenalizablePriceOracleMixin
+from rotkehlchen.utils.network import create_session
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 MIN_DEFILLAMA_CONFIDENCE = FVal('0.20')
+# Number of coins queried per current prices request to keep the url length sane
+CURRENT_PRICES_COINS_CHUNK_SIZE = 100
 
 
-class Defillama(HistoricalPriceOracleInterface, PenalizablePriceOracleMixin):
+class Defillama(
+        HistoricalPriceOracleInterface,
+        MultipleCurrentPricesOracleInterface,
+        PenalizablePriceOracleMixin,
+):
 
     def __init__(self) -> None:
         HistoricalPriceOracleInterface.__init__(self, oracle_name='defillama')
         PenalizablePriceOracleMixin.__init__(self)
-        self.session = requests.session()
+        self.session = create_session()
         self.session.headers.update({'User-Agent': 'rotkehlchen'})
         self.all_coins_cache: dict[str, dict[str, Any]] | None = None
         self.last_rate_limit = 0
@@ -196,6 +208,52 @@ class Defillama(HistoricalPriceOracleInterface, PenalizablePriceOracleMixin):
         rate_price = Inquirer.find_price(from_asset=A_USD, to_asset=to_asset)
         return Price(usd_price * rate_price), False
 
+    def query_multiple_current_prices(
+            self,
+            from_assets: Sequence[AssetWithOracles],
+            to_asset: AssetWithOracles,
+    ) -> dict[AssetWithOracles, Price]:
+        """Returns the current prices of from_assets to to_asset in Defillama.
+
+        Queries the current prices endpoint with many comma separated coins at once.
+        Assets not supported by defillama or with no price returned are omitted.
+
+        May raise:
+        - RemoteError if there is a problem querying defillama
+        """
+        coin_to_assets: defaultdict[str, list[AssetWithOracles]] = defaultdict(list)
+        for from_asset in from_assets:
+            try:
+                coin_to_assets[self._get_asset_id(from_asset)].append(from_asset)
+            except UnsupportedAsset:
+                continue
+
+        rate_price = None
+        prices: dict[AssetWithOracles, Price] = {}
+        for chunk in get_chunks(list(coin_to_assets), n=CURRENT_PRICES_COINS_CHUNK_SIZE):
+            result = self._query(
+                module='prices',
+                subpath=f'current/{",".join(chunk)}',
+            )
+            for coin_id in chunk:
+                if coin_id not in result.get('coins', {}):
+                    continue
+
+                coin_assets = coin_to_assets[coin_id]
+                usd_price = self._deserialize_price(result, coin_id, coin_assets[0], to_asset)
+                if usd_price == ZERO:
+                    continue
+
+                if to_asset != A_USD:
+                    if rate_price is None:
+                        rate_price = Inquirer.find_price(from_asset=A_USD, to_asset=to_asset)
+                    usd_price = Price(usd_price * rate_price)
+
+                for asset in coin_assets:
+                    prices[asset] = usd_price
+
+        return prices
+
     def can_query_history(
             self,
             from_asset: Asset,  # pylint: disable=unused-argument
@@ -214,6 +272,21 @@ class Defillama(HistoricalPriceOracleInterface, PenalizablePriceOracleMixin):
 
         return ts_now() - self.last_rate_limit <= seconds
 
+    def query_cached_historical_price(
+            self,
+            from_asset: Asset,
+            to_asset: Asset,
+            timestamp: Timestamp,
+    ) -> HistoricalPrice | None:
+        return GlobalDBHandler().get_historical_price(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            timestamp=timestamp,
+            max_seconds_distance=DAY_IN_SECONDS,
+            source=HistoricalPriceOracle.DEFILLAMA,
+            interpolation_max_gap=CachedSettings().historical_price_interpolation_max_gap,
+        )
+
     def query_historical_price(
             self,
             from_asset: Asset,
@@ -232,14 +305,12 @@ class Defillama(HistoricalPriceOracleInterface, PenalizablePriceOracleMixin):
             raise PriceQueryUnsupportedAsset(e.identifier) from e
 
         # check DB cache
-        price_cache_entry = GlobalDBHandler().get_historical_price(
+        price_cache_entry = self.query_cached_historical_price(
             from_asset=from_asset,
             to_asset=to_asset,
             timestamp=timestamp,
-            max_seconds_distance=DAY_IN_SECONDS,
-            source=HistoricalPriceOracle.DEFILLAMA,
         )
-        if price_cache_entry:
+        if price_cache_entry is not None:
             return price_cache_entry.price
 
         try:
@@ -14,6 +14,7 @@ from rotkehlchen.api.websockets.typedefs import WSMessageType
 from rotkehlchen.chain.evm.constants import GENESIS_HASH, ZERO_ADDRESS
 from rotkehlchen.chain.structures import TimestampOrBlockRange
 from rotkehlchen.db.constants import HISTORY_MAPPING_STATE_DECODED
+from rotkehlchen.db.evmblocks import DBEvmBlocks
 from rotkehlchen.db.evmtx import DBEvmTx
 from rotkehlchen.db.history_events import DBHistoryEvents
 from rotkehlchen.db.settings import CachedSettings
@@ -38,7 +39,8 @@ from rotkehlchen.types import (
     deserialize_evm_tx_hash,
 )
 from rotkehlchen.utils.data_structures import LRUCacheWithRemove
-from rotkehlchen.utils.misc import hex_or_bytes_to_int, set_user_agent
+from rotkehlchen.utils.misc import hex_or_bytes_to_int
+from rotkehlchen.utils.network import create_session
 from rotkehlchen.utils.serialization import jsonloads_dict
 
 if TYPE_CHECKING:
@@ -102,9 +104,8 @@ class Etherscan(ExternalServiceWithApiKey, metaclass=ABCMeta):
             SupportedBlockchain.GNOSIS,
         ) else 'api-'
         self.base_url = base_url
-        self.session = requests.session()
+        self.session = create_session()
         self.warning_given = False
-        set_user_agent(self.session)
         self.timestamp_to_block_cache: LRUCacheWithRemove[Timestamp, int] = LRUCacheWithRemove(maxsize=32)  # noqa: E501
         # set per-chain earliest timestamps that can be turned to blocks. Never returns block 0
         if service == ExternalService.ETHERSCAN:
@@ -678,6 +679,13 @@ class Etherscan(ExternalServiceWithApiKey, metaclass=ABCMeta):
         if (block_number := self.timestamp_to_block_cache.get(ts)) is not None:
             return block_number
 
+        if (block_number := DBEvmBlocks(self.db).get_blocknumber_by_time(
+            chain_id=self.chain.to_chain_id(),
+            ts=ts,
+            closest=closest,
+        )) is not None:
+            return block_number
+
         options = {'timestamp': ts, 'closest': closest}
         result = self._query(
             module='block',
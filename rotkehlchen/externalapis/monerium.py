@@ -13,7 +13,8 @@ from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.history.events.structures.types import HistoryEventSubType, HistoryEventType
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import Location, deserialize_evm_tx_hash
-from rotkehlchen.utils.misc import set_user_agent, ts_now
+from rotkehlchen.utils.misc import ts_now
+from rotkehlchen.utils.network import create_session
 from rotkehlchen.utils.serialization import jsonloads_list
 
 if TYPE_CHECKING:
@@ -32,10 +33,9 @@ class Monerium:
 
     def __init__(self, database: 'DBHandler', user: str, password: str) -> None:
         self.database = database
-        self.session = requests.session()
+        self.session = create_session()
         self.user = user
         self.password = password
-        set_user_agent(self.session)
 
     def _query(
             self,
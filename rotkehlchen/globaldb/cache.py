@@ -1,5 +1,6 @@
 """Functions dealing with the general_cache table of the Global DB"""
-from collections.abc import Iterable
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
 
 from rotkehlchen.chain.evm.constants import ZERO_ADDRESS
 from rotkehlchen.chain.evm.types import string_to_evm_address
@@ -138,6 +139,39 @@ def globaldb_get_unique_cache_value(
     return result[0]
 
 
+def globaldb_get_unique_cache_entries_like(
+        cursor: DBCursor,
+        key_parts: Iterable[str | UniqueCacheType],
+        since_ts: Timestamp,
+        limit: int,
+) -> list[tuple[str, str, Timestamp]]:
+    """
+    Function that reads from the unique cache table.
+    Returns the key, value and last queried ts of the entries whose key starts with the
+    provided `key_parts` and that were last queried from `since_ts` onwards. At most
+    `limit` entries are returned, the most recently queried first.
+
+    key_parts should contain neither the "%" nor the "." symbol.
+    """
+    cursor.execute(
+        'SELECT key, value, last_queried_ts FROM unique_cache WHERE key LIKE ? AND '
+        'last_queried_ts >= ? ORDER BY last_queried_ts DESC LIMIT ?',
+        (f'{compute_cache_key(key_parts)}%', since_ts, limit),
+    )
+    return [(key, value, Timestamp(last_queried_ts)) for key, value, last_queried_ts in cursor]
+
+
+def globaldb_delete_unique_cache_values(
+        write_cursor: DBCursor,
+        key_parts_list: Iterable[Iterable[str | UniqueCacheType]],
+) -> None:
+    """Delete the unique cache entries of all the given keys"""
+    write_cursor.executemany(
+        'DELETE FROM unique_cache WHERE key=?',
+        [(compute_cache_key(key_parts),) for key_parts in key_parts_list],
+    )
+
+
 def globaldb_get_general_cache_like(
         cursor: DBCursor,
         key_parts: Iterable[str | GeneralCacheType],
@@ -232,3 +266,44 @@ def read_curve_pool_tokens(
 
     found_tokens.sort(key=lambda x: x[0])
     return [address for _, address in found_tokens]
+
+
+def read_curve_pools_data(
+        cursor: 'DBCursor',
+        lp_tokens: Sequence[ChecksumEvmAddress],
+) -> dict[ChecksumEvmAddress, tuple[ChecksumEvmAddress, list[ChecksumEvmAddress]]]:
+    """
+    Reads the pool address and the pool tokens of many curve lp tokens at once.
+    Pool tokens are returned in the same order as in the pool contract like in
+    read_curve_pool_tokens. Lp tokens without a known pool are omitted.
+    """
+    lp_token_keys = {
+        compute_cache_key((CacheType.CURVE_POOL_ADDRESS, lp_token)): lp_token
+        for lp_token in lp_tokens
+    }
+    cursor.execute(
+        f'SELECT key, value FROM unique_cache WHERE key IN ({",".join(["?"] * len(lp_token_keys))})',  # noqa: E501
+        list(lp_token_keys),
+    )
+    pool_addresses = {  # pool address is guaranteed to be checksumed due to how we save it
+        lp_token_keys[key]: string_to_evm_address(value) for key, value in cursor
+    }
+    pool_keys = {
+        compute_cache_key((CacheType.CURVE_POOL_TOKENS, pool_address)): pool_address
+        for pool_address in pool_addresses.values()
+    }
+    cursor.execute(
+        f'SELECT key, value FROM general_cache WHERE substr(key, 1, {BASE_POOL_TOKENS_KEY_LENGTH}) '  # noqa: E501
+        f'IN ({",".join(["?"] * len(pool_keys))})',
+        list(pool_keys),
+    )
+    found_tokens: defaultdict[ChecksumEvmAddress, list[tuple[int, ChecksumEvmAddress]]] = defaultdict(list)  # noqa: E501
+    for key, address in cursor:
+        found_tokens[pool_keys[key[:BASE_POOL_TOKENS_KEY_LENGTH]]].append(
+            (int(key[BASE_POOL_TOKENS_KEY_LENGTH:]), string_to_evm_address(address)),
+        )
+
+    return {
+        lp_token: (pool_address, [address for _, address in sorted(found_tokens[pool_address])])
+        for lp_token, pool_address in pool_addresses.items()
+    }
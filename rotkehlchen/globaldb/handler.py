@@ -1,11 +1,14 @@
+import csv
 import logging
 import os
 import shutil
 import sqlite3
 from collections import defaultdict
+from collections.abc import Iterator
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Literal, Optional, cast, overload
 
+from eth_utils import to_checksum_address
 from gevent.lock import Semaphore
 
 from rotkehlchen.assets.asset import (
@@ -19,7 +22,7 @@ from rotkehlchen.assets.asset import (
     UnderlyingToken,
 )
 from rotkehlchen.assets.types import AssetData, AssetType
-from rotkehlchen.chain.evm.types import string_to_evm_address
+from rotkehlchen.chain.evm.types import asset_id_is_evm_token, string_to_evm_address
 from rotkehlchen.constants.assets import A_ETH, A_ETH2
 from rotkehlchen.constants.misc import (
     DEFAULT_SQL_VM_INSTRUCTIONS_CB,
@@ -27,6 +30,7 @@ from rotkehlchen.constants.misc import (
     GLOBALDIR_NAME,
     NFT_DIRECTIVE,
 )
+from rotkehlchen.constants.prices import ZERO_PRICE
 from rotkehlchen.db.drivers.gevent import DBConnection, DBConnectionType, DBCursor
 from rotkehlchen.errors.asset import UnknownAsset, WrongAssetType
 from rotkehlchen.errors.misc import DBUpgradeError, InputError
@@ -42,6 +46,7 @@ from rotkehlchen.types import (
     Price,
     Timestamp,
 )
+from rotkehlchen.utils.data_structures import LRUCacheWithRemove, LRUSetCache
 from rotkehlchen.utils.misc import timestamp_to_date, ts_now
 from rotkehlchen.utils.serialization import (
     deserialize_asset_with_oracles_from_db,
@@ -49,6 +54,15 @@ from rotkehlchen.utils.serialization import (
 )
 
 from .migrations.manager import LAST_DATA_MIGRATION, maybe_apply_globaldb_migrations
+from .price_blocks import (
+    BLOCK_STORED_SOURCES,
+    PriceBlock,
+    PriceBlockKey,
+    decode_price_block,
+    query_closest_block_price,
+    query_surrounding_block_prices,
+    write_price_blocks,
+)
 from .schema import DB_SCRIPT_CREATE_TABLES
 from .upgrades.manager import maybe_upgrade_globaldb
 from .utils import GLOBAL_DB_VERSION, globaldb_get_setting_value
@@ -60,6 +74,9 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+EVM_TOKENS_CACHE_SIZE = 1024
+NON_EVM_TOKENS_CACHE_SIZE = 4096
+
 
 _ALL_ASSETS_TABLES_JOINS = """
 FROM {dbprefix}assets LEFT JOIN {dbprefix}common_asset_details on {dbprefix}assets.identifier={dbprefix}common_asset_details.identifier
@@ -196,6 +213,45 @@ def _initialize_global_db_directory(
     )
 
 
+def _connect_to_global_db_read_only(
+        data_dir: Path,
+        sql_vm_instructions_cb: int,
+) -> DBConnection:
+    """Connects to the already initialized global DB of the data dir without upgrading,
+    migrating or checking it. Any write through the connection fails."""
+    connection = DBConnection(
+        path=data_dir / GLOBALDIR_NAME / GLOBALDB_NAME,
+        connection_type=DBConnectionType.GLOBAL,
+        sql_vm_instructions_cb=sql_vm_instructions_cb,
+    )
+    connection.executescript('PRAGMA foreign_keys=on;')
+    connection.execute('PRAGMA query_only=ON;')
+    return connection
+
+
+# the columns with the first and last timestamp of the prices of each price table
+_PRICE_TABLE_TIMESTAMP_COLUMNS = {
+    'price_history': ('timestamp', 'timestamp'),
+    'price_history_blocks': ('first_timestamp', 'last_timestamp'),
+}
+
+
+def _price_tables_for_source(source: HistoricalPriceOracle | None) -> tuple[str, ...]:
+    """Returns the tables that can hold prices of the given source"""
+    if source is None:
+        return ('price_history', 'price_history_blocks')
+    if source in BLOCK_STORED_SOURCES:
+        return ('price_history_blocks',)
+    return ('price_history',)
+
+
+def _token_and_underlying_identifiers(token: EvmToken) -> list[str]:
+    """Returns the identifiers of the token and of its underlying tokens"""
+    return [token.identifier] + [
+        x.get_identifier(parent_chain=token.chain_id) for x in token.underlying_tokens or []
+    ]
+
+
 class GlobalDBHandler:
     """A singleton class controlling the global DB"""
     __instance: Optional['GlobalDBHandler'] = None
@@ -204,17 +260,23 @@ class GlobalDBHandler:
     conn: DBConnection
     used_backup: bool  # specifies if the global DB was restored from a backup
     packaged_db_lock: Semaphore
+    # caches of get_evm_token for found tokens and for addresses known not to be tokens
+    evm_tokens_cache: LRUCacheWithRemove[tuple[ChecksumEvmAddress, ChainID], EvmToken]
+    non_evm_tokens_cache: LRUSetCache[tuple[ChecksumEvmAddress, ChainID]]
 
     def __new__(
             cls,
             data_dir: Path | None = None,
             sql_vm_instructions_cb: int | None = None,
+            read_only: bool = False,
     ) -> 'GlobalDBHandler':
         """
         Initializes the GlobalDB.
 
         If the data dir is given it uses the already existing global DB in that directory,
         of if there is none copies the built-in one there.
+        If read_only is True the existing global DB is only connected to, and any write
+        through the connection fails. For worker processes of the main rotki process.
         May raise:
         - DBSchemaError if GlobalDB's schema is malformed
         """
@@ -224,10 +286,35 @@ class GlobalDBHandler:
         assert sql_vm_instructions_cb is not None, 'First instantiation of GlobalDBHandler should have a sql_vm_instructions_cb'  # noqa: E501
         GlobalDBHandler.__instance = object.__new__(cls)
         GlobalDBHandler.__instance._data_directory = data_dir
-        GlobalDBHandler.__instance.conn, GlobalDBHandler.__instance.used_backup = _initialize_global_db_directory(data_dir, sql_vm_instructions_cb)  # noqa: E501
+        GlobalDBHandler.__instance.evm_tokens_cache = LRUCacheWithRemove(maxsize=EVM_TOKENS_CACHE_SIZE)  # noqa: E501
+        GlobalDBHandler.__instance.non_evm_tokens_cache = LRUSetCache(maxsize=NON_EVM_TOKENS_CACHE_SIZE)  # noqa: E501
+        if read_only is True:
+            GlobalDBHandler.__instance.conn = _connect_to_global_db_read_only(data_dir, sql_vm_instructions_cb)  # noqa: E501
+            GlobalDBHandler.__instance.used_backup = False
+        else:
+            GlobalDBHandler.__instance.conn, GlobalDBHandler.__instance.used_backup = _initialize_global_db_directory(data_dir, sql_vm_instructions_cb)  # noqa: E501
         GlobalDBHandler.__instance.packaged_db_lock = Semaphore()
         return GlobalDBHandler.__instance
 
+    @staticmethod
+    def clean_evm_tokens_cache(identifiers: list[str] | None = None) -> None:
+        """Clean the memory cache of get_evm_token for either the given asset identifiers
+        or all of it. Identifiers that are not evm tokens clean the entire cache."""
+        if (instance := GlobalDBHandler.__instance) is None:
+            return  # not initialized yet so nothing is cached
+
+        tokens_data = [asset_id_is_evm_token(x) for x in identifiers] if identifiers is not None else [None]  # noqa: E501
+        if None not in tokens_data:
+            for chain_id, address in cast(list[tuple[ChainID, ChecksumEvmAddress]], tokens_data):
+                # identifiers may come lowercased so make sure the address is checksummed
+                key = (to_checksum_address(address), chain_id)
+                instance.evm_tokens_cache.remove(key)
+                instance.non_evm_tokens_cache.remove(key)
+            return
+
+        instance.evm_tokens_cache.clear()
+        instance.non_evm_tokens_cache.clear()
+
     def filepath(self) -> Path:
         """This should only be called after initalization of the global DB"""
         return self._data_directory / GLOBALDIR_NAME / GLOBALDB_NAME  # type: ignore [operator]
@@ -330,6 +417,9 @@ class GlobalDBHandler:
                 f'Failed to add asset {asset.identifier} into the assets table due to {e!s}',
             ) from e
 
+        if isinstance(asset, EvmToken):
+            GlobalDBHandler.clean_evm_tokens_cache(_token_and_underlying_identifiers(asset))
+
     @staticmethod
     def retrieve_assets(userdb: 'DBHandler', filter_query: 'AssetsFilterQuery') -> tuple[list[dict[str, Any]], int]:  # noqa: E501
         """
@@ -808,8 +898,18 @@ class GlobalDBHandler:
         """Gets all details for an evm token by its address
 
         If no token for the given address can be found None is returned.
+
+        Both found tokens and addresses that are not tokens are kept in a memory cache
+        since this is called for every log address during decoding.
         """
-        with GlobalDBHandler().conn.read_ctx() as cursor:
+        globaldb = GlobalDBHandler()
+        key = (address, chain_id)
+        if (cached_token := globaldb.evm_tokens_cache.get(key)) is not None:
+            return cached_token
+        if key in globaldb.non_evm_tokens_cache:
+            return None
+
+        with globaldb.conn.read_ctx() as cursor:
             cursor.execute(
                 'SELECT A.identifier, B.address, B.chain, B.token_kind, B.decimals, C.name, '
                 'A.symbol, A.started, A.swapped_for, A.coingecko, A.cryptocompare, B.protocol '
@@ -820,13 +920,14 @@ class GlobalDBHandler:
             )
             results = cursor.fetchall()
             if len(results) == 0:
+                globaldb.non_evm_tokens_cache.add(key)
                 return None
 
             token_data = results[0]
-            underlying_tokens = GlobalDBHandler().fetch_underlying_tokens(cursor, token_data[0])
+            underlying_tokens = globaldb.fetch_underlying_tokens(cursor, token_data[0])
 
         try:
-            return EvmToken.deserialize_from_db(
+            token = EvmToken.deserialize_from_db(
                 entry=token_data,
                 underlying_tokens=underlying_tokens,
             )
@@ -837,6 +938,9 @@ class GlobalDBHandler:
             )
             return None
 
+        globaldb.evm_tokens_cache.add(key, token)
+        return token
+
     @staticmethod
     def get_evm_tokens(
             chain_id: ChainID,
@@ -909,7 +1013,8 @@ class GlobalDBHandler:
 
     @staticmethod
     def add_evm_token_data(write_cursor: DBCursor, entry: EvmToken) -> None:
-        """Adds ethereum token specific information into the global DB
+        """Adds ethereum token specific information into the global DB. The caller should
+        clean the evm tokens cache after the write transaction is committed.
 
         May raise InputError if the token already exists
         """
@@ -1022,6 +1127,7 @@ class GlobalDBHandler:
                 f'due to a constraint being hit. Make sure the new values are valid ',
             ) from e
 
+        GlobalDBHandler.clean_evm_tokens_cache()  # address or chain may have been edited too
         return rotki_id
 
     @staticmethod
@@ -1140,6 +1246,8 @@ class GlobalDBHandler:
                     f'but it was not found in the DB',
                 )
 
+        GlobalDBHandler.clean_evm_tokens_cache([identifier])
+
     @staticmethod
     def get_assets_with_symbol(
             symbol: str,
@@ -1203,6 +1311,138 @@ class GlobalDBHandler:
 
         return assets
 
+    @staticmethod
+    def _query_closest_historical_price(
+            cursor: DBCursor,
+            from_asset: 'Asset',
+            to_asset: 'Asset',
+            timestamp: Timestamp,
+            max_seconds_distance: int,
+            source: HistoricalPriceOracle | None,
+            decoded_blocks: dict[PriceBlockKey, PriceBlock],
+    ) -> Optional['HistoricalPrice']:
+        """Finds the price closest to the given timestamp among the manual prices
+        of price_history and the oracle prices of price_history_blocks"""
+        result, result_distance = None, 0
+        if source is None or source not in BLOCK_STORED_SOURCES:
+            querystr = (
+                'SELECT from_asset, to_asset, source_type, timestamp, price, '
+                'MIN(ABS(timestamp - ?)) FROM price_history '
+                'WHERE from_asset=? AND to_asset=? AND timestamp BETWEEN ? AND ?'
+            )
+            querylist = [timestamp, from_asset.identifier, to_asset.identifier, timestamp - max_seconds_distance, timestamp + max_seconds_distance]  # noqa: E501
+            if source is not None:
+                querystr += ' AND source_type=?'
+                querylist.append(source.serialize_for_db())
+
+            entry = cursor.execute(querystr, querylist).fetchone()
+            if entry[0] is not None:
+                # The entry tuple last entry MIN(ABS()) is disregarded in deserialize_from_db
+                result, result_distance = HistoricalPrice.deserialize_from_db(entry), entry[5]
+
+        if source is None or source in BLOCK_STORED_SOURCES:
+            block_entry = query_closest_block_price(
+                cursor=cursor,
+                from_asset=from_asset.identifier,
+                to_asset=to_asset.identifier,
+                timestamp=timestamp,
+                max_seconds_distance=max_seconds_distance,
+                source=source,
+                decoded_blocks=decoded_blocks,
+            )
+            if block_entry is not None and (result is None or block_entry[0] < result_distance):
+                result = HistoricalPrice(
+                    from_asset=from_asset,
+                    to_asset=to_asset,
+                    source=HistoricalPriceOracle.deserialize_from_db(block_entry[1]),
+                    timestamp=block_entry[2],
+                    price=block_entry[3],
+                )
+
+        return result
+
+    @staticmethod
+    def _query_interpolated_historical_price(
+            cursor: DBCursor,
+            from_asset: 'Asset',
+            to_asset: 'Asset',
+            timestamp: Timestamp,
+            max_gap: int,
+            source: HistoricalPriceOracle | None,
+            decoded_blocks: dict[PriceBlockKey, PriceBlock],
+    ) -> Optional['HistoricalPrice']:
+        """Linearly interpolates the price at the given timestamp between the oracle
+        prices of price_history_blocks right before and after it, if they are at most
+        max_gap seconds apart. Manual prices are never interpolated.
+
+        Zero prices are how some oracles mark missing data so they are not interpolated.
+        """
+        if source is not None and source not in BLOCK_STORED_SOURCES:
+            return None
+
+        surrounding = query_surrounding_block_prices(
+            cursor=cursor,
+            from_asset=from_asset.identifier,
+            to_asset=to_asset.identifier,
+            timestamp=timestamp,
+            max_gap=max_gap,
+            source=source,
+            decoded_blocks=decoded_blocks,
+        )
+        if surrounding is None:
+            return None
+
+        source_type, (before_ts, before_price), (after_ts, after_price) = surrounding
+        if ZERO_PRICE in (before_price, after_price):
+            return None
+
+        return HistoricalPrice(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            source=HistoricalPriceOracle.deserialize_from_db(source_type),
+            timestamp=timestamp,
+            price=Price(
+                before_price +
+                (after_price - before_price) * (timestamp - before_ts) / (after_ts - before_ts),
+            ),
+            interpolated=True,
+        )
+
+    @staticmethod
+    def _query_historical_price(
+            cursor: DBCursor,
+            from_asset: 'Asset',
+            to_asset: 'Asset',
+            timestamp: Timestamp,
+            max_seconds_distance: int,
+            source: HistoricalPriceOracle | None,
+            interpolation_max_gap: int,
+            decoded_blocks: dict[PriceBlockKey, PriceBlock],
+    ) -> Optional['HistoricalPrice']:
+        """Finds the closest stored price and if there is none and interpolation_max_gap
+        is positive tries to interpolate one"""
+        result = GlobalDBHandler._query_closest_historical_price(
+            cursor=cursor,
+            from_asset=from_asset,
+            to_asset=to_asset,
+            timestamp=timestamp,
+            max_seconds_distance=max_seconds_distance,
+            source=source,
+            decoded_blocks=decoded_blocks,
+        )
+        if result is not None or interpolation_max_gap <= 0:
+            return result
+
+        return GlobalDBHandler._query_interpolated_historical_price(
+            cursor=cursor,
+            from_asset=from_asset,
+            to_asset=to_asset,
+            timestamp=timestamp,
+            max_gap=interpolation_max_gap,
+            source=source,
+            decoded_blocks=decoded_blocks,
+        )
+
     @staticmethod
     def get_historical_price(
             from_asset: 'Asset',
@@ -1210,75 +1450,89 @@ class GlobalDBHandler:
             timestamp: Timestamp,
             max_seconds_distance: int,
             source: HistoricalPriceOracle | None = None,
+            interpolation_max_gap: int = 0,
     ) -> Optional['HistoricalPrice']:
         """Gets the price around a particular timestamp
 
+        If there is no price within max_seconds_distance and interpolation_max_gap is
+        positive, the price is linearly interpolated between the stored oracle prices
+        around the timestamp if they are at most interpolation_max_gap seconds apart.
+        The returned entry is then flagged as interpolated.
+
         If no price can be found returns None
         """
-        querystr = (
-            'SELECT from_asset, to_asset, source_type, timestamp, '
-            'price, MIN(ABS(timestamp - ?)) FROM price_history '
-            'WHERE from_asset=? AND to_asset=? '
-            'AND timestamp between ? AND ?'
-        )
-        querylist = [timestamp, from_asset.identifier, to_asset.identifier, timestamp - max_seconds_distance, timestamp + max_seconds_distance]  # noqa: E501
-        if source is not None:
-            querystr += ' AND source_type=? '
-            querylist.append(source.serialize_for_db())
-
         with GlobalDBHandler().conn.read_ctx() as cursor:
-            result = cursor.execute(querystr, tuple(querylist)).fetchone()
-            if result[0] is None:
-                return None
-
-        # The result tuple last entry MIN(ABS()) is disregarded in deserialize_from_db
-        return HistoricalPrice.deserialize_from_db(result)
+            return GlobalDBHandler._query_historical_price(
+                cursor=cursor,
+                from_asset=from_asset,
+                to_asset=to_asset,
+                timestamp=timestamp,
+                max_seconds_distance=max_seconds_distance,
+                source=source,
+                interpolation_max_gap=interpolation_max_gap,
+                decoded_blocks={},
+            )
 
     @staticmethod
     def get_historical_prices(
             query_data: list[tuple['Asset', 'Asset', Timestamp]],
             max_seconds_distance: int,
             source: HistoricalPriceOracle | None = None,
+            interpolation_max_gap: int = 0,
     ) -> list[Optional['HistoricalPrice']]:
         """Given a list of from/to/timestamp data to query returns all values
         that could be found in the DB and None for those that could not be found.
-        """
-        querystr = (
-            'SELECT from_asset, to_asset, source_type, timestamp, price, MIN(ABS(timestamp - ?)) '
-            'FROM price_history WHERE from_asset=? AND to_asset=? AND timestamp BETWEEN ? AND ?'
-        )
-        querylist: list[tuple] = []
-        if source is not None:
-            querystr += ' AND source_type=? '
-            serialized_source = source.serialize_for_db()
-            for from_asset, to_asset, timestamp in query_data:
-                querylist.append((timestamp, from_asset.identifier, to_asset.identifier, timestamp - max_seconds_distance, timestamp + max_seconds_distance, serialized_source))  # noqa: E501
-
-        else:
-            for from_asset, to_asset, timestamp in query_data:
-                querylist.append((timestamp, from_asset.identifier, to_asset.identifier, timestamp - max_seconds_distance, timestamp + max_seconds_distance))  # noqa: E501
+        Interpolation works as in get_historical_price.
 
-        prices_results = []
+        Each price block is decoded once no matter how many of the queries fall in it.
+        """
+        decoded_blocks: dict[PriceBlockKey, PriceBlock] = {}
         with GlobalDBHandler().conn.read_ctx() as cursor:
-            for entry in querylist:
-                result = cursor.execute(querystr, entry).fetchone()  # below last index of the result tuple is ignored in deserialize  # noqa: E501
-                prices_results.append(None if result[0] is None else HistoricalPrice.deserialize_from_db(result))  # noqa: E501
-
-        return prices_results
+            return [GlobalDBHandler._query_historical_price(
+                cursor=cursor,
+                from_asset=from_asset,
+                to_asset=to_asset,
+                timestamp=timestamp,
+                max_seconds_distance=max_seconds_distance,
+                source=source,
+                interpolation_max_gap=interpolation_max_gap,
+                decoded_blocks=decoded_blocks,
+            ) for from_asset, to_asset, timestamp in query_data]
 
     @staticmethod
     def add_historical_prices(entries: list['HistoricalPrice']) -> None:
         """Adds the given historical price entries in the DB
 
-        If any addition causes a DB error it's skipped and an error is logged
+        Prices of the oracles are merged in their price blocks and existing
+        prices are kept. If any addition causes a DB error it's skipped and an
+        error is logged
         """
+        manual_entries = []
+        oracle_entries = []
+        for entry in entries:
+            if entry.source in BLOCK_STORED_SOURCES:
+                oracle_entries.append(entry)
+            else:
+                manual_entries.append(entry)
+
+        if len(oracle_entries) != 0:
+            with GlobalDBHandler().conn.write_ctx() as write_cursor:
+                write_price_blocks(
+                    write_cursor=write_cursor,
+                    entries=oracle_entries,
+                    replace=False,
+                )
+
+        if len(manual_entries) == 0:
+            return
+
         try:
             with GlobalDBHandler().conn.write_ctx() as write_cursor:
                 write_cursor.executemany(
                     """INSERT OR IGNORE INTO price_history(
                     from_asset, to_asset, source_type, timestamp, price
                     ) VALUES (?, ?, ?, ?, ?)
-                    """, [x.serialize_for_db() for x in entries],
+                    """, [x.serialize_for_db() for x in manual_entries],
                 )
         except sqlite3.IntegrityError as e:
             # roll back any of the executemany that may have gone in
@@ -1288,7 +1542,7 @@ class GlobalDBHandler:
             )
 
             with GlobalDBHandler().conn.write_ctx() as write_cursor:
-                for entry in entries:
+                for entry in manual_entries:
                     try:
                         write_cursor.execute(
                             """INSERT OR IGNORE INTO price_history(
@@ -1309,6 +1563,10 @@ class GlobalDBHandler:
         If the price for the specified asset pair, oracle type and timestamp already exists,
         it is replaced.
         """
+        if entry.source in BLOCK_STORED_SOURCES:
+            with GlobalDBHandler().conn.write_ctx() as write_cursor:
+                return write_price_blocks(write_cursor=write_cursor, entries=[entry], replace=True)
+
         try:
             with GlobalDBHandler().conn.write_ctx() as write_cursor:
                 serialized = entry.serialize_for_db()
@@ -1384,8 +1642,10 @@ class GlobalDBHandler:
                 raise InputError(f'Failed to add manual current price due to: {e!s}') from e
 
             write_cursor.execute(
-                'SELECT from_asset, to_asset FROM price_history WHERE from_asset=? OR to_asset=?',
-                (from_asset.identifier, from_asset.identifier),
+                'SELECT from_asset, to_asset FROM price_history WHERE from_asset=? OR to_asset=? '
+                'UNION SELECT from_asset, to_asset FROM price_history_blocks '
+                'WHERE from_asset=? OR to_asset=?',
+                (from_asset.identifier,) * 4,
             )
             pairs_to_invalidate = [(Asset(entry[0]), Asset(entry[1])) for entry in write_cursor]
 
@@ -1549,7 +1809,7 @@ class GlobalDBHandler:
             to_asset: 'Asset',
             source: HistoricalPriceOracle | None = None,
     ) -> None:
-        querystr = 'DELETE FROM price_history WHERE from_asset=? AND to_asset=?'
+        querystr = 'WHERE from_asset=? AND to_asset=?'
         query_list = [from_asset.identifier, to_asset.identifier]
         if source is not None:
             querystr += ' AND source_type=?'
@@ -1557,7 +1817,8 @@ class GlobalDBHandler:
 
         try:
             with GlobalDBHandler().conn.write_ctx() as write_cursor:
-                write_cursor.execute(querystr, tuple(query_list))
+                for table in _price_tables_for_source(source):
+                    write_cursor.execute(f'DELETE FROM {table} {querystr}', tuple(query_list))
         except sqlite3.IntegrityError as e:
             log.error(
                 f'Failed to delete historical prices from {from_asset} to {to_asset} '
@@ -1570,28 +1831,38 @@ class GlobalDBHandler:
             to_asset: 'Asset',
             source: HistoricalPriceOracle | None = None,
     ) -> tuple[Timestamp, Timestamp] | None:
-        querystr = 'SELECT MIN(timestamp), MAX(timestamp) FROM price_history WHERE from_asset=? AND to_asset=?'  # noqa: E501
+        querystr = 'WHERE from_asset=? AND to_asset=?'
         query_list = [from_asset.identifier, to_asset.identifier]
         if source is not None:
             querystr += ' AND source_type=?'
             query_list.append(source.serialize_for_db())
 
+        ranges = []
         with GlobalDBHandler().conn.read_ctx() as cursor:
-            query = cursor.execute(querystr, tuple(query_list))
-            result = query.fetchone()
-            if result is None or None in (result[0], result[1]):
-                return None
-            return result[0], result[1]
+            for table in _price_tables_for_source(source):
+                min_column, max_column = _PRICE_TABLE_TIMESTAMP_COLUMNS[table]
+                result = cursor.execute(
+                    f'SELECT MIN({min_column}), MAX({max_column}) FROM {table} {querystr}',
+                    tuple(query_list),
+                ).fetchone()
+                if result is not None and None not in (result[0], result[1]):
+                    ranges.append(result)
+
+        if len(ranges) == 0:
+            return None
+        return min(x[0] for x in ranges), max(x[1] for x in ranges)
 
     @staticmethod
     def get_historical_price_data(source: HistoricalPriceOracle) -> list[dict[str, Any]]:
         """Return a list of assets and first/last ts
 
         Only used by the API so just returning it as List of dicts from here"""
+        table = _price_tables_for_source(source)[0]
+        min_column, max_column = _PRICE_TABLE_TIMESTAMP_COLUMNS[table]
         with GlobalDBHandler().conn.read_ctx() as cursor:
             query = cursor.execute(
-                'SELECT from_asset, to_asset, MIN(timestamp), MAX(timestamp) FROM '
-                'price_history WHERE source_type=? GROUP BY from_asset, to_asset',
+                f'SELECT from_asset, to_asset, MIN({min_column}), MAX({max_column}) FROM '
+                f'{table} WHERE source_type=? GROUP BY from_asset, to_asset',
                 (source.serialize_for_db(),),
             )
             return [
@@ -1601,6 +1872,108 @@ class GlobalDBHandler:
                  'to_timestamp': entry[3],
                  } for entry in query]
 
+    @staticmethod
+    def _iterate_historical_price_rows(
+            cursor: DBCursor,
+            from_asset: Optional['Asset'],
+            to_asset: Optional['Asset'],
+            source: HistoricalPriceOracle | None,
+    ) -> Iterator[tuple[str, str, str, Timestamp, str]]:
+        """Yields the stored prices in the format of the price_history table.
+        First the manual ones and then the ones of the oracles, each of them ordered
+        by asset pair, source and timestamp"""
+        filters, bindings = [], []
+        if from_asset is not None:
+            filters.append('from_asset=?')
+            bindings.append(from_asset.identifier)
+        if to_asset is not None:
+            filters.append('to_asset=?')
+            bindings.append(to_asset.identifier)
+        if source is not None:
+            filters.append('source_type=?')
+            bindings.append(source.serialize_for_db())
+        querystr = '' if len(filters) == 0 else 'WHERE ' + ' AND '.join(filters)
+
+        tables = _price_tables_for_source(source)
+        if 'price_history' in tables:
+            yield from cursor.execute(
+                'SELECT from_asset, to_asset, source_type, timestamp, price FROM price_history '
+                f'{querystr} ORDER BY from_asset, to_asset, source_type, timestamp',
+                bindings,
+            ).fetchall()
+
+        if 'price_history_blocks' not in tables:
+            return
+
+        for from_id, to_id, source_type, block_start, encoded in cursor.execute(
+                'SELECT from_asset, to_asset, source_type, block_start, prices FROM '
+                f'price_history_blocks {querystr} '
+                'ORDER BY from_asset, to_asset, source_type, block_start',
+                bindings,
+        ).fetchall():
+            try:
+                block = decode_price_block(block_start=block_start, encoded=encoded)
+            except DeserializationError as e:
+                log.error(f'Skipping corrupt price block of {from_id}->{to_id} at {block_start}. {e!s}')  # noqa: E501
+                continue
+
+            for timestamp, price in zip(block.timestamps, block.prices, strict=True):
+                yield from_id, to_id, source_type, timestamp, str(price)
+
+    @staticmethod
+    def get_all_historical_prices(
+            from_asset: Optional['Asset'] = None,
+            to_asset: Optional['Asset'] = None,
+            source: HistoricalPriceOracle | None = None,
+    ) -> list['HistoricalPrice']:
+        """Returns all the stored prices matching the given filters.
+
+        May raise:
+        - DeserializationError
+        - UnknownAsset
+        """
+        with GlobalDBHandler().conn.read_ctx() as cursor:
+            return [HistoricalPrice.deserialize_from_db(x) for x in GlobalDBHandler._iterate_historical_price_rows(  # noqa: E501
+                cursor=cursor,
+                from_asset=from_asset,
+                to_asset=to_asset,
+                source=source,
+            )]
+
+    @staticmethod
+    def export_historical_prices(
+            filepath: Path,
+            from_asset: Optional['Asset'] = None,
+            to_asset: Optional['Asset'] = None,
+            source: HistoricalPriceOracle | None = None,
+    ) -> int:
+        """Writes the stored prices matching the given filters in a CSV file, one row
+        per price. Returns the number of prices written.
+
+        May raise:
+        - OSError if the file can't be written
+        """
+        count = 0
+        with GlobalDBHandler().conn.read_ctx() as cursor, open(filepath, 'w', newline='', encoding='utf-8') as csvfile:  # noqa: E501
+            writer = csv.writer(csvfile)
+            writer.writerow(('from_asset', 'to_asset', 'source', 'timestamp', 'price'))
+            for from_id, to_id, source_type, timestamp, price in GlobalDBHandler._iterate_historical_price_rows(  # noqa: E501
+                    cursor=cursor,
+                    from_asset=from_asset,
+                    to_asset=to_asset,
+                    source=source,
+            ):
+                writer.writerow((
+                    from_id,
+                    to_id,
+                    HistoricalPriceOracle.deserialize_from_db(source_type).serialize(),
+                    timestamp,
+                    price,
+                ))
+                count += 1
+
+        return count
+
     def hard_reset_assets_list(
             self,
             user_db: 'DBHandler',
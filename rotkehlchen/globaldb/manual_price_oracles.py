@@ -30,6 +30,15 @@ class ManualPriceOracle:
     ) -> bool:
         return True
 
+    @staticmethod
+    def query_cached_historical_price(
+            from_asset: Asset,  # pylint: disable=unused-argument
+            to_asset: Asset,  # pylint: disable=unused-argument
+            timestamp: Timestamp,  # pylint: disable=unused-argument
+    ) -> None:
+        """Manual prices are not a cache of another oracle's prices"""
+        return None
+
     @classmethod
     def query_historical_price(
             cls,
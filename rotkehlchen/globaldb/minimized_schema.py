@@ -1,5 +1,5 @@
 # This file contains minimized db schema and it should not be touched manually but only generated by tools/scripts/generate_minimized_db_schema.py
-# Created at 2023-09-07 07:31:09 UTC with rotki version 1.30.2.dev41+gc4bb6769b.d20230906 by lefteris
+# Created at 2026-10-19 09:38:09 UTC with rotki version 0.1.dev1+g20572fa.d20261019 by rotki
 MINIMIZED_GLOBAL_DB_SCHEMA = {
     "token_kinds": "token_kindchar(1)primarykeynotnull,seqintegerunique",
     "underlying_tokens_list": "identifiertextnotnull,weighttextnotnull,parent_token_entrytextnotnull,foreignkey(parent_token_entry)referencesevm_tokens(identifier)ondeletecascadeonupdatecascadeforeignkey(identifier)referencesevm_tokens(identifier)onupdatecascadeondeletecascadeprimarykey(identifier,parent_token_entry)",
@@ -12,6 +12,7 @@ MINIMIZED_GLOBAL_DB_SCHEMA = {
     "user_owned_assets": "asset_idvarchar[24]notnullprimarykey,foreignkey(asset_id)referencesassets(identifier)onupdatecascadeondeletecascade",
     "price_history_source_types": "typechar(1)primarykeynotnull,seqintegerunique",
     "price_history": "from_assettextnotnullcollatenocase,to_assettextnotnullcollatenocase,source_typechar(1)notnulldefault('a')referencesprice_history_source_types(type),timestampintegernotnull,pricetextnotnull,foreignkey(from_asset)referencesassets(identifier)onupdatecascadeondeletecascade,foreignkey(to_asset)referencesassets(identifier)onupdatecascadeondeletecascade,primarykey(from_asset,to_asset,source_type,timestamp)",
+    "price_history_blocks": "from_assettextnotnullcollatenocase,to_assettextnotnullcollatenocase,source_typechar(1)notnullreferencesprice_history_source_types(type),block_startintegernotnull,first_timestampintegernotnull,last_timestampintegernotnull,pricesblobnotnull,foreignkey(from_asset)referencesassets(identifier)onupdatecascadeondeletecascade,foreignkey(to_asset)referencesassets(identifier)onupdatecascadeondeletecascade,primarykey(from_asset,to_asset,source_type,block_start)",
     "binance_pairs": "pairtextnotnull,base_assettextnotnull,quote_assettextnotnull,locationtextnotnull,foreignkey(base_asset)referencesassets(identifier)onupdatecascadeondeletecascade,foreignkey(quote_asset)referencesassets(identifier)onupdatecascadeondeletecascade,primarykey(pair,location)",
     "address_book": "addresstextnotnull,blockchaintext,nametextnotnull,primarykey(address,blockchain)",
     "custom_assets": "identifiertextnotnullprimarykey,notestext,typetextnotnullcollatenocase,foreignkey(identifier)referencesassets(identifier)onupdatecascadeondeletecascade",
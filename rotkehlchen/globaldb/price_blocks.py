@@ -0,0 +1,355 @@
+"""Compressed storage of the historical prices queried from the price oracles.
+
+The oracle prices of each asset pair and source are stored in blocks covering
+PRICE_BLOCK_SECONDS of time, one row per block in the price_history_blocks table.
+A block holds its points in columns: the timestamps as deltas from the previous
+one, followed by the decimal exponents and the deltas of the decimal coefficients
+of the prices. All of them are varints and the whole block is zlib compressed.
+The encoding of the prices is lossless so a price reads back exactly as it was stored.
+
+Manually input prices are few and edited by the user so they stay in price_history.
+"""
+import logging
+import sqlite3
+import zlib
+from bisect import bisect_left
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
+from decimal import Decimal
+from typing import TYPE_CHECKING, NamedTuple
+
+from rotkehlchen.constants.timing import DAY_IN_SECONDS
+from rotkehlchen.errors.serialization import DeserializationError
+from rotkehlchen.fval import FVal
+from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.types import Price, Timestamp
+
+if TYPE_CHECKING:
+    from rotkehlchen.db.drivers.gevent import DBCursor
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+PRICE_BLOCK_SECONDS = DAY_IN_SECONDS * 30
+BLOCK_STORED_SOURCES = tuple(
+    x for x in HistoricalPriceOracle
+    if x not in (HistoricalPriceOracle.MANUAL, HistoricalPriceOracle.MANUAL_CURRENT)
+)
+BLOCK_STORED_SOURCES_DB = tuple(x.serialize_for_db() for x in BLOCK_STORED_SOURCES)
+
+
+class PriceBlockKey(NamedTuple):
+    from_asset: str
+    to_asset: str
+    source_type: str
+    block_start: Timestamp
+
+
+class PriceBlock(NamedTuple):
+    """The decoded points of a block, sorted by timestamp"""
+    timestamps: list[Timestamp]
+    prices: list[Price]
+
+
+def price_block_start(timestamp: int) -> Timestamp:
+    return Timestamp(timestamp - timestamp % PRICE_BLOCK_SECONDS)
+
+
+def _write_varint(data: bytearray, value: int) -> None:
+    while value > 0x7f:
+        data.append((value & 0x7f) | 0x80)
+        value >>= 7
+    data.append(value)
+
+
+def _read_varint(data: bytes, offset: int) -> tuple[int, int]:
+    """Returns the value read and the offset after it"""
+    result, shift = 0, 0
+    while True:
+        byte = data[offset]
+        offset += 1
+        result |= (byte & 0x7f) << shift
+        if byte < 0x80:
+            return result, offset
+        shift += 7
+
+
+def _zigzag(value: int) -> int:
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def _unzigzag(value: int) -> int:
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+
+def encode_price_block(block_start: Timestamp, points: Sequence[tuple[Timestamp, Price]]) -> bytes:
+    """Encodes the given points of a block. They have to be sorted by timestamp,
+    unique and inside the block.
+
+    May raise:
+    - ValueError if a price is not a finite number
+    """
+    data = bytearray()
+    _write_varint(data, len(points))
+    last_timestamp = block_start
+    for timestamp, _ in points:
+        _write_varint(data, timestamp - last_timestamp)
+        last_timestamp = timestamp
+
+    coefficients = []
+    for _, price in points:
+        sign, digits, exponent = price.num.as_tuple()
+        if not isinstance(exponent, int):
+            raise ValueError(f'Can not encode non finite price {price}')
+        _write_varint(data, _zigzag(exponent))
+        coefficient = int(''.join(str(x) for x in digits))
+        coefficients.append(-coefficient if sign == 1 else coefficient)
+
+    last_coefficient = 0
+    for coefficient in coefficients:
+        _write_varint(data, _zigzag(coefficient - last_coefficient))
+        last_coefficient = coefficient
+
+    return zlib.compress(bytes(data))
+
+
+def decode_price_block(block_start: Timestamp, encoded: bytes) -> PriceBlock:
+    """Decodes a block encoded by encode_price_block
+
+    May raise:
+    - DeserializationError if the data is not a valid block
+    """
+    try:
+        data = zlib.decompress(encoded)
+        count, offset = _read_varint(data, 0)
+        timestamps, exponents, prices = [], [], []
+        timestamp = block_start
+        for _ in range(count):
+            delta, offset = _read_varint(data, offset)
+            timestamp = Timestamp(timestamp + delta)
+            timestamps.append(timestamp)
+        for _ in range(count):
+            value, offset = _read_varint(data, offset)
+            exponents.append(_unzigzag(value))
+        coefficient = 0
+        for exponent in exponents:
+            value, offset = _read_varint(data, offset)
+            coefficient += _unzigzag(value)
+            prices.append(Price(FVal(Decimal((
+                int(coefficient < 0),
+                tuple(int(x) for x in str(abs(coefficient))),
+                exponent,
+            )))))
+    except (zlib.error, IndexError) as e:
+        raise DeserializationError(f'Failed to decode a price block: {e!s}') from e
+
+    return PriceBlock(timestamps=timestamps, prices=prices)
+
+
+def _read_price_block(
+        key: PriceBlockKey,
+        encoded: bytes,
+        decoded_blocks: dict[PriceBlockKey, PriceBlock],
+) -> PriceBlock | None:
+    """Decodes a block read from the DB, using the already decoded blocks if possible.
+    Returns None if the block is corrupt"""
+    if (block := decoded_blocks.get(key)) is not None:
+        return block
+
+    try:
+        block = decode_price_block(block_start=key.block_start, encoded=encoded)
+    except DeserializationError as e:
+        log.error(f'Skipping corrupt price block {key}. {e!s}')
+        return None
+
+    decoded_blocks[key] = block
+    return block
+
+
+def query_closest_block_price(
+        cursor: 'DBCursor',
+        from_asset: str,
+        to_asset: str,
+        timestamp: Timestamp,
+        max_seconds_distance: int,
+        source: HistoricalPriceOracle | None,
+        decoded_blocks: dict[PriceBlockKey, PriceBlock],
+) -> tuple[int, str, Timestamp, Price] | None:
+    """Finds the stored oracle price closest to the given timestamp, within the given distance.
+
+    Returns the distance, the source type, the timestamp and the price of the point
+    found or None. The blocks decoded in the process are kept in decoded_blocks so
+    that they can be reused by subsequent queries.
+    """
+    querystr = (
+        'SELECT source_type, block_start, prices FROM price_history_blocks '
+        'WHERE from_asset=? AND to_asset=? AND block_start > ? AND block_start <= ? '
+        'AND first_timestamp <= ? AND last_timestamp >= ?'
+    )
+    bindings: list[str | int] = [
+        from_asset,
+        to_asset,
+        timestamp - max_seconds_distance - PRICE_BLOCK_SECONDS,
+        timestamp + max_seconds_distance,
+        timestamp + max_seconds_distance,
+        timestamp - max_seconds_distance,
+    ]
+    if source is not None:
+        querystr += ' AND source_type=?'
+        bindings.append(source.serialize_for_db())
+
+    closest: tuple[int, str, Timestamp, Price] | None = None
+    for source_type, block_start, encoded in cursor.execute(querystr, bindings).fetchall():
+        key = PriceBlockKey(from_asset, to_asset, source_type, block_start)
+        if (block := _read_price_block(key, encoded, decoded_blocks)) is None:
+            continue
+
+        # only the points right before and after the timestamp can be the closest ones
+        idx = bisect_left(block.timestamps, timestamp)
+        for candidate_idx in (idx - 1, idx):
+            if not 0 <= candidate_idx < len(block.timestamps):
+                continue
+            distance = abs(block.timestamps[candidate_idx] - timestamp)
+            if distance <= max_seconds_distance and (closest is None or distance < closest[0]):
+                closest = (
+                    distance,
+                    source_type,
+                    block.timestamps[candidate_idx],
+                    block.prices[candidate_idx],
+                )
+
+    return closest
+
+
+def query_surrounding_block_prices(
+        cursor: 'DBCursor',
+        from_asset: str,
+        to_asset: str,
+        timestamp: Timestamp,
+        max_gap: int,
+        source: HistoricalPriceOracle | None,
+        decoded_blocks: dict[PriceBlockKey, PriceBlock],
+) -> tuple[str, tuple[Timestamp, Price], tuple[Timestamp, Price]] | None:
+    """Finds the stored oracle prices right before and at or right after the given
+    timestamp that are at most max_gap seconds apart, so that the price at the
+    timestamp can be interpolated between them.
+
+    Both points come from the same source. If more than one source has such points
+    the ones closest together are picked, and on a tie the ones of the source with
+    the lowest db character, so that the result is always the same.
+    Returns the source type and the points before and after or None.
+    """
+    querystr = (
+        'SELECT source_type, block_start, prices FROM price_history_blocks '
+        'WHERE from_asset=? AND to_asset=? AND block_start > ? AND block_start <= ? '
+        'AND first_timestamp <= ? AND last_timestamp >= ?'
+    )
+    bindings: list[str | int] = [
+        from_asset,
+        to_asset,
+        timestamp - max_gap - PRICE_BLOCK_SECONDS,
+        timestamp + max_gap,
+        timestamp + max_gap,
+        timestamp - max_gap,
+    ]
+    if source is not None:
+        querystr += ' AND source_type=?'
+        bindings.append(source.serialize_for_db())
+
+    before: dict[str, tuple[Timestamp, Price]] = {}
+    after: dict[str, tuple[Timestamp, Price]] = {}
+    for source_type, block_start, encoded in cursor.execute(querystr, bindings).fetchall():
+        key = PriceBlockKey(from_asset, to_asset, source_type, block_start)
+        if (block := _read_price_block(key, encoded, decoded_blocks)) is None:
+            continue
+
+        idx = bisect_left(block.timestamps, timestamp)
+        if idx > 0 and (
+            source_type not in before or before[source_type][0] < block.timestamps[idx - 1]
+        ):
+            before[source_type] = (block.timestamps[idx - 1], block.prices[idx - 1])
+        if idx < len(block.timestamps) and (
+            source_type not in after or after[source_type][0] > block.timestamps[idx]
+        ):
+            after[source_type] = (block.timestamps[idx], block.prices[idx])
+
+    candidates = sorted(
+        (after[source_type][0] - point[0], source_type)
+        for source_type, point in before.items() if source_type in after
+    )
+    if len(candidates) == 0 or candidates[0][0] > max_gap:
+        return None
+
+    source_type = candidates[0][1]
+    return source_type, before[source_type], after[source_type]
+
+
+def write_price_blocks(
+        write_cursor: 'DBCursor',
+        entries: Iterable[HistoricalPrice],
+        replace: bool,
+) -> bool:
+    """Merges the given oracle prices in their blocks.
+
+    If replace is True the given prices replace any stored price of the same
+    pair, source and timestamp. Otherwise the stored prices are kept. Blocks that
+    can't be written due to a DB error are skipped and an error is logged.
+    Returns False if any block was skipped and True otherwise.
+    """
+    success = True
+    new_points: defaultdict[PriceBlockKey, dict[Timestamp, Price]] = defaultdict(dict)
+    for entry in entries:
+        key = PriceBlockKey(
+            from_asset=entry.from_asset.identifier,
+            to_asset=entry.to_asset.identifier,
+            source_type=entry.source.serialize_for_db(),
+            block_start=price_block_start(entry.timestamp),
+        )
+        if replace is True:
+            new_points[key][entry.timestamp] = entry.price
+        else:
+            new_points[key].setdefault(entry.timestamp, entry.price)
+
+    for key, block_points in new_points.items():
+        result = write_cursor.execute(
+            'SELECT prices FROM price_history_blocks WHERE from_asset=? AND to_asset=? '
+            'AND source_type=? AND block_start=?',
+            key,
+        ).fetchone()
+        points: dict[Timestamp, Price] = {}
+        if result is not None:
+            try:
+                block = decode_price_block(block_start=key.block_start, encoded=result[0])
+            except DeserializationError as e:
+                log.error(f'Overwriting corrupt price block {key}. {e!s}')
+            else:
+                points = dict(zip(block.timestamps, block.prices, strict=True))
+
+        if replace is True:
+            points.update(block_points)
+        elif all(timestamp in points for timestamp in block_points):
+            continue  # nothing new to write
+        else:
+            points = block_points | points
+
+        sorted_points = sorted(points.items())
+        try:
+            encoded = encode_price_block(block_start=key.block_start, points=sorted_points)
+        except ValueError as e:
+            log.error(f'Failed to encode the prices of block {key} due to {e!s}. Skipping')
+            success = False
+            continue
+
+        try:
+            write_cursor.execute(
+                'INSERT OR REPLACE INTO price_history_blocks(from_asset, to_asset, '
+                'source_type, block_start, first_timestamp, last_timestamp, prices) '
+                'VALUES(?, ?, ?, ?, ?, ?, ?)',
+                (*key, sorted_points[0][0], sorted_points[-1][0], encoded),
+            )
+        except sqlite3.IntegrityError as e:
+            log.error(f'Failed to add the prices of block {key} due to {e!s}. Skipping')
+            success = False
+
+    return success
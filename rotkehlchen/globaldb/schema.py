@@ -226,6 +226,22 @@ CREATE TABLE IF NOT EXISTS price_history (
 );
 """
 
+# The prices queried from the oracles, in compressed blocks. See globaldb/price_blocks.py
+DB_CREATE_PRICE_HISTORY_BLOCKS = """
+CREATE TABLE IF NOT EXISTS price_history_blocks (
+    from_asset TEXT NOT NULL COLLATE NOCASE,
+    to_asset TEXT NOT NULL COLLATE NOCASE,
+    source_type CHAR(1) NOT NULL REFERENCES price_history_source_types(type),
+    block_start INTEGER NOT NULL,
+    first_timestamp INTEGER NOT NULL,
+    last_timestamp INTEGER NOT NULL,
+    prices BLOB NOT NULL,
+    FOREIGN KEY(from_asset) REFERENCES assets(identifier) ON UPDATE CASCADE ON DELETE CASCADE,
+    FOREIGN KEY(to_asset) REFERENCES assets(identifier) ON UPDATE CASCADE ON DELETE CASCADE,
+    PRIMARY KEY(from_asset, to_asset, source_type, block_start)
+);
+"""
+
 DB_CREATE_BINANCE_PAIRS = """
 CREATE TABLE IF NOT EXISTS binance_pairs (
     pair TEXT NOT NULL,
@@ -317,6 +333,7 @@ BEGIN TRANSACTION;
 {DB_CREATE_USER_OWNED_ASSETS}
 {DB_CREATE_PRICE_HISTORY_SOURCE_TYPES}
 {DB_CREATE_PRICE_HISTORY}
+{DB_CREATE_PRICE_HISTORY_BLOCKS}
 {DB_CREATE_BINANCE_PAIRS}
 {DB_CREATE_ADDRESS_BOOK}
 {DB_CREATE_CUSTOM_ASSET}
@@ -14,6 +14,7 @@ from .v2_v3 import migrate_to_v3
 from .v3_v4 import migrate_to_v4
 from .v4_v5 import migrate_to_v5
 from .v5_v6 import migrate_to_v6
+from .v6_v7 import migrate_to_v7
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -39,6 +40,10 @@ UPGRADES_LIST = [
         from_version=5,
         function=migrate_to_v6,
     ),
+    UpgradeRecord(
+        from_version=6,
+        function=migrate_to_v7,
+    ),
 ]
 
 
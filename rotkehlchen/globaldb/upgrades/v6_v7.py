@@ -0,0 +1,99 @@
+import logging
+from typing import TYPE_CHECKING
+
+from rotkehlchen.fval import FVal
+from rotkehlchen.globaldb.price_blocks import (
+    BLOCK_STORED_SOURCES_DB,
+    encode_price_block,
+    price_block_start,
+)
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.types import Price, Timestamp
+
+if TYPE_CHECKING:
+    from rotkehlchen.db.drivers.gevent import DBConnection, DBCursor
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+
+def _create_price_history_blocks_table(cursor: 'DBCursor') -> None:
+    log.debug('Enter _create_price_history_blocks_table')
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS price_history_blocks (
+            from_asset TEXT NOT NULL COLLATE NOCASE,
+            to_asset TEXT NOT NULL COLLATE NOCASE,
+            source_type CHAR(1) NOT NULL REFERENCES price_history_source_types(type),
+            block_start INTEGER NOT NULL,
+            first_timestamp INTEGER NOT NULL,
+            last_timestamp INTEGER NOT NULL,
+            prices BLOB NOT NULL,
+            FOREIGN KEY(from_asset) REFERENCES assets(identifier) ON UPDATE CASCADE ON DELETE CASCADE,
+            FOREIGN KEY(to_asset) REFERENCES assets(identifier) ON UPDATE CASCADE ON DELETE CASCADE,
+            PRIMARY KEY(from_asset, to_asset, source_type, block_start)
+        );
+        """,  # noqa: E501
+    )
+    log.debug('Exit _create_price_history_blocks_table')
+
+
+def _move_oracle_prices_to_blocks(cursor: 'DBCursor') -> None:
+    """Moves the prices queried from the oracles from price_history to price_history_blocks.
+    The rows are read in order so only one block is kept in memory at a time."""
+    log.debug('Enter _move_oracle_prices_to_blocks')
+    placeholders = ','.join('?' * len(BLOCK_STORED_SOURCES_DB))
+    select_cursor = cursor.connection.cursor()
+    select_cursor.execute(
+        f'SELECT from_asset, to_asset, source_type, timestamp, price FROM price_history '
+        f'WHERE source_type IN ({placeholders}) '
+        f'ORDER BY from_asset, to_asset, source_type, timestamp',
+        BLOCK_STORED_SOURCES_DB,
+    )
+    current_key: tuple[str, str, str, Timestamp] | None = None
+    points: list[tuple[Timestamp, Price]] = []
+
+    def write_block() -> None:
+        if current_key is None or len(points) == 0:
+            return
+        cursor.execute(
+            'INSERT OR REPLACE INTO price_history_blocks(from_asset, to_asset, source_type, '
+            'block_start, first_timestamp, last_timestamp, prices) VALUES(?, ?, ?, ?, ?, ?, ?)',
+            (
+                *current_key,
+                points[0][0],
+                points[-1][0],
+                encode_price_block(block_start=current_key[3], points=points),
+            ),
+        )
+
+    for from_asset, to_asset, source_type, timestamp, price in select_cursor:
+        key = (from_asset, to_asset, source_type, price_block_start(timestamp))
+        if key != current_key:
+            write_block()
+            current_key, points = key, []
+        try:
+            points.append((Timestamp(timestamp), Price(FVal(price))))
+        except ValueError:
+            log.error(f'Dropping invalid price {price} of {from_asset}->{to_asset} at {timestamp}')
+
+    write_block()
+    select_cursor.close()
+    cursor.execute(
+        f'DELETE FROM price_history WHERE source_type IN ({placeholders})',
+        BLOCK_STORED_SOURCES_DB,
+    )
+    log.debug('Exit _move_oracle_prices_to_blocks')
+
+
+def migrate_to_v7(connection: 'DBConnection') -> None:
+    """This globalDB upgrade does the following:
+    - Adds the `price_history_blocks` table.
+    - Moves the prices queried from the oracles from `price_history` to compressed blocks
+    in `price_history_blocks`. Manual prices stay in `price_history`.
+    """
+    log.debug('Entered globaldb v6->v7 upgrade')
+
+    with connection.write_ctx() as cursor:
+        _create_price_history_blocks_table(cursor)
+        _move_oracle_prices_to_blocks(cursor)
@@ -11,8 +11,10 @@ if TYPE_CHECKING:
 # Whenever you upgrade the global DB make sure to:
 # 1. Go to assets repo and tweak the min/max schema of the updates
 # 2. Tweak ASSETS_FILE_IMPORT_ACCEPTED_GLOBALDB_VERSIONS
-GLOBAL_DB_VERSION = 6
-ASSETS_FILE_IMPORT_ACCEPTED_GLOBALDB_VERSIONS = (3, GLOBAL_DB_VERSION)
+# 3. Regenerate the packaged global DB (rotkehlchen/data/global.db) at the new version.
+#    The assets reset refuses a packaged DB at another version, so this blocks a release.
+GLOBAL_DB_VERSION = 7
+ASSETS_FILE_IMPORT_ACCEPTED_GLOBALDB_VERSIONS = (3, 6, GLOBAL_DB_VERSION)
 MIN_SUPPORTED_GLOBAL_DB_VERSION = 2
 
 # Some functions that split the logic out of some GlobalDB query functions that are
@@ -28,6 +28,7 @@ if TYPE_CHECKING:
     from rotkehlchen.chain.aggregator import ChainsAggregator
     from rotkehlchen.db.dbhandler import DBHandler
     from rotkehlchen.db.drivers.gevent import DBCursor
+    from rotkehlchen.exchanges.exchange import ExchangeInterface
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -323,7 +324,8 @@ class HistoryQueryingManager:
             step = self._increase_progress(step, total_steps)
             self.processing_state_name = state_name
 
-        for exchange in self.exchange_manager.iterate_exchanges():
+        def query_exchange_history(exchange: 'ExchangeInterface') -> None:
+            nonlocal step
             self.processing_state_name = f'Querying {exchange.name} exchange history'
             exchange.query_history_with_callbacks(
                 # We need to have history of exchanges since before the range
@@ -335,6 +337,8 @@ class HistoryQueryingManager:
             # each exchange instance executes STEPS_PER_CEX steps out of the total_steps
             step = self._increase_progress(step, total_steps, step_by=STEPS_PER_CEX)
 
+        self.exchange_manager.query_exchanges(query_exchange_history)
+
         # Query all trades, asset movements and margin positions from the DB for all
         # possible locations.
         self.processing_state_name = 'Reading trades, asset movements and margin positions from the DB'  # noqa: E501
@@ -1,25 +1,33 @@
+import bisect
 import logging
-from collections.abc import Sequence
+from collections import defaultdict
+from collections.abc import Iterable, Sequence
 from contextlib import suppress
 from http import HTTPStatus
 from pathlib import Path
+from time import monotonic
 from typing import TYPE_CHECKING, Optional
 
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.constants import ONE
 from rotkehlchen.constants.assets import A_KFEE, A_USD
 from rotkehlchen.constants.prices import ZERO_PRICE
+from rotkehlchen.constants.timing import HOUR_IN_SECONDS
+from rotkehlchen.db.settings import CachedSettings
 from rotkehlchen.errors.asset import UnknownAsset, WrongAssetType
 from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.errors.price import NoPriceForGivenTimestamp, PriceQueryUnsupportedAsset
 from rotkehlchen.fval import FVal
+from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.globaldb.manual_price_oracles import ManualPriceOracle
 from rotkehlchen.inquirer import Inquirer
+from rotkehlchen.interfaces import HistoricalPriceRangeOracleInterface
 from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.oracles.telemetry import OracleQueryKind, OracleTelemetry
 from rotkehlchen.types import Price, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
 
-from .types import HistoricalPriceOracle, HistoricalPriceOracleInstance
+from .types import HistoricalPrice, HistoricalPriceOracle, HistoricalPriceOracleInstance
 
 if TYPE_CHECKING:
     from rotkehlchen.externalapis.coingecko import Coingecko
@@ -29,6 +37,9 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# How far a stored price can be from a timestamp to count as the price of that timestamp
+PREFETCH_MAX_SECONDS_DISTANCE = HOUR_IN_SECONDS
+
 
 def query_usd_price_or_use_default(
         asset: Asset,
@@ -74,6 +85,35 @@ def query_usd_price_zero_if_error(
     return usd_price
 
 
+def cluster_timestamps(
+        timestamps: Sequence[Timestamp],
+        max_range_seconds: int,
+) -> list[list[Timestamp]]:
+    """Splits the given sorted timestamps into consecutive clusters each of which
+    spans at most max_range_seconds"""
+    clusters: list[list[Timestamp]] = []
+    for timestamp in timestamps:
+        if len(clusters) != 0 and timestamp - clusters[-1][0] <= max_range_seconds:
+            clusters[-1].append(timestamp)
+        else:
+            clusters.append([timestamp])
+
+    return clusters
+
+
+def _has_price_near(
+        price_timestamps: Sequence[Timestamp],
+        timestamp: Timestamp,
+        max_seconds_distance: int,
+) -> bool:
+    """Checks if any of the sorted price_timestamps is close enough to timestamp"""
+    idx = bisect.bisect_left(price_timestamps, timestamp)
+    return any(
+        abs(price_timestamps[i] - timestamp) <= max_seconds_distance
+        for i in (idx - 1, idx) if 0 <= i < len(price_timestamps)
+    )
+
+
 class PriceHistorian:
     __instance: Optional['PriceHistorian'] = None
     _cryptocompare: 'Cryptocompare'
@@ -116,6 +156,116 @@ class PriceHistorian:
         instance._oracles = oracles
         instance._oracle_instances = [getattr(instance, f'_{oracle!s}') for oracle in oracles]
 
+    @staticmethod
+    def prefetch_historical_prices(
+            assets_timestamps: Iterable[tuple[Asset, Timestamp]],
+            to_asset: Asset,
+    ) -> None:
+        """Fetches and stores the historical prices of many assets and timestamps in bulk
+        so that querying them one by one afterwards is served from the DB.
+
+        The timestamps of each asset that have no price stored are split in clusters
+        spanning the longest range that an oracle can return in a single query. Each
+        cluster is then asked from the first oracle in the order that supports range
+        queries, moving to the next one for the timestamps it could not find. This
+        turns thousands of single price queries into a few range queries.
+
+        Assets with special price handling and fiat to fiat pairs are skipped since
+        they are not priced by the oracles.
+        """
+        instance = PriceHistorian()
+        assert instance._oracles is not None and instance._oracle_instances is not None, (
+            'PriceHistorian should never be called before setting the oracles'
+        )
+        range_oracles = [
+            (oracle, oracle_instance) for oracle, oracle_instance
+            in zip(instance._oracles, instance._oracle_instances, strict=True)
+            if isinstance(oracle_instance, HistoricalPriceRangeOracleInterface)
+        ]
+        if len(range_oracles) == 0:
+            return
+
+        timestamps_per_asset: defaultdict[Asset, set[Timestamp]] = defaultdict(set)
+        for asset, timestamp in assets_timestamps:
+            if asset not in (to_asset, A_KFEE):
+                timestamps_per_asset[asset].add(timestamp)
+
+        try:
+            to_asset_with_oracles = to_asset.resolve_to_asset_with_oracles()
+        except (UnknownAsset, WrongAssetType):
+            return
+
+        new_prices: list[HistoricalPrice] = []
+        for asset, asset_timestamps in timestamps_per_asset.items():
+            try:
+                from_asset = asset.resolve_to_asset_with_oracles()
+            except (UnknownAsset, WrongAssetType):
+                continue
+
+            if from_asset.is_fiat() and to_asset_with_oracles.is_fiat():
+                continue  # forex rates are queried separately
+
+            timestamps = sorted(asset_timestamps)
+            cached_prices = GlobalDBHandler().get_historical_prices(
+                query_data=[(from_asset, to_asset_with_oracles, x) for x in timestamps],
+                max_seconds_distance=PREFETCH_MAX_SECONDS_DISTANCE,
+                interpolation_max_gap=CachedSettings().historical_price_interpolation_max_gap,
+            )
+            remaining = [x for x, cached in zip(timestamps, cached_prices, strict=True) if cached is None]  # noqa: E501
+            for oracle, oracle_instance in range_oracles:
+                if len(remaining) == 0:
+                    break
+
+                not_found: list[Timestamp] = []
+                clusters = cluster_timestamps(remaining, oracle_instance.max_price_range_seconds)
+                for idx, cluster in enumerate(clusters):
+                    if oracle_instance.can_query_history(
+                        from_asset=from_asset,
+                        to_asset=to_asset_with_oracles,
+                        timestamp=cluster[0],
+                    ) is False:
+                        not_found.extend(x for rest in clusters[idx:] for x in rest)
+                        break
+
+                    try:
+                        prices = oracle_instance.query_historical_price_range(
+                            from_asset=from_asset,
+                            to_asset=to_asset_with_oracles,
+                            from_timestamp=cluster[0],
+                            to_timestamp=cluster[-1],
+                        )
+                    except (PriceQueryUnsupportedAsset, RemoteError) as e:
+                        log.debug(
+                            f'Could not query historical price range of {from_asset} -> '
+                            f'{to_asset_with_oracles} from {oracle} due to {e!s}',
+                        )
+                        not_found.extend(x for rest in clusters[idx:] for x in rest)
+                        break
+
+                    new_prices.extend(HistoricalPrice(
+                        from_asset=from_asset,
+                        to_asset=to_asset_with_oracles,
+                        source=oracle,
+                        timestamp=timestamp,
+                        price=price,
+                    ) for timestamp, price in prices)
+                    price_timestamps = [x[0] for x in prices]
+                    not_found.extend(x for x in cluster if not _has_price_near(
+                        price_timestamps=price_timestamps,
+                        timestamp=x,
+                        max_seconds_distance=PREFETCH_MAX_SECONDS_DISTANCE,
+                    ))
+
+                log.debug(
+                    f'Historical price oracle {oracle} found prices for '
+                    f'{len(remaining) - len(not_found)}/{len(remaining)} timestamps of '
+                    f'{from_asset} -> {to_asset_with_oracles}',
+                )
+                remaining = not_found
+
+        if len(new_prices) != 0:
+            GlobalDBHandler().add_historical_prices(entries=new_prices)
+
     @staticmethod
     def get_price_for_special_asset(
             from_asset: Asset,
@@ -212,7 +362,11 @@ class PriceHistorian:
             'PriceHistorian should never be called before setting the oracles'
         )
         rate_limited = False
-        for oracle, oracle_instance in zip(oracles, oracle_instances, strict=True):
+        for oracle, oracle_instance in OracleTelemetry().order_oracles(
+            kind=OracleQueryKind.HISTORICAL,
+            asset=from_asset,
+            oracles=zip(oracles, oracle_instances, strict=True),
+        ):
             can_query_history = oracle_instance.can_query_history(
                 from_asset=from_asset,
                 to_asset=to_asset,
@@ -221,6 +375,27 @@ class PriceHistorian:
             if can_query_history is False:
                 continue
 
+            if (price_entry := oracle_instance.query_cached_historical_price(
+                from_asset=from_asset,
+                to_asset=to_asset,
+                timestamp=timestamp,
+            )) is not None:
+                OracleTelemetry().record_cache_hit(
+                    kind=OracleQueryKind.HISTORICAL,
+                    oracle=oracle,
+                    asset=from_asset,
+                )
+                log.debug(
+                    f'Historical price oracle {oracle} got price from its stored prices',
+                    price=price_entry.price,
+                    interpolated=price_entry.interpolated,
+                    from_asset=from_asset,
+                    to_asset=to_asset,
+                    timestamp=timestamp,
+                )
+                return price_entry.price
+
+            start = monotonic()
             try:
                 price = oracle_instance.query_historical_price(
                     from_asset=from_asset,
@@ -232,16 +407,29 @@ class PriceHistorian:
                 NoPriceForGivenTimestamp,
                 UnknownAsset,
                 WrongAssetType,
-            ):
-                continue
-            except RemoteError as e:
+                RemoteError,
+            ) as e:
+                OracleTelemetry().record(
+                    kind=OracleQueryKind.HISTORICAL,
+                    oracle=oracle,
+                    asset=from_asset,
+                    seconds=monotonic() - start,
+                    failure=type(e).__name__,
+                )
                 # Raise the flag if any of the services was rate limited
-                rate_limited = (
-                    rate_limited is True or
+                rate_limited = rate_limited is True or (
+                    isinstance(e, RemoteError) and
                     e.error_code == HTTPStatus.TOO_MANY_REQUESTS
                 )
                 continue
 
+            OracleTelemetry().record(
+                kind=OracleQueryKind.HISTORICAL,
+                oracle=oracle,
+                asset=from_asset,
+                seconds=monotonic() - start,
+                failure=None,
+            )
             log.debug(
                 f'Historical price oracle {oracle} got price',
                 price=price,
@@ -44,11 +44,14 @@ class HistoricalPrice(NamedTuple):
     source: HistoricalPriceOracle
     timestamp: Timestamp
     price: Price
+    # True if the price is not stored but interpolated between the stored prices around it
+    interpolated: bool = False
 
     def __str__(self) -> str:
         return (
             f'Price entry {self.price!s} of {self.from_asset} -> {self.to_asset} '
             f'at {self.timestamp} from {self.source!s}'
+            f'{" (interpolated)" if self.interpolated else ""}'
         )
 
     def serialize_for_db(self) -> tuple[str, str, str, int, str]:
@@ -1,16 +1,17 @@
+import json
 import logging
 import operator
+import time
 from collections.abc import Iterable, Sequence
 from contextlib import suppress
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, NamedTuple, Optional, Union
 
-from rotkehlchen.assets.asset import Asset, EvmToken, FiatAsset, UnderlyingToken
+from rotkehlchen.assets.asset import Asset, AssetWithOracles, EvmToken, FiatAsset, UnderlyingToken
 from rotkehlchen.assets.utils import TokenEncounterInfo, get_or_create_evm_token
 from rotkehlchen.chain.ethereum.defi.price import handle_defi_price_query
-from rotkehlchen.chain.ethereum.utils import token_normalized_value_decimals
+from rotkehlchen.chain.ethereum.utils import MULTICALL_CHUNKS, token_normalized_value_decimals
 from rotkehlchen.chain.evm.contracts import EvmContract
-from rotkehlchen.chain.evm.types import string_to_evm_address
 from rotkehlchen.chain.evm.utils import lp_price_from_uniswaplike_pool_contract
 from rotkehlchen.constants import ONE, ZERO
 from rotkehlchen.constants.assets import (
@@ -61,6 +62,7 @@ from rotkehlchen.constants.misc import CURRENCYCONVERTER_API_KEY
 from rotkehlchen.constants.prices import ZERO_PRICE
 from rotkehlchen.constants.resolver import ethaddress_to_identifier
 from rotkehlchen.constants.timing import DAY_IN_SECONDS, MONTH_IN_SECONDS
+from rotkehlchen.db.settings import DEFAULT_CURRENT_PRICE_CACHE_SIZE, CachedSettings
 from rotkehlchen.errors.asset import UnknownAsset, WrongAssetType
 from rotkehlchen.errors.defi import DefiPoolError
 from rotkehlchen.errors.misc import (
@@ -77,12 +79,21 @@ from rotkehlchen.externalapis.xratescom import (
     get_historical_xratescom_exchange_rates,
 )
 from rotkehlchen.fval import FVal
-from rotkehlchen.globaldb.cache import globaldb_get_unique_cache_value, read_curve_pool_tokens
+from rotkehlchen.globaldb.cache import (
+    globaldb_delete_unique_cache_values,
+    globaldb_get_unique_cache_entries_like,
+    globaldb_set_unique_cache_value_at_ts,
+    read_curve_pools_data,
+)
 from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
-from rotkehlchen.interfaces import CurrentPriceOracleInterface
+from rotkehlchen.interfaces import (
+    CurrentPriceOracleInterface,
+    MultipleCurrentPricesOracleInterface,
+)
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.oracles.structures import CurrentPriceOracle
+from rotkehlchen.oracles.telemetry import NO_PRICE_FAILURE, OracleQueryKind, OracleTelemetry
 from rotkehlchen.serialization.deserialize import deserialize_evm_address
 from rotkehlchen.types import (
     CURVE_POOL_PROTOCOL,
@@ -90,13 +101,14 @@ from rotkehlchen.types import (
     YEARN_VAULTS_V2_PROTOCOL,
     CacheType,
     ChainID,
+    ChecksumEvmAddress,
     EvmTokenKind,
     Price,
     ProtocolsWithPriceLogic,
     Timestamp,
 )
 from rotkehlchen.utils.data_structures import LRUCacheWithRemove
-from rotkehlchen.utils.misc import timestamp_to_daystart_timestamp, ts_now
+from rotkehlchen.utils.misc import get_chunks, timestamp_to_daystart_timestamp, ts_now
 from rotkehlchen.utils.mixins.penalizable_oracle import PenalizablePriceOracleMixin
 from rotkehlchen.utils.network import request_get_dict
 
@@ -114,6 +126,9 @@ logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
 CURRENT_PRICE_CACHE_SECS = 300  # 5 mins
+# Expired usd prices older than this are not served even if serving stale prices is enabled
+STALE_CURRENT_PRICE_MAX_AGE = DAY_IN_SECONDS
+CURRENT_PRICES_PERSIST_FREQUENCY = 300  # seconds
 DEFAULT_RATE_LIMIT_WAITING_TIME = 60  # seconds
 BTC_PER_BSQ = FVal('0.00000100')
 
@@ -244,6 +259,11 @@ class Inquirer:
     __instance: Optional['Inquirer'] = None
     _cached_forex_data: dict
     _cached_current_price: LRUCacheWithRemove[tuple[Asset, Asset], CachedPriceEntry]
+    # assets whose expired usd price was served and should be refreshed in the background
+    _stale_prices_to_refresh: set[Asset]
+    # usd prices cached since the last time they were persisted in the globaldb
+    _usd_prices_to_persist: dict[Asset, CachedPriceEntry]
+    _usd_prices_last_persisted: float
     _data_directory: Path
     _cryptocompare: 'Cryptocompare'
     _coingecko: 'Coingecko'
@@ -289,7 +309,10 @@ class Inquirer:
         Inquirer._coingecko = coingecko
         Inquirer._defillama = defillama
         Inquirer._manualcurrent = manualcurrent
-        Inquirer._cached_current_price = LRUCacheWithRemove(maxsize=1024)
+        Inquirer._cached_current_price = LRUCacheWithRemove(maxsize=DEFAULT_CURRENT_PRICE_CACHE_SIZE)  # noqa: E501
+        Inquirer._stale_prices_to_refresh = set()
+        Inquirer._usd_prices_to_persist = {}
+        Inquirer._usd_prices_last_persisted = time.monotonic()
         Inquirer._evm_managers = {}
         Inquirer._msg_aggregator = msg_aggregator
         Inquirer.special_tokens = {
@@ -354,17 +377,112 @@ class Inquirer:
         Inquirer()._uniswapv2 = uniswap_v2
         Inquirer()._uniswapv3 = uniswap_v3
 
+    @staticmethod
+    def load_persisted_usd_prices() -> None:
+        """Loads in the in memory cache the most recent usd prices stored in the globaldb
+        by previous runs, so that the cache misses don't need to read the globaldb.
+
+        Only the prices that are recent enough to ever be served are loaded."""
+        cache_prefix = CacheType.CURRENT_PRICE.serialize()
+        with GlobalDBHandler().conn.read_ctx() as cursor:
+            entries = globaldb_get_unique_cache_entries_like(
+                cursor=cursor,
+                key_parts=(CacheType.CURRENT_PRICE,),
+                since_ts=Timestamp(ts_now() - STALE_CURRENT_PRICE_MAX_AGE),
+                limit=Inquirer._cached_current_price.maxsize,
+            )
+
+        for key, value, last_queried_ts in reversed(entries):  # most recent used last
+            try:
+                price, oracle = json.loads(value)
+                cached_price = CachedPriceEntry(
+                    price=Price(FVal(price)),
+                    time=last_queried_ts,
+                    oracle=CurrentPriceOracle.deserialize(oracle),
+                    used_main_currency=False,
+                )
+            except (json.JSONDecodeError, ValueError, TypeError, DeserializationError) as e:
+                log.error(f'Found invalid persisted usd price {value} for {key}: {e!s}')
+                continue
+
+            cache_key = (Asset(key.removeprefix(cache_prefix)), A_USD)
+            if (
+                    (current := Inquirer._cached_current_price.get(cache_key)) is None or
+                    current.time < cached_price.time
+            ):
+                Inquirer._cached_current_price.add(cache_key, cached_price)
+
+    @staticmethod
+    def should_persist_usd_prices() -> bool:
+        """Whether there are new usd prices and they were not persisted recently"""
+        return (
+            len(Inquirer._usd_prices_to_persist) != 0 and
+            time.monotonic() - Inquirer._usd_prices_last_persisted >= CURRENT_PRICES_PERSIST_FREQUENCY  # noqa: E501
+        )
+
+    @staticmethod
+    def persist_usd_prices() -> None:
+        """Stores the usd prices cached since the last call in the globaldb, in a single
+        transaction, so that they survive restarts. Zero prices are not stored since they
+        just denote that no oracle found a price."""
+        entries, Inquirer._usd_prices_to_persist = Inquirer._usd_prices_to_persist, {}
+        Inquirer._usd_prices_last_persisted = time.monotonic()
+        if len(entries := {k: v for k, v in entries.items() if v.price != ZERO_PRICE}) == 0:
+            return
+
+        with GlobalDBHandler().conn.write_ctx() as write_cursor:
+            for asset, entry in entries.items():
+                globaldb_set_unique_cache_value_at_ts(
+                    write_cursor=write_cursor,
+                    key_parts=(CacheType.CURRENT_PRICE, asset.identifier),
+                    value=json.dumps([str(entry.price), entry.oracle.serialize()]),
+                    timestamp=entry.time,
+                )
+
+    @staticmethod
+    def _delete_persisted_usd_prices(assets: Iterable[Asset]) -> None:
+        for asset in (assets_to_delete := list(assets)):
+            Inquirer._usd_prices_to_persist.pop(asset, None)
+
+        with GlobalDBHandler().conn.write_ctx() as write_cursor:
+            globaldb_delete_unique_cache_values(
+                write_cursor=write_cursor,
+                key_parts_list=[(CacheType.CURRENT_PRICE, x.identifier) for x in assets_to_delete],
+            )
+
     @staticmethod
     def get_cached_current_price_entry(
             cache_key: tuple[Asset, Asset],
             match_main_currency: bool,
     ) -> CachedPriceEntry | None:
+        """Returns the cached price for the pair if it's still valid.
+
+        If serving stale prices is enabled an expired usd price up to
+        STALE_CURRENT_PRICE_MAX_AGE old is still returned and the asset is queued to be
+        refreshed in the background.
+        """
         cache = Inquirer._cached_current_price.get(cache_key)
-        if cache is None or ts_now() - cache.time > CURRENT_PRICE_CACHE_SECS or cache.used_main_currency != match_main_currency:  # noqa: E501
+        if cache is None or cache.used_main_currency != match_main_currency:
             return None
 
+        if (age := ts_now() - cache.time) > CURRENT_PRICE_CACHE_SECS:
+            if (
+                    cache_key[1] != A_USD or age > STALE_CURRENT_PRICE_MAX_AGE or
+                    CachedSettings().serve_stale_current_prices is False
+            ):
+                return None
+
+            Inquirer._stale_prices_to_refresh.add(cache_key[0])
+
         return cache
 
+    @staticmethod
+    def pop_stale_prices_to_refresh() -> list[Asset]:
+        """Returns the assets whose stale usd price was served and resets the queue"""
+        assets = list(Inquirer._stale_prices_to_refresh)
+        Inquirer._stale_prices_to_refresh.clear()
+        return assets
+
     @staticmethod
     def remove_cache_prices_for_asset(pairs_to_invalidate: list[tuple[Asset, Asset]]) -> None:
         """Deletes all prices cache that contains any asset in the possible pairs."""
@@ -377,9 +495,29 @@ class Inquirer:
             if asset_pair[0] in assets_to_invalidate or asset_pair[1] in assets_to_invalidate:
                 Inquirer._cached_current_price.remove(asset_pair)
 
+        if A_USD in assets_to_invalidate:  # all usd prices are invalid
+            Inquirer._usd_prices_to_persist.clear()
+            with GlobalDBHandler().conn.write_ctx() as write_cursor:
+                write_cursor.execute(
+                    'DELETE FROM unique_cache WHERE key LIKE ?',
+                    (f'{CacheType.CURRENT_PRICE.serialize()}%',),
+                )
+        else:
+            Inquirer._delete_persisted_usd_prices(assets_to_invalidate)
+
     @staticmethod
     def remove_cached_current_price_entry(cache_key: tuple[Asset, Asset]) -> None:
         Inquirer._cached_current_price.remove(cache_key)
+        if cache_key[1] == A_USD:
+            Inquirer._delete_persisted_usd_prices([cache_key[0]])
+
+    @staticmethod
+    def set_cached_current_price_size(size: int) -> None:
+        """Sets the maximum number of entries of the in memory current price cache"""
+        cache = Inquirer._cached_current_price
+        cache.maxsize = size
+        while len(cache.cache) > size:
+            cache.cache.popitem(last=False)
 
     @staticmethod
     def set_oracles_order(oracles: Sequence[CurrentPriceOracle]) -> None:
@@ -398,10 +536,83 @@ class Inquirer:
 
     @staticmethod
     def set_cached_price(cache_key: tuple[Asset, Asset], cached_price: CachedPriceEntry) -> None:
-        """Save cached price for the key provided and all the assets in the same collection"""
+        """Save cached price for the key provided and all the assets in the same collection.
+        Usd prices are also queued to be persisted in the globaldb by persist_usd_prices."""
         related_assets = GlobalDBHandler().get_assets_in_same_collection(cache_key[0].identifier)
+        persist = cache_key[1] == A_USD and cached_price.used_main_currency is False
         for related_asset in related_assets:
             Inquirer._cached_current_price.add((related_asset, cache_key[1]), cached_price)
+            if persist:
+                Inquirer._usd_prices_to_persist[related_asset] = cached_price
+
+    @staticmethod
+    def _oracle_is_unavailable(oracle_instance: CurrentPriceOracleInstance) -> bool:
+        """Returns whether the oracle got rate limited recently or is penalized"""
+        return (
+            isinstance(oracle_instance, CurrentPriceOracleInterface) and
+            (
+                oracle_instance.rate_limited_in_last(DEFAULT_RATE_LIMIT_WAITING_TIME) is True or
+                isinstance(oracle_instance, PenalizablePriceOracleMixin) and oracle_instance.is_penalized() is True  # noqa: E501
+            )
+        )
+
+    @staticmethod
+    def _query_oracle_instance(
+            oracle: CurrentPriceOracle,
+            oracle_instance: CurrentPriceOracleInstance,
+            from_asset: Asset,
+            to_asset: Asset,
+            coming_from_latest_price: bool,
+            match_main_currency: bool,
+    ) -> tuple[Price, bool]:
+        """Queries a single oracle for the current price of from_asset in to_asset.
+
+        Returns ZERO_PRICE if the oracle failed to find a price. The errors are logged.
+        The query is recorded in the oracle telemetry.
+        """
+        start = time.monotonic()
+        try:
+            price, used_main_currency = oracle_instance.query_current_price(
+                from_asset=from_asset,  # type: ignore  # type is guaranteed by the caller
+                to_asset=to_asset,  # type: ignore  # type is guaranteed by the caller
+                match_main_currency=match_main_currency,
+            )
+        except (DefiPoolError, PriceQueryUnsupportedAsset, RemoteError) as e:
+            OracleTelemetry().record(
+                kind=OracleQueryKind.CURRENT,
+                oracle=oracle,
+                asset=from_asset,
+                seconds=time.monotonic() - start,
+                failure=type(e).__name__,
+            )
+            log.warning(
+                f'Current price oracle {oracle} failed to request {to_asset.identifier} '
+                f'price for {from_asset.identifier} due to: {e!s}.',
+            )
+        except RecursionError:
+            # We have to catch recursion error only at the top level since otherwise we get to
+            # recursion level MAX - 1, and after calling some other function may run into it again.  # noqa: E501
+            if coming_from_latest_price is True:
+                raise
+
+            # else
+            # Infinite loop can happen if user creates a loop of manual current prices
+            # (e.g. said that 1 BTC costs 2 ETH and 1 ETH costs 5 BTC).
+            Inquirer._msg_aggregator.add_warning(
+                f'Was not able to find price from {from_asset!s} to {to_asset!s} since your '
+                f'manual latest prices form a loop. For now, other oracles will be used.',
+            )
+        else:
+            OracleTelemetry().record(
+                kind=OracleQueryKind.CURRENT,
+                oracle=oracle,
+                asset=from_asset,
+                seconds=time.monotonic() - start,
+                failure=NO_PRICE_FAILURE if price == ZERO_PRICE else None,
+            )
+            return price, used_main_currency
+
+        return ZERO_PRICE, False
 
     @staticmethod
     def _query_oracle_instances(
@@ -441,43 +652,22 @@ class Inquirer:
         price = ZERO_PRICE
         oracle_queried = CurrentPriceOracle.BLOCKCHAIN
         used_main_currency = False
-        for oracle, oracle_instance in zip(oracles, oracle_instances, strict=True):
-            if (
-                isinstance(oracle_instance, CurrentPriceOracleInterface) and
-                (
-                    oracle_instance.rate_limited_in_last(DEFAULT_RATE_LIMIT_WAITING_TIME) is True or  # noqa: E501
-                    isinstance(oracle_instance, PenalizablePriceOracleMixin) and oracle_instance.is_penalized() is True  # noqa: E501
-                )
-            ):
-                continue
-
-            try:
-                price, used_main_currency = oracle_instance.query_current_price(
-                    from_asset=from_asset,  # type: ignore  # type is guaranteed by the if above
-                    to_asset=to_asset,  # type: ignore  # type is guaranteed by the if above
-                    match_main_currency=match_main_currency,
-                )
-            except (DefiPoolError, PriceQueryUnsupportedAsset, RemoteError) as e:
-                log.warning(
-                    f'Current price oracle {oracle} failed to request {to_asset.identifier} '
-                    f'price for {from_asset.identifier} due to: {e!s}.',
-                )
-                continue
-            except RecursionError:
-                # We have to catch recursion error only at the top level since otherwise we get to
-                # recursion level MAX - 1, and after calling some other function may run into it again.  # noqa: E501
-                if coming_from_latest_price is True:
-                    raise
-
-                # else
-                # Infinite loop can happen if user creates a loop of manual current prices
-                # (e.g. said that 1 BTC costs 2 ETH and 1 ETH costs 5 BTC).
-                instance._msg_aggregator.add_warning(
-                    f'Was not able to find price from {from_asset!s} to {to_asset!s} since your '
-                    f'manual latest prices form a loop. For now, other oracles will be used.',
-                )
+        for oracle, oracle_instance in OracleTelemetry().order_oracles(
+            kind=OracleQueryKind.CURRENT,
+            asset=from_asset,
+            oracles=zip(oracles, oracle_instances, strict=True),
+        ):
+            if Inquirer._oracle_is_unavailable(oracle_instance):
                 continue
 
+            price, used_main_currency = Inquirer._query_oracle_instance(
+                oracle=oracle,
+                oracle_instance=oracle_instance,
+                from_asset=from_asset,
+                to_asset=to_asset,
+                coming_from_latest_price=coming_from_latest_price,
+                match_main_currency=match_main_currency,
+            )
             if price != ZERO_PRICE:
                 oracle_queried = oracle
                 log.debug(
@@ -499,6 +689,118 @@ class Inquirer:
         )
         return price, oracle_queried, used_main_currency
 
+    @staticmethod
+    def _query_oracle_instances_for_assets(
+            assets: Sequence[AssetWithOracles],
+            skip_onchain: bool,
+    ) -> dict[AssetWithOracles, Price]:
+        """Query the usd price of many assets from the oracle instances.
+
+        Goes through the oracles in order and asks each one for the prices of the
+        assets the previous oracles could not find. Oracles that support it are queried
+        for all the remaining assets at once. With the adaptive_oracle_order setting the
+        assets are grouped by the order of the oracles for their asset class. All queried
+        prices are cached and assets for which no oracle found a price get ZERO_PRICE.
+        """
+        instance = Inquirer()
+        assert (
+            instance._oracles is not None and
+            instance._oracle_instances is not None and
+            instance._oracles_not_onchain is not None and
+            instance._oracle_instances_not_onchain is not None
+        ), (
+            'Inquirer should never be called before setting the oracles'
+        )
+        if skip_onchain:
+            oracles = instance._oracles_not_onchain
+            oracle_instances = instance._oracle_instances_not_onchain
+        else:
+            oracles = instance._oracles
+            oracle_instances = instance._oracle_instances
+
+        prices: dict[AssetWithOracles, Price] = {}
+        oracles_queried: dict[AssetWithOracles, CurrentPriceOracle] = {}
+        for ordered_oracles, group_assets in OracleTelemetry().group_by_oracles_order(
+            kind=OracleQueryKind.CURRENT,
+            assets=assets,
+            oracles=zip(oracles, oracle_instances, strict=True),
+        ):
+            remaining_assets = group_assets
+            for oracle, oracle_instance in ordered_oracles:
+                if len(remaining_assets) == 0:
+                    break
+
+                if Inquirer._oracle_is_unavailable(oracle_instance):
+                    continue
+
+                oracle_prices: dict[AssetWithOracles, Price] = {}
+                if isinstance(oracle_instance, MultipleCurrentPricesOracleInterface):
+                    start = time.monotonic()
+                    try:
+                        oracle_prices = oracle_instance.query_multiple_current_prices(
+                            from_assets=remaining_assets,
+                            to_asset=Inquirer.usd,
+                        )
+                    except RemoteError as e:
+                        failure: str | None = type(e).__name__
+                        log.warning(
+                            f'Current price oracle {oracle} failed to request usd prices '
+                            f'for {len(remaining_assets)} assets due to: {e!s}.',
+                        )
+                    else:
+                        failure = None
+
+                    # the time of the single query is split evenly among the assets
+                    seconds = (time.monotonic() - start) / len(remaining_assets)
+                    for asset in remaining_assets:
+                        asset_failure = failure
+                        if failure is None and oracle_prices.get(asset, ZERO_PRICE) == ZERO_PRICE:
+                            asset_failure = NO_PRICE_FAILURE
+                        OracleTelemetry().record(
+                            kind=OracleQueryKind.CURRENT,
+                            oracle=oracle,
+                            asset=asset,
+                            seconds=seconds,
+                            failure=asset_failure,
+                        )
+                    if failure is not None:
+                        continue
+                else:
+                    for asset in remaining_assets:
+                        if Inquirer._oracle_is_unavailable(oracle_instance):
+                            break
+
+                        oracle_prices[asset], _ = Inquirer._query_oracle_instance(
+                            oracle=oracle,
+                            oracle_instance=oracle_instance,
+                            from_asset=asset,
+                            to_asset=Inquirer.usd,
+                            coming_from_latest_price=False,
+                            match_main_currency=False,
+                        )
+
+                for asset, price in oracle_prices.items():
+                    if price != ZERO_PRICE:
+                        prices[asset] = price
+                        oracles_queried[asset] = oracle
+
+                log.debug(f'Current price oracle {oracle} got usd prices for {len(oracle_prices)} assets')  # noqa: E501
+                remaining_assets = [x for x in remaining_assets if x not in prices]
+
+        now = ts_now()
+        for asset in assets:
+            Inquirer.set_cached_price(
+                cache_key=(asset, A_USD),
+                cached_price=CachedPriceEntry(
+                    price=prices.get(asset, ZERO_PRICE),
+                    time=now,
+                    oracle=oracles_queried.get(asset, CurrentPriceOracle.BLOCKCHAIN),
+                    used_main_currency=False,
+                ),
+            )
+
+        return prices
+
     @staticmethod
     def _find_price(
             from_asset: Asset,
@@ -619,6 +921,142 @@ class Inquirer:
             match_main_currency=match_main_currency,
         )
 
+    @staticmethod
+    def find_usd_prices(
+            assets: Iterable[Asset],
+            ignore_cache: bool = False,
+            skip_onchain: bool = False,
+    ) -> dict[Asset, Price]:
+        """Returns the current usd price of each of the given assets.
+
+        Works like find_usd_price but the assets that are priced by the oracles are
+        queried together, so that batch capable oracles need only a few requests to
+        price many assets. Curve and yearn vault v2 LP tokens are also priced together
+        with a few multicalls. Other assets with their own pricing logic, such as fiat or
+        tokens with underlying tokens, fall back to find_usd_price.
+
+        Returns ZERO_PRICE for the assets whose price could not be found.
+        """
+        prices: dict[Asset, Price] = {}
+        oracle_assets: dict[AssetWithOracles, Asset] = {}
+        lp_tokens: dict[EvmToken, Asset] = {}
+        for asset in assets:
+            if asset in prices:
+                continue
+
+            if asset == A_USD:
+                prices[asset] = Price(ONE)
+                continue
+
+            if ignore_cache is False:
+                cache = Inquirer.get_cached_current_price_entry(cache_key=(asset, A_USD), match_main_currency=False)  # noqa: E501
+                if cache is not None:
+                    prices[asset] = cache.price
+                    continue
+
+            if (lp_token := Inquirer._resolve_batch_priced_lp_token(asset)) is not None:
+                lp_tokens[lp_token] = asset
+            elif (oracle_asset := Inquirer._resolve_oracle_priced_asset(asset)) is None:
+                prices[asset] = Inquirer.find_usd_price(
+                    asset=asset,
+                    ignore_cache=ignore_cache,
+                    skip_onchain=skip_onchain,
+                )
+            else:
+                oracle_assets[oracle_asset] = asset
+
+        if len(lp_tokens) != 0:
+            lp_token_prices = Inquirer._find_lp_token_prices(list(lp_tokens))
+            for lp_token, asset in lp_tokens.items():
+                if (price := lp_token_prices.get(lp_token)) is None:
+                    # on-chain query failed. Let find_usd_price continue to the oracles
+                    price = Inquirer.find_usd_price(
+                        asset=asset,
+                        ignore_cache=ignore_cache,
+                        skip_onchain=skip_onchain,
+                    )
+                prices[asset] = price
+
+        if len(oracle_assets) != 0:
+            oracle_prices = Inquirer._query_oracle_instances_for_assets(
+                assets=list(oracle_assets),
+                skip_onchain=skip_onchain,
+            )
+            for oracle_asset, asset in oracle_assets.items():
+                prices[asset] = oracle_prices.get(oracle_asset, ZERO_PRICE)
+
+        return prices
+
+    @staticmethod
+    def _resolve_batch_priced_lp_token(asset: Asset) -> EvmToken | None:
+        """Returns the resolved token if it's a curve or yearn vault v2 LP token that
+        can be priced together with others by _find_lp_token_prices"""
+        try:
+            resolved_asset = asset.resolve()
+        except UnknownAsset:
+            return None
+
+        if (
+            isinstance(resolved_asset, EvmToken) and
+            resolved_asset.chain_id == ChainID.ETHEREUM and
+            resolved_asset.protocol in (CURVE_POOL_PROTOCOL, YEARN_VAULTS_V2_PROTOCOL) and
+            resolved_asset.identifier not in Inquirer.special_tokens and
+            resolved_asset not in ASSETS_UNDERLYING_BTC
+        ):
+            return resolved_asset
+
+        return None
+
+    @staticmethod
+    def _find_lp_token_prices(lp_tokens: list[EvmToken]) -> dict[EvmToken, Price]:
+        """Prices all the given curve and yearn vault v2 LP tokens with one batch per
+        protocol and caches the found prices. Tokens whose price could not be found
+        are omitted."""
+        instance = Inquirer()
+        prices = instance.find_curve_pool_prices(
+            [x for x in lp_tokens if x.protocol == CURVE_POOL_PROTOCOL],
+        ) | instance.find_yearn_prices(
+            [x for x in lp_tokens if x.protocol == YEARN_VAULTS_V2_PROTOCOL],
+        )
+        now = ts_now()
+        for lp_token, price in prices.items():
+            Inquirer.set_cached_price(
+                cache_key=(lp_token, A_USD),
+                cached_price=CachedPriceEntry(
+                    price=price,
+                    time=now,
+                    oracle=CurrentPriceOracle.BLOCKCHAIN,
+                    used_main_currency=False,
+                ),
+            )
+
+        log.debug(f'Found the on-chain price of {len(prices)} out of {len(lp_tokens)} LP tokens')
+        return prices
+
+    @staticmethod
+    def _resolve_oracle_priced_asset(asset: Asset) -> AssetWithOracles | None:
+        """Returns the resolved asset if its usd price is found only by querying the
+        oracles, or None if _find_usd_price has some special logic for it"""
+        if asset in (A_BSQ, A_KFEE):
+            return None
+
+        try:
+            resolved_asset = asset.resolve()
+        except UnknownAsset:
+            return None
+
+        if isinstance(resolved_asset, FiatAsset) or not isinstance(resolved_asset, AssetWithOracles):  # noqa: E501
+            return None
+
+        if isinstance(resolved_asset, EvmToken) and (
+            resolved_asset.identifier in Inquirer.special_tokens or
+            resolved_asset.protocol in ProtocolsWithPriceLogic or
+            resolved_asset.underlying_tokens is not None
+        ):
+            return None
+
+        return resolved_asset
+
     @staticmethod
     def _find_usd_price(
             asset: Asset,
@@ -760,70 +1198,110 @@ class Inquirer:
             self,
             lp_token: EvmToken,
     ) -> Price | None:
+        """Returns the price of 1 LP token from the curve pool of the given lp token"""
+        return self.find_curve_pool_prices([lp_token]).get(lp_token)
+
+    def find_curve_pool_prices(
+            self,
+            lp_tokens: Sequence[EvmToken],
+    ) -> dict[EvmToken, Price]:
         """
-        1. Obtain the pool for this token
-        2. Obtain prices for assets in pool
+        1. Obtain the pool and pool tokens of all the lp tokens with one globaldb read
+        2. Obtain prices for all the assets in the pools
         3. Obtain the virtual price for share and the balances of each
-        token in the pool
-        4. Calc the price for a share
+        token in each pool with one multicall
+        4. Calc the price for a share of each pool
 
-        Returns the price of 1 LP token from the pool
+        Returns the price of 1 LP token of each pool. LP tokens whose price could not
+        be calculated are omitted.
         """
+        if len(lp_tokens) == 0:
+            return {}
+
         ethereum = self.get_evm_manager(chain_id=ChainID.ETHEREUM)
         ethereum.assure_curve_cache_is_queried_and_decoder_updated()  # type:ignore  # ethereum is an EthereumManager here
 
         with GlobalDBHandler().conn.read_ctx() as cursor:
-            pool_address_in_cache = globaldb_get_unique_cache_value(
+            pools_data = read_curve_pools_data(
                 cursor=cursor,
-                key_parts=(CacheType.CURVE_POOL_ADDRESS, lp_token.evm_address),
+                lp_tokens=[lp_token.evm_address for lp_token in lp_tokens],
             )
-            if pool_address_in_cache is None:
-                return None
-            # pool address is guaranteed to be checksumed due to how we save it
-            pool_address = string_to_evm_address(pool_address_in_cache)
-            pool_tokens_addresses = read_curve_pool_tokens(cursor=cursor, pool_address=pool_address)  # noqa: E501
 
-        tokens: list[EvmToken] = []
-        # Translate addresses to tokens
-        try:
-            for token_address_str in pool_tokens_addresses:
-                token_address = string_to_evm_address(token_address_str)
-                if token_address == '0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE':
-                    tokens.append(self.weth)
-                else:
-                    token_identifier = ethaddress_to_identifier(token_address)
-                    tokens.append(EvmToken(token_identifier))
-        except UnknownAsset:
-            return None
+        pools: dict[EvmToken, tuple[ChecksumEvmAddress, list[EvmToken]]] = {}
+        for lp_token in lp_tokens:
+            if (pool_data := pools_data.get(lp_token.evm_address)) is None:
+                continue
+
+            pool_address, pool_tokens_addresses = pool_data
+            tokens: list[EvmToken] = []
+            # Translate addresses to tokens
+            try:
+                for token_address in pool_tokens_addresses:
+                    if token_address == '0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE':
+                        tokens.append(self.weth)
+                    else:
+                        token_identifier = ethaddress_to_identifier(token_address)
+                        tokens.append(EvmToken(token_identifier))
+            except UnknownAsset:
+                continue
+
+            pools[lp_token] = (pool_address, tokens)
 
-        # Get price for each token in the pool
-        prices = []
-        for token in tokens:
-            price = self.find_usd_price(token)
-            if price == ZERO_PRICE:
+        # Get price for each token in all the pools
+        token_prices = self.find_usd_prices(
+            assets={token for _, tokens in pools.values() for token in tokens},
+        )
+        # Query virtual price of LP share and balances in the pool for each token of each pool
+        calls: list[tuple[ChecksumEvmAddress, str]] = []
+        pool_calls: dict[EvmToken, tuple[EvmContract, list[EvmToken], int]] = {}
+        curve_pool_abi = ethereum.node_inquirer.contracts.abi('CURVE_POOL')
+        for lp_token, (pool_address, tokens) in pools.items():
+            if len(missing_prices := [x for x in tokens if token_prices[x] == ZERO_PRICE]) != 0:
                 log.error(
                     f'Could not calculate price for {lp_token} due to inability to '
-                    f'fetch price for {token}.',
+                    f'fetch price for {missing_prices[0]}.',
                 )
-                return None
-            prices.append(price)
+                continue
 
-        # Query virtual price of LP share and balances in the pool for each token
-        contract = EvmContract(
-            address=pool_address,
-            abi=ethereum.node_inquirer.contracts.abi('CURVE_POOL'),
-            deployed_block=0,
-        )
-        calls = [(pool_address, contract.encode(method_name='get_virtual_price'))]
-        calls += [
-            (pool_address, contract.encode(method_name='balances', arguments=[i]))
-            for i in range(len(tokens))
-        ]
-        output = ethereum.node_inquirer.multicall_2(
-            require_success=False,
-            calls=calls,
-        )
+            contract = EvmContract(address=pool_address, abi=curve_pool_abi, deployed_block=0)
+            pool_calls[lp_token] = (contract, tokens, len(calls))
+            calls.append((pool_address, contract.encode(method_name='get_virtual_price')))
+            calls.extend(
+                (pool_address, contract.encode(method_name='balances', arguments=[i]))
+                for i in range(len(tokens))
+            )
 
+        output = []
+        for calls_chunk in get_chunks(calls, n=MULTICALL_CHUNKS):
+            output.extend(ethereum.node_inquirer.multicall_2(
+                require_success=False,
+                calls=calls_chunk,
+            ))
+
+        prices = {}
+        for lp_token, (contract, tokens, idx) in pool_calls.items():
+            price = self._calculate_curve_pool_price(
+                lp_token=lp_token,
+                contract=contract,
+                prices=[token_prices[token] for token in tokens],
+                tokens=tokens,
+                output=output[idx:idx + len(tokens) + 1],
+            )
+            if price is not None:
+                prices[lp_token] = price
+
+        return prices
+
+    @staticmethod
+    def _calculate_curve_pool_price(
+            lp_token: EvmToken,
+            contract: EvmContract,
+            prices: list[Price],
+            tokens: list[EvmToken],
+            output: list[tuple[bool, bytes]],
+    ) -> Price | None:
+        """Calculates the price of 1 LP token of a curve pool from the prices of the pool
+        tokens and the output of the get_virtual_price and balances calls of the pool"""
         # Check that the output has the correct structure
         if not all(len(call_result) == 2 for call_result in output):
             log.debug(
@@ -881,75 +1359,123 @@ class Inquirer:
         Query price for a yearn vault v2 token using the pricePerShare method
         and the price of the underlying token.
         """
+        return self.find_yearn_prices([token]).get(token)
+
+    def find_yearn_prices(
+            self,
+            tokens: Sequence[EvmToken],
+    ) -> dict[EvmToken, Price]:
+        """
+        Query prices for many yearn vault v2 tokens using the pricePerShare method
+        of all the vaults in one multicall and the price of the underlying tokens.
+        Vaults whose price could not be queried are omitted.
+        """
+        if len(tokens) == 0:
+            return {}
+
         ethereum = self.get_evm_manager(chain_id=ChainID.ETHEREUM)
         globaldb = GlobalDBHandler()
         with globaldb.conn.read_ctx() as cursor:
-            maybe_underlying_tokens = globaldb.fetch_underlying_tokens(cursor, ethaddress_to_identifier(token.evm_address))  # noqa: E501
+            stored_underlying_tokens = {
+                token: globaldb.fetch_underlying_tokens(cursor, ethaddress_to_identifier(token.evm_address))  # noqa: E501
+                for token in tokens
+            }
+
+        underlying_tokens: dict[EvmToken, EvmToken] = {}
+        for token, maybe_underlying_tokens in stored_underlying_tokens.items():
+            if maybe_underlying_tokens is None or len(maybe_underlying_tokens) != 1:
+                # underlying token not recorded in the DB. Ask the chain
+                if (underlying_token := self._query_yearn_underlying_token(token)) is None:
+                    continue
+                underlying_tokens[token] = underlying_token
+            else:
+                underlying_tokens[token] = EvmToken(ethaddress_to_identifier(maybe_underlying_tokens[0].address))  # noqa: E501
 
-        contract = EvmContract(
+        if len(underlying_tokens) == 0:
+            return {}
+
+        underlying_token_prices = self.find_usd_prices(assets=set(underlying_tokens.values()))
+        # Get the price per share from the yearn contracts
+        contracts = [EvmContract(
             address=token.evm_address,
             abi=ethereum.node_inquirer.contracts.abi('YEARN_VAULT_V2'),
             deployed_block=0,
-        )
-        if maybe_underlying_tokens is None or len(maybe_underlying_tokens) != 1:
-            # underlying token not recorded in the DB. Ask the chain
-            try:
-                remote_underlying_token = contract.call(ethereum.node_inquirer, 'token')
-            except (RemoteError, BlockchainQueryError) as e:
-                log.error(f'Failed to query underlying token method in Yearn v2 Vault. {e!s}')
-                return None
+        ) for token in underlying_tokens]
+        output = []
+        try:
+            for contracts_chunk in get_chunks(contracts, n=MULTICALL_CHUNKS):
+                output.extend(ethereum.node_inquirer.multicall_2(
+                    require_success=False,
+                    calls=[(x.address, x.encode(method_name='pricePerShare')) for x in contracts_chunk],  # noqa: E501
+                ))
+        except (RemoteError, BlockchainQueryError) as e:
+            log.error(f'Failed to query pricePerShare method in Yearn v2 Vaults. {e!s}')
+            return {}
 
-            try:
-                underlying_token_address = deserialize_evm_address(remote_underlying_token)
-            except DeserializationError:
-                log.error(f'underlying token call of {token.evm_address} returned invalid address {remote_underlying_token}')  # noqa: E501
-                return None
+        prices = {}
+        for (token, underlying_token), contract, (success, result) in zip(underlying_tokens.items(), contracts, output, strict=True):  # noqa: E501
+            if success is False:
+                log.error(f'Failed to query pricePerShare method in Yearn v2 Vault {token.evm_address}')  # noqa: E501
+                continue
 
-            try:  # make sure it's in the global DB
-                underlying_token = get_or_create_evm_token(
-                    userdb=ethereum.node_inquirer.database,
-                    evm_address=underlying_token_address,
-                    chain_id=ChainID.ETHEREUM,
-                    encounter=TokenEncounterInfo(
-                        description='Detecting Yearn vault underlying tokens',
-                    ),
-                )
-            except NotERC20Conformant as e:
-                log.error(
-                    f'Error fetching ethereum token {underlying_token_address} while '
-                    f'detecting underlying tokens of {token.evm_address!s}: {e!s}',
-                )
-            # store it in the DB, so next time no need to query chain
-            with globaldb.conn.write_ctx() as write_cursor:
-                globaldb._add_underlying_tokens(
-                    write_cursor=write_cursor,
-                    parent_token_identifier=token.identifier,
-                    underlying_tokens=[
-                        UnderlyingToken(
-                            address=underlying_token_address,
-                            token_kind=EvmTokenKind.ERC20,  # this may be a guess here
-                            weight=ONE,  # all yearn vaults have single underlying
-                        )],
-                    chain_id=ChainID.ETHEREUM,
-                )
-        else:
-            underlying_token = EvmToken(ethaddress_to_identifier(maybe_underlying_tokens[0].address))  # noqa: E501
+            price_per_share = contract.decode(result, 'pricePerShare')[0]
+            prices[token] = Price(price_per_share * underlying_token_prices[underlying_token] / 10 ** token.get_decimals())  # noqa: E501
 
-        underlying_token_price = self.find_usd_price(underlying_token)
-        # Get the price per share from the yearn contract
+        return prices
+
+    def _query_yearn_underlying_token(self, token: EvmToken) -> EvmToken | None:
+        """Queries the underlying token of a yearn vault v2 from the chain and stores it
+        in the globaldb, so next time there is no need to query the chain"""
+        ethereum = self.get_evm_manager(chain_id=ChainID.ETHEREUM)
         contract = EvmContract(
             address=token.evm_address,
             abi=ethereum.node_inquirer.contracts.abi('YEARN_VAULT_V2'),
             deployed_block=0,
         )
         try:
-            price_per_share = contract.call(ethereum.node_inquirer, 'pricePerShare')
+            remote_underlying_token = contract.call(ethereum.node_inquirer, 'token')
         except (RemoteError, BlockchainQueryError) as e:
-            log.error(f'Failed to query pricePerShare method in Yearn v2 Vault. {e!s}')
-        else:
-            return Price(price_per_share * underlying_token_price / 10 ** token.get_decimals())
+            log.error(f'Failed to query underlying token method in Yearn v2 Vault. {e!s}')
+            return None
 
-        return None
+        try:
+            underlying_token_address = deserialize_evm_address(remote_underlying_token)
+        except DeserializationError:
+            log.error(f'underlying token call of {token.evm_address} returned invalid address {remote_underlying_token}')  # noqa: E501
+            return None
+
+        try:  # make sure it's in the global DB
+            underlying_token = get_or_create_evm_token(
+                userdb=ethereum.node_inquirer.database,
+                evm_address=underlying_token_address,
+                chain_id=ChainID.ETHEREUM,
+                encounter=TokenEncounterInfo(
+                    description='Detecting Yearn vault underlying tokens',
+                ),
+            )
+        except NotERC20Conformant as e:
+            log.error(
+                f'Error fetching ethereum token {underlying_token_address} while '
+                f'detecting underlying tokens of {token.evm_address!s}: {e!s}',
+            )
+            return None
+
+        # store it in the DB, so next time no need to query chain
+        globaldb = GlobalDBHandler()
+        with globaldb.conn.write_ctx() as write_cursor:
+            globaldb._add_underlying_tokens(
+                write_cursor=write_cursor,
+                parent_token_identifier=token.identifier,
+                underlying_tokens=[
+                    UnderlyingToken(
+                        address=underlying_token_address,
+                        token_kind=EvmTokenKind.ERC20,  # this may be a guess here
+                        weight=ONE,  # all yearn vaults have single underlying
+                    )],
+                chain_id=ChainID.ETHEREUM,
+            )
+
+        return underlying_token
 
     @staticmethod
     def get_fiat_usd_exchange_rates(currencies: Iterable[FiatAsset]) -> dict[FiatAsset, Price]:
@@ -1,9 +1,13 @@
 import abc
-from typing import Any
+from collections.abc import Sequence
+from typing import TYPE_CHECKING, Any, Optional
 
 from rotkehlchen.assets.asset import Asset, AssetWithOracles
 from rotkehlchen.types import Price, Timestamp
 
+if TYPE_CHECKING:
+    from rotkehlchen.history.types import HistoricalPrice
+
 
 class CurrentPriceOracleInterface(metaclass=abc.ABCMeta):
     """
@@ -66,6 +70,17 @@ class HistoricalPriceOracleInterface(CurrentPriceOracleInterface):
         - RemoteError
         """
 
+    def query_cached_historical_price(
+            self,
+            from_asset: Asset,  # pylint: disable=unused-argument
+            to_asset: Asset,  # pylint: disable=unused-argument
+            timestamp: Timestamp,  # pylint: disable=unused-argument
+    ) -> Optional['HistoricalPrice']:
+        """Returns the price entry that query_historical_price would get from the prices of
+        the oracle stored in the globaldb, or None if it would have to query the oracle.
+        Oracles that don't store their prices always return None."""
+        return None
+
     @abc.abstractmethod
     def all_coins(self) -> dict[str, dict[str, Any]]:
         """Historical price oracles (coingecko, cryptocompare) implement this
@@ -74,3 +89,46 @@ class HistoricalPriceOracleInterface(CurrentPriceOracleInterface):
         May raise
         - RemoteError
         """
+
+
+class MultipleCurrentPricesOracleInterface(metaclass=abc.ABCMeta):
+    """Interface for current price oracles able to query the prices of many assets at once"""
+
+    @abc.abstractmethod
+    def query_multiple_current_prices(
+            self,
+            from_assets: Sequence[AssetWithOracles],
+            to_asset: AssetWithOracles,
+    ) -> dict[AssetWithOracles, Price]:
+        """Returns the price of each of from_assets in to_asset at the current timestamp.
+
+        Assets not supported by the oracle or for which no price was found are omitted
+        from the result. Never tries to match the main currency.
+
+        May raise:
+        - RemoteError
+        """
+
+
+class HistoricalPriceRangeOracleInterface(metaclass=abc.ABCMeta):
+    """Interface for historical price oracles able to query the prices of a time range at once"""
+
+    # The longest time range that a single range query can cover
+    max_price_range_seconds: int
+
+    @abc.abstractmethod
+    def query_historical_price_range(
+            self,
+            from_asset: AssetWithOracles,
+            to_asset: AssetWithOracles,
+            from_timestamp: Timestamp,
+            to_timestamp: Timestamp,
+    ) -> list[tuple[Timestamp, Price]]:
+        """Returns the prices of from_asset in to_asset found between the given timestamps
+        ordered by timestamp. The range should not exceed max_price_range_seconds. Zero
+        prices are omitted and nothing is stored in the DB.
+
+        May raise:
+        - PriceQueryUnsupportedAsset
+        - RemoteError
+        """
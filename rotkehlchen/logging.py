@@ -11,6 +11,8 @@ from rotkehlchen.greenlets.utils import get_greenlet_name
 from rotkehlchen.utils.misc import is_production, timestamp_to_date, ts_now
 
 PYWSGI_RE = re.compile(r'\[(.*)\] ')
+LOG_FORMAT = '[%(asctime)s] %(levelname)s %(name)s %(message)s'
+LOG_DATE_FORMAT = '%d/%m/%Y %H:%M:%S %Z'
 
 TRACE = logging.DEBUG - 5
 
@@ -129,8 +131,8 @@ def configure_logging(args: argparse.Namespace) -> None:
     loglevel = args.loglevel.upper()
     formatters = {
         'default': {
-            'format': '[%(asctime)s] %(levelname)s %(name)s %(message)s',
-            'datefmt': '%d/%m/%Y %H:%M:%S %Z',
+            'format': LOG_FORMAT,
+            'datefmt': LOG_DATE_FORMAT,
         },
     }
     handlers = {
@@ -206,3 +208,30 @@ def configure_logging(args: argparse.Namespace) -> None:
         logging.getLogger('substrateinterface.base').setLevel(logging.CRITICAL)
         logging.getLogger('eth_hash').setLevel(logging.CRITICAL)
         logging.getLogger('vcr').setLevel(logging.CRITICAL)
+
+
+def get_logfile() -> Path | None:
+    """Returns the file the root logger writes to or None if it does not log to a file"""
+    for handler in logging.getLogger().handlers:
+        if isinstance(handler, logging.FileHandler):
+            return Path(handler.baseFilename)
+
+    return None
+
+
+def configure_worker_process_logging(loglevel: int, logfile: Path | None) -> None:
+    """Configures the logging of a worker process spawned by the main process. It logs at
+    the same level and to the same file, without rotating it, or to stderr if there is
+    no file."""
+    if not hasattr(logging, 'TRACE'):
+        add_logging_level('TRACE', TRACE)
+    logging.basicConfig(
+        level=loglevel,
+        format=LOG_FORMAT,
+        datefmt=LOG_DATE_FORMAT,
+        filename=logfile,
+        encoding='utf-8' if logfile is not None else None,
+        force=True,
+    )
+    for name in ('urllib3', 'urllib3.connectionpool', 'eth_hash'):
+        logging.getLogger(name).setLevel(logging.CRITICAL)
@@ -0,0 +1,328 @@
+import json
+import logging
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from typing import Any, Optional, TypeVar
+
+from rotkehlchen.assets.asset import Asset
+from rotkehlchen.db.settings import CachedSettings
+from rotkehlchen.errors.asset import UnknownAsset
+from rotkehlchen.errors.serialization import DeserializationError
+from rotkehlchen.globaldb.cache import (
+    globaldb_get_unique_cache_value,
+    globaldb_set_unique_cache_value,
+)
+from rotkehlchen.globaldb.handler import GlobalDBHandler
+from rotkehlchen.history.types import HistoricalPriceOracle
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.oracles.structures import CurrentPriceOracle
+from rotkehlchen.types import CacheType
+from rotkehlchen.utils.data_structures import LRUCacheWithRemove
+from rotkehlchen.utils.mixins.enums import SerializableEnumNameMixin
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+NO_PRICE_FAILURE = 'no price'
+UNKNOWN_ASSET_CLASS = 'unknown'
+# An oracle that never found a price for an asset class after this many queries
+# is tried last for that class in the adaptive mode
+ADAPTIVE_MIN_QUERIES = 20
+# Max number of assets for which the oracle that answered is remembered
+PREFERRED_ORACLES_CACHE_SIZE = 8192
+ORACLE_TELEMETRY_PERSIST_FREQUENCY = 300  # seconds
+# Oracles with prices input by the user. They are never moved in the adaptive mode
+MANUAL_ORACLES = (CurrentPriceOracle.MANUALCURRENT, HistoricalPriceOracle.MANUAL)
+
+
+class OracleQueryKind(SerializableEnumNameMixin):
+    CURRENT = 1
+    HISTORICAL = 2
+
+
+PriceOracle = CurrentPriceOracle | HistoricalPriceOracle
+OracleT = TypeVar('OracleT', bound=PriceOracle)
+T = TypeVar('T')
+AssetT = TypeVar('AssetT', bound=Asset)
+
+
+@dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
+class OracleStats:
+    queries: int = 0
+    hits: int = 0
+    # prices the oracle had stored in the globaldb. Not counted in the queries
+    cache_hits: int = 0
+    total_seconds: float = 0.0
+    max_seconds: float = 0.0
+    failures: dict[str, int] = field(default_factory=dict)  # reason -> count
+
+    def serialize(self) -> dict[str, Any]:
+        return {
+            'queries': self.queries,
+            'hits': self.hits,
+            'cache_hits': self.cache_hits,
+            'total_seconds': self.total_seconds,
+            'max_seconds': self.max_seconds,
+            'failures': self.failures,
+        }
+
+    def serialize_for_api(self) -> dict[str, Any]:
+        return {
+            'queries': self.queries,
+            'hits': self.hits,
+            'hit_rate': round(self.hits / self.queries, 4) if self.queries != 0 else 0,
+            'cache_hits': self.cache_hits,
+            'average_seconds': round(self.total_seconds / self.queries, 3) if self.queries != 0 else 0,  # noqa: E501
+            'max_seconds': round(self.max_seconds, 3),
+            'failures': self.failures,
+        }
+
+    @classmethod
+    def deserialize(cls, data: dict[str, Any]) -> 'OracleStats':
+        """May raise:
+        - KeyError, ValueError, TypeError if the data is not valid
+        """
+        return cls(
+            queries=int(data['queries']),
+            hits=int(data['hits']),
+            cache_hits=int(data['cache_hits']),
+            total_seconds=float(data['total_seconds']),
+            max_seconds=float(data['max_seconds']),
+            failures={str(k): int(v) for k, v in data['failures'].items()},
+        )
+
+
+def get_asset_class(asset: Asset) -> str:
+    """Returns the class of the asset under which the oracle queries are grouped"""
+    try:
+        return str(asset.get_asset_type())
+    except UnknownAsset:
+        return UNKNOWN_ASSET_CLASS
+
+
+def _deserialize_oracle(kind: OracleQueryKind, value: str) -> PriceOracle:
+    """May raise DeserializationError if the value is not an oracle of the given kind"""
+    if kind == OracleQueryKind.CURRENT:
+        return CurrentPriceOracle.deserialize(value)
+    return HistoricalPriceOracle.deserialize(value)
+
+
+class OracleTelemetry:
+    """Singleton that keeps the latency, hit rate and failure reasons of the price
+    oracle queries per kind of query, oracle and asset class, along with the oracle
+    that last found a price for each asset.
+
+    The data is kept in memory and periodically persisted in the globaldb. If the
+    adaptive_oracle_order setting is enabled it's used to reorder the oracles of each
+    query. The oracle that last answered for the asset is tried first and oracles
+    that never answered for the asset class are tried last.
+    """
+    __instance: Optional['OracleTelemetry'] = None
+    _stats: dict[tuple[OracleQueryKind, PriceOracle, str], OracleStats]
+    _preferred: LRUCacheWithRemove[tuple[OracleQueryKind, str], PriceOracle]
+    _dirty: bool
+    _last_persisted: float
+
+    def __new__(cls) -> 'OracleTelemetry':
+        if OracleTelemetry.__instance is not None:
+            return OracleTelemetry.__instance
+
+        OracleTelemetry.__instance = object.__new__(cls)
+        OracleTelemetry.__instance.reset()
+        return OracleTelemetry.__instance
+
+    def reset(self) -> None:
+        """Clears all the data kept in memory"""
+        self._stats = {}
+        self._preferred = LRUCacheWithRemove(maxsize=PREFERRED_ORACLES_CACHE_SIZE)
+        self._dirty = False
+        self._last_persisted = time.monotonic()
+
+    def clear(self) -> None:
+        """Clears all the data, both in memory and persisted"""
+        self.reset()
+        self._dirty = True
+        self.persist()
+
+    def _get_stats(self, kind: OracleQueryKind, oracle: PriceOracle, asset: Asset) -> OracleStats:
+        key = (kind, oracle, get_asset_class(asset))
+        if (stats := self._stats.get(key)) is None:
+            stats = self._stats[key] = OracleStats()
+        return stats
+
+    def record(
+            self,
+            kind: OracleQueryKind,
+            oracle: PriceOracle,
+            asset: Asset,
+            seconds: float,
+            failure: str | None,
+    ) -> None:
+        """Records a price query of the given asset to the oracle.
+        failure is the reason the oracle did not return a price or None if it did"""
+        stats = self._get_stats(kind=kind, oracle=oracle, asset=asset)
+        stats.queries += 1
+        stats.total_seconds += seconds
+        stats.max_seconds = max(stats.max_seconds, seconds)
+        if failure is None:
+            stats.hits += 1
+            self._preferred.add((kind, asset.identifier), oracle)
+        else:
+            stats.failures[failure] = stats.failures.get(failure, 0) + 1
+
+        self._dirty = True
+
+    def record_cache_hit(self, kind: OracleQueryKind, oracle: PriceOracle, asset: Asset) -> None:
+        """Records a price of the given asset found in the prices of the oracle stored in
+        the globaldb. It's kept apart from the queries so that it doesn't skew their stats"""
+        self._get_stats(kind=kind, oracle=oracle, asset=asset).cache_hits += 1
+        self._preferred.add((kind, asset.identifier), oracle)
+        self._dirty = True
+
+    def _demote_oracles(
+            self,
+            kind: OracleQueryKind,
+            asset_class: str,
+            oracles: list[tuple[OracleT, T]],
+    ) -> list[tuple[OracleT, T]]:
+        """Moves last the oracles that never found a price for the asset class"""
+        demoted = set()
+        for oracle, _ in oracles:
+            stats = self._stats.get((kind, oracle, asset_class))
+            if (
+                oracle not in MANUAL_ORACLES and stats is not None and
+                stats.queries >= ADAPTIVE_MIN_QUERIES and stats.hits == 0 and
+                stats.cache_hits == 0
+            ):
+                demoted.add(oracle)
+        return (
+            [x for x in oracles if x[0] not in demoted] +
+            [x for x in oracles if x[0] in demoted]
+        )
+
+    def order_oracles(
+            self,
+            kind: OracleQueryKind,
+            asset: Asset,
+            oracles: Iterable[tuple[OracleT, T]],
+    ) -> list[tuple[OracleT, T]]:
+        """Takes the oracles, paired with their instances, in the order set by the user and
+        returns them in the order in which they should be queried for the given asset.
+        The order changes only if the adaptive_oracle_order setting is enabled."""
+        ordered = list(oracles)
+        if CachedSettings().adaptive_oracle_order is False:
+            return ordered
+
+        ordered = self._demote_oracles(
+            kind=kind,
+            asset_class=get_asset_class(asset),
+            oracles=ordered,
+        )
+        preferred = self._preferred.get((kind, asset.identifier))
+        for idx, entry in enumerate(ordered):
+            if entry[0] == preferred:
+                # move it right after the manual oracles that precede it
+                position = 0
+                while position < idx and ordered[position][0] in MANUAL_ORACLES:
+                    position += 1
+                ordered.insert(position, ordered.pop(idx))
+                break
+
+        return ordered
+
+    def group_by_oracles_order(
+            self,
+            kind: OracleQueryKind,
+            assets: Iterable[AssetT],
+            oracles: Iterable[tuple[OracleT, T]],
+    ) -> list[tuple[list[tuple[OracleT, T]], list[AssetT]]]:
+        """Like order_oracles but for assets whose prices are queried together. Returns the
+        assets grouped by the order in which the oracles should be queried for them.
+
+        Only the oracles that never answered for the asset class are moved since the oracle
+        that last answered differs per asset. Without the adaptive_oracle_order setting all
+        the assets are in a single group with the oracles in the order set by the user."""
+        ordered, assets = list(oracles), list(assets)
+        if CachedSettings().adaptive_oracle_order is False:
+            return [(ordered, assets)]
+
+        class_orders: dict[str, list[tuple[OracleT, T]]] = {}
+        groups: dict[tuple[OracleT, ...], tuple[list[tuple[OracleT, T]], list[AssetT]]] = {}
+        for asset in assets:
+            if (asset_class := get_asset_class(asset)) not in class_orders:
+                class_orders[asset_class] = self._demote_oracles(
+                    kind=kind,
+                    asset_class=asset_class,
+                    oracles=ordered,
+                )
+            class_order = class_orders[asset_class]
+            if (key := tuple(x[0] for x in class_order)) not in groups:
+                groups[key] = (class_order, [])
+            groups[key][1].append(asset)
+
+        return list(groups.values())
+
+    def serialize(self) -> list[dict[str, Any]]:
+        return [{
+            'kind': str(kind),
+            'oracle': str(oracle),
+            'asset_class': asset_class,
+            **stats.serialize_for_api(),
+        } for (kind, oracle, asset_class), stats in sorted(
+            self._stats.items(),
+            key=lambda x: (x[0][0].value, str(x[0][1]), x[0][2]),
+        )]
+
+    def should_persist(self) -> bool:
+        """Whether there is new data and it was not persisted recently"""
+        return self._dirty and time.monotonic() - self._last_persisted >= ORACLE_TELEMETRY_PERSIST_FREQUENCY  # noqa: E501
+
+    def persist(self) -> None:
+        """Stores the data kept in memory in the globaldb if anything changed"""
+        if self._dirty is False:
+            return
+
+        value = json.dumps({
+            'stats': [
+                [kind.serialize(), oracle.serialize(), asset_class, stats.serialize()]
+                for (kind, oracle, asset_class), stats in self._stats.items()
+            ],
+            'preferred': [
+                [kind.serialize(), identifier, oracle.serialize()]
+                for (kind, identifier), oracle in self._preferred.cache.items()
+            ],
+        })
+        with GlobalDBHandler().conn.write_ctx() as write_cursor:
+            globaldb_set_unique_cache_value(
+                write_cursor=write_cursor,
+                key_parts=(CacheType.ORACLE_TELEMETRY,),
+                value=value,
+            )
+
+        self._dirty = False
+        self._last_persisted = time.monotonic()
+
+    def load(self) -> None:
+        """Replaces the data kept in memory with the data persisted in the globaldb"""
+        self.reset()
+        with GlobalDBHandler().conn.read_ctx() as cursor:
+            value = globaldb_get_unique_cache_value(
+                cursor=cursor,
+                key_parts=(CacheType.ORACLE_TELEMETRY,),
+            )
+
+        if value is None:
+            return
+
+        try:
+            data = json.loads(value)
+            for raw_kind, raw_oracle, asset_class, raw_stats in data['stats']:
+                kind = OracleQueryKind.deserialize(raw_kind)
+                self._stats[(kind, _deserialize_oracle(kind, raw_oracle), asset_class)] = OracleStats.deserialize(raw_stats)  # noqa: E501
+            for raw_kind, identifier, raw_oracle in data['preferred']:
+                kind = OracleQueryKind.deserialize(raw_kind)
+                self._preferred.add((kind, identifier), _deserialize_oracle(kind, raw_oracle))
+        except (json.JSONDecodeError, KeyError, ValueError, TypeError, DeserializationError) as e:
+            log.error(f'Found invalid persisted oracle telemetry. Ignoring it. {e!s}')
+            self.reset()
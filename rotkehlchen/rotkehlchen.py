@@ -78,6 +78,7 @@ from rotkehlchen.history.types import HistoricalPriceOracle
 from rotkehlchen.icons import IconManager
 from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.oracles.telemetry import OracleTelemetry
 from rotkehlchen.premium.premium import Premium, PremiumCredentials, premium_create_and_verify
 from rotkehlchen.premium.sync import PremiumSyncManager
 from rotkehlchen.tasks.manager import DEFAULT_MAX_TASKS_NUM, TaskManager
@@ -350,6 +351,7 @@ class Rotkehlchen:
                 defillama=self.defillama,
             )
             PriceHistorian().set_oracles_order(settings.historical_price_oracles)
+            OracleTelemetry().load()
 
             exchange_credentials = self.data.db.get_exchange_credentials(cursor)
             self.exchange_manager.initialize_exchanges(
@@ -421,6 +423,8 @@ class Rotkehlchen:
             uniswap_v3=uniswap_v3_oracle,
         )
         Inquirer().set_oracles_order(settings.current_price_oracles)
+        Inquirer().set_cached_current_price_size(settings.current_price_cache_size)
+        Inquirer().load_persisted_usd_prices()
 
         self.chains_aggregator = ChainsAggregator(
             blockchain_accounts=blockchain_accounts,
@@ -518,6 +522,8 @@ class Rotkehlchen:
 
         self.data.logout()
         self.cryptocompare.unset_database()
+        OracleTelemetry().persist()
+        Inquirer().persist_usd_prices()
         CachedSettings().reset()
 
         # Make sure no messages leak to other user sessions
@@ -874,6 +880,7 @@ class Rotkehlchen:
             save_despite_errors: bool = False,
             timestamp: Timestamp | None = None,
             ignore_cache: bool = False,
+            incremental: bool = False,
     ) -> dict[str, Any]:
         """Query all balances rotkehlchen can see.
 
@@ -886,6 +893,8 @@ class Rotkehlchen:
         If a timestamp is given then that is the time that the balances are going
         to be saved in the DB
         If ignore_cache is True then all underlying calls that have a cache ignore it
+        If incremental is True then evm chains only requery the balances of the addresses
+        with activity since their last balances query
 
         Returns a dictionary with the queried balances.
         """
@@ -897,8 +906,9 @@ class Rotkehlchen:
 
         balances: dict[str, dict[Asset, Balance]] = {}
         problem_free = True
-        for exchange in self.exchange_manager.iterate_exchanges():
-            exchange_balances, error_msg = exchange.query_balances(ignore_cache=ignore_cache)
+        for exchange, (exchange_balances, error_msg) in self.exchange_manager.query_exchanges(
+            lambda exchange: exchange.query_balances(ignore_cache=ignore_cache),
+        ):
             # If we got an error, disregard that exchange but make sure we don't save data
             if not isinstance(exchange_balances, dict):
                 problem_free = False
@@ -921,7 +931,15 @@ class Rotkehlchen:
             blockchain_result = self.chains_aggregator.query_balances(
                 blockchain=None,
                 ignore_cache=ignore_cache,
+                incremental=incremental,
             )  # copies below since if cache is used we end up modifying the balance sheet object
+            for chain, error_msg in blockchain_result.failed_chains.items():
+                # The other chains are queried but make sure we don't save data
+                problem_free = False
+                self.msg_aggregator.add_message(
+                    message_type=WSMessageType.BALANCE_SNAPSHOT_ERROR,
+                    data={'location': f'{chain!s} balances query', 'error': error_msg},
+                )
             if len(blockchain_result.totals.assets) != 0:
                 balances[str(Location.BLOCKCHAIN)] = blockchain_result.totals.assets.copy()
             liabilities = blockchain_result.totals.liabilities.copy()
@@ -1075,6 +1093,9 @@ class Rotkehlchen:
         if settings.current_price_oracles is not None:
             Inquirer().set_oracles_order(settings.current_price_oracles)
 
+        if settings.current_price_cache_size is not None:
+            Inquirer().set_cached_current_price_size(settings.current_price_cache_size)
+
         if settings.historical_price_oracles is not None:
             PriceHistorian().set_oracles_order(settings.historical_price_oracles)
 
@@ -54,6 +54,8 @@ def _add_spam_asset(
             [(SPAM_PROTOCOL, identifier) for identifier in detected_spam_assets],
         )
 
+    globaldb.clean_evm_tokens_cache(detected_spam_assets)
+
     user_db.ignore_multiple_assets(
         write_cursor=user_db_write_cursor,
         assets=detected_spam_assets,
@@ -33,7 +33,9 @@ from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.externalapis.monerium import Monerium
 from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.history.types import HistoricalPriceOracle
+from rotkehlchen.inquirer import Inquirer
 from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.oracles.telemetry import OracleTelemetry
 from rotkehlchen.premium.premium import Premium, premium_create_and_verify
 from rotkehlchen.tasks.assets import (
     augmented_spam_detection,
@@ -73,7 +75,7 @@ log = RotkehlchenLogsAdapter(logger)
 
 CRYPTOCOMPARE_QUERY_AFTER_SECS = 86400  # a day
 DEFAULT_MAX_TASKS_NUM = 2
-CRYPTOCOMPARE_HISTOHOUR_FREQUENCY = 240  # at least 4 mins apart
+CRYPTOCOMPARE_HISTOHOUR_FREQUENCY = 240  # wait 4 mins after being rate limited
 XPUB_DERIVATION_FREQUENCY = 3600  # every hour
 EVM_TX_QUERY_FREQUENCY = 3600  # every hour
 EXCHANGE_QUERY_FREQUENCY = 3600  # every hour
@@ -158,6 +160,9 @@ class TaskManager:
             self._maybe_detect_new_spam_tokens,
             self._maybe_augmented_detect_new_spam_tokens,
             self._maybe_query_monerium,
+            self._maybe_refresh_stale_current_prices,
+            self._maybe_persist_current_prices,
+            self._maybe_persist_oracle_telemetry,
         ]
         if self.premium_sync_manager is not None:
             self.potential_tasks.append(self._maybe_schedule_db_upload)
@@ -222,7 +227,7 @@ class TaskManager:
         self.prepared_cryptocompare_query = True
 
     def _maybe_schedule_cryptocompare_query(self) -> Optional[list[gevent.Greenlet]]:
-        """Schedules a cryptocompare query for a single asset history"""
+        """Schedules a cryptocompare cache warm-up for the history of all the prepared pairs"""
         if self.prepared_cryptocompare_query is False:
             self._prepare_cryptocompare_queries()
 
@@ -236,23 +241,21 @@ class TaskManager:
         ):
             return None
 
-        now_ts = ts_now()
-        # Make sure there is a long enough period  between an asset's histohour query
-        # to avoid getting rate limited by cryptocompare
-        if now_ts - self.cryptocompare.last_histohour_query_ts <= CRYPTOCOMPARE_HISTOHOUR_FREQUENCY:  # noqa: E501
+        # Give cryptocompare some time to recover if it recently rate limited us
+        if self.cryptocompare.rate_limited_in_last(CRYPTOCOMPARE_HISTOHOUR_FREQUENCY) is True:
             return None
 
-        query = self.cryptocompare_queries.pop()
-        task_name = f'Cryptocompare historical prices {query.from_asset} / {query.to_asset} query'
+        queries = list(self.cryptocompare_queries)
+        self.cryptocompare_queries.clear()
+        task_name = f'Cryptocompare historical prices cache warm-up of {len(queries)} pairs'
         log.debug(f'Scheduling task for {task_name}')
         return [self.greenlet_manager.spawn_and_track(
             after_seconds=None,
             task_name=task_name,
             exception_is_error=False,
-            method=self.cryptocompare.query_and_store_historical_data,
-            from_asset=query.from_asset,
-            to_asset=query.to_asset,
-            timestamp=now_ts,
+            method=self.cryptocompare.warm_up_cache,
+            pairs=[(x.from_asset, x.to_asset) for x in queries],
+            msg_aggregator=self.msg_aggregator,
         )]
 
     def _maybe_schedule_xpub_derivation(self) -> Optional[list[gevent.Greenlet]]:
@@ -531,6 +534,7 @@ class TaskManager:
                     save_despite_errors=False,
                     timestamp=None,
                     ignore_cache=True,
+                    incremental=True,
                 )]
         return None
 
@@ -788,6 +792,50 @@ class TaskManager:
             method=monerium.get_and_process_orders,
         )]
 
+    def _maybe_refresh_stale_current_prices(self) -> Optional[list[gevent.Greenlet]]:
+        """Schedules a refresh of the expired usd prices served by the inquirer"""
+        if len(assets := Inquirer.pop_stale_prices_to_refresh()) == 0:
+            return None
+
+        task_name = f'Refresh stale current prices of {len(assets)} assets'
+        log.debug(f'Scheduling task to {task_name}')
+        return [self.greenlet_manager.spawn_and_track(
+            after_seconds=None,
+            task_name=task_name,
+            exception_is_error=False,
+            method=Inquirer.find_usd_prices,
+            assets=assets,
+            ignore_cache=True,
+        )]
+
+    def _maybe_persist_current_prices(self) -> Optional[list[gevent.Greenlet]]:
+        """Schedules storing the usd prices found by the inquirer in the globaldb"""
+        if Inquirer.should_persist_usd_prices() is False:
+            return None
+
+        task_name = 'Persist current usd prices'
+        log.debug(f'Scheduling task to {task_name}')
+        return [self.greenlet_manager.spawn_and_track(
+            after_seconds=None,
+            task_name=task_name,
+            exception_is_error=False,
+            method=Inquirer.persist_usd_prices,
+        )]
+
+    def _maybe_persist_oracle_telemetry(self) -> Optional[list[gevent.Greenlet]]:
+        """Schedules storing the price oracle telemetry in the globaldb"""
+        if OracleTelemetry().should_persist() is False:
+            return None
+
+        task_name = 'Persist price oracle telemetry'
+        log.debug(f'Scheduling task to {task_name}')
+        return [self.greenlet_manager.spawn_and_track(
+            after_seconds=None,
+            task_name=task_name,
+            exception_is_error=False,
+            method=OracleTelemetry().persist,
+        )]
+
     def _schedule(self) -> None:
         """Schedules background tasks"""
         self.greenlet_manager.clear_finished()
@@ -819,6 +867,8 @@ class TaskManager:
             new_greenlets = scheduling_fn()
             if new_greenlets is None:
                 continue  # The scheduling function for the specific task decided to not schedule it  # noqa: E501
+            for greenlet in new_greenlets:  # let interactive requests go first
+                greenlet.background_task = True
             self.running_greenlets[scheduling_fn] = new_greenlets
             spawned_new += 1
 
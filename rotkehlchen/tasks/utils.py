@@ -59,6 +59,11 @@ def query_missing_prices_of_base_entries(
     and we couldn't find a price for it now.
     """
     inquirer = PriceHistorian()
+    # fetch the prices in as few range queries as possible before pricing each entry
+    inquirer.prefetch_historical_prices(
+        assets_timestamps=[(asset, timestamp) for _, _, asset, timestamp in entries_missing_prices],  # noqa: E501
+        to_asset=A_USD,
+    )
     updates = []
     for identifier, amount, asset, timestamp in entries_missing_prices:
         try:
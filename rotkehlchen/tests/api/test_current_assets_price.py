@@ -11,6 +11,7 @@ from rotkehlchen.fval import FVal
 from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
 from rotkehlchen.inquirer import CurrentPriceOracle, Inquirer
+from rotkehlchen.oracles.telemetry import OracleQueryKind, OracleTelemetry
 from rotkehlchen.tests.utils.api import (
     api_url_for,
     assert_error_response,
@@ -616,3 +617,34 @@ def test_get_manual_prices_with_nfts(
             'price': '2',
         },
     ]
+
+
+def test_oracle_telemetry(rotkehlchen_api_server: 'APIServer') -> None:
+    """Test that the oracle telemetry can be queried and cleared via the api"""
+    telemetry = OracleTelemetry()
+    telemetry.reset()
+    telemetry.record(
+        kind=OracleQueryKind.CURRENT,
+        oracle=CurrentPriceOracle.COINGECKO,
+        asset=A_ETH,
+        seconds=0.5,
+        failure=None,
+    )
+    response = requests.get(api_url_for(rotkehlchen_api_server, 'oracletelemetryresource'))
+    assert assert_proper_response_with_result(response) == [{
+        'kind': 'current',
+        'oracle': 'coingecko',
+        'asset_class': 'own chain',
+        'queries': 1,
+        'hits': 1,
+        'hit_rate': 1.0,
+        'cache_hits': 0,
+        'average_seconds': 0.5,
+        'max_seconds': 0.5,
+        'failures': {},
+    }]
+
+    response = requests.delete(api_url_for(rotkehlchen_api_server, 'oracletelemetryresource'))
+    assert_proper_response(response)
+    response = requests.get(api_url_for(rotkehlchen_api_server, 'oracletelemetryresource'))
+    assert assert_proper_response_with_result(response) == []
@@ -8,6 +8,7 @@ from rotkehlchen.tests.utils.api import (
     assert_error_response,
     assert_proper_response_with_result,
 )
+from rotkehlchen.utils.rate_limiter import RateLimit, RateLimiter
 
 
 @pytest.mark.parametrize('include_etherscan_key', [False])
@@ -288,3 +289,24 @@ def test_remove_external_services_errors(rotkehlchen_api_server):
         contained_in_msg='Failed to deserialize ExternalService value unknown',
         status_code=HTTPStatus.BAD_REQUEST,
     )
+
+
+def test_get_external_services_rate_limits(rotkehlchen_api_server):
+    """Tests that the rate limiting stats of the external services are returned"""
+    rate_limiter = RateLimiter()
+    rate_limiter.set_limit(key='test.key', limit=RateLimit(rate=1000, burst=1))
+    try:
+        for _ in range(2):
+            rate_limiter.acquire(key='test.key', background=True)
+        response = requests.get(
+            api_url_for(rotkehlchen_api_server, 'externalservicesratelimitsresource'),
+        )
+        result = assert_proper_response_with_result(response)
+    finally:
+        rate_limiter.set_limit(key='test.key', limit=None)
+        rate_limiter._stats.pop('test.key', None)
+
+    assert result['test.key']['requests'] == 2
+    assert result['test.key']['background_requests'] == 2
+    assert result['test.key']['throttled'] == 1
+    assert result['test.key']['max_wait_seconds'] <= result['test.key']['wait_seconds']
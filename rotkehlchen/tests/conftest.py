@@ -22,6 +22,7 @@ from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.logging import TRACE, RotkehlchenLogsAdapter, add_logging_level, configure_logging
 from rotkehlchen.tests.utils.args import default_args
 from rotkehlchen.utils.mixins.enums import SerializableEnumNameMixin
+from rotkehlchen.utils.rate_limiter import DEFAULT_RATE_LIMITS, RateLimiter
 from rotkehlchen.utils.serialization import jsonloads_dict
 
 if TYPE_CHECKING:
@@ -67,6 +68,17 @@ def pytest_addoption(parser):
         help='If set then all tests that are aware of their mocking the network will not do that. Use this in order to easily skip mocks and test that using the network, the remote queries are still working fine and mocks dont need any changing.',  # noqa: E501
     )
     parser.addoption('--profiler', default=None, choices=['flamegraph-trace'])
+    parser.addoption(
+        '--decoding-benchmark',
+        default=None,
+        metavar='OUTPUT_PATH',
+        help='If set then the offline decoding throughput benchmark runs and its results, along with the time spent per decoder, are written as json to the given path. It is skipped by default since its numbers depend on the machine.',  # noqa: E501
+    )
+    parser.addoption(
+        '--decoding-benchmark-baseline',
+        default=None,
+        help='Path of a json file with the results of a previous decoding benchmark run to check for throughput regressions against. If the file does not exist the results are saved there.',  # noqa: E501
+    )
 
 
 if sys.platform == 'darwin':
@@ -151,6 +163,14 @@ def _fixture_profiler(request):
         profiler_instance.stop()
 
 
+@pytest.fixture(autouse=True, scope='session', name='rate_limiter')
+def _fixture_rate_limiter():
+    """Don't throttle the requests of the tests since most of them are replayed"""
+    rate_limiter = RateLimiter()
+    for key in DEFAULT_RATE_LIMITS:
+        rate_limiter.set_limit(key=key, limit=None)
+
+
 def requires_env(allowed_envs: list[TestEnvironment]):
     """Conditionally run tests if the environment is in the list of allowed environments"""
     try:
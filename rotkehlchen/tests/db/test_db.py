@@ -7,6 +7,7 @@ from pathlib import Path
 from unittest.mock import patch
 
 import pytest
+from pysqlcipher3 import dbapi2 as sqlcipher
 
 from rotkehlchen.accounting.structures.balance import BalanceType
 from rotkehlchen.accounting.structures.types import ActionType
@@ -35,14 +36,19 @@ from rotkehlchen.db.schema import DB_CREATE_ETH2_DAILY_STAKING_DETAILS
 from rotkehlchen.db.settings import (
     DEFAULT_ACCOUNT_FOR_ASSETS_MOVEMENTS,
     DEFAULT_ACTIVE_MODULES,
+    DEFAULT_ADAPTIVE_ORACLE_ORDER,
     DEFAULT_BALANCE_SAVE_FREQUENCY,
+    DEFAULT_BALANCES_QUERY_CONCURRENCY,
     DEFAULT_BTC_DERIVATION_GAP_LIMIT,
     DEFAULT_CALCULATE_PAST_COST_BASIS,
+    DEFAULT_CHAIN_BALANCES_QUERY_TIMEOUT,
     DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_CURRENT_PRICE_CACHE_SIZE,
     DEFAULT_CURRENT_PRICE_ORACLES,
     DEFAULT_DATE_DISPLAY_FORMAT,
     DEFAULT_DISPLAY_DATE_IN_LOCALTIME,
     DEFAULT_ETH_STAKING_TAXABLE_AFTER_WITHDRAWAL_ENABLED,
+    DEFAULT_HISTORICAL_PRICE_INTERPOLATION_MAX_GAP,
     DEFAULT_HISTORICAL_PRICE_ORACLES,
     DEFAULT_INCLUDE_CRYPTO2CRYPTO,
     DEFAULT_INCLUDE_FEES_IN_COST_BASIS,
@@ -50,12 +56,14 @@ from rotkehlchen.db.settings import (
     DEFAULT_INFER_ZERO_TIMED_BALANCES,
     DEFAULT_LAST_DATA_MIGRATION,
     DEFAULT_MAIN_CURRENCY,
+    DEFAULT_MULTIPROCESS_DECODING,
     DEFAULT_ORACLE_PENALTY_DURATION,
     DEFAULT_ORACLE_PENALTY_THRESHOLD_COUNT,
     DEFAULT_PNL_CSV_HAVE_SUMMARY,
     DEFAULT_PNL_CSV_WITH_FORMULAS,
     DEFAULT_QUERY_RETRY_LIMIT,
     DEFAULT_READ_TIMEOUT,
+    DEFAULT_SERVE_STALE_CURRENT_PRICES,
     DEFAULT_SSF_GRAPH_MULTIPLIER,
     DEFAULT_TREAT_ETH2_AS_ETH,
     DEFAULT_UI_FLOATING_PRECISION,
@@ -485,6 +493,13 @@ def test_writing_fetching_data(data_dir, username, sql_vm_instructions_cb):
         'read_timeout': DEFAULT_READ_TIMEOUT,
         'oracle_penalty_threshold_count': DEFAULT_ORACLE_PENALTY_THRESHOLD_COUNT,
         'oracle_penalty_duration': DEFAULT_ORACLE_PENALTY_DURATION,
+        'current_price_cache_size': DEFAULT_CURRENT_PRICE_CACHE_SIZE,
+        'serve_stale_current_prices': DEFAULT_SERVE_STALE_CURRENT_PRICES,
+        'historical_price_interpolation_max_gap': DEFAULT_HISTORICAL_PRICE_INTERPOLATION_MAX_GAP,
+        'adaptive_oracle_order': DEFAULT_ADAPTIVE_ORACLE_ORDER,
+        'multiprocess_decoding': DEFAULT_MULTIPROCESS_DECODING,
+        'balances_query_concurrency': DEFAULT_BALANCES_QUERY_CONCURRENCY,
+        'chain_balances_query_timeout': DEFAULT_CHAIN_BALANCES_QUERY_TIMEOUT,
     }
     assert len(expected_dict) == len(dataclasses.fields(DBSettings)), 'One or more settings are missing'  # noqa: E501
 
@@ -1918,3 +1933,33 @@ def test_startup_check_settings(database: 'DBHandler') -> None:
     assert settings.non_syncing_exchanges == [
         ExchangeLocationID(name='Coinbase', location=Location.COINBASE),
     ]
+
+
+def test_read_only_db(database, sql_vm_instructions_cb):
+    """Test that a read only DBHandler of the logged in user's DB can read it but not write"""
+    with database.user_write() as write_cursor:
+        database.set_setting(write_cursor, name='ui_floating_precision', value=5)
+
+    read_only_db = DBHandler(
+        user_data_dir=database.user_data_dir,
+        password=database.password,
+        msg_aggregator=MessagesAggregator(),
+        initial_settings=None,
+        sql_vm_instructions_cb=sql_vm_instructions_cb,
+        resume_from_backup=False,
+        read_only=True,
+    )
+    with read_only_db.conn.read_ctx() as cursor:
+        assert read_only_db.get_settings(cursor).ui_floating_precision == 5
+
+    for connection in (read_only_db.conn, read_only_db.conn_transient):
+        with pytest.raises(sqlcipher.OperationalError), connection.write_ctx() as write_cursor:  # pylint: disable=no-member
+            write_cursor.execute(
+                'INSERT OR REPLACE INTO settings(name, value) VALUES(?, ?)',
+                ('ui_floating_precision', 3),
+            )
+
+    read_only_db.disconnect(conn_attribute='conn')
+    read_only_db.disconnect(conn_attribute='conn_transient')
+    with database.conn.read_ctx() as cursor:
+        assert database.get_settings(cursor).ui_floating_precision == 5
@@ -1,9 +1,14 @@
+from rotkehlchen.accounting.structures.balance import Balance
 from rotkehlchen.chain.accounts import BlockchainAccountData
 from rotkehlchen.chain.evm.types import EvmAccount
+from rotkehlchen.constants.assets import A_ETH
 from rotkehlchen.data_handler import DataHandler
 from rotkehlchen.db.evmtx import DBEvmTx
 from rotkehlchen.db.filtering import EvmTransactionsFilterQuery
+from rotkehlchen.db.history_events import DBHistoryEvents
 from rotkehlchen.fval import FVal
+from rotkehlchen.history.events.structures.base import HistoryEvent
+from rotkehlchen.history.events.structures.types import HistoryEventSubType, HistoryEventType
 from rotkehlchen.tests.utils.constants import (
     ETH_ADDRESS1,
     ETH_ADDRESS2,
@@ -13,13 +18,16 @@ from rotkehlchen.tests.utils.constants import (
 from rotkehlchen.tests.utils.factories import make_evm_address, make_evm_tx_hash
 from rotkehlchen.types import (
     ChainID,
+    ChecksumEvmAddress,
     EvmInternalTransaction,
     EvmTransaction,
+    Location,
     SupportedBlockchain,
     Timestamp,
     deserialize_evm_tx_hash,
 )
 from rotkehlchen.user_messages import MessagesAggregator
+from rotkehlchen.utils.misc import ts_sec_to_ms
 
 
 def test_add_get_evm_transactions(data_dir, username, sql_vm_instructions_cb):
@@ -307,3 +315,71 @@ def test_query_also_internal_evm_transactions(data_dir, username, sql_vm_instruc
             has_premium=True,
         )
         assert result == [tx1, tx3, tx4]
+
+
+def test_get_addresses_with_activity_after(database):
+    """Test that the addresses with transactions or history events added after the activity
+    marker are found only for the given chain, including transactions that happened before"""
+    dbevmtx, dbevents = DBEvmTx(database), DBHistoryEvents(database)
+    old_address, late_tx_address, shared_tx_address, event_address, other_chain_address = (
+        make_evm_address() for _ in range(5)
+    )
+
+    def make_transaction(chain_id: ChainID, from_address: ChecksumEvmAddress) -> EvmTransaction:
+        return EvmTransaction(
+            tx_hash=make_evm_tx_hash(),
+            chain_id=chain_id,
+            timestamp=Timestamp(1600000000),
+            block_number=1,
+            from_address=from_address,
+            to_address=make_evm_address(),
+            value=0,
+            gas=1,
+            gas_price=1,
+            gas_used=1,
+            input_data=MOCK_INPUT_DATA,
+            nonce=1,
+        )
+
+    def make_event(location_label: ChecksumEvmAddress) -> HistoryEvent:
+        return HistoryEvent(
+            event_identifier=f'event_of_{location_label}',
+            sequence_index=0,
+            timestamp=ts_sec_to_ms(Timestamp(1600000000)),
+            location=Location.ETHEREUM,
+            event_type=HistoryEventType.RECEIVE,
+            event_subtype=HistoryEventSubType.NONE,
+            asset=A_ETH,
+            balance=Balance(FVal(1)),
+            location_label=location_label,
+        )
+
+    old_transaction = make_transaction(chain_id=ChainID.ETHEREUM, from_address=old_address)
+    with database.user_write() as write_cursor:
+        dbevmtx.add_evm_transactions(write_cursor, [old_transaction], relevant_address=old_address)
+        dbevents.add_history_event(write_cursor=write_cursor, event=make_event(old_address))
+
+    with database.conn.read_ctx() as cursor:
+        marker = dbevmtx.get_activity_marker(cursor)
+
+    with database.user_write() as write_cursor:  # all with timestamps before the marker
+        for chain_id, address in (
+                (ChainID.ETHEREUM, late_tx_address),
+                (ChainID.OPTIMISM, other_chain_address),
+        ):
+            dbevmtx.add_evm_transactions(
+                write_cursor=write_cursor,
+                evm_transactions=[make_transaction(chain_id=chain_id, from_address=address)],
+                relevant_address=address,
+            )
+        # an already saved transaction that turns out to concern another address
+        dbevmtx.add_evm_transactions(write_cursor, [old_transaction], relevant_address=shared_tx_address)  # noqa: E501
+        dbevents.add_history_event(write_cursor=write_cursor, event=make_event(event_address))
+
+    with database.conn.read_ctx() as cursor:
+        assert dbevmtx.get_addresses_with_activity_after(
+            cursor=cursor,
+            chain_id=ChainID.ETHEREUM,
+            addresses=[old_address, late_tx_address, shared_tx_address, event_address, other_chain_address],  # noqa: E501
+            marker=marker,
+        ) == {late_tx_address, shared_tx_address, event_address}
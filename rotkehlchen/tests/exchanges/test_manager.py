@@ -1,8 +1,24 @@
 import inspect
+import time
 from importlib import import_module
+from typing import TYPE_CHECKING
 
+import gevent
+import pytest
+
+from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.exchanges.constants import SUPPORTED_EXCHANGES
+from rotkehlchen.exchanges.exchange import ExchangeInterface
 from rotkehlchen.exchanges.manager import ExchangeManager
+from rotkehlchen.tests.utils.exchanges import (
+    create_test_bitfinex,
+    create_test_bitstamp,
+    create_test_coinbase,
+)
+
+if TYPE_CHECKING:
+    from rotkehlchen.db.dbhandler import DBHandler
+    from rotkehlchen.user_messages import MessagesAggregator
 
 EXCHANGE_METHODS_TO_CHECK = (
     'query_balances',
@@ -32,3 +48,42 @@ def test_all_methods_implemented():
             code = inspect.getsource(method)
             msg = f'{method_name} for exchange {name} is not implemented'
             assert 'raise NotImplementedError' not in code, msg
+
+
+def test_query_exchanges_concurrently(
+        exchange_manager: ExchangeManager,
+        database: 'DBHandler',
+        function_scope_messages_aggregator: 'MessagesAggregator',
+) -> None:
+    """Test that exchanges are queried concurrently, that results keep the order of the
+    exchanges and that a failing exchange does not stop the queries of the others"""
+    exchanges: list[ExchangeInterface] = [
+        create_test_coinbase(database, function_scope_messages_aggregator),
+        create_test_bitstamp(database, function_scope_messages_aggregator),
+        create_test_bitfinex(database, function_scope_messages_aggregator),
+    ]
+    for exchange in exchanges:
+        exchange_manager.connected_exchanges[exchange.location].append(exchange)
+
+    query_seconds = 0.3
+    queried: list[str] = []
+
+    def query(exchange: ExchangeInterface) -> str:
+        gevent.sleep(query_seconds)
+        queried.append(exchange.name)
+        return exchange.name
+
+    start = time.monotonic()
+    assert exchange_manager.query_exchanges(query) == [(x, x.name) for x in exchanges]
+    assert time.monotonic() - start < query_seconds * 2
+
+    def failing_query(exchange: ExchangeInterface) -> str:
+        if exchange.name == 'coinbase':
+            raise RemoteError('coinbase is down')
+        return query(exchange)
+
+    queried.clear()
+    exchange_manager.query_concurrency = 1
+    with pytest.raises(RemoteError, match='coinbase is down'):
+        exchange_manager.query_exchanges(failing_query)
+    assert queried == ['bitstamp', 'bitfinex']
@@ -6,13 +6,13 @@ import gevent
 import pytest
 
 from rotkehlchen.assets.asset import Asset, EvmToken
-from rotkehlchen.constants.assets import A_BTC, A_DAI, A_ETH, A_EUR, A_YFI
+from rotkehlchen.constants.assets import A_BTC, A_DAI, A_ETH, A_EUR, A_USD, A_YFI
 from rotkehlchen.errors.asset import UnsupportedAsset
 from rotkehlchen.externalapis.coingecko import Coingecko, CoingeckoAssetData
 from rotkehlchen.fval import FVal
 from rotkehlchen.icons import IconManager
 from rotkehlchen.tests.utils.mock import MockResponse
-from rotkehlchen.types import Price
+from rotkehlchen.types import Price, Timestamp
 
 
 @pytest.fixture(name='icon_manager')
@@ -63,6 +63,52 @@ def test_coingecko_historical_price(session_coingecko):
     assert price == Price(FVal('7.7478028375650725'))
 
 
+def test_coingecko_multiple_current_prices(globaldb):  # pylint: disable=unused-argument
+    """Test that the simple prices of many assets are queried in chunks of comma
+    separated coingecko ids and that unsupported assets or missing prices are omitted"""
+    coingecko, queried_ids = Coingecko(), []
+
+    def mock_query(module, _subpath=None, options=None):
+        assert module == 'simple/price' and options['vs_currencies'] == 'usd'
+        queried_ids.append(options['ids'])
+        return {x: {'usd': 2} for x in options['ids'].split(',') if x != 'dai'}
+
+    unsupported_asset = Asset('eip155:1/erc20:0x1844b21593262668B7248d0f57a220CaaBA46ab9')  # PRL
+    with (
+        patch('rotkehlchen.externalapis.coingecko.SIMPLE_PRICE_IDS_CHUNK_SIZE', new=2),
+        patch.object(coingecko, '_query', side_effect=mock_query),
+    ):
+        prices = coingecko.query_multiple_current_prices(
+            from_assets=[x.resolve_to_asset_with_oracles() for x in (A_BTC, A_ETH, A_DAI, A_YFI, unsupported_asset)],  # noqa: E501
+            to_asset=A_USD.resolve_to_asset_with_oracles(),
+        )
+
+    assert queried_ids == ['bitcoin,ethereum', 'dai,yearn-finance']
+    assert prices == {A_BTC: Price(FVal(2)), A_ETH: Price(FVal(2)), A_YFI: Price(FVal(2))}
+
+
+def test_coingecko_price_range_of_single_timestamp(globaldb):  # pylint: disable=unused-argument
+    """Test that a range of a single timestamp is widened since coingecko returns
+    no prices for an empty range"""
+    coingecko, queried_ranges = Coingecko(), []
+
+    def mock_query(module, subpath=None, options=None):
+        assert module == 'coins' and subpath == 'bitcoin/market_chart/range'
+        queried_ranges.append((options['from'], options['to']))
+        return {'prices': [[1700000000000, 37000], [1700003600000, 0]]}
+
+    with patch.object(coingecko, '_query', side_effect=mock_query):
+        prices = coingecko.query_historical_price_range(
+            from_asset=A_BTC.resolve_to_asset_with_oracles(),
+            to_asset=A_USD.resolve_to_asset_with_oracles(),
+            from_timestamp=Timestamp(1700001800),
+            to_timestamp=Timestamp(1700001800),
+        )
+
+    assert queried_ranges == [('1699998200', '1700005400')]
+    assert prices == [(Timestamp(1700000000), Price(FVal(37000)))]
+
+
 def test_assets_with_icons(icon_manager):
     """Checks that _assets_with_coingecko_id returns a proper result"""
     x = icon_manager._assets_with_coingecko_id()
@@ -18,6 +18,7 @@ from rotkehlchen.constants.assets import (
     A_EUR,
     A_USD,
 )
+from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.externalapis.cryptocompare import (
     CRYPTOCOMPARE_HOURQUERYLIMIT,
     CRYPTOCOMPARE_SPECIAL_CASES_MAPPING,
@@ -43,20 +44,11 @@ def test_cryptocompare_query_pricehistorical(cryptocompare):
 
 
 def get_globaldb_cache_entries(from_asset: Asset, to_asset: Asset) -> list[HistoricalPrice]:
-    """TODO: This should probaly be moved in the globaldb/handler.py if we use it elsewhere
-    and made more generic (accept different sources)"""
-    connection = GlobalDBHandler().conn
-    cursor = connection.cursor()
-    query = cursor.execute(
-        'SELECT from_asset, to_asset, source_type, timestamp, price FROM '
-        'price_history WHERE from_asset=? AND to_asset=? AND source_type=? ORDER BY timestamp ASC',
-        (
-            from_asset.identifier,
-            to_asset.identifier,
-            HistoricalPriceOracle.CRYPTOCOMPARE.serialize_for_db(),  # pylint: disable=no-member
-        ),
+    return GlobalDBHandler().get_all_historical_prices(
+        from_asset=from_asset,
+        to_asset=to_asset,
+        source=HistoricalPriceOracle.CRYPTOCOMPARE,
     )
-    return [HistoricalPrice.deserialize_from_db(x) for x in query]
 
 
 @pytest.mark.parametrize('use_clean_caching_directory', [True])
@@ -96,6 +88,71 @@ def check_cc_result(result: list, forward: bool):
             raise AssertionError(f'Unexpected time entry {entry.time}')
 
 
+@pytest.mark.freeze_time('2023-11-14 22:40:00 GMT')
+@pytest.mark.parametrize('use_clean_caching_directory', [True])
+@pytest.mark.parametrize('function_scope_initialize_mock_rotki_notifier', [True])
+def test_cryptocompare_cache_warm_up(data_dir, database, function_scope_messages_aggregator):
+    """Test that the cache warm-up stores the whole history of many pairs page by page,
+    records when it's complete and resumes from the oldest stored price"""
+    cc = Cryptocompare(data_directory=data_dir, database=database)
+    now = Timestamp(1700001600)  # the frozen time
+    history_start = Timestamp(now - now % 3600 - 4500 * 3600)
+    queried_pairs = []
+
+    def mock_histohour(from_asset, to_asset, limit, to_timestamp):
+        queried_pairs.append((from_asset, to_asset))
+        if from_asset == A_BTC:
+            raise RemoteError('Cryptocompare is down')
+
+        time_to = to_timestamp - to_timestamp % 3600
+        time_from = time_to - limit * 3600
+        return {'TimeFrom': time_from, 'TimeTo': time_to, 'Data': [{
+            'time': ts,
+            'close': (price := 0 if from_asset == A_USD or ts < history_start else ts // 3600),
+            'high': price,
+            'low': price,
+        } for ts in range(time_from, time_to + 1, 3600)]}
+
+    with patch.object(cc, 'query_endpoint_histohour', side_effect=mock_histohour):
+        cc.warm_up_cache(
+            pairs=[(A_ETH, A_EUR), (A_BTC, A_EUR), (A_USD, A_EUR)],
+            msg_aggregator=function_scope_messages_aggregator,
+        )
+
+    # ETH history needs 3 pages and a 4th one finds the start. USD has no history
+    assert queried_pairs.count((A_ETH, A_EUR)) == 4
+    assert queried_pairs.count((A_USD, A_EUR)) == 1
+    assert GlobalDBHandler().get_historical_price_range(
+        from_asset=A_ETH,
+        to_asset=A_EUR,
+        source=HistoricalPriceOracle.CRYPTOCOMPARE,
+    ) == (history_start, now - now % 3600)
+    assert len(get_globaldb_cache_entries(from_asset=A_ETH, to_asset=A_EUR)) == 4501
+    messages = [x.data for x in function_scope_messages_aggregator.rotki_notifier.messages]
+    assert [x['oldest_timestamp'] for x in messages if x['from_asset'] == 'ETH'] == [
+        now - now % 3600 - 2000 * 3600,
+        now - now % 3600 - 4000 * 3600,
+        history_start,
+        history_start,
+    ]
+    finished = [x for x in messages if x['status'] != 'in_progress']
+    assert {x['from_asset']: x['status'] for x in finished} == {
+        'ETH': 'completed',
+        'BTC': 'failed',
+        'USD': 'completed',
+    }
+    assert sorted(x['processed_pairs'] for x in finished) == [1, 2, 3]
+
+    # a second warm-up only queries the pairs whose history is not complete
+    queried_pairs = []
+    with patch.object(cc, 'query_endpoint_histohour', side_effect=mock_histohour):
+        cc.warm_up_cache(
+            pairs=[(A_ETH, A_EUR), (A_BTC, A_EUR), (A_USD, A_EUR)],
+            msg_aggregator=function_scope_messages_aggregator,
+        )
+    assert queried_pairs == [(A_BTC, A_EUR)]
+
+
 @pytest.mark.skip('They are updating their systems & cleaning inactive pairs. Check again soon')
 @pytest.mark.freeze_time()
 @pytest.mark.parametrize('use_clean_caching_directory', [True])
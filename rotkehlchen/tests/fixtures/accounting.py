@@ -256,7 +256,7 @@ def _create_inquirer(
         msg_aggregator=MessagesAggregator(),
     )
 
-    mocked_methods = ('find_price', 'find_usd_price', 'find_price_and_oracle', 'find_usd_price_and_oracle', '_query_fiat_pair')  # noqa: E501
+    mocked_methods = ('find_price', 'find_usd_price', 'find_usd_prices', 'find_price_and_oracle', 'find_usd_price_and_oracle', '_query_fiat_pair')  # noqa: E501
     for x in mocked_methods:  # restore Inquirer to original state if needed
         old = f'{x}_old'
         if (original_method := getattr(Inquirer, old, None)) is not None:
@@ -290,6 +290,14 @@ def _create_inquirer(
     ):
         return mocked_prices.get(asset, FVal('1.5'))
 
+    def mock_find_usd_prices(
+            assets,
+            ignore_cache: bool = False,
+            skip_onchain: bool = False,  # pylint: disable=unused-argument
+    ):
+        # go through find_usd_price so that it follows whichever mocking is applied to it
+        return {asset: Inquirer.find_usd_price(asset, ignore_cache=ignore_cache) for asset in assets}  # noqa: E501
+
     def mock_find_price_with_oracle(
             from_asset,
             to_asset,
@@ -320,6 +328,7 @@ def _create_inquirer(
     if ignore_mocked_prices_for is None:
         Inquirer.find_price = inquirer.find_price = mock_find_price  # type: ignore
         Inquirer.find_usd_price = inquirer.find_usd_price = mock_find_usd_price  # type: ignore
+        Inquirer.find_usd_prices = inquirer.find_usd_prices = mock_find_usd_prices  # type: ignore
         Inquirer.find_price_and_oracle = inquirer.find_price_and_oracle = mock_find_price_with_oracle  # type: ignore  # noqa: E501
         Inquirer.find_usd_price_and_oracle = inquirer.find_usd_price_and_oracle = mock_find_usd_price_with_oracle  # type: ignore  # noqa: E501
 
@@ -401,6 +410,7 @@ def _create_inquirer(
 
         inquirer.find_price = Inquirer.find_price = mock_some_prices  # type: ignore
         inquirer.find_usd_price = Inquirer.find_usd_price = mock_some_usd_prices  # type: ignore
+        inquirer.find_usd_prices = Inquirer.find_usd_prices = mock_find_usd_prices  # type: ignore
         inquirer.find_price_and_oracle = Inquirer.find_price_and_oracle = mock_prices_with_oracles  # type: ignore
         inquirer.find_usd_price_and_oracle = Inquirer.find_usd_price_and_oracle = mock_usd_prices_with_oracles  # type: ignore  # noqa: E501
 
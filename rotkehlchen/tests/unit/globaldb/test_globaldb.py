@@ -3,6 +3,7 @@ import sqlite3
 from pathlib import Path
 from shutil import copyfile
 from typing import TYPE_CHECKING
+from unittest.mock import patch
 from uuid import uuid4
 
 import pytest
@@ -677,6 +678,16 @@ def test_global_db_restore(globaldb, database):
     conn.close()
 
 
+def test_packaged_db_version():
+    """Test that the packaged global DB is at the latest version since the assets reset
+    refuses to restore the assets of a packaged DB at another version"""
+    root_dir = Path(__file__).resolve().parent.parent.parent.parent
+    conn = sqlite3.connect(root_dir / 'data' / GLOBALDB_NAME)
+    version = conn.execute('SELECT value FROM settings WHERE name="version";').fetchone()
+    conn.close()
+    assert int(version[0]) == GLOBAL_DB_VERSION, 'The packaged global DB needs to be regenerated'
+
+
 def test_global_db_reset(globaldb, database):
     """
     Check that the user can recreate assets information from the packaged
@@ -1300,3 +1311,48 @@ def test_assets_in_same_collection(globaldb: GlobalDBHandler):
 
     # check an asset with no related assets
     assert globaldb.get_assets_in_same_collection(identifier=A_ETH.identifier) == (A_ETH,)
+
+
+def test_get_evm_token_cache(globaldb: GlobalDBHandler):
+    """Check that evm token lookups, including misses, are cached and invalidated on changes"""
+    address, underlying_address = make_evm_address(), make_evm_address()
+    key, underlying_key = (address, ChainID.ETHEREUM), (underlying_address, ChainID.ETHEREUM)
+    assert globaldb.get_evm_token(address, ChainID.ETHEREUM) is None
+    assert globaldb.get_evm_token(underlying_address, ChainID.ETHEREUM) is None
+    assert key in globaldb.non_evm_tokens_cache and underlying_key in globaldb.non_evm_tokens_cache
+    with patch.object(globaldb.conn, 'read_ctx') as read_ctx:  # misses don't hit the DB again
+        assert globaldb.get_evm_token(address, ChainID.ETHEREUM) is None
+    assert read_ctx.call_count == 0
+
+    token = EvmToken.initialize(
+        address=address,
+        chain_id=ChainID.ETHEREUM,
+        token_kind=EvmTokenKind.ERC20,
+        name='Cached token',
+        symbol='CACHED',
+        decimals=18,
+        underlying_tokens=[UnderlyingToken(
+            address=underlying_address,
+            token_kind=EvmTokenKind.ERC20,
+            weight=ONE,
+        )],
+    )
+    globaldb.add_asset(token)  # adding the token and its underlying token invalidates misses
+    assert key not in globaldb.non_evm_tokens_cache
+    assert underlying_key not in globaldb.non_evm_tokens_cache
+    assert globaldb.get_evm_token(address, ChainID.ETHEREUM) == token
+    assert globaldb.get_evm_token(underlying_address, ChainID.ETHEREUM) is not None
+    with patch.object(globaldb.conn, 'read_ctx') as read_ctx:
+        assert globaldb.get_evm_token(address, ChainID.ETHEREUM) == token
+    assert read_ctx.call_count == 0
+
+    object.__setattr__(token, 'name', 'Edited token')
+    globaldb.edit_evm_token(token)
+    cached_token = globaldb.get_evm_token(address, ChainID.ETHEREUM)
+    assert cached_token is not None and cached_token.name == 'Edited token'
+
+    AssetResolver.clean_memory_cache(token.identifier)  # resolver invalidation cleans it too
+    assert key not in globaldb.evm_tokens_cache
+    assert globaldb.get_evm_token(address, ChainID.ETHEREUM) is not None
+    globaldb.delete_evm_token(address, ChainID.ETHEREUM)
+    assert globaldb.get_evm_token(address, ChainID.ETHEREUM) is None
@@ -14,6 +14,7 @@ from rotkehlchen.tests.utils.globaldb import patch_for_globaldb_migrations
 @pytest.mark.parametrize('globaldb_upgrades', [[]])
 @pytest.mark.parametrize('run_globaldb_migrations', [False])
 @pytest.mark.parametrize('custom_globaldb', ['v4_global_before_migration1.db'])
+@pytest.mark.parametrize('target_globaldb_version', [6])
 def test_migration1(globaldb):
     """Test for the 1st globalDB data migration"""
     # Check state before migration
@@ -1,5 +1,18 @@
+import csv
+
+import pytest
+
+from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import A_BAL, A_BTC, A_ETH, A_USD
+from rotkehlchen.constants.timing import DAY_IN_SECONDS
+from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.fval import FVal
+from rotkehlchen.globaldb.price_blocks import (
+    PRICE_BLOCK_SECONDS,
+    decode_price_block,
+    encode_price_block,
+    price_block_start,
+)
 from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
 from rotkehlchen.tests.utils.constants import A_EUR
 from rotkehlchen.types import Price, Timestamp
@@ -131,3 +144,216 @@ def test_get_historical_price(globaldb, historical_price_test_data):  # pylint:
         max_seconds_distance=3600,
     )
     assert price_entry is None
+
+
+def test_price_block_encoding():
+    """Test that the prices of a block are decoded exactly as they were encoded"""
+    block_start = price_block_start(1700000000)
+    points = [
+        (Timestamp(block_start), Price(FVal('1800.52'))),
+        (Timestamp(block_start + 3600), Price(FVal('1801.100'))),
+        (Timestamp(block_start + 7200), Price(ZERO)),
+        (Timestamp(block_start + 7201), Price(FVal('0.000000000001234'))),
+        (Timestamp(block_start + 10800), Price(FVal('-5.5'))),
+        (Timestamp(block_start + PRICE_BLOCK_SECONDS - 1), Price(FVal('115792089237316195423570985008687907853269984665640564039457'))),  # noqa: E501
+    ]
+    block = decode_price_block(block_start, encode_price_block(block_start, points))
+    assert block.timestamps == [x[0] for x in points]
+    assert [str(x) for x in block.prices] == [str(x[1]) for x in points]
+
+    with pytest.raises(DeserializationError):
+        decode_price_block(block_start, b'garbage')
+
+
+def test_historical_prices_in_blocks(globaldb, tmp_path):
+    """Test that the oracle prices spanning many blocks are stored in
+    price_history_blocks and are queried, replaced, exported and deleted properly"""
+    start_ts = price_block_start(1700000000)
+    globaldb.add_historical_prices([HistoricalPrice(
+        from_asset=A_ETH,
+        to_asset=A_USD,
+        source=HistoricalPriceOracle.CRYPTOCOMPARE,
+        timestamp=Timestamp(start_ts + idx * DAY_IN_SECONDS),
+        price=Price(FVal(1000 + idx)),
+    ) for idx in range(90)] + [HistoricalPrice(
+        from_asset=A_ETH,
+        to_asset=A_USD,
+        source=HistoricalPriceOracle.MANUAL,
+        timestamp=Timestamp(start_ts + 50 * DAY_IN_SECONDS + 10),
+        price=Price(FVal(5)),
+    )])
+    with globaldb.conn.read_ctx() as cursor:
+        assert cursor.execute('SELECT COUNT(*) FROM price_history_blocks').fetchone()[0] == 3
+        assert cursor.execute('SELECT COUNT(*) FROM price_history').fetchone()[0] == 1
+
+    # existing prices are not replaced when adding and new ones are merged in the blocks
+    globaldb.add_historical_prices([HistoricalPrice(
+        from_asset=A_ETH,
+        to_asset=A_USD,
+        source=HistoricalPriceOracle.CRYPTOCOMPARE,
+        timestamp=Timestamp(start_ts + idx),
+        price=Price(FVal(1)),
+    ) for idx in (0, 1)])
+    assert globaldb.get_historical_prices(
+        query_data=[
+            (A_ETH, A_USD, Timestamp(start_ts)),
+            (A_ETH, A_USD, Timestamp(start_ts + 2)),
+            (A_ETH, A_USD, Timestamp(start_ts + 30 * DAY_IN_SECONDS - 3600)),
+            (A_ETH, A_USD, Timestamp(start_ts + 50 * DAY_IN_SECONDS + 8)),
+            (A_ETH, A_USD, Timestamp(start_ts + 100 * DAY_IN_SECONDS)),
+        ],
+        max_seconds_distance=7200,
+    ) == [HistoricalPrice(
+        from_asset=A_ETH,
+        to_asset=A_USD,
+        source=HistoricalPriceOracle.CRYPTOCOMPARE,
+        timestamp=Timestamp(start_ts),
+        price=Price(FVal(1000)),
+    ), HistoricalPrice(
+        from_asset=A_ETH,
+        to_asset=A_USD,
+        source=HistoricalPriceOracle.CRYPTOCOMPARE,
+        timestamp=Timestamp(start_ts + 1),
+        price=Price(FVal(1)),
+    ), HistoricalPrice(  # closest one is in the next block
+        from_asset=A_ETH,
+        to_asset=A_USD,
+        source=HistoricalPriceOracle.CRYPTOCOMPARE,
+        timestamp=Timestamp(start_ts + 30 * DAY_IN_SECONDS),
+        price=Price(FVal(1030)),
+    ), HistoricalPrice(  # manual price is closer than the oracle one
+        from_asset=A_ETH,
+        to_asset=A_USD,
+        source=HistoricalPriceOracle.MANUAL,
+        timestamp=Timestamp(start_ts + 50 * DAY_IN_SECONDS + 10),
+        price=Price(FVal(5)),
+    ), None]
+
+    # a single price replaces the existing one
+    assert globaldb.add_single_historical_price(HistoricalPrice(
+        from_asset=A_ETH,
+        to_asset=A_USD,
+        source=HistoricalPriceOracle.CRYPTOCOMPARE,
+        timestamp=Timestamp(start_ts),
+        price=Price(FVal(2)),
+    )) is True
+    assert globaldb.get_historical_price(
+        from_asset=A_ETH,
+        to_asset=A_USD,
+        timestamp=Timestamp(start_ts),
+        max_seconds_distance=0,
+        source=HistoricalPriceOracle.CRYPTOCOMPARE,
+    ).price == FVal(2)
+    assert globaldb.get_historical_price_range(from_asset=A_ETH, to_asset=A_USD) == (
+        start_ts,
+        start_ts + 89 * DAY_IN_SECONDS,
+    )
+    assert globaldb.get_historical_price_data(source=HistoricalPriceOracle.CRYPTOCOMPARE) == [{
+        'from_asset': 'ETH',
+        'to_asset': 'USD',
+        'from_timestamp': start_ts,
+        'to_timestamp': start_ts + 89 * DAY_IN_SECONDS,
+    }]
+
+    filepath = tmp_path / 'prices.csv'
+    assert globaldb.export_historical_prices(filepath=filepath, from_asset=A_ETH) == 92
+    with open(filepath, encoding='utf-8') as csvfile:
+        rows = list(csv.DictReader(csvfile))
+    assert rows[0] == {
+        'from_asset': 'ETH',
+        'to_asset': 'USD',
+        'source': 'manual',
+        'timestamp': str(start_ts + 50 * DAY_IN_SECONDS + 10),
+        'price': '5',
+    }
+    assert rows[1:4] == [
+        {'from_asset': 'ETH', 'to_asset': 'USD', 'source': 'cryptocompare', 'timestamp': str(start_ts), 'price': '2'},  # noqa: E501
+        {'from_asset': 'ETH', 'to_asset': 'USD', 'source': 'cryptocompare', 'timestamp': str(start_ts + 1), 'price': '1'},  # noqa: E501
+        {'from_asset': 'ETH', 'to_asset': 'USD', 'source': 'cryptocompare', 'timestamp': str(start_ts + DAY_IN_SECONDS), 'price': '1001'},  # noqa: E501
+    ]
+
+    globaldb.delete_historical_prices(
+        from_asset=A_ETH,
+        to_asset=A_USD,
+        source=HistoricalPriceOracle.CRYPTOCOMPARE,
+    )
+    assert globaldb.get_historical_price_range(from_asset=A_ETH, to_asset=A_USD) == (
+        start_ts + 50 * DAY_IN_SECONDS + 10,
+        start_ts + 50 * DAY_IN_SECONDS + 10,
+    )
+    with globaldb.conn.read_ctx() as cursor:
+        assert cursor.execute('SELECT COUNT(*) FROM price_history_blocks').fetchone()[0] == 0
+
+
+def test_historical_price_interpolation(globaldb):
+    """Test that prices are linearly interpolated between the stored oracle prices
+    around a timestamp only when asked to and when they are close enough"""
+    boundary = price_block_start(1700000000) + PRICE_BLOCK_SECONDS
+    globaldb.add_historical_prices([HistoricalPrice(
+        from_asset=A_ETH,
+        to_asset=A_USD,
+        source=source,
+        timestamp=Timestamp(boundary + offset),
+        price=Price(FVal(price)),
+    ) for source, offset, price in (
+        (HistoricalPriceOracle.CRYPTOCOMPARE, -1800, 100),  # in the previous block
+        (HistoricalPriceOracle.CRYPTOCOMPARE, 1800, 200),
+        (HistoricalPriceOracle.CRYPTOCOMPARE, 5400, 0),  # missing data
+        (HistoricalPriceOracle.COINGECKO, -900, 50),
+        (HistoricalPriceOracle.COINGECKO, 900, 60),
+    )] + [HistoricalPrice(
+        from_asset=A_ETH,
+        to_asset=A_EUR,
+        source=HistoricalPriceOracle.MANUAL,
+        timestamp=Timestamp(boundary + offset),
+        price=Price(FVal(price)),
+    ) for offset, price in ((-1800, 1), (1800, 2))])
+
+    def query(timestamp, interpolation_max_gap, source=None, to_asset=A_USD):
+        return globaldb.get_historical_price(
+            from_asset=A_ETH,
+            to_asset=to_asset,
+            timestamp=Timestamp(timestamp),
+            max_seconds_distance=200,
+            source=source,
+            interpolation_max_gap=interpolation_max_gap,
+        )
+
+    assert query(boundary + 1440, interpolation_max_gap=0) is None
+    assert query(boundary + 1440, interpolation_max_gap=3600) == HistoricalPrice(
+        from_asset=A_ETH,
+        to_asset=A_USD,
+        source=HistoricalPriceOracle.CRYPTOCOMPARE,
+        timestamp=Timestamp(boundary + 1440),
+        price=Price(FVal(190)),
+        interpolated=True,
+    )
+    # a stored price within the distance is preferred to an interpolated one
+    assert query(boundary + 1700, interpolation_max_gap=3600).interpolated is False
+    # the points with the smallest gap are used and the source can be restricted
+    assert query(boundary, interpolation_max_gap=3600).price == FVal(55)
+    assert query(
+        boundary,
+        interpolation_max_gap=3600,
+        source=HistoricalPriceOracle.CRYPTOCOMPARE,
+    ).price == FVal(150)
+    assert query(
+        boundary,
+        interpolation_max_gap=3599,
+        source=HistoricalPriceOracle.CRYPTOCOMPARE,
+    ) is None
+    # zero prices and manual prices are never interpolated
+    assert query(boundary + 3600, interpolation_max_gap=3600) is None
+    assert query(boundary, interpolation_max_gap=3600, to_asset=A_EUR) is None
+    assert globaldb.get_historical_prices(
+        query_data=[(A_ETH, A_USD, Timestamp(boundary - 1350)), (A_ETH, A_USD, Timestamp(boundary + 9000))],  # noqa: E501
+        max_seconds_distance=0,
+        interpolation_max_gap=DAY_IN_SECONDS,
+    ) == [HistoricalPrice(
+        from_asset=A_ETH,
+        to_asset=A_USD,
+        source=HistoricalPriceOracle.CRYPTOCOMPARE,
+        timestamp=Timestamp(boundary - 1350),
+        price=Price(FVal('112.5')),
+        interpolated=True,
+    ), None]
@@ -506,6 +506,64 @@ def test_upgrade_v5_v6(globaldb: GlobalDBHandler):
         ).fetchone()[0] == 0
 
 
+@pytest.mark.parametrize('globaldb_upgrades', [[]])
+@pytest.mark.parametrize('custom_globaldb', ['v6_global.db'])
+@pytest.mark.parametrize('target_globaldb_version', [6])
+@pytest.mark.parametrize('reload_user_assets', [False])
+def test_upgrade_v6_v7(globaldb: GlobalDBHandler):
+    """Test the global DB upgrade from v6 to v7"""
+    prices = [
+        ('ETH', 'USD', 'C', 1700000000, '1800.52'),
+        ('ETH', 'USD', 'C', 1700003600, '1801.1'),
+        ('ETH', 'USD', 'C', 1710000000, '3500'),
+        ('ETH', 'USD', 'B', 1700000000, '1799.9'),
+        ('BTC', 'EUR', 'F', 1600000000, '0.000001'),
+        ('ETH', 'USD', 'A', 1700000000, '1850'),
+        ('BTC', 'USD', 'E', 1700000000, '35000'),
+    ]
+    with globaldb.conn.write_ctx() as write_cursor:
+        assert write_cursor.execute(
+            'SELECT COUNT(*) FROM sqlite_master WHERE type="table" and name=?',
+            ('price_history_blocks',),
+        ).fetchone()[0] == 0
+        write_cursor.executemany(
+            'INSERT INTO price_history(from_asset, to_asset, source_type, timestamp, price) '
+            'VALUES(?, ?, ?, ?, ?)',
+            prices,
+        )
+
+    with ExitStack() as stack:
+        patch_for_globaldb_upgrade_to(stack, 7)
+        maybe_upgrade_globaldb(
+            connection=globaldb.conn,
+            global_dir=globaldb._data_directory / GLOBALDIR_NAME,  # type: ignore
+            db_filename=GLOBALDB_NAME,
+        )
+    assert globaldb.get_setting_value('version', 0) == 7
+    with globaldb.conn.read_ctx() as cursor:
+        # only the manual prices stay in price_history
+        assert cursor.execute(
+            'SELECT from_asset, to_asset, source_type, timestamp, price FROM price_history '
+            'ORDER BY source_type',
+        ).fetchall() == prices[5:]
+        # ETH/USD cryptocompare prices span two blocks
+        assert cursor.execute(
+            'SELECT from_asset, to_asset, source_type, first_timestamp, last_timestamp '
+            'FROM price_history_blocks ORDER BY from_asset, source_type, block_start',
+        ).fetchall() == [
+            ('BTC', 'EUR', 'F', 1600000000, 1600000000),
+            ('ETH', 'USD', 'B', 1700000000, 1700000000),
+            ('ETH', 'USD', 'C', 1700000000, 1700003600),
+            ('ETH', 'USD', 'C', 1710000000, 1710000000),
+        ]
+
+    # all prices read back exactly as they were
+    assert sorted(
+        (x.from_asset.identifier, x.to_asset.identifier, x.source.serialize_for_db(), x.timestamp, str(x.price))  # noqa: E501
+        for x in globaldb.get_all_historical_prices()
+    ) == sorted(prices)
+
+
 @pytest.mark.parametrize('custom_globaldb', ['v2_global.db'])
 @pytest.mark.parametrize('target_globaldb_version', [2])
 @pytest.mark.parametrize('reload_user_assets', [False])
@@ -1,21 +1,48 @@
+import time
+from collections import defaultdict
+from collections.abc import Sequence
 from contextlib import ExitStack
-from typing import TYPE_CHECKING
+from functools import partial
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
 
+import gevent
 import pytest
 
+from rotkehlchen.accounting.structures.balance import Balance, BalanceSheet
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.assets.utils import get_or_create_evm_token
 from rotkehlchen.chain.accounts import BlockchainAccountData
-from rotkehlchen.chain.aggregator import ChainsAggregator, _module_name_to_class
+from rotkehlchen.chain.aggregator import (
+    INCREMENTAL_BALANCES_FULL_SWEEP_SECONDS,
+    ChainsAggregator,
+    _module_name_to_class,
+)
 from rotkehlchen.chain.evm.types import NodeName, WeightedNode, string_to_evm_address
 from rotkehlchen.constants import ONE
+from rotkehlchen.constants.assets import A_BTC, A_DAI, A_ETH
+from rotkehlchen.db.evmtx import DBEvmTx
+from rotkehlchen.db.settings import CachedSettings
+from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.blockchain import setup_evm_addresses_activity_mock
-from rotkehlchen.tests.utils.factories import make_evm_address
+from rotkehlchen.tests.utils.factories import make_evm_address, make_evm_tx_hash
 from rotkehlchen.tests.utils.polygon_pos import ALCHEMY_RPC_ENDPOINT
-from rotkehlchen.types import AVAILABLE_MODULES_MAP, SPAM_PROTOCOL, ChainID, SupportedBlockchain
+from rotkehlchen.types import (
+    AVAILABLE_MODULES_MAP,
+    SPAM_PROTOCOL,
+    BTCAddress,
+    ChainID,
+    EvmTransaction,
+    Price,
+    SupportedBlockchain,
+    Timestamp,
+)
+from rotkehlchen.utils.misc import ts_now
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.polygon_pos.manager import PolygonPOSManager
+    from rotkehlchen.db.dbhandler import DBHandler
+    from rotkehlchen.types import ChecksumEvmAddress
 
 
 ALCHEMY_POLYGON_NODE = WeightedNode(
@@ -252,3 +279,130 @@ def test_detect_evm_accounts_spam_tx(polygon_pos_manager: 'PolygonPOSManager') -
             db.add_to_ignored_assets(write_cursor=write_cursor, asset=asset)
 
     assert polygon_pos_manager.transactions.address_has_been_spammed(evm_address) is True
+
+
+@pytest.mark.parametrize('ethereum_accounts', [[]])
+def test_query_all_balances_concurrently(blockchain: 'ChainsAggregator') -> None:
+    """Test that querying the balances of all chains queries them concurrently and that a
+    chain exceeding the timeout is reported as failed while the other chains' balances
+    are still returned"""
+    query_seconds, slow_query_seconds, slow_chain = 0.1, 1.5, SupportedBlockchain.BITCOIN_CASH
+    queried_chains: list[SupportedBlockchain] = []
+
+    def mock_query(chain: SupportedBlockchain, **_kwargs: Any) -> None:
+        gevent.sleep(slow_query_seconds if chain == slow_chain else query_seconds)
+        queried_chains.append(chain)
+        if chain == SupportedBlockchain.BITCOIN:
+            blockchain.balances.btc[BTCAddress('bc1qhkje0xfvhmgk6mvanxwy09n45df03tj3h3jtnf')] = Balance(amount=ONE, usd_value=ONE)  # noqa: E501
+
+    with ExitStack() as stack:
+        for chain in SupportedBlockchain:
+            stack.enter_context(patch.object(
+                blockchain,
+                f'query_{chain.get_key()}_balances',
+                side_effect=partial(mock_query, chain),
+            ))
+
+        stack.enter_context(patch.object(CachedSettings, 'balances_query_concurrency', new=len(SupportedBlockchain)))  # noqa: E501
+        stack.enter_context(patch.object(CachedSettings, 'chain_balances_query_timeout', new=0.5))
+        start = time.monotonic()
+        result = blockchain.query_balances(ignore_cache=True)
+        assert time.monotonic() - start < 0.5 + query_seconds * len(SupportedBlockchain) / 2
+        assert set(queried_chains) == set(SupportedBlockchain) - {slow_chain}
+        assert list(result.failed_chains) == [slow_chain]
+        assert 'timed out after 0.5 seconds' in result.failed_chains[slow_chain]
+        assert result.totals.assets[A_BTC] == Balance(amount=ONE, usd_value=ONE)
+
+        # with a concurrency limit of 1 the chains are queried one after the other
+        queried_chains.clear()
+        stack.enter_context(patch.object(CachedSettings, 'balances_query_concurrency', new=1))
+        stack.enter_context(patch.object(CachedSettings, 'chain_balances_query_timeout', new=10))
+        start = time.monotonic()
+        result = blockchain.query_balances(ignore_cache=True)
+        elapsed = time.monotonic() - start
+        assert elapsed >= slow_query_seconds + query_seconds * (len(SupportedBlockchain) - 1)
+        assert queried_chains == list(SupportedBlockchain)
+        assert result.failed_chains == {}
+
+
+@pytest.mark.parametrize('number_of_eth_accounts', [2])
+def test_incremental_evm_balances_refresh(
+        blockchain: 'ChainsAggregator',
+        database: 'DBHandler',
+        ethereum_accounts: list['ChecksumEvmAddress'],
+) -> None:
+    """Test that an incremental refresh of evm balances only queries the addresses with
+    activity added to the DB since the last query and the new addresses, reuses the
+    balances of the others at the current prices and queries all addresses once the
+    full sweep is due"""
+    active_address, inactive_address = ethereum_accounts
+    new_address = make_evm_address()
+    prices = {A_ETH: Price(FVal(2000)), A_DAI: Price(ONE)}
+    queried_addresses: list[set['ChecksumEvmAddress']] = []
+
+    def mock_get_multi_balance(accounts: Sequence['ChecksumEvmAddress']) -> dict['ChecksumEvmAddress', FVal]:  # noqa: E501
+        queried_addresses.append(set(accounts))
+        return dict.fromkeys(accounts, ONE)
+
+    def mock_query_evm_tokens(
+            balances: defaultdict['ChecksumEvmAddress', BalanceSheet],
+            addresses: Sequence['ChecksumEvmAddress'],
+            **_kwargs: Any,
+    ) -> None:
+        for address in addresses:
+            balances[address].assets[A_DAI] = Balance(amount=FVal(10), usd_value=FVal(10) * prices[A_DAI])  # noqa: E501
+
+    def query_balances(now: Timestamp, incremental: bool = True) -> set['ChecksumEvmAddress']:
+        queried_addresses.clear()
+        with patch('rotkehlchen.chain.aggregator.ts_now', return_value=now):
+            blockchain.query_evm_chain_balances(chain=SupportedBlockchain.ETHEREUM, incremental=incremental)  # noqa: E501
+        return set().union(*queried_addresses)
+
+    def add_transaction(address: 'ChecksumEvmAddress') -> None:
+        with database.user_write() as write_cursor:
+            DBEvmTx(database).add_evm_transactions(
+                write_cursor=write_cursor,
+                evm_transactions=[EvmTransaction(
+                    tx_hash=make_evm_tx_hash(),
+                    chain_id=ChainID.ETHEREUM,
+                    timestamp=Timestamp(1600000000),  # queried long after it happened
+                    block_number=1,
+                    from_address=address,
+                    to_address=make_evm_address(),
+                    value=0,
+                    gas=1,
+                    gas_price=1,
+                    gas_used=1,
+                    input_data=b'',
+                    nonce=1,
+                )],
+                relevant_address=address,
+            )
+
+    with (
+        patch.object(blockchain.ethereum.node_inquirer, 'get_multi_balance', side_effect=mock_get_multi_balance),  # noqa: E501
+        patch.object(blockchain, 'query_evm_tokens', side_effect=mock_query_evm_tokens),
+        patch('rotkehlchen.chain.aggregator.Inquirer.find_usd_price', side_effect=lambda asset: prices[asset]),  # noqa: E501
+        patch('rotkehlchen.chain.aggregator.Inquirer.find_usd_prices', side_effect=lambda assets: {x: prices[x] for x in assets}),  # noqa: E501
+    ):
+        start_ts = ts_now()
+        assert query_balances(now=start_ts) == {active_address, inactive_address}
+
+        add_transaction(active_address)
+        prices[A_ETH] = Price(FVal(3000))
+        assert query_balances(now=Timestamp(start_ts + 1)) == {active_address}
+        eth_balances = blockchain.balances.get(SupportedBlockchain.ETHEREUM)
+        for address in (active_address, inactive_address):  # the reused one is repriced too
+            assert eth_balances[address].assets == {
+                A_ETH: Balance(amount=ONE, usd_value=FVal(3000)),
+                A_DAI: Balance(amount=FVal(10), usd_value=FVal(10)),
+            }
+
+        blockchain.accounts.add(SupportedBlockchain.ETHEREUM, new_address)
+        assert query_balances(now=Timestamp(start_ts + 2)) == {new_address}
+        assert query_balances(now=Timestamp(start_ts + 3)) == set()
+        assert query_balances(now=Timestamp(start_ts + 4), incremental=False) == {active_address, inactive_address, new_address}  # noqa: E501
+
+        # all addresses are queried again once a full sweep is due
+        assert query_balances(now=Timestamp(start_ts + 4 + INCREMENTAL_BALANCES_FULL_SWEEP_SECONDS)) == {active_address, inactive_address, new_address}  # noqa: E501
+        assert query_balances(now=Timestamp(start_ts + 5 + INCREMENTAL_BALANCES_FULL_SWEEP_SECONDS)) == set()  # noqa: E501
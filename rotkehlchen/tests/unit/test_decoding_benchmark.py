@@ -0,0 +1,31 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from rotkehlchen.tests.utils.decoders import (
+    check_decoding_benchmark_regression,
+    run_decoding_benchmark,
+)
+from rotkehlchen.types import ChainID
+
+
+@pytest.mark.parametrize('use_custom_database', ['ethtxs.db'])
+def test_decoding_benchmark(request, ethereum_transaction_decoder, database):
+    """Replays the recorded transactions and receipts of the test DB through the decoder
+    without network and reports the throughput, memory and time spent per decoder.
+
+    Run with --decoding-benchmark=<output path> and optionally --decoding-benchmark-baseline=<path>
+    to fail if the throughput regressed compared to a previous run."""
+    if (output_path := request.config.option.decoding_benchmark) is None:
+        pytest.skip('Decoding benchmark only runs with --decoding-benchmark')
+
+    result = run_decoding_benchmark(
+        decoder=ethereum_transaction_decoder,
+        database=database,
+        chain_id=ChainID.ETHEREUM,
+    )
+    assert result.transactions > 0
+    Path(output_path).write_text(json.dumps(result.serialize(), indent=2))
+    if (baseline := request.config.option.decoding_benchmark_baseline) is not None:
+        check_decoding_benchmark_regression(result=result, baseline_path=Path(baseline))
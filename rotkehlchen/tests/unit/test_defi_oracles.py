@@ -2,12 +2,24 @@ from typing import TYPE_CHECKING
 from unittest.mock import patch
 
 import pytest
+from eth_abi import encode
 
 from rotkehlchen.assets.asset import Asset, EvmToken
 from rotkehlchen.assets.resolver import AssetResolver
+from rotkehlchen.chain.ethereum.oracles.uniswap import NO_ROUTE_CACHE_TTL
 from rotkehlchen.chain.evm.types import string_to_evm_address
 from rotkehlchen.constants import ONE
-from rotkehlchen.constants.assets import A_1INCH, A_BTC, A_DOGE, A_ETH, A_LINK, A_USDC, A_WETH
+from rotkehlchen.constants.assets import (
+    A_1INCH,
+    A_BTC,
+    A_DAI,
+    A_DOGE,
+    A_ETH,
+    A_LINK,
+    A_USD,
+    A_USDC,
+    A_WETH,
+)
 from rotkehlchen.constants.prices import ZERO_PRICE
 from rotkehlchen.errors.defi import DefiPoolError
 from rotkehlchen.errors.price import PriceQueryUnsupportedAsset
@@ -16,6 +28,7 @@ from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.inquirer import CurrentPriceOracle
 from rotkehlchen.tests.utils.mock import MockResponse
 from rotkehlchen.types import ChainID, EvmTokenKind, Price
+from rotkehlchen.utils.misc import ts_now
 
 if TYPE_CHECKING:
     from rotkehlchen.inquirer import Inquirer
@@ -165,3 +178,61 @@ def test_invalid_token_kind_price_query(inquirer_defi: 'Inquirer'):
             to_asset=A_USDC.resolve_to_evm_token(),
             match_main_currency=False,
         )
+
+
+@pytest.mark.parametrize('use_clean_caching_directory', [True])
+def test_uniswap_route_cache_and_batched_pool_prices(inquirer_defi: 'Inquirer'):
+    """Test that the uniswap oracle remembers routes, including missing ones, and reads
+    the prices of the pools of many tokens with a single multicall"""
+    oracle = inquirer_defi._uniswapv2
+    assert oracle is not None
+    usdc = A_USDC.resolve_to_evm_token()
+    inch, link = A_1INCH.resolve_to_evm_token(), A_LINK.resolve_to_evm_token()
+    inch_pool = string_to_evm_address('0x0000000000000000000000000000000000000001')
+    link_pool = string_to_evm_address('0x0000000000000000000000000000000000000002')
+    routes = {inch: [inch_pool], link: [link_pool]}
+    pools = {  # pool -> (token0, token1, reserve0, reserve1)
+        inch_pool: (inch, usdc, 1_000_000 * 10**18, 500_000 * 10**6),
+        link_pool: (link, usdc, 100_000 * 10**18, 1_500_000 * 10**6),
+    }
+    pool_outputs = {}
+    for pool_addr, (token_0, token_1, reserve_0, reserve_1) in pools.items():
+        pool_contract = oracle.pool_contract(pool_addr)
+        pool_outputs[(pool_addr, pool_contract.encode(method_name='getReserves'))] = encode(['uint112', 'uint112', 'uint32'], [reserve_0, reserve_1, 0])  # noqa: E501
+        pool_outputs[(pool_addr, pool_contract.encode(method_name='token0'))] = encode(['address'], [token_0.evm_address])  # noqa: E501
+        pool_outputs[(pool_addr, pool_contract.encode(method_name='token1'))] = encode(['address'], [token_1.evm_address])  # noqa: E501
+
+    def mock_multicall_2(calls, **kwargs):  # pylint: disable=unused-argument
+        return [(True, pool_outputs[call]) for call in calls]
+
+    with (
+        patch.object(oracle, 'find_route', side_effect=lambda x, _: routes.get(x, [])) as find_route,  # noqa: E501
+        patch.object(oracle.ethereum, 'multicall_2', side_effect=mock_multicall_2) as multicall,
+        patch.object(inquirer_defi, 'find_usd_price', return_value=Price(ONE)),  # for reserves
+    ):
+        assets = [A_1INCH.resolve_to_asset_with_oracles(), A_LINK.resolve_to_asset_with_oracles(), A_DAI.resolve_to_asset_with_oracles(), A_BTC.resolve_to_asset_with_oracles()]  # noqa: E501
+        expected_prices = {assets[0]: FVal('0.5'), assets[1]: FVal(15)}
+        usd = A_USD.resolve_to_asset_with_oracles()
+        assert oracle.query_multiple_current_prices(from_assets=assets, to_asset=usd) == expected_prices  # noqa: E501
+        assert find_route.call_count == 3  # BTC is not an ethereum token
+        assert multicall.call_count == 1
+        assert len(multicall.call_args.kwargs['calls']) == 6
+
+        # the routes are remembered and only the reserves are read for known pools
+        assert oracle.query_multiple_current_prices(from_assets=assets, to_asset=usd) == expected_prices  # noqa: E501
+        assert find_route.call_count == 3
+        assert multicall.call_count == 2
+        assert len(multicall.call_args.kwargs['calls']) == 2
+
+        # a token without a route is searched again only after the negative cache expires
+        with patch(
+            'rotkehlchen.chain.ethereum.oracles.uniswap.ts_now',
+            return_value=ts_now() + NO_ROUTE_CACHE_TTL,
+        ):
+            assert oracle.query_multiple_current_prices(from_assets=assets, to_asset=usd) == expected_prices  # noqa: E501
+        assert find_route.call_count == 4
+        assert find_route.call_args.args[0] == A_DAI.resolve_to_evm_token()
+
+        # the single price query uses the same cached route
+        assert oracle.query_current_price(assets[1], usd, False)[0] == FVal(15)
+        assert find_route.call_count == 4
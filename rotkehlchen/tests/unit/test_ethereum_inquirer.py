@@ -1,4 +1,4 @@
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import pytest
 
@@ -6,6 +6,7 @@ from rotkehlchen.chain.accounts import BlockchainAccountData
 from rotkehlchen.chain.ethereum.constants import ETHEREUM_ETHERSCAN_NODE_NAME
 from rotkehlchen.chain.evm.constants import ZERO_ADDRESS
 from rotkehlchen.chain.evm.decoding.constants import ERC20_OR_ERC721_TRANSFER
+from rotkehlchen.chain.evm.node_inquirer import _query_web3_get_logs
 from rotkehlchen.chain.evm.structures import EvmTxReceipt, EvmTxReceiptLog
 from rotkehlchen.chain.evm.types import string_to_evm_address
 from rotkehlchen.db.evmtx import DBEvmTx
@@ -18,7 +19,13 @@ from rotkehlchen.tests.utils.ethereum import (
     wait_until_all_nodes_connected,
 )
 from rotkehlchen.tests.utils.factories import make_evm_address
-from rotkehlchen.types import ChainID, EvmTransaction, SupportedBlockchain, deserialize_evm_tx_hash
+from rotkehlchen.types import (
+    ChainID,
+    EvmTransaction,
+    SupportedBlockchain,
+    Timestamp,
+    deserialize_evm_tx_hash,
+)
 from rotkehlchen.utils.hexbytes import hexstring_to_bytes
 
 
@@ -430,3 +437,89 @@ def test_get_contract_deployed_block(ethereum_inquirer):
     """
     assert ethereum_inquirer.get_contract_deployed_block('0x5a464C28D19848f44199D003BeF5ecc87d090F87') == 12251871  # noqa: E501
     assert ethereum_inquirer.get_contract_deployed_block('0x9531C059098e3d194fF87FebB587aB07B30B1306') is None  # noqa: E501
+
+
+def test_get_logs_cache(ethereum_inquirer):
+    """Test that logs already fetched are not queried again and only new blocks are asked for"""
+    queried_ranges = []
+
+    def mock_query(method, call_order, from_block, to_block, **kwargs):  # pylint: disable=unused-argument
+        queried_ranges.append((from_block, to_block))
+        return [{'blockNumber': to_block, 'logIndex': 0}]
+
+    contract_address = make_evm_address()
+    query_patch = patch.object(ethereum_inquirer, '_query', side_effect=mock_query)
+    latest_block_patch = patch.object(
+        ethereum_inquirer,
+        'get_latest_block_number',
+        return_value=200,
+    )
+    with query_patch, latest_block_patch:
+        for to_block in (100, 'latest', 150, 'latest'):
+            events = ethereum_inquirer.get_logs(
+                contract_address=contract_address,
+                abi=[],
+                event_name='Transfer',
+                argument_filters={'to': contract_address},
+                from_block=1,
+                to_block=to_block,
+            )
+            assert events[-1]['blockNumber'] <= (to_block if to_block != 'latest' else 200)
+
+    assert queried_ranges == [(1, 100), (101, 200)]
+    assert len(events) == 2
+
+
+def test_web3_get_logs_adapts_block_range():
+    """Test that the block range of web3 log queries shrinks for dense and grows for sparse ranges"""  # noqa: E501
+    queried_ranges = []
+
+    def mock_get_logs(filter_args):
+        queried_ranges.append((filter_args['fromBlock'], filter_args['toBlock']))
+        if filter_args['toBlock'] - filter_args['fromBlock'] > 1000:
+            raise ValueError("{'code': -32005, 'message': 'query returned more than 10000 results'}")  # noqa: E501
+        return []
+
+    web3 = MagicMock()
+    web3.eth.get_logs.side_effect = mock_get_logs
+    events, block_range = _query_web3_get_logs(
+        web3=web3,
+        filter_args={},
+        from_block=0,
+        to_block=5000,
+        contract_address=make_evm_address(),
+        event_name='Transfer',
+        argument_filters={},
+        initial_block_range=4000,
+        max_block_range=16000,
+    )
+    assert events == []
+    assert queried_ranges[:4] == [(0, 4000), (0, 2000), (0, 1000), (1001, 3001)]
+    assert block_range == 1000  # the range that worked should be remembered
+
+
+def test_blocknumber_by_time_from_index(ethereum_inquirer):
+    """Test that block numbers are found by interpolation search in the local block index
+    by only fetching the blocks of the remaining gap"""
+    ethereum_inquirer.block_index.add_block_timestamps(
+        chain_id=ChainID.ETHEREUM,
+        blocks=[(100, 1700001000), (200, 1700002200)],
+    )
+
+    def mock_get_block(web3, num):  # pylint: disable=unused-argument
+        return {'number': num, 'timestamp': 1700001000 + (num - 100) * 12}
+
+    with patch.object(ethereum_inquirer, '_get_block_by_number', side_effect=mock_get_block) as get_block:  # noqa: E501
+        assert ethereum_inquirer.get_blocknumber_by_time(Timestamp(1700001500)) == 141
+        assert [x.kwargs['num'] for x in get_block.call_args_list] == [141, 142]
+        # now the bracketing blocks are indexed so nothing is fetched
+        assert ethereum_inquirer.get_blocknumber_by_time(Timestamp(1700001500)) == 141
+        assert ethereum_inquirer.get_blocknumber_by_time(
+            ts=Timestamp(1700001500),
+            closest='after',
+        ) == 142
+        assert ethereum_inquirer.etherscan.get_blocknumber_by_time(Timestamp(1700001500)) == 141
+        assert ethereum_inquirer.get_event_timestamp({'blockNumber': 142}) == 1700001504
+        assert get_block.call_count == 2
+        # outside of the indexed range nothing can be found in the index
+        assert ethereum_inquirer.get_blocknumber_by_time_from_index(Timestamp(1700005000)) is None
@@ -2,10 +2,14 @@ from typing import TYPE_CHECKING
 from unittest.mock import patch
 
 import pytest
+from eth_utils import event_abi_to_log_topic
 
 from rotkehlchen.accounting.structures.balance import Balance
+from rotkehlchen.chain.ethereum.abi import WEB3, decode_event_data_abi
 from rotkehlchen.chain.evm.constants import GENESIS_HASH
 from rotkehlchen.chain.evm.decoding.constants import CPT_GAS
+from rotkehlchen.chain.evm.decoding.structures import DEFAULT_DECODING_OUTPUT
+from rotkehlchen.chain.evm.structures import EvmTxReceiptLog
 from rotkehlchen.chain.evm.types import EvmAccount, string_to_evm_address
 from rotkehlchen.chain.optimism.types import OptimismTransaction
 from rotkehlchen.constants.assets import A_ETH, A_SAI
@@ -13,6 +17,7 @@ from rotkehlchen.db.evmtx import DBEvmTx
 from rotkehlchen.db.filtering import EvmEventFilterQuery, EvmTransactionsFilterQuery
 from rotkehlchen.db.history_events import DBHistoryEvents
 from rotkehlchen.db.optimismtx import DBOptimismTx
+from rotkehlchen.db.settings import CachedSettings
 from rotkehlchen.fval import FVal
 from rotkehlchen.history.events.structures.base import (
     HistoryBaseEntry,
@@ -278,3 +283,192 @@ def test_genesis_remove_address(
         )
 
     assert len(genesis_tx) == 0, 'Genesis transaction should have been deleted'
+
+
+@pytest.mark.parametrize('use_custom_database', ['ethtxs.db'])
+def test_decoding_profiling(ethereum_transaction_decoder, database):
+    """Test that when profiling is enabled the decoding rules calls are recorded"""
+    dbevmtx = DBEvmTx(database)
+    decoder = ethereum_transaction_decoder
+    decoder.set_profiling(True)
+    with database.conn.read_ctx() as cursor:
+        transactions = dbevmtx.get_evm_transactions(
+            cursor=cursor,
+            filter_=EvmTransactionsFilterQuery.make(
+                tx_hash=deserialize_evm_tx_hash('0x5cc0e6e62753551313412492296d5e57bea0a9d1ce507cc96aa4aa076c5bde7a'),
+                chain_id=ChainID.ETHEREUM,
+            ),
+            has_premium=True,
+        )
+        for tx in transactions:
+            receipt = dbevmtx.get_receipt(cursor, tx.tx_hash, ChainID.ETHEREUM)
+            assert receipt is not None, 'all receipts should be queried in the test DB'
+            decoder._get_or_decode_transaction_events(tx, receipt, ignore_cache=False)
+
+    stats = decoder.profiler.serialize()
+    assert len(stats) != 0
+    assert [x['seconds'] for x in stats] == sorted([x['seconds'] for x in stats], reverse=True)
+    approve_stats = next(x for x in stats if x['decoder'] == 'EthereumTransactionDecoder' and x['rule_type'] == 'event_rule')  # noqa: E501
+    assert approve_stats['calls'] >= approve_stats['events'] > 0
+
+    decoder.set_profiling(False)
+    assert decoder.profiler is None
+
+
+@pytest.mark.parametrize('use_custom_database', ['ethtxs.db'])
+def test_redecode_affected_transactions(ethereum_transaction_decoder, database):
+    """Test that only the decoded transactions involving the given addresses or topics
+    are redecoded and that new address mappings are detected"""
+    dbevmtx = DBEvmTx(database)
+    decoder = ethereum_transaction_decoder
+    approve_tx_hash = deserialize_evm_tx_hash('0x5cc0e6e62753551313412492296d5e57bea0a9d1ce507cc96aa4aa076c5bde7a')  # noqa: E501
+    sai_address = string_to_evm_address('0x89d24A6b4CcB1B6fAA2625fE562bDD9a23260359')
+    decoder.decode_transaction_hashes(ignore_cache=False, tx_hashes=[approve_tx_hash])
+    with database.conn.read_ctx() as cursor:
+        for addresses, topics, expected_hashes in (
+                ([sai_address], [], [approve_tx_hash]),
+                ([], [hexstring_to_bytes('0x8c5be1e5ebec7d5bd14f71427d1e84f3dd0314c0f7b2291e5b200ac8c7c3b925')], [approve_tx_hash]),  # noqa: E501
+                ([string_to_evm_address('0x4Fabb145d64652a948d72533023f6E7A623C7C53')], [], []),
+        ):
+            assert dbevmtx.get_decoded_transaction_hashes_touching(
+                cursor=cursor,
+                chain_id=ChainID.ETHEREUM,
+                addresses=addresses,
+                topics=topics,
+            ) == expected_hashes
+
+    with patch.object(decoder, '_decode_transaction', wraps=decoder._decode_transaction) as decode_mock:  # noqa: E501
+        events = decoder.redecode_affected_transactions(addresses=[sai_address])
+        assert decode_mock.call_count == 1
+        assert {event.tx_hash for event in events} == {approve_tx_hash}
+        assert decoder.redecode_affected_transactions(addresses=[string_to_evm_address('0x4Fabb145d64652a948d72533023f6E7A623C7C53')]) == []  # noqa: E501
+        assert decode_mock.call_count == 1
+
+    mapping = (decoder._maybe_decode_erc20_approve,)
+    assert decoder.update_address_mappings({sai_address: mapping}) == {sai_address}
+    assert decoder.update_address_mappings({sai_address: mapping}) == set()
+
+    # new mappings found when reloading the decoders data redecode the affected transactions
+    new_mapping = (lambda context: DEFAULT_DECODING_OUTPUT,)
+    with (
+        patch.object(decoder, 'reload_data', side_effect=lambda cursor: decoder.update_address_mappings({sai_address: new_mapping})),  # noqa: E501
+        patch.object(decoder, '_decode_transaction', wraps=decoder._decode_transaction) as decode_mock,  # noqa: E501
+    ):
+        decoder.decode_transaction_hashes(ignore_cache=False, tx_hashes=[approve_tx_hash])
+        assert decode_mock.call_count == 1
+        assert decoder.rules.address_mappings[sai_address] == new_mapping
+        decoder.decode_transaction_hashes(ignore_cache=False, tx_hashes=[approve_tx_hash])
+        assert decode_mock.call_count == 1, 'unchanged mappings should not redecode anything'
+
+
+def test_decode_event_data_static_fast_path():
+    """Test that the fixed offset decoding of static types gives the same results as the
+    generic abi codec and that data it can't handle is still decoded by the codec"""
+    swap_abi = {'anonymous': False, 'name': 'Swap', 'type': 'event', 'inputs': [
+        {'indexed': True, 'name': 'sender', 'type': 'address'},
+        {'indexed': True, 'name': 'recipient', 'type': 'address'},
+        {'indexed': False, 'name': 'amount0', 'type': 'int256'},
+        {'indexed': False, 'name': 'amount1', 'type': 'int256'},
+        {'indexed': False, 'name': 'sqrtPriceX96', 'type': 'uint160'},
+        {'indexed': False, 'name': 'liquidity', 'type': 'uint128'},
+        {'indexed': False, 'name': 'tick', 'type': 'int24'},
+    ]}
+    data_types = ['int256', 'int256', 'uint160', 'uint128', 'int24']
+    data_values = [-5 * 10**18, 12345678, 2**150 + 7, 2**100, -887272]
+    sender = string_to_evm_address('0xE592427A0AEce92De3Edee1F18E0157C05861564')
+    recipient = string_to_evm_address('0x2B888954421b424C5D3D9Ce9bB67c9bD47537d12')
+    tx_log = EvmTxReceiptLog(
+        log_index=0,
+        data=WEB3.codec.encode(data_types, data_values),
+        address=string_to_evm_address('0x88e6A0c2dDD26FEEb64F039a2c41296FcB3f5640'),
+        removed=False,
+        topics=[
+            event_abi_to_log_topic(swap_abi),
+            WEB3.codec.encode(['address'], [sender]),
+            WEB3.codec.encode(['address'], [recipient]),
+        ],
+    )
+    with patch.object(WEB3.codec, 'decode', wraps=WEB3.codec.decode) as codec_decode:
+        assert decode_event_data_abi(tx_log, swap_abi) == ([sender, recipient], data_values)
+        assert codec_decode.call_count == 0
+
+        # a string is not a static type so the codec decodes the data
+        message_abi = {'anonymous': False, 'name': 'Message', 'type': 'event', 'inputs': [
+            {'indexed': True, 'name': 'sender', 'type': 'address'},
+            {'indexed': False, 'name': 'text', 'type': 'string'},
+        ]}
+        message_log = EvmTxReceiptLog(
+            log_index=1,
+            data=WEB3.codec.encode(['string'], ['rotki']),
+            address=tx_log.address,
+            removed=False,
+            topics=[event_abi_to_log_topic(message_abi), tx_log.topics[1]],
+        )
+        assert decode_event_data_abi(message_log, message_abi) == ([sender], ['rotki'])
+        assert codec_decode.call_count == 1
+
+
+@pytest.mark.parametrize('use_custom_database', ['ethtxs.db'])
+def test_decode_transaction_hashes_loads_decoded_in_bulk(ethereum_transaction_decoder, database):
+    """Test that the events of already decoded transactions are loaded in bulk without
+    getting each transaction and that only the undecoded ones are decoded"""
+    decoder = ethereum_transaction_decoder
+    approve_tx_hash = deserialize_evm_tx_hash('0x5cc0e6e62753551313412492296d5e57bea0a9d1ce507cc96aa4aa076c5bde7a')  # noqa: E501
+    with database.conn.read_ctx() as cursor:
+        other_tx_hash = deserialize_evm_tx_hash(cursor.execute(
+            'SELECT tx_hash FROM evm_transactions WHERE chain_id=? AND tx_hash!=? LIMIT 1',
+            (ChainID.ETHEREUM.serialize_for_db(), approve_tx_hash),
+        ).fetchone()[0])
+
+    approve_events = decoder.decode_transaction_hashes(ignore_cache=False, tx_hashes=[approve_tx_hash])  # noqa: E501
+    assert len(approve_events) != 0
+    with database.conn.read_ctx() as cursor:
+        assert decoder.dbevmtx.get_decoded_transaction_hashes(
+            cursor=cursor,
+            chain_id=ChainID.ETHEREUM,
+            tx_hashes=[approve_tx_hash, other_tx_hash],
+        ) == {approve_tx_hash}
+
+    with (
+        patch.object(decoder.transactions, 'get_or_create_transaction', wraps=decoder.transactions.get_or_create_transaction) as get_tx,  # noqa: E501
+        patch.object(decoder, '_decode_transaction', wraps=decoder._decode_transaction) as decode_tx,  # noqa: E501
+    ):
+        events = decoder.decode_transaction_hashes(
+            ignore_cache=False,
+            tx_hashes=[approve_tx_hash, other_tx_hash],
+        )
+
+    assert get_tx.call_count == decode_tx.call_count == 1
+    assert get_tx.call_args.kwargs['tx_hash'] == other_tx_hash
+    approve_db_events = [x for x in events if x.tx_hash == approve_tx_hash]
+    assert [x.serialize() | {'identifier': None} for x in approve_db_events] == [
+        x.serialize() | {'identifier': None} for x in approve_events
+    ]
+
+
+@pytest.mark.parametrize('use_custom_database', ['ethtxs.db'])
+def test_decode_transaction_hashes_in_worker_process(ethereum_transaction_decoder, database):
+    """Test that with multiprocess decoding the transactions are decoded in a worker process
+    and that its events are saved by this process the same as if decoded here"""
+    decoder = ethereum_transaction_decoder
+    approve_tx_hash = deserialize_evm_tx_hash('0x5cc0e6e62753551313412492296d5e57bea0a9d1ce507cc96aa4aa076c5bde7a')  # noqa: E501
+    in_process_events = decoder.decode_transaction_hashes(ignore_cache=True, tx_hashes=[approve_tx_hash])  # noqa: E501
+    assert len(in_process_events) != 0
+
+    with (
+        patch.object(CachedSettings, 'multiprocess_decoding', new=True),
+        patch('rotkehlchen.chain.evm.decoding.decoder.DECODING_WORKER_MIN_TRANSACTIONS', new=1),
+        patch.object(decoder, '_decode_transaction_events', wraps=decoder._decode_transaction_events) as decode_here,  # noqa: E501
+    ):
+        worker_events = decoder.decode_transaction_hashes(ignore_cache=True, tx_hashes=[approve_tx_hash])  # noqa: E501
+
+    assert decode_here.call_count == 0
+    with database.conn.read_ctx() as cursor:
+        db_events = DBHistoryEvents(database).get_history_events(
+            cursor=cursor,
+            filter_query=EvmEventFilterQuery.make(tx_hashes=[approve_tx_hash]),
+            has_premium=True,
+        )
+    assert [x.serialize() | {'identifier': None} for x in db_events] == [
+        x.serialize() | {'identifier': None} for x in worker_events
+    ] == [x.serialize() | {'identifier': None} for x in in_process_events]
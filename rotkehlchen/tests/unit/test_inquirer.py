@@ -6,6 +6,7 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 import requests
+from eth_abi import encode
 from freezegun import freeze_time
 
 from rotkehlchen.assets.asset import Asset, CustomAsset, EvmToken, FiatAsset, UnderlyingToken
@@ -28,7 +29,7 @@ from rotkehlchen.constants.assets import (
 from rotkehlchen.constants.prices import ZERO_PRICE
 from rotkehlchen.constants.resolver import ethaddress_to_identifier, evm_address_to_identifier
 from rotkehlchen.db.custom_assets import DBCustomAssets
-from rotkehlchen.db.settings import CachedSettings
+from rotkehlchen.db.settings import DEFAULT_CURRENT_PRICE_CACHE_SIZE, CachedSettings
 from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.fval import FVal
 from rotkehlchen.globaldb.cache import (
@@ -39,12 +40,23 @@ from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
 from rotkehlchen.inquirer import (
     CURRENT_PRICE_CACHE_SECS,
+    CURRENT_PRICES_PERSIST_FREQUENCY,
     DEFAULT_RATE_LIMIT_WAITING_TIME,
+    STALE_CURRENT_PRICE_MAX_AGE,
     CurrentPriceOracle,
     Inquirer,
     _query_currency_converterapi,
 )
-from rotkehlchen.interfaces import CurrentPriceOracleInterface
+from rotkehlchen.interfaces import (
+    CurrentPriceOracleInterface,
+    MultipleCurrentPricesOracleInterface,
+)
+from rotkehlchen.oracles.telemetry import (
+    ADAPTIVE_MIN_QUERIES,
+    NO_PRICE_FAILURE,
+    OracleQueryKind,
+    OracleTelemetry,
+)
 from rotkehlchen.tests.conftest import TestEnvironment, requires_env
 from rotkehlchen.tests.utils.constants import A_CNY, A_JPY
 from rotkehlchen.tests.utils.mock import MockResponse
@@ -689,3 +701,223 @@ def test_usd_price(inquirer: Inquirer, globaldb: GlobalDBHandler):
     ):
         price = inquirer.find_usd_price(token)
         assert price != ZERO
+
+
+@pytest.mark.parametrize('use_clean_caching_directory', [True])
+@pytest.mark.parametrize('should_mock_current_price_queries', [False])
+def test_find_usd_prices(inquirer):
+    """Test that find_usd_prices queries batch capable oracles once for all the assets
+    and asks the next oracles only for the prices that were not found"""
+    class BatchOracleMock(CurrentPriceOracleInterface, MultipleCurrentPricesOracleInterface):
+        def __init__(self):
+            super().__init__('batch')
+            self.queried_assets = []
+
+        def rate_limited_in_last(self, seconds=None):
+            return False
+
+        def query_current_price(self, from_asset, to_asset, match_main_currency):
+            raise AssertionError('Should not query single prices of a batch oracle')
+
+        def query_multiple_current_prices(self, from_assets, to_asset):
+            self.queried_assets.append(list(from_assets))
+            return {x: Price(FVal(100)) for x in from_assets if x in (A_BTC, A_ETH)}
+
+    batch_oracle, single_oracle = BatchOracleMock(), MagicMock()
+    single_oracle.query_current_price.return_value = (Price(FVal(1)), False)
+    inquirer._oracle_instances = [batch_oracle, single_oracle]
+    inquirer._oracles = inquirer._oracles[:2]
+
+    prices = inquirer.find_usd_prices([A_BTC, A_ETH, A_DAI, A_USD, A_BTC])
+    assert prices == {
+        A_BTC: Price(FVal(100)),
+        A_ETH: Price(FVal(100)),
+        A_DAI: Price(FVal(1)),
+        A_USD: Price(FVal(1)),
+    }
+    assert batch_oracle.queried_assets == [[A_BTC, A_ETH, A_DAI]]
+    assert single_oracle.query_current_price.call_count == 1
+    assert single_oracle.query_current_price.call_args.kwargs['from_asset'] == A_DAI
+
+    # all the prices should now be cached
+    assert inquirer.find_usd_prices([A_BTC, A_DAI]) == {
+        A_BTC: Price(FVal(100)),
+        A_DAI: Price(FVal(1)),
+    }
+    assert inquirer.find_usd_price(A_ETH) == Price(FVal(100))
+    assert len(batch_oracle.queried_assets) == 1
+    assert single_oracle.query_current_price.call_count == 1
+
+    # in the adaptive order the tokens skip the batch oracle that never priced a token
+    inquirer._oracles = [CurrentPriceOracle.COINGECKO, CurrentPriceOracle.CRYPTOCOMPARE]
+    telemetry = OracleTelemetry()
+    telemetry.reset()
+    for _ in range(ADAPTIVE_MIN_QUERIES):
+        telemetry.record(
+            kind=OracleQueryKind.CURRENT,
+            oracle=CurrentPriceOracle.COINGECKO,
+            asset=A_DAI,
+            seconds=1,
+            failure=NO_PRICE_FAILURE,
+        )
+    with patch.object(CachedSettings, 'adaptive_oracle_order', new=True):
+        assert inquirer.find_usd_prices([A_BTC, A_DAI], ignore_cache=True) == {
+            A_BTC: Price(FVal(100)),
+            A_DAI: Price(FVal(1)),
+        }
+    assert batch_oracle.queried_assets[1:] == [[A_BTC]]
+    assert single_oracle.query_current_price.call_count == 2
+    telemetry.reset()
+
+
+@pytest.mark.parametrize('should_mock_current_price_queries', [False])
+def test_current_prices_persist_across_restarts(inquirer):
+    """Test that the usd prices queried are periodically persisted in the globaldb in a
+    single transaction and are loaded back after the in memory cache is lost"""
+    oracle = MagicMock()
+    oracle.query_current_price.return_value = (Price(FVal(42)), False)
+    inquirer._oracle_instances = [oracle]
+    inquirer._oracles = [CurrentPriceOracle.COINGECKO]
+
+    globaldb = GlobalDBHandler()
+    with patch.object(globaldb.conn, 'write_ctx', wraps=globaldb.conn.write_ctx) as write_ctx:
+        assert inquirer.find_usd_price(A_BTC) == Price(FVal(42))
+        assert inquirer.find_usd_price(A_ETH) == Price(FVal(42))
+        assert write_ctx.call_count == 0  # prices are not written on every query
+        assert inquirer.should_persist_usd_prices() is False  # persisted recently
+        Inquirer._usd_prices_last_persisted -= CURRENT_PRICES_PERSIST_FREQUENCY
+        assert inquirer.should_persist_usd_prices() is True
+        inquirer.persist_usd_prices()
+        assert write_ctx.call_count == 1
+        assert inquirer.should_persist_usd_prices() is False  # nothing new to persist
+
+    assert oracle.query_current_price.call_count == 2
+    inquirer._cached_current_price.clear()  # simulate a restart
+    inquirer.load_persisted_usd_prices()
+    with patch.object(globaldb.conn, 'read_ctx', wraps=globaldb.conn.read_ctx) as read_ctx:
+        price, oracle_used, _ = inquirer.find_usd_price_and_oracle(A_BTC)
+        assert read_ctx.call_count == 0  # served from memory
+    assert price == Price(FVal(42))
+    assert oracle_used == CurrentPriceOracle.COINGECKO
+    assert oracle.query_current_price.call_count == 2
+
+    # removing the cached price also removes the persisted one
+    inquirer.remove_cached_current_price_entry((A_BTC, A_USD))
+    inquirer._cached_current_price.clear()
+    inquirer.load_persisted_usd_prices()
+    assert inquirer.find_usd_price(A_ETH) == Price(FVal(42))
+    assert oracle.query_current_price.call_count == 2
+    assert inquirer.find_usd_price(A_BTC) == Price(FVal(42))
+    assert oracle.query_current_price.call_count == 3
+
+
+@pytest.mark.parametrize('should_mock_current_price_queries', [False])
+def test_serve_stale_current_prices(inquirer, freezer):
+    """Test that when enabled, expired usd prices are served and queued for a refresh
+    unless they are older than the maximum age of a stale price"""
+    oracle = MagicMock()
+    oracle.query_current_price.return_value = (Price(FVal(42)), False)
+    inquirer._oracle_instances = [oracle]
+    inquirer._oracles = [CurrentPriceOracle.COINGECKO]
+    assert inquirer.find_usd_price(A_BTC) == Price(FVal(42))
+
+    freezer.tick(delta=datetime.timedelta(seconds=CURRENT_PRICE_CACHE_SECS + 1))
+    oracle.query_current_price.return_value = (Price(FVal(43)), False)
+    with patch.object(CachedSettings, 'serve_stale_current_prices', new=True):
+        assert inquirer.find_usd_price(A_BTC) == Price(FVal(42))
+
+    assert oracle.query_current_price.call_count == 1
+    assert inquirer.pop_stale_prices_to_refresh() == [A_BTC]
+    assert inquirer.pop_stale_prices_to_refresh() == []
+
+    # without stale prices the expired price is queried again
+    assert inquirer.find_usd_price(A_BTC) == Price(FVal(43))
+    assert oracle.query_current_price.call_count == 2
+
+    # a price older than the maximum age is queried again even when serving stale prices
+    freezer.tick(delta=datetime.timedelta(seconds=STALE_CURRENT_PRICE_MAX_AGE + 1))
+    oracle.query_current_price.return_value = (Price(FVal(44)), False)
+    with patch.object(CachedSettings, 'serve_stale_current_prices', new=True):
+        assert inquirer.find_usd_price(A_BTC) == Price(FVal(44))
+
+    assert oracle.query_current_price.call_count == 3
+    assert inquirer.pop_stale_prices_to_refresh() == []
+
+
+@pytest.mark.parametrize('should_mock_current_price_queries', [False])
+def test_adaptive_oracle_order(inquirer):
+    """Test that the oracle queries are recorded and that in the adaptive mode the
+    oracle that found the price of an asset is queried first the next time"""
+    inquirer._oracles = [CurrentPriceOracle.COINGECKO, CurrentPriceOracle.CRYPTOCOMPARE]
+    inquirer._oracle_instances = [MagicMock(), MagicMock()]
+    inquirer._oracle_instances[0].query_current_price.side_effect = RemoteError
+    inquirer._oracle_instances[1].query_current_price.return_value = (Price(FVal(42)), False)
+    telemetry = OracleTelemetry()
+    telemetry.reset()
+    with patch.object(CachedSettings, 'adaptive_oracle_order', new=True):
+        for _ in range(2):
+            assert inquirer.find_usd_price(A_BTC, ignore_cache=True) == Price(FVal(42))
+
+    assert inquirer._oracle_instances[0].query_current_price.call_count == 1
+    assert inquirer._oracle_instances[1].query_current_price.call_count == 2
+    assert [(x['oracle'], x['queries'], x['hits'], x['failures']) for x in telemetry.serialize()] == [  # noqa: E501
+        ('coingecko', 1, 0, {'RemoteError': 1}),
+        ('cryptocompare', 2, 2, {}),
+    ]
+    telemetry.reset()
+
+
+def test_current_price_cache_size(inquirer):
+    inquirer._cached_current_price.clear()
+    for asset in (A_BTC, A_ETH, A_DAI):
+        inquirer._cached_current_price.add((asset, A_EUR), MagicMock())
+
+    inquirer.set_cached_current_price_size(2)
+    assert list(inquirer._cached_current_price.cache) == [(A_ETH, A_EUR), (A_DAI, A_EUR)]
+    inquirer.set_cached_current_price_size(DEFAULT_CURRENT_PRICE_CACHE_SIZE)
+
+
+@pytest.mark.parametrize('use_clean_caching_directory', [True])
+def test_find_lp_token_prices_in_batch(inquirer_defi, globaldb):
+    """Test that curve and yearn vault v2 LP tokens are priced with one multicall per
+    protocol and that the found prices get cached"""
+    curve_lp_token = EvmToken('eip155:1/erc20:0xA3D87FffcE63B53E0d54fAa1cc983B7eB0b74A9c')
+    curve_pool = string_to_evm_address('0xc5424B857f758E906013F3555Dad202e4bdB4567')
+    yvusdc = EvmToken('eip155:1/erc20:0x5f18C75AbDAe578b483E5F43f12a39cF75b973a9')
+    with globaldb.conn.write_ctx() as write_cursor:
+        globaldb_set_unique_cache_value(
+            write_cursor=write_cursor,
+            key_parts=(CacheType.CURVE_POOL_ADDRESS, curve_lp_token.evm_address),
+            value=curve_pool,
+        )
+        for idx, pool_token in enumerate(('0xEeeeeEeeeEeEeeEeEeEeeEEEeeeeEeeeeeeeEEeE', '0x5e74C9036fb86BD7eCdcb084a0673EFc32eA31cb')):  # noqa: E501
+            globaldb_set_general_cache_values(
+                write_cursor=write_cursor,
+                key_parts=(CacheType.CURVE_POOL_TOKENS, curve_pool, str(idx)),
+                values=[pool_token],
+            )
+
+    outputs = {
+        curve_pool: [encode(['uint256'], [x]) for x in (102 * 10**16, 100 * 10**18, 300 * 10**18)],
+        yvusdc.evm_address: [encode(['uint256'], [110 * 10**4])],
+    }
+
+    def mock_multicall_2(calls, **kwargs):  # pylint: disable=unused-argument
+        return [(True, outputs[calls[0][0]][idx]) for idx in range(len(calls))]
+
+    ethereum = inquirer_defi.get_evm_manager(chain_id=ChainID.ETHEREUM)
+    with (
+        patch.object(ethereum, 'assure_curve_cache_is_queried_and_decoder_updated'),
+        patch.object(ethereum.node_inquirer, 'multicall_2', side_effect=mock_multicall_2) as multicall,  # noqa: E501
+    ):
+        prices = Inquirer._find_lp_token_prices([curve_lp_token, yvusdc])
+
+    # pool tokens and the underlying token are all priced at the mocked 1.5 usd
+    assert prices == {curve_lp_token: FVal('1.53'), yvusdc: FVal('1.65')}
+    assert multicall.call_count == 2
+    for lp_token, price in prices.items():
+        cached_entry = Inquirer.get_cached_current_price_entry(
+            cache_key=(lp_token, A_USD),
+            match_main_currency=False,
+        )
+        assert cached_entry is not None and cached_entry.price == price
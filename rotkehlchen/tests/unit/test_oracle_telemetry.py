@@ -0,0 +1,198 @@
+from unittest.mock import patch
+
+import pytest
+
+from rotkehlchen.constants.assets import A_BTC, A_DAI, A_ETH
+from rotkehlchen.db.settings import CachedSettings
+from rotkehlchen.globaldb.cache import globaldb_set_unique_cache_value
+from rotkehlchen.history.types import HistoricalPriceOracle
+from rotkehlchen.oracles.structures import CurrentPriceOracle
+from rotkehlchen.oracles.telemetry import (
+    ADAPTIVE_MIN_QUERIES,
+    NO_PRICE_FAILURE,
+    OracleQueryKind,
+    OracleTelemetry,
+)
+from rotkehlchen.types import CacheType
+
+ORACLES = [
+    (HistoricalPriceOracle.MANUAL, 'manual'),
+    (HistoricalPriceOracle.CRYPTOCOMPARE, 'cryptocompare'),
+    (HistoricalPriceOracle.COINGECKO, 'coingecko'),
+    (HistoricalPriceOracle.DEFILLAMA, 'defillama'),
+]
+
+
+@pytest.fixture(name='telemetry')
+def fixture_telemetry():
+    telemetry = OracleTelemetry()
+    telemetry.reset()
+    yield telemetry
+    telemetry.reset()
+
+
+def _order(telemetry, asset):
+    return [x[1] for x in telemetry.order_oracles(
+        kind=OracleQueryKind.HISTORICAL,
+        asset=asset,
+        oracles=ORACLES,
+    )]
+
+
+def _group(telemetry, assets):
+    groups = telemetry.group_by_oracles_order(
+        kind=OracleQueryKind.HISTORICAL,
+        assets=assets,
+        oracles=ORACLES,
+    )
+    return [([x[1] for x in oracles], group) for oracles, group in groups]
+
+
+def test_adaptive_oracle_order(telemetry):
+    for _ in range(ADAPTIVE_MIN_QUERIES):  # cryptocompare never finds dai, an evm token
+        telemetry.record(
+            kind=OracleQueryKind.HISTORICAL,
+            oracle=HistoricalPriceOracle.CRYPTOCOMPARE,
+            asset=A_DAI,
+            seconds=0.5,
+            failure='PriceQueryUnsupportedAsset',
+        )
+    telemetry.record(
+        kind=OracleQueryKind.HISTORICAL,
+        oracle=HistoricalPriceOracle.DEFILLAMA,
+        asset=A_BTC,
+        seconds=1.5,
+        failure=None,
+    )
+    telemetry.record(  # current price queries don't affect the historical order
+        kind=OracleQueryKind.CURRENT,
+        oracle=CurrentPriceOracle.COINGECKO,
+        asset=A_ETH,
+        seconds=0.1,
+        failure=NO_PRICE_FAILURE,
+    )
+    assert _order(telemetry, A_BTC) == ['manual', 'cryptocompare', 'coingecko', 'defillama']
+
+    with patch.object(CachedSettings, 'adaptive_oracle_order', new=True):
+        # the oracle that answered goes first, after the manual prices
+        assert _order(telemetry, A_BTC) == ['manual', 'defillama', 'cryptocompare', 'coingecko']
+        # oracles that never answered for the asset class go last
+        assert _order(telemetry, A_DAI) == ['manual', 'coingecko', 'defillama', 'cryptocompare']
+        assert _order(telemetry, A_ETH) == ['manual', 'cryptocompare', 'coingecko', 'defillama']
+        # assets queried together are grouped by the order of the oracles for their class
+        assert _group(telemetry, [A_BTC, A_DAI, A_ETH]) == [
+            (['manual', 'cryptocompare', 'coingecko', 'defillama'], [A_BTC, A_ETH]),
+            (['manual', 'coingecko', 'defillama', 'cryptocompare'], [A_DAI]),
+        ]
+
+    assert _group(telemetry, [A_BTC, A_DAI, A_ETH]) == [
+        (['manual', 'cryptocompare', 'coingecko', 'defillama'], [A_BTC, A_DAI, A_ETH]),
+    ]
+    assert telemetry.serialize() == [{
+        'kind': 'current',
+        'oracle': 'coingecko',
+        'asset_class': 'own chain',
+        'queries': 1,
+        'hits': 0,
+        'hit_rate': 0,
+        'cache_hits': 0,
+        'average_seconds': 0.1,
+        'max_seconds': 0.1,
+        'failures': {NO_PRICE_FAILURE: 1},
+    }, {
+        'kind': 'historical',
+        'oracle': 'cryptocompare',
+        'asset_class': 'evm token',
+        'queries': ADAPTIVE_MIN_QUERIES,
+        'hits': 0,
+        'hit_rate': 0,
+        'cache_hits': 0,
+        'average_seconds': 0.5,
+        'max_seconds': 0.5,
+        'failures': {'PriceQueryUnsupportedAsset': ADAPTIVE_MIN_QUERIES},
+    }, {
+        'kind': 'historical',
+        'oracle': 'defillama',
+        'asset_class': 'own chain',
+        'queries': 1,
+        'hits': 1,
+        'hit_rate': 1.0,
+        'cache_hits': 0,
+        'average_seconds': 1.5,
+        'max_seconds': 1.5,
+        'failures': {},
+    }]
+
+
+def test_cache_hits(telemetry):
+    """Test that prices found in the stored prices of an oracle are counted apart
+    from its queries and count as answers for the adaptive order"""
+    for _ in range(ADAPTIVE_MIN_QUERIES):
+        telemetry.record(
+            kind=OracleQueryKind.HISTORICAL,
+            oracle=HistoricalPriceOracle.DEFILLAMA,
+            asset=A_DAI,
+            seconds=2,
+            failure='RemoteError',
+        )
+    telemetry.record_cache_hit(
+        kind=OracleQueryKind.HISTORICAL,
+        oracle=HistoricalPriceOracle.DEFILLAMA,
+        asset=A_DAI,
+    )
+    with patch.object(CachedSettings, 'adaptive_oracle_order', new=True):
+        assert _order(telemetry, A_DAI) == ['manual', 'defillama', 'cryptocompare', 'coingecko']
+        assert _group(telemetry, [A_DAI]) == [
+            (['manual', 'cryptocompare', 'coingecko', 'defillama'], [A_DAI]),
+        ]
+
+    assert telemetry.serialize() == [{
+        'kind': 'historical',
+        'oracle': 'defillama',
+        'asset_class': 'evm token',
+        'queries': ADAPTIVE_MIN_QUERIES,
+        'hits': 0,
+        'hit_rate': 0,
+        'cache_hits': 1,
+        'average_seconds': 2,
+        'max_seconds': 2,
+        'failures': {'RemoteError': ADAPTIVE_MIN_QUERIES},
+    }]
+
+
+def test_telemetry_persistence(telemetry, globaldb):
+    telemetry.record(
+        kind=OracleQueryKind.CURRENT,
+        oracle=CurrentPriceOracle.DEFILLAMA,
+        asset=A_ETH,
+        seconds=0.25,
+        failure=None,
+    )
+    assert telemetry.should_persist() is False  # persisted recently
+    telemetry.persist()
+    serialized = telemetry.serialize()
+    telemetry.reset()
+    assert telemetry.serialize() == []
+
+    telemetry.load()
+    assert telemetry.serialize() == serialized
+    with patch.object(CachedSettings, 'adaptive_oracle_order', new=True):
+        assert [x[0] for x in telemetry.order_oracles(
+            kind=OracleQueryKind.CURRENT,
+            asset=A_ETH,
+            oracles=[(CurrentPriceOracle.COINGECKO, None), (CurrentPriceOracle.DEFILLAMA, None)],
+        )] == [CurrentPriceOracle.DEFILLAMA, CurrentPriceOracle.COINGECKO]
+
+    telemetry.clear()
+    telemetry.load()
+    assert telemetry.serialize() == []
+
+    # invalid persisted data is ignored
+    with globaldb.conn.write_ctx() as write_cursor:
+        globaldb_set_unique_cache_value(
+            write_cursor=write_cursor,
+            key_parts=(CacheType.ORACLE_TELEMETRY,),
+            value='{"stats": [["current", "unknown oracle", "own chain", {}]], "preferred": []}',
+        )
+    telemetry.load()
+    assert telemetry.serialize() == []
@@ -4,8 +4,10 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from rotkehlchen.constants.assets import A_BTC, A_USD
+from rotkehlchen.constants.assets import A_BTC, A_ETH, A_USD
 from rotkehlchen.constants.timing import DAY_IN_SECONDS
+from rotkehlchen.db.settings import CachedSettings
+from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.errors.price import NoPriceForGivenTimestamp, PriceQueryUnsupportedAsset
 from rotkehlchen.externalapis.coingecko import Coingecko
 from rotkehlchen.externalapis.cryptocompare import Cryptocompare
@@ -18,6 +20,7 @@ from rotkehlchen.history.types import (
     HistoricalPrice,
     HistoricalPriceOracle,
 )
+from rotkehlchen.oracles.telemetry import OracleTelemetry
 from rotkehlchen.tests.utils.constants import A_GBP
 from rotkehlchen.types import Price, Timestamp
 
@@ -32,11 +35,18 @@ def fixture_fake_price_historian(historical_price_oracles_order):
     # Since this is a singleton and we want it initialized everytime the fixture
     # is called make sure its instance is always starting from scratch
     PriceHistorian._PriceHistorian__instance = None
+    oracle_instances = (
+        MagicMock(spec=Cryptocompare),
+        MagicMock(spec=Coingecko),
+        MagicMock(spec=Defillama),
+    )
+    for oracle_instance in oracle_instances:  # no stored prices
+        oracle_instance.query_cached_historical_price.return_value = None
     price_historian = PriceHistorian(
         data_directory=MagicMock(spec=Path),
-        cryptocompare=MagicMock(spec=Cryptocompare),
-        coingecko=MagicMock(spec=Coingecko),
-        defillama=MagicMock(spec=Defillama),
+        cryptocompare=oracle_instances[0],
+        coingecko=oracle_instances[1],
+        defillama=oracle_instances[2],
     )
     price_historian.set_oracles_order(historical_price_oracles_order)
     return price_historian
@@ -65,6 +75,9 @@ def test_all_common_methods_implemented():
         # Check 'query_historical_price' method exists
         assert hasattr(instance, 'query_historical_price')
         assert callable(instance.query_historical_price)
+        # Check 'query_cached_historical_price' method exists
+        assert hasattr(instance, 'query_cached_historical_price')
+        assert callable(instance.query_cached_historical_price)
 
 
 def test_set_oracles_custom_order(fake_price_historian):
@@ -215,6 +228,45 @@ def test_manual_oracle_correctly_returns_price(globaldb, fake_price_historian):
         )
 
 
+def test_oracle_stored_prices_are_used(globaldb, fake_price_historian):
+    """Test that a price found in the stored prices of an oracle, here interpolated
+    between them, is returned without querying the oracle"""
+    price_historian = fake_price_historian
+    price_historian._oracle_instances[3] = defillama = Defillama()
+    timestamp = Timestamp(1700000000)
+    globaldb.add_historical_prices([HistoricalPrice(
+        from_asset=A_ETH,
+        to_asset=A_USD,
+        source=HistoricalPriceOracle.DEFILLAMA,
+        timestamp=Timestamp(timestamp + offset),
+        price=Price(FVal(price)),
+    ) for offset, price in ((-2 * DAY_IN_SECONDS, 2000), (2 * DAY_IN_SECONDS, 2200))])
+    for oracle_instance in price_historian._oracle_instances[1:3]:
+        oracle_instance.query_historical_price.side_effect = PriceQueryUnsupportedAsset('ETH')
+
+    telemetry = OracleTelemetry()
+    telemetry.reset()
+    with (
+        patch.object(CachedSettings, 'historical_price_interpolation_max_gap', new=5 * DAY_IN_SECONDS),  # noqa: E501
+        patch.object(defillama, 'query_historical_price') as query_historical_price,
+    ):
+        assert price_historian.query_historical_price(
+            from_asset=A_ETH,
+            to_asset=A_USD,
+            timestamp=timestamp,
+        ) == Price(FVal(2100))
+
+    assert query_historical_price.call_count == 0
+    # the stored price is not recorded as a query of the oracle
+    assert [(x['oracle'], x['queries'], x['cache_hits']) for x in telemetry.serialize()] == [
+        ('coingecko', 1, 0),
+        ('cryptocompare', 1, 0),
+        ('defillama', 0, 1),
+        ('manual', 1, 0),
+    ]
+    telemetry.reset()
+
+
 def test_get_historical_prices(globaldb):
     ts1 = Timestamp(1611595470)
     price1, price2, price3, price4 = 30000, 35000, 45000, 77000
@@ -267,3 +319,53 @@ def test_get_historical_prices(globaldb):
         max_seconds_distance=DAY_IN_SECONDS,
     )
     assert [price1, price2, price3, None, price4] == [x.price if x is not None else None for x in result]  # noqa: E501
+
+
+def test_prefetch_historical_prices(globaldb, fake_price_historian):
+    """Test that missing prices are fetched with one range query per cluster of timestamps
+    and that the timestamps an oracle could not find are asked from the next one"""
+    start_ts = Timestamp(1611595470)
+    globaldb.add_single_historical_price(HistoricalPrice(
+        from_asset=A_ETH,
+        to_asset=A_USD,
+        price=Price(FVal(1000)),
+        timestamp=start_ts,
+        source=HistoricalPriceOracle.MANUAL,
+    ))
+    cryptocompare, coingecko = fake_price_historian._oracle_instances[1:3]
+    for oracle_instance in (cryptocompare, coingecko):
+        oracle_instance.max_price_range_seconds = 10 * DAY_IN_SECONDS
+        oracle_instance.can_query_history.return_value = True
+
+    def query_range(from_timestamp, to_timestamp, **_kwargs):
+        if from_timestamp > start_ts + 15 * DAY_IN_SECONDS:
+            raise RemoteError('boom')
+        return [(Timestamp(x), Price(FVal(5))) for x in range(from_timestamp, to_timestamp + 1, 3600)]  # noqa: E501
+
+    cryptocompare.query_historical_price_range.side_effect = query_range
+    coingecko.query_historical_price_range.side_effect = lambda from_timestamp, **kwargs: [(from_timestamp, Price(FVal(7)))]  # noqa: E501
+    fake_price_historian.prefetch_historical_prices(
+        assets_timestamps=[
+            (A_BTC, start_ts + x * DAY_IN_SECONDS) for x in (0, 1, 5, 12, 25)
+        ] + [(A_ETH, start_ts), (A_USD, start_ts)],
+        to_asset=A_USD,
+    )
+    # 3 clusters of BTC timestamps and the ETH price is already in the DB
+    assert [x.kwargs['from_timestamp'] for x in cryptocompare.query_historical_price_range.call_args_list] == [  # noqa: E501
+        start_ts, start_ts + 12 * DAY_IN_SECONDS, start_ts + 25 * DAY_IN_SECONDS,
+    ]
+    assert coingecko.query_historical_price_range.call_count == 1
+    for days, price, source in (
+            (0, 5, HistoricalPriceOracle.CRYPTOCOMPARE),
+            (5, 5, HistoricalPriceOracle.CRYPTOCOMPARE),
+            (12, 5, HistoricalPriceOracle.CRYPTOCOMPARE),
+            (25, 7, HistoricalPriceOracle.COINGECKO),
+    ):
+        entry = globaldb.get_historical_price(
+            from_asset=A_BTC,
+            to_asset=A_USD,
+            timestamp=start_ts + days * DAY_IN_SECONDS,
+            max_seconds_distance=0,
+        )
+        assert entry.price == FVal(price)
+        assert entry.source == source
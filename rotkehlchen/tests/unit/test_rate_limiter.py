@@ -0,0 +1,72 @@
+import time
+from unittest.mock import patch
+
+import gevent
+import pytest
+import requests
+
+from rotkehlchen.utils.network import create_session
+from rotkehlchen.utils.rate_limiter import (
+    RateLimit,
+    RateLimitedAdapter,
+    RateLimiter,
+    is_background_greenlet,
+)
+
+
+@pytest.fixture(name='rate_limiter')
+def fixture_rate_limiter():
+    rate_limiter = RateLimiter()
+    yield rate_limiter
+    for key in ('test.key', 'example.com'):
+        rate_limiter.set_limit(key=key, limit=None)
+        rate_limiter._stats.pop(key, None)
+
+
+def test_requests_are_throttled(rate_limiter):
+    rate_limiter.set_limit(key='test.key', limit=RateLimit(rate=20, burst=2))
+    start = time.monotonic()
+    for _ in range(4):
+        rate_limiter.acquire(key='test.key', background=False)
+
+    assert time.monotonic() - start >= 0.09  # 2 requests had to wait for a token each
+    stats = rate_limiter.get_stats()['test.key']
+    assert stats['requests'] == 4
+    assert stats['throttled'] == 2
+    assert stats['background_requests'] == 0
+
+
+def test_background_requests_let_interactive_go_first(rate_limiter):
+    rate_limiter.set_limit(key='test.key', limit=RateLimit(rate=20, burst=1))
+    rate_limiter.acquire(key='test.key', background=False)  # empty the bucket
+    order = []
+
+    def acquire(background):
+        rate_limiter.acquire(key='test.key', background=background)
+        order.append(background)
+
+    background_greenlet = gevent.spawn(acquire, background=True)
+    gevent.sleep(0)  # make sure the background request is waiting first
+    gevent.joinall([background_greenlet, gevent.spawn(acquire, background=False)])
+    assert order == [False, True]
+
+
+def test_background_greenlets():
+    def check():
+        return is_background_greenlet(), gevent.spawn(is_background_greenlet).get()
+
+    assert check() == (False, False)
+    greenlet = gevent.spawn(check)
+    greenlet.background_task = True
+    assert greenlet.get() == (True, True)
+
+
+def test_sessions_are_rate_limited(rate_limiter):
+    session = create_session()
+    adapter = session.get_adapter('https://example.com')
+    assert isinstance(adapter, RateLimitedAdapter)
+    with patch('requests.adapters.HTTPAdapter.send') as send:
+        adapter.send(requests.Request('GET', 'https://example.com/api').prepare())
+
+    assert send.call_count == 1
+    assert rate_limiter.get_stats()['example.com']['requests'] == 1
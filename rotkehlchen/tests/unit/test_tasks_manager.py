@@ -281,6 +281,7 @@ def test_update_snapshot_balances(task_manager):
                 save_despite_errors=False,
                 timestamp=None,
                 ignore_cache=True,
+                incremental=True,
             )
     except gevent.Timeout as e:
         raise AssertionError(f'Update snapshot balances was not completed within {timeout} seconds') from e  # noqa: E501
@@ -1,20 +1,39 @@
 import datetime
+from collections import defaultdict
 from typing import TYPE_CHECKING, Any
 from unittest.mock import MagicMock, patch
 
 import gevent
 import pytest
 
+from rotkehlchen.accounting.structures.balance import Balance
 from rotkehlchen.assets.utils import _query_or_get_given_token_info
 from rotkehlchen.chain.ethereum.tokens import EthereumTokens
-from rotkehlchen.chain.evm.tokens import generate_multicall_chunks
-from rotkehlchen.chain.evm.types import string_to_evm_address
+from rotkehlchen.chain.evm.tokens import (
+    FULL_TOKEN_DETECTION_PERIOD,
+    MIN_TOKEN_CHUNK_LENGTH,
+    TOKEN_CHUNK_SLOW_RESPONSE_SECS,
+    TokenChunkLengths,
+    generate_multicall_chunks,
+)
+from rotkehlchen.chain.evm.types import NodeName, WeightedNode, string_to_evm_address
 from rotkehlchen.constants import ONE
-from rotkehlchen.constants.assets import A_OMG, A_WETH
+from rotkehlchen.constants.assets import A_DAI, A_OMG, A_USDC, A_WETH
+from rotkehlchen.db.history_events import DBHistoryEvents
+from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.fval import FVal
+from rotkehlchen.history.events.structures.evm_event import EvmEvent
+from rotkehlchen.history.events.structures.types import HistoryEventSubType, HistoryEventType
 from rotkehlchen.tests.utils.constants import A_LPT
-from rotkehlchen.tests.utils.factories import make_evm_address
-from rotkehlchen.types import ChainID, ChecksumEvmAddress, EvmTokenKind, SupportedBlockchain
+from rotkehlchen.tests.utils.factories import make_evm_address, make_evm_tx_hash
+from rotkehlchen.types import (
+    ChainID,
+    ChecksumEvmAddress,
+    EvmTokenKind,
+    Location,
+    SupportedBlockchain,
+    TimestampMS,
+)
 from rotkehlchen.utils.misc import ts_now
 
 if TYPE_CHECKING:
@@ -117,6 +136,59 @@ def test_generate_chunks():
     assert generated_chunks == expected_chunks
 
 
+def test_adaptive_chunk_lengths():
+    """Test that the token chunk length of a node adapts to failures and response times"""
+    node = NodeName(name='node', endpoint='https://node', owned=False, blockchain=SupportedBlockchain.ETHEREUM)  # noqa: E501
+    chunk_lengths = TokenChunkLengths()
+    assert chunk_lengths.get(node=node, max_length=400) == 400
+    assert chunk_lengths.update(node=node, max_length=400, elapsed=None) == 200
+    assert chunk_lengths.update(node=node, max_length=400, elapsed=TOKEN_CHUNK_SLOW_RESPONSE_SECS + 1) == 150  # noqa: E501
+    assert chunk_lengths.update(node=node, max_length=400, elapsed=0.5) == 187
+    assert chunk_lengths.update(node=node, max_length=400, elapsed=5) == 187  # unchanged
+    for _ in range(10):
+        chunk_lengths.update(node=node, max_length=400, elapsed=None)
+    assert chunk_lengths.get(node=node, max_length=400) == MIN_TOKEN_CHUNK_LENGTH
+    for _ in range(20):
+        chunk_lengths.update(node=node, max_length=400, elapsed=0.5)
+    assert chunk_lengths.get(node=node, max_length=400) == 400
+
+
+def test_query_tokens_parallel_nodes(tokens):
+    """Test that token balance chunks are spread across nodes and that the chunks
+    of a failing node are picked up by the other nodes"""
+    good_node, bad_node = (WeightedNode(
+        node_info=NodeName(name=name, endpoint=f'https://{name}', owned=False, blockchain=SupportedBlockchain.ETHEREUM),  # noqa: E501
+        active=True,
+        weight=ONE,
+    ) for name in ('good', 'bad'))
+    for node in (good_node, bad_node):
+        tokens.evm_inquirer.web3_mapping[node.node_info] = MagicMock()
+
+    addresses = [make_evm_address() for _ in range(6)]
+    address_tokens = [A_DAI.resolve_to_evm_token(), A_USDC.resolve_to_evm_token()]
+    queried_chunks = defaultdict(list)
+
+    def mock_multicall_balances(chunk, call_order):
+        queried_chunks[call_order[0].node_info.name].append(chunk)
+        if call_order[0] == bad_node:
+            raise RemoteError('out of gas')
+        gevent.sleep(0.01)  # let the other node greenlet run
+        return {address: {token: ONE for token in chunk_tokens} for address, chunk_tokens in chunk}
+
+    with (
+        patch('rotkehlchen.chain.evm.tokens.get_chunk_size_call_order', return_value=(MIN_TOKEN_CHUNK_LENGTH * 2, [good_node, bad_node])),  # noqa: E501
+        patch.object(tokens.db, 'get_tokens_for_address', return_value=(address_tokens, ts_now())),
+        patch.object(tokens, '_get_multicall_token_balances', side_effect=mock_multicall_balances),
+        patch('rotkehlchen.chain.evm.tokens.Inquirer.find_usd_prices', side_effect=lambda assets: dict.fromkeys(assets, ONE)),  # noqa: E501
+    ):
+        balances, _ = tokens.query_tokens_for_addresses(addresses)
+
+    assert balances == {address: {token: ONE for token in address_tokens} for address in addresses}
+    assert len(queried_chunks['good']) > 1
+    assert len(queried_chunks['bad']) == 2, 'bad node should stop after failing with min length'
+    assert tokens.chunk_lengths.get(bad_node.node_info, 0) == MIN_TOKEN_CHUNK_LENGTH
+
+
 def test_last_queried_ts(tokens, freezer):
     """
     Checks that after detecting evm tokens last_queried_timestamp is updated and there
@@ -205,6 +277,59 @@ def test_cache_is_per_token_type(ethereum_inquirer):
     assert erc721_token_data == erc721_cached_data == ('Art Blocks', 'BLOCKS', 0)
 
 
+def test_incremental_token_detection(tokens: EthereumTokens) -> None:
+    """Test that incremental token detection only checks the already detected tokens
+    and the tokens moved since the last detection unless a full detection is due"""
+    address = make_evm_address()
+    queried_tokens = []
+
+    def mock_query_chunks(address, tokens, chunk_size, call_order):  # pylint: disable=unused-argument
+        queried_tokens.append(set(tokens))
+        return {token: ONE for token in tokens}
+
+    with (
+        patch.object(tokens, '_query_chunks', side_effect=mock_query_chunks),
+        patch.object(tokens, 'maybe_detect_proxies_tokens'),
+        patch.object(tokens.evm_inquirer.proxies_inquirer, 'get_accounts_having_proxy', return_value={}),  # noqa: E501
+        patch(
+            'rotkehlchen.globaldb.handler.GlobalDBHandler.get_evm_tokens',
+            return_value=[A_USDC.resolve_to_evm_token()],
+        ) as get_evm_tokens,
+    ):
+        # never detected before, so all known tokens are checked
+        tokens.detect_tokens(only_cache=False, addresses=[address], incremental=True)
+        assert get_evm_tokens.call_count == 1
+        assert queried_tokens == [{A_USDC}]
+
+        # a DAI movement appears in the history events of the address
+        with tokens.db.user_write() as write_cursor:
+            DBHistoryEvents(tokens.db).add_history_event(write_cursor, EvmEvent(
+                tx_hash=make_evm_tx_hash(),
+                sequence_index=0,
+                timestamp=TimestampMS(1700000000000),
+                location=Location.ETHEREUM,
+                location_label=address,
+                asset=A_DAI,
+                balance=Balance(amount=ONE),
+                event_type=HistoryEventType.RECEIVE,
+                event_subtype=HistoryEventSubType.NONE,
+            ))
+        result = tokens.detect_tokens(only_cache=False, addresses=[address], incremental=True)
+        assert get_evm_tokens.call_count == 1
+        assert queried_tokens[1] == {A_USDC, A_DAI}
+        assert set(result[address][0]) == {A_USDC, A_DAI}  # type: ignore[arg-type]
+
+        # nothing new moved so only the detected tokens are checked
+        tokens.detect_tokens(only_cache=False, addresses=[address], incremental=True)
+        assert queried_tokens[2] == {A_USDC, A_DAI}
+
+        # once the last full detection is old enough all known tokens are checked again
+        with patch('rotkehlchen.chain.evm.tokens.ts_now', return_value=ts_now() + FULL_TOKEN_DETECTION_PERIOD + 1):  # noqa: E501
+            tokens.detect_tokens(only_cache=False, addresses=[address], incremental=True)
+        assert get_evm_tokens.call_count == 2
+        assert queried_tokens[3] == {A_USDC}
+
+
 def _do_read(database):
     with database.conn.read_ctx() as cursor:
         database.get_settings(cursor)
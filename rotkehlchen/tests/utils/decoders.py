@@ -1,18 +1,146 @@
-from typing import TYPE_CHECKING
+import json
+import time
+import tracemalloc
+from contextlib import suppress
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
 from unittest.mock import _patch, patch
 
+import requests
+
+from rotkehlchen.db.evmtx import DBEvmTx
+from rotkehlchen.db.filtering import EvmTransactionsFilterQuery
 from rotkehlchen.utils.mixins.customizable_date import CustomizableDateMixin
 
 if TYPE_CHECKING:
+    from rotkehlchen.chain.evm.decoding.decoder import EVMTransactionDecoder
+    from rotkehlchen.db.dbhandler import DBHandler
     from rotkehlchen.db.drivers.gevent import DBCursor
+    from rotkehlchen.types import SUPPORTED_CHAIN_IDS, ChecksumEvmAddress
+
+# Maximum allowed drop of the decoding throughput compared to the baseline
+DECODING_BENCHMARK_MAX_REGRESSION = 0.2
+
+
+@dataclass(init=True, repr=True, eq=False, order=False, unsafe_hash=False, frozen=False)
+class DecodingBenchmarkResult:
+    transactions: int
+    failed_transactions: int
+    events: int
+    seconds: float
+    peak_memory_bytes: int
+    decoders: list[dict[str, Any]]
+
+    @property
+    def transactions_per_second(self) -> float:
+        return self.transactions / self.seconds if self.seconds != 0 else 0.0
+
+    @property
+    def events_per_second(self) -> float:
+        return self.events / self.seconds if self.seconds != 0 else 0.0
+
+    def serialize(self) -> dict[str, Any]:
+        return asdict(self) | {
+            'transactions_per_second': round(self.transactions_per_second, 3),
+            'events_per_second': round(self.events_per_second, 3),
+        }
 
 
 def patch_decoder_reload_data() -> _patch:
     """Patch decoder so reload data does not reload on-chain data at each decoding"""
-    def patched_reload_data(self, cursor: 'DBCursor') -> None:
+    def patched_reload_data(self, cursor: 'DBCursor') -> set['ChecksumEvmAddress']:
         self.base.refresh_tracked_accounts(cursor)
         for decoder in self.decoders.values():
             if isinstance(decoder, CustomizableDateMixin):
                 decoder.reload_settings(cursor)
+        return set()
 
     return patch('rotkehlchen.chain.evm.decoding.decoder.EVMTransactionDecoder.reload_data', patched_reload_data)  # noqa: E501
+
+
+def run_decoding_benchmark(
+        decoder: 'EVMTransactionDecoder',
+        database: 'DBHandler',
+        chain_id: 'SUPPORTED_CHAIN_IDS',
+) -> DecodingBenchmarkResult:
+    """Decodes all the transactions of the chain stored in the database, along with their
+    receipts, with the network disabled and measures the decoding throughput.
+
+    Transactions whose decoding fails, for example because it needs the network to get
+    the details of an unknown token, are not counted in the throughput.
+
+    The throughput is timed in a first pass. Memory and time per decoder are gathered in
+    a second pass since tracemalloc and the profiler slow down the decoding.
+    """
+    dbevmtx = DBEvmTx(database)
+    with database.conn.read_ctx() as cursor:
+        transactions = dbevmtx.get_evm_transactions(
+            cursor=cursor,
+            filter_=EvmTransactionsFilterQuery.make(chain_id=chain_id),
+            has_premium=True,
+        )
+        corpus = [
+            (transaction, receipt) for transaction in transactions
+            if (receipt := dbevmtx.get_receipt(cursor, transaction.tx_hash, chain_id)) is not None
+        ]
+
+    decoded_transactions = failed_transactions = events = 0
+    seconds = 0.0
+    network_patch = patch.object(requests.Session, 'request', side_effect=requests.exceptions.ConnectionError('Network is disabled in the decoding benchmark'))  # noqa: E501
+    with network_patch:  # the timed pass, without the overhead of profiling and tracemalloc
+        for transaction, receipt in corpus:
+            start = time.perf_counter()
+            try:
+                decoded_events, _ = decoder._decode_transaction(
+                    transaction=transaction,
+                    tx_receipt=receipt,
+                )
+            except Exception:  # pylint: disable=broad-except  # correctness is not measured here
+                failed_transactions += 1
+                continue
+
+            seconds += time.perf_counter() - start
+            decoded_transactions += 1
+            events += len(decoded_events)
+
+    # a second pass to gather the memory and per decoder stats. Nothing is saved in the DB
+    decoder.set_profiling(True)
+    tracemalloc.start()
+    with network_patch:
+        for transaction, receipt in corpus:
+            with suppress(Exception):
+                decoder._decode_transaction_events(transaction=transaction, tx_receipt=receipt)
+
+    _, peak_memory_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert decoder.profiler is not None, 'profiling was enabled above'
+    decoder_stats = decoder.profiler.serialize()
+    decoder.set_profiling(False)
+    return DecodingBenchmarkResult(
+        transactions=decoded_transactions,
+        failed_transactions=failed_transactions,
+        events=events,
+        seconds=seconds,
+        peak_memory_bytes=peak_memory_bytes,
+        decoders=decoder_stats,
+    )
+
+
+def check_decoding_benchmark_regression(
+        result: DecodingBenchmarkResult,
+        baseline_path: Path,
+) -> None:
+    """Compares the result with the baseline stored in the given path and fails if the
+    throughput dropped more than the allowed regression. If there is no baseline yet
+    the result is saved as the baseline."""
+    if baseline_path.exists() is False:
+        baseline_path.write_text(json.dumps(result.serialize(), indent=2))
+        return
+
+    baseline = json.loads(baseline_path.read_text())
+    min_transactions_per_second = baseline['transactions_per_second'] * (1 - DECODING_BENCHMARK_MAX_REGRESSION)  # noqa: E501
+    assert result.transactions_per_second >= min_transactions_per_second, (
+        f'Decoding throughput regressed to {result.transactions_per_second:.2f} tx/s. '
+        f'Baseline is {baseline["transactions_per_second"]:.2f} tx/s'
+    )
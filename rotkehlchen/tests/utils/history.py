@@ -1097,6 +1097,7 @@ def maybe_mock_historical_price_queries(
     # save the original function in this variable to be used when
     # the list of assets to not mock is non empty.
     original_function = historian.query_historical_price
+    original_prefetch_function = historian.prefetch_historical_prices
 
     def mock_historical_price_query(from_asset, to_asset, timestamp):
         if from_asset == to_asset:
@@ -1129,7 +1130,14 @@ def maybe_mock_historical_price_queries(
 
         return price
 
+    def mock_prefetch_historical_prices(assets_timestamps, to_asset):
+        original_prefetch_function(
+            assets_timestamps=[x for x in assets_timestamps if x[0] in dont_mock_price_for],
+            to_asset=to_asset,
+        )
+
     historian.query_historical_price = mock_historical_price_query
+    historian.prefetch_historical_prices = mock_prefetch_historical_prices
 
 
 def assert_pnl_debug_import(filepath: Path, database: DBHandler) -> None:
@@ -942,6 +942,9 @@ class CacheType(Enum):
     CONVEX_POOL_ADDRESS = auto()  # get convex pool addr
     CONVEX_POOL_NAME = auto()  # map convex pool rewards address -> pool name
     SPAM_ASSET_FALSE_POSITIVE = auto()  # assets that shouldn't be marked as spam automatically
+    CURRENT_PRICE = auto()  # last known usd price of an asset to serve it across restarts
+    CRYPTOCOMPARE_HISTORY_START = auto()  # oldest cryptocompare price of a pair once all history is cached  # noqa: E501
+    ORACLE_TELEMETRY = auto()  # price oracle query stats and the oracle that answered per asset  # noqa: E501
 
     def serialize(self) -> str:
         # Using custom serialize method instead of SerializableEnumMixin since mixin replaces
@@ -961,6 +964,9 @@ UniqueCacheType = Literal[
     CacheType.ENS_NAMEHASH,
     CacheType.ENS_LABELHASH,
     CacheType.CONVEX_POOL_NAME,
+    CacheType.CURRENT_PRICE,
+    CacheType.CRYPTOCOMPARE_HISTORY_START,
+    CacheType.ORACLE_TELEMETRY,
 ]
 
 UNIQUE_CACHE_KEYS: tuple[UniqueCacheType, ...] = typing.get_args(UniqueCacheType)
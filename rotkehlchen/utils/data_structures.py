@@ -91,5 +91,9 @@ class LRUSetCache(Generic[VT]):
         if key in self.cache:
             self.cache.pop(key)
 
+    def clear(self) -> None:
+        """Delete all entries in the cache"""
+        self.cache.clear()
+
     def get_values(self) -> set[VT]:
         return set(self.cache.keys())
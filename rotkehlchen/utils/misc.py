@@ -277,6 +277,29 @@ def hex_or_bytes_to_str(value: bytes | str) -> str:
     return hexstr
 
 
+@functools.lru_cache(maxsize=8192)
+def _hexstr_to_checksum_address(hexstr: str) -> ChecksumEvmAddress:
+    """Checksums an address hexstring. Cached since checksumming needs a keccak hash and
+    the same few addresses appear in most logs.
+
+    May raise:
+    - ValueError if the hexstring is not a valid address
+    """
+    return ChecksumEvmAddress(to_checksum_address('0x' + hexstr))
+
+
+def bytes_to_checksum_address(value: bytes) -> ChecksumEvmAddress:
+    """Turns 20 bytes into a checksummed address
+
+    May raise:
+    - DeserializationError if the bytes are not a valid address
+    """
+    try:
+        return _hexstr_to_checksum_address(value.hex())
+    except ValueError as e:
+        raise DeserializationError(f'Invalid ethereum address: {value.hex()}') from e
+
+
 def hex_or_bytes_to_address(value: bytes | str) -> ChecksumEvmAddress:
     """Turns a 32bit bytes/HexBytes or a hexstring into an address
 
@@ -289,7 +312,7 @@ def hex_or_bytes_to_address(value: bytes | str) -> ChecksumEvmAddress:
     except ConversionError as e:
         raise DeserializationError(f'Could not turn {value!r} to an ethereum address') from e
     try:
-        return ChecksumEvmAddress(to_checksum_address('0x' + hexstr[24:]))
+        return _hexstr_to_checksum_address(hexstr[24:])
     except ValueError as e:
         raise DeserializationError(
             f'Invalid ethereum address: {hexstr[24:]}',
@@ -3,6 +3,7 @@ import logging
 from collections.abc import Callable
 from http import HTTPStatus
 from typing import Any, Literal, overload
+from urllib.parse import urlparse
 
 import gevent
 import requests
@@ -11,11 +12,23 @@ from rotkehlchen.constants import GLOBAL_REQUESTS_TIMEOUT
 from rotkehlchen.db.settings import CachedSettings
 from rotkehlchen.errors.misc import RemoteError, UnableToDecryptRemoteData
 from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.utils.misc import set_user_agent
+from rotkehlchen.utils.rate_limiter import RateLimitedAdapter, RateLimiter
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
 
+def create_session() -> requests.Session:
+    """Creates a session with our user agent whose requests go through the rate limiter"""
+    session = requests.session()
+    set_user_agent(session)
+    adapter = RateLimitedAdapter()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
 def request_get(
         url: str,
         timeout: int = GLOBAL_REQUESTS_TIMEOUT,
@@ -28,6 +41,8 @@ def request_get(
     - Remote error if the get request fails
     """
     log.debug(f'Querying {url}')
+    if (host := urlparse(url).hostname) is not None:
+        RateLimiter().acquire(key=host)
     # TODO make this a bit more smart. Perhaps conditional on the type of request.
     # Not all requests would need repeated attempts
     response = retry_calls(
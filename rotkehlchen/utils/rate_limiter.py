@@ -0,0 +1,172 @@
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, NamedTuple, Optional
+from urllib.parse import urlparse
+
+import gevent
+from requests import PreparedRequest, Response
+from requests.adapters import HTTPAdapter
+
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+
+class RateLimit(NamedTuple):
+    rate: float  # requests allowed per second on average
+    burst: int  # requests that can be made at once after some idle time
+
+
+# Conservative defaults based on the documented limits of the free tiers
+DEFAULT_RATE_LIMITS: dict[str, RateLimit] = {
+    'api.coingecko.com': RateLimit(rate=0.5, burst=5),
+    'min-api.cryptocompare.com': RateLimit(rate=10, burst=20),
+    'api.etherscan.io': RateLimit(rate=5, burst=5),
+    'api-optimistic.etherscan.io': RateLimit(rate=5, burst=5),
+    'api.arbiscan.io': RateLimit(rate=5, burst=5),
+    'api.basescan.org': RateLimit(rate=5, burst=5),
+    'api.gnosisscan.io': RateLimit(rate=5, burst=5),
+    'api.polygonscan.com': RateLimit(rate=5, burst=5),
+}
+
+
+@dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
+class RateLimitStats:
+    requests: int = 0
+    background_requests: int = 0
+    throttled: int = 0
+    wait_seconds: float = 0.0
+    max_wait_seconds: float = 0.0
+
+    def serialize(self) -> dict[str, Any]:
+        return {
+            'requests': self.requests,
+            'background_requests': self.background_requests,
+            'throttled': self.throttled,
+            'wait_seconds': round(self.wait_seconds, 3),
+            'max_wait_seconds': round(self.max_wait_seconds, 3),
+        }
+
+
+class TokenBucket:
+    """A token bucket refilled at `rate` tokens per second up to `burst` tokens.
+
+    Each request takes a token, waiting for one if the bucket is empty. Background
+    requests wait for as long as any interactive request is waiting so that
+    background jobs can't starve user facing queries.
+    """
+
+    def __init__(self, limit: RateLimit) -> None:
+        self.limit = limit
+        self.tokens = float(limit.burst)
+        self.last_refill = time.monotonic()
+        self.interactive_waiters = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(
+            float(self.limit.burst),
+            self.tokens + (now - self.last_refill) * self.limit.rate,
+        )
+        self.last_refill = now
+
+    def acquire(self, background: bool) -> float:
+        """Takes a token, waiting as long as needed. Returns the seconds waited"""
+        start, waited = time.monotonic(), False
+        if background is False:
+            self.interactive_waiters += 1
+        try:
+            while True:
+                self._refill()
+                if self.tokens >= 1 and (background is False or self.interactive_waiters == 0):
+                    self.tokens -= 1
+                    return time.monotonic() - start if waited else 0.0
+
+                waited = True
+                if self.tokens < 1:
+                    gevent.sleep((1 - self.tokens) / self.limit.rate)
+                else:  # a background request letting interactive ones go first
+                    gevent.sleep(1 / self.limit.rate)
+        finally:
+            if background is False:
+                self.interactive_waiters -= 1
+
+
+def is_background_greenlet() -> bool:
+    """Checks if the current greenlet or any greenlet that spawned it is a background task"""
+    greenlet: Any = gevent.getcurrent()
+    while greenlet is not None:
+        if getattr(greenlet, 'background_task', False) is True:
+            return True
+
+        spawning_greenlet = getattr(greenlet, 'spawning_greenlet', None)
+        greenlet = spawning_greenlet() if spawning_greenlet is not None else None
+
+    return False
+
+
+class RateLimiter:
+    """Singleton that rate limits the requests to external services.
+
+    Requests are keyed by the host they are sent to, and each host with a configured
+    limit gets its own token bucket. Requests to other hosts are only counted.
+    Requests made by background tasks give way to the interactive ones.
+    """
+    __instance: Optional['RateLimiter'] = None
+    _buckets: dict[str, TokenBucket]
+    _stats: dict[str, RateLimitStats]
+
+    def __new__(cls) -> 'RateLimiter':
+        if RateLimiter.__instance is not None:
+            return RateLimiter.__instance
+
+        RateLimiter.__instance = object.__new__(cls)
+        RateLimiter.__instance._buckets = {
+            key: TokenBucket(limit) for key, limit in DEFAULT_RATE_LIMITS.items()
+        }
+        RateLimiter.__instance._stats = {}
+        return RateLimiter.__instance
+
+    def set_limit(self, key: str, limit: RateLimit | None) -> None:
+        """Sets the rate limit of the given key. None removes any limit"""
+        if limit is None:
+            self._buckets.pop(key, None)
+        else:
+            self._buckets[key] = TokenBucket(limit)
+
+    def acquire(self, key: str, background: bool | None = None) -> None:
+        """Waits until a request to the given key can be made.
+
+        If background is not given it's determined by the current greenlet.
+        """
+        if background is None:
+            background = is_background_greenlet()
+
+        if (stats := self._stats.get(key)) is None:
+            stats = self._stats[key] = RateLimitStats()
+        stats.requests += 1
+        stats.background_requests += background
+        if (bucket := self._buckets.get(key)) is None:
+            return
+
+        if (waited := bucket.acquire(background=background)) == 0:
+            return
+
+        log.debug(f'Waited {waited:.3f} seconds for a {"background" if background else "interactive"} request to {key}')  # noqa: E501
+        stats.throttled += 1
+        stats.wait_seconds += waited
+        stats.max_wait_seconds = max(stats.max_wait_seconds, waited)
+
+    def get_stats(self) -> dict[str, dict[str, Any]]:
+        return {key: stats.serialize() for key, stats in self._stats.items()}
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """Transport adapter that acquires from the RateLimiter before sending each request"""
+
+    def send(self, request: PreparedRequest, *args: Any, **kwargs: Any) -> Response:
+        if request.url is not None and (host := urlparse(request.url).hostname) is not None:
+            RateLimiter().acquire(key=host)
+        return super().send(request, *args, **kwargs)
@@ -0,0 +1,63 @@
+"""
+This script dumps the decoding profiling stats of a running rotki backend.
+
+Profiling should first be enabled via the decode/profiling API endpoint, or with
+--enable by this script, and then a (re)decoding should be run.
+"""
+
+import argparse
+import sys
+
+import requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Dump the decoding profiling stats of rotki')
+    parser.add_argument(
+        '--api-url',
+        help='The url of the rotki REST API',
+        default='http://127.0.0.1:5042/api/1',
+    )
+    parser.add_argument(
+        '--enable',
+        help='Enable (or reset) decoding profiling for all evm chains instead of dumping',
+        action='store_true',
+    )
+    parser.add_argument(
+        '--limit',
+        help='Number of entries to show per chain',
+        type=int,
+        default=30,
+    )
+    args = parser.parse_args()
+    url = f'{args.api_url}/blockchains/evm/transactions/decode/profiling'
+    if args.enable is True:
+        response = requests.put(url, json={'enable': True}, timeout=30)
+        if response.status_code != 200:
+            sys.exit(f'Failed to enable decoding profiling: {response.text}')
+        print('Decoding profiling enabled')
+        return
+
+    response = requests.get(url, timeout=30)
+    if response.status_code != 200:
+        sys.exit(f'Failed to get decoding profiling stats: {response.text}')
+
+    result = response.json()['result']
+    if len(result) == 0:
+        print('Decoding profiling is not enabled for any chain')
+        return
+
+    for chain, entries in result.items():
+        total_seconds = sum(x['seconds'] for x in entries)
+        print(f'\n{chain}: {total_seconds:.3f} seconds in decoding rules')
+        print(f'{"decoder":<40} {"rule type":<20} {"counterparty":<20} {"calls":>9} {"seconds":>10} {"events":>8}')  # noqa: E501
+        for entry in entries[:args.limit]:
+            print(
+                f'{entry["decoder"]:<40} {entry["rule_type"]:<20} '
+                f'{entry["counterparty"] or "-":<20} {entry["calls"]:>9} '
+                f'{entry["seconds"]:>10.3f} {entry["events"]:>8}',
+            )
+
+
+if __name__ == '__main__':
+    main()